@@ -0,0 +1,148 @@
+"""Benchmark the overhead of `Chat` over long agent sessions.
+
+Runs agent sessions of up to 1,000 turns, in which each turn submits the chat and
+executes the function call in the response, adding two messages. A chat model that
+immediately returns a function call is used, so only the time spent in `Chat` is
+measured. This is compared with the previous implementation, which copied the list of
+messages to create a new `Chat` each time a message was added.
+
+The time to add the messages of a session to a chat, and to fork the chat by adding a
+message to it after each turn, is also reported separately. These exclude the cost of
+creating the messages and executing the function calls, which dominates the time of
+a session.
+
+Run with `python benchmarks/chat_history.py`.
+"""
+
+import time
+from collections.abc import Callable, Iterable
+from typing import Any
+
+from magentic import AssistantMessage, Chat, FunctionCall, FunctionResultMessage
+from magentic.chat_model.base import ChatModel, OutputT
+from magentic.chat_model.message import Message, UserMessage
+
+SESSION_LENGTHS = [10, 100, 1_000]
+
+
+def get_weather(city: str) -> str:
+    """Get the weather in a city."""
+    return "sunny"
+
+
+class FunctionCallChatModel(ChatModel):
+    """A chat model that responds to every request with the same function call."""
+
+    def complete(
+        self,
+        messages: Iterable[Message[Any]],
+        functions: Iterable[Callable[..., Any]] | None = None,
+        output_types: Iterable[type[OutputT]] | None = None,
+        *,
+        stop: list[str] | None = None,
+    ) -> AssistantMessage[OutputT]:
+        return AssistantMessage(FunctionCall(get_weather, "Dublin"))  # type: ignore[arg-type]
+
+    async def acomplete(
+        self,
+        messages: Iterable[Message[Any]],
+        functions: Iterable[Callable[..., Any]] | None = None,
+        output_types: Iterable[type[OutputT]] | None = None,
+        *,
+        stop: list[str] | None = None,
+    ) -> AssistantMessage[OutputT]:
+        return self.complete(messages, functions, output_types, stop=stop)
+
+
+class PreviousChat(Chat):
+    """`Chat` as previously implemented, copying the list of messages on every add."""
+
+    def __init__(
+        self, messages: list[Message[Any]] | None = None, **kwargs: Any
+    ) -> None:
+        super().__init__(**kwargs)
+        self._kwargs = kwargs
+        self._message_list = list(messages) if messages else []
+
+    @property
+    def messages(self) -> list[Message[Any]]:
+        return self._message_list.copy()
+
+    @property
+    def last_message(self) -> Message[Any]:
+        return self._message_list[-1]
+
+    def add_message(self, message: Message[Any]) -> "PreviousChat":
+        return PreviousChat([*self._message_list, message], **self._kwargs)
+
+    def submit(self) -> "PreviousChat":
+        output_message: AssistantMessage[Any] = self.model.complete(
+            messages=self._message_list,
+            functions=self._functions,
+            output_types=self._output_types,
+        )
+        return self.add_message(output_message)
+
+
+def run_session(chat: Chat, num_turns: int) -> Chat:
+    chat = chat.add_message(UserMessage("What is the weather in Dublin?"))
+    for _ in range(num_turns):
+        chat = chat.submit().exec_function_call()
+    return chat
+
+
+def add_messages(chat: Chat, messages: list[Message[Any]]) -> list[Chat]:
+    """Add the messages one at a time, forking the chat after each message."""
+    forks = []
+    for message in messages:
+        chat = chat.add_message(message)
+        forks.append(chat.add_message(UserMessage("Fork")))
+        assert chat.last_message is message
+    return forks
+
+
+def bench(func: Callable[[], Any], repeat: int = 3) -> float:
+    """Return the best time in milliseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1e3
+
+
+def main() -> None:
+    model = FunctionCallChatModel()
+    kwargs: dict[str, Any] = {"functions": [get_weather], "model": model}
+    chat = run_session(Chat(**kwargs), 2)
+    previous_chat = run_session(PreviousChat(**kwargs), 2)
+    # Function result messages are only equal for the same function call instance
+    assert repr(chat.messages) == repr(previous_chat.messages)
+    assert isinstance(chat.last_message, FunctionResultMessage)
+
+    print("Time per agent session in milliseconds")
+    for num_turns in SESSION_LENGTHS:
+        previous = bench(lambda: run_session(PreviousChat(**kwargs), num_turns))  # noqa: B023
+        current = bench(lambda: run_session(Chat(**kwargs), num_turns))  # noqa: B023
+        print(
+            f"{num_turns:>6} turns"
+            f" | previous {previous:8.2f}"
+            f" | current {current:8.2f}"
+            f" | {previous / current:5.1f}x"
+        )
+
+    print("Time to add and fork the messages of a session in milliseconds")
+    for num_turns in [*SESSION_LENGTHS, 10_000]:
+        messages = run_session(Chat(**kwargs), num_turns).messages
+        previous = bench(lambda: add_messages(PreviousChat(**kwargs), messages))  # noqa: B023
+        current = bench(lambda: add_messages(Chat(**kwargs), messages))  # noqa: B023
+        print(
+            f"{num_turns:>6} turns"
+            f" | previous {previous:8.2f}"
+            f" | current {current:8.2f}"
+            f" | {previous / current:5.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
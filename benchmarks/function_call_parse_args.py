@@ -0,0 +1,144 @@
+"""Benchmark parsing tool call arguments into a `FunctionCall`.
+
+Parses the arguments for functions that mix positional-only, `*args`, keyword-only
+and `**kwargs` parameters using `FunctionCallFunctionSchema.parse_args`. This is
+compared with the previous implementation, which got the signature of the function
+and walked its parameters once for each parameter kind on every call.
+
+Run with `python benchmarks/function_call_parse_args.py`.
+"""
+
+import inspect
+import json
+import time
+from collections.abc import Callable
+from typing import Any
+
+from magentic.chat_model.function_schema import FunctionCallFunctionSchema
+from magentic.function_call import FunctionCall
+
+NUM_CALLS = 20_000
+
+
+def add(a: int, b: int) -> int:
+    return a + b
+
+
+def mixed(a: int, /, b: int, *args: int, c: int, **kwargs: int) -> int:
+    return a + b + sum(args) + c + sum(kwargs.values())
+
+
+def many_params(
+    a: int,
+    b: str,
+    /,
+    c: float,
+    d: int,
+    *args: int,
+    e: int = 0,
+    f: str = "",
+    g: float = 0.0,
+    h: bool = False,
+    **kwargs: str,
+) -> None:
+    pass
+
+
+CASES: list[tuple[Callable[..., Any], dict[str, Any]]] = [
+    (add, {"a": 1, "b": 2}),
+    (mixed, {"a": 1, "b": 2, "args": [3, 4], "c": 5, "kwargs": {"d": 6}}),
+    (
+        many_params,
+        {
+            "a": 1,
+            "b": "x",
+            "c": 1.5,
+            "d": 2,
+            "args": [1, 2, 3],
+            "e": 1,
+            "f": "y",
+            "g": 2.5,
+            "h": True,
+            "kwargs": {"i": "z", "j": "w"},
+        },
+    ),
+]
+
+
+def parse_args_previous(
+    schema: FunctionCallFunctionSchema[Any], args_json: str
+) -> FunctionCall[Any]:
+    """The previous implementation of `FunctionCallFunctionSchema.parse_args`."""
+    func = schema._func
+    model = schema._model.model_validate_json(args_json)
+    supplied_params = [
+        param
+        for param in inspect.signature(func).parameters.values()
+        if param.name in model.model_fields_set
+    ]
+    args_positional_only = [
+        getattr(model, param.name)
+        for param in supplied_params
+        if param.kind == param.POSITIONAL_ONLY
+    ]
+    args_positional_or_keyword = [
+        getattr(model, param.name)
+        for param in supplied_params
+        if param.kind == param.POSITIONAL_OR_KEYWORD
+    ]
+    args_var_positional = [
+        arg
+        for param in supplied_params
+        if param.kind == param.VAR_POSITIONAL
+        for arg in getattr(model, param.name)
+    ]
+    args_keyword_only = {
+        param.name: getattr(model, param.name)
+        for param in supplied_params
+        if param.kind == param.KEYWORD_ONLY
+    }
+    args_var_keyword = {
+        name: value
+        for param in supplied_params
+        if param.kind == param.VAR_KEYWORD
+        for name, value in getattr(model, param.name).items()
+    }
+    return FunctionCall(
+        func,
+        *args_positional_only,
+        *args_positional_or_keyword,
+        *args_var_positional,
+        **args_keyword_only,
+        **args_var_keyword,
+    )
+
+
+def bench(func: Callable[[], Any], repeat: int = 3) -> float:
+    """Return the best time per call in microseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(NUM_CALLS):
+            func()
+        best = min(best, time.perf_counter() - start)
+    return best / NUM_CALLS * 1e6
+
+
+def main() -> None:
+    print("Time per parse_args call in microseconds")
+    for func, args in CASES:
+        schema = FunctionCallFunctionSchema(func)
+        args_json = json.dumps(args)
+        assert schema.parse_args([args_json]) == parse_args_previous(schema, args_json)
+        previous = bench(lambda: parse_args_previous(schema, args_json))  # noqa: B023
+        current = bench(lambda: schema.parse_args([args_json]))  # noqa: B023
+        print(
+            f"{func.__name__:<12}"
+            f" | previous {previous:6.2f}"
+            f" | current {current:6.2f}"
+            f" | {previous / current:4.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""Benchmark the time to import magentic in a new interpreter.
+
+Uses `python -X importtime` to measure the cumulative time to `import magentic`. This
+is compared with the previous implementation, which imported openai when importing
+magentic because `OpenaiChatModel` and the function schemas imported it eagerly.
+
+Run with `python benchmarks/import_time.py`.
+"""
+
+import subprocess
+import sys
+
+REPEAT = 5
+
+
+def import_time(code: str) -> float:
+    """Return the best time in milliseconds to import the last module in `code`."""
+    best = float("inf")
+    for _ in range(REPEAT):
+        result = subprocess.run(  # noqa: S603
+            [sys.executable, "-X", "importtime", "-c", code],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        # The last line is the outermost import of the last statement
+        cumulative = result.stderr.splitlines()[-1].split("|")[1]
+        best = min(best, int(cumulative) / 1e3)
+    return best
+
+
+def main() -> None:
+    openai = import_time("import openai")
+    current = import_time("import magentic")
+    # The previous implementation imported openai as part of importing magentic
+    previous = openai + import_time("import openai; import magentic")
+
+    print("Time to import magentic in milliseconds")
+    print(
+        f"{'import magentic':<16}"
+        f" | previous {previous:8.1f}"
+        f" | current {current:8.1f}"
+        f" | {previous / current:6.1f}x"
+    )
+
+
+if __name__ == "__main__":
+    main()
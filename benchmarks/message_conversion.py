@@ -0,0 +1,83 @@
+"""Benchmark converting the chat history to OpenAI messages on each turn.
+
+Builds the history of an agent session in which each turn adds a function call and
+its result, then converts the full history to OpenAI messages as is done for every
+request. This is compared with the previous implementation, which converted every
+message in the history on every request, rather than only the messages added since
+the previous turn.
+
+Run with `python benchmarks/message_conversion.py`.
+"""
+
+import time
+from collections.abc import Callable
+from typing import Any
+
+from magentic import AssistantMessage, FunctionCall, FunctionResultMessage
+from magentic.chat_model.message import Message, UserMessage
+from magentic.chat_model.openai_chat_model import (
+    _add_missing_tool_calls_responses,
+    _messages_to_openai_messages,
+    message_to_openai_message,
+)
+
+SESSION_LENGTHS = [10, 100, 1_000]
+
+
+def get_weather(city: str, days: int = 1) -> list[str]:
+    """Get the weather forecast for a city."""
+    return ["sunny"] * days
+
+
+def build_history(num_turns: int) -> list[Message[Any]]:
+    messages: list[Message[Any]] = [UserMessage("What is the weather in Dublin?")]
+    for turn in range(num_turns):
+        function_call = FunctionCall(get_weather, "Dublin", days=turn % 7 + 1)
+        messages.append(AssistantMessage(function_call))
+        messages.append(FunctionResultMessage(function_call(), function_call))
+    return messages
+
+
+def convert_previous(messages: list[Message[Any]]) -> None:
+    """The previous implementation, which converted every message on each request."""
+    _add_missing_tool_calls_responses([message_to_openai_message(m) for m in messages])
+
+
+def convert_current(messages: list[Message[Any]]) -> None:
+    _add_missing_tool_calls_responses(_messages_to_openai_messages(messages))
+
+
+def bench(func: Callable[[], Any], repeat: int = 3) -> float:
+    """Return the best time in milliseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1e3
+
+
+def main() -> None:
+    messages = build_history(3)
+    assert _messages_to_openai_messages(messages) == [
+        message_to_openai_message(m) for m in messages
+    ]
+
+    print("Time to convert the history on the last turn in milliseconds")
+    for num_turns in SESSION_LENGTHS:
+        messages = build_history(num_turns)
+
+        # The history up to the last turn was converted by previous requests
+        convert_current(messages)
+        current = bench(lambda: convert_current(messages))  # noqa: B023
+        previous = bench(lambda: convert_previous(messages))  # noqa: B023
+        print(
+            f"{num_turns:>6} turns"
+            f" | previous {previous:8.2f}"
+            f" | current {current:8.2f}"
+            f" | {previous / current:5.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,310 @@
+"""Benchmark the per-token overhead of converting LLM output streams into outputs.
+
+Streams synthetic OpenAI, Anthropic and LiteLLM responses through `OutputStream` and
+`AsyncOutputStream` using the real stream parser for each provider. Each response is
+either text, returned as a `StreamedStr`, or many tool calls, returned as a
+`ParallelFunctionCall`. The stream state is replaced with a no-op so that only the
+overhead of `OutputStream` and the parser is measured. The number of tool calls is
+varied while keeping the total number of tokens fixed, so that any per-token cost
+which grows with the number of tool calls in the response is visible.
+
+Run with `python benchmarks/output_stream.py`.
+"""
+
+import asyncio
+import time
+from collections.abc import Callable
+from typing import Any
+
+import anthropic.types as anthropic_types
+from anthropic.lib.streaming import InputJsonEvent, MessageStopEvent, TextEvent
+from litellm.types.utils import (
+    ChatCompletionDeltaToolCall,
+    Delta,
+    Function,
+    ModelResponse,
+    StreamingChoices,
+)
+from openai.types.chat import ChatCompletionChunk
+
+from magentic.chat_model.anthropic_chat_model import AnthropicStreamParser
+from magentic.chat_model.base import aparse_stream, parse_stream
+from magentic.chat_model.function_schema import (
+    get_async_function_schemas,
+    get_function_schemas,
+)
+from magentic.chat_model.litellm_chat_model import LitellmStreamParser
+from magentic.chat_model.message import AssistantMessage, Message, Usage
+from magentic.chat_model.openai_chat_model import OpenaiStreamParser
+from magentic.chat_model.stream import (
+    AsyncOutputStream,
+    OutputStream,
+    StreamParser,
+    StreamState,
+)
+from magentic.function_call import AsyncParallelFunctionCall, ParallelFunctionCall
+from magentic.streaming import AsyncStreamedStr, StreamedStr, async_iter
+
+NUM_TOKENS = 20_000
+NUM_TOOL_CALLS = (1, 10, 100)
+
+
+def search(query: str) -> str:
+    return query
+
+
+def tool_call_args_tokens(num_tokens: int) -> list[str]:
+    """Split the arguments of a tool call into `num_tokens` chunks."""
+    return ['{"query": "', *(["word "] * (num_tokens - 2)), '"}']
+
+
+class NoopStreamState(StreamState[Any]):
+    """Stream state that ignores all items, to isolate `OutputStream` overhead."""
+
+    def __init__(self) -> None:
+        self.usage_ref: list[Usage] = []
+
+    def update(self, item: Any) -> None:
+        pass
+
+    @property
+    def current_message_snapshot(self) -> Message[Any]:
+        return AssistantMessage("")
+
+
+def openai_chunk(delta: dict[str, Any]) -> ChatCompletionChunk:
+    return ChatCompletionChunk.model_validate(
+        {
+            "id": "chatcmpl-1",
+            "object": "chat.completion.chunk",
+            "created": 0,
+            "model": "gpt-4o",
+            "choices": [{"index": 0, "delta": delta}],
+        }
+    )
+
+
+def openai_text() -> list[ChatCompletionChunk]:
+    return [
+        openai_chunk({"role": "assistant", "content": ""}),
+        *(openai_chunk({"content": " word"}) for _ in range(NUM_TOKENS)),
+    ]
+
+
+def openai_tool_calls(num_tool_calls: int) -> list[ChatCompletionChunk]:
+    chunks = [openai_chunk({"role": "assistant"})]
+    for i in range(num_tool_calls):
+        for j, args in enumerate(tool_call_args_tokens(NUM_TOKENS // num_tool_calls)):
+            tool_call = {
+                "index": i,
+                "id": f"call_{i}" if j == 0 else None,
+                "type": "function",
+                "function": {"name": "search" if j == 0 else None, "arguments": args},
+            }
+            chunks.append(openai_chunk({"tool_calls": [tool_call]}))
+    return chunks
+
+
+def anthropic_message() -> anthropic_types.Message:
+    return anthropic_types.Message(
+        id="msg_1",
+        content=[],
+        model="claude-3-5-sonnet-latest",
+        role="assistant",
+        stop_reason=None,
+        stop_sequence=None,
+        type="message",
+        usage=anthropic_types.Usage(input_tokens=10, output_tokens=1),
+    )
+
+
+def anthropic_events(blocks: list[Any]) -> list[Any]:
+    message_delta = anthropic_types.RawMessageDeltaEvent(
+        type="message_delta",
+        delta={"stop_reason": "end_turn", "stop_sequence": None},  # type: ignore[arg-type]
+        usage=anthropic_types.MessageDeltaUsage(output_tokens=100),
+    )
+    return [
+        anthropic_types.RawMessageStartEvent(
+            type="message_start", message=anthropic_message()
+        ),
+        *blocks,
+        message_delta,
+        MessageStopEvent(type="message_stop", message=anthropic_message()),
+    ]
+
+
+def anthropic_text() -> list[Any]:
+    blocks: list[Any] = [
+        anthropic_types.RawContentBlockStartEvent(
+            type="content_block_start",
+            index=0,
+            content_block=anthropic_types.TextBlock(type="text", text=""),
+        )
+    ]
+    for _ in range(NUM_TOKENS):
+        blocks.append(
+            anthropic_types.RawContentBlockDeltaEvent(
+                type="content_block_delta",
+                index=0,
+                delta=anthropic_types.TextDelta(type="text_delta", text=" word"),
+            )
+        )
+        blocks.append(TextEvent(type="text", text=" word", snapshot=""))
+    return anthropic_events(blocks)
+
+
+def anthropic_tool_calls(num_tool_calls: int) -> list[Any]:
+    blocks: list[Any] = []
+    for i in range(num_tool_calls):
+        blocks.append(
+            anthropic_types.RawContentBlockStartEvent(
+                type="content_block_start",
+                index=i,
+                content_block=anthropic_types.ToolUseBlock(
+                    type="tool_use", id=f"toolu_{i}", name="search", input={}
+                ),
+            )
+        )
+        for args in tool_call_args_tokens(NUM_TOKENS // num_tool_calls):
+            blocks.append(
+                anthropic_types.RawContentBlockDeltaEvent(
+                    type="content_block_delta",
+                    index=i,
+                    delta=anthropic_types.InputJSONDelta(
+                        type="input_json_delta", partial_json=args
+                    ),
+                )
+            )
+            blocks.append(
+                InputJsonEvent(type="input_json", partial_json=args, snapshot={})
+            )
+    return anthropic_events(blocks)
+
+
+def litellm_chunk(delta: Delta) -> ModelResponse:
+    return ModelResponse(stream=True, choices=[StreamingChoices(delta=delta)])
+
+
+def litellm_text() -> list[ModelResponse]:
+    return [
+        litellm_chunk(Delta(role="assistant", content=" word"))
+        for _ in range(NUM_TOKENS)
+    ]
+
+
+def litellm_tool_calls(num_tool_calls: int) -> list[ModelResponse]:
+    chunks = []
+    for i in range(num_tool_calls):
+        for j, args in enumerate(tool_call_args_tokens(NUM_TOKENS // num_tool_calls)):
+            tool_call = ChatCompletionDeltaToolCall(
+                id=f"call_{i}" if j == 0 else None,
+                function=Function(name="search" if j == 0 else None, arguments=args),
+                type="function",
+                index=i,
+            )
+            chunks.append(litellm_chunk(Delta(content=None, tool_calls=[tool_call])))
+    return chunks
+
+
+PROVIDERS: dict[
+    str,
+    tuple[
+        Callable[[], StreamParser[Any]],
+        Callable[[], list[Any]],
+        Callable[[int], list[Any]],
+    ],
+] = {
+    "openai": (OpenaiStreamParser, openai_text, openai_tool_calls),
+    "anthropic": (AnthropicStreamParser, anthropic_text, anthropic_tool_calls),
+    "litellm": (LitellmStreamParser, litellm_text, litellm_tool_calls),
+}
+
+
+def consume_output(output: Any) -> None:
+    if isinstance(output, StreamedStr):
+        output.to_string()
+    else:
+        for _ in output:
+            pass
+
+
+async def aconsume_output(output: Any) -> None:
+    if isinstance(output, AsyncStreamedStr):
+        await output.to_string()
+    else:
+        async for _ in output:
+            pass
+
+
+def bench(
+    parser: StreamParser[Any], items: list[Any], output_type: type, repeat: int = 5
+) -> float:
+    """Return the best time per token in microseconds."""
+    function_schemas = get_function_schemas([search], [output_type])
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        stream = OutputStream(
+            iter(items),
+            function_schemas=function_schemas,
+            parser=parser,
+            state=NoopStreamState(),
+        )
+        consume_output(parse_stream(stream, [output_type]))
+        best = min(best, time.perf_counter() - start)
+    return best / NUM_TOKENS * 1e6
+
+
+async def abench(
+    parser: StreamParser[Any], items: list[Any], output_type: type, repeat: int = 5
+) -> float:
+    """Async version of `bench`."""
+    function_schemas = get_async_function_schemas([search], [output_type])
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        stream = AsyncOutputStream(
+            async_iter(items),
+            function_schemas=function_schemas,
+            parser=parser,
+            state=NoopStreamState(),
+        )
+        await aconsume_output(await aparse_stream(stream, [output_type]))
+        best = min(best, time.perf_counter() - start)
+    return best / NUM_TOKENS * 1e6
+
+
+def format_results(name: str, text: float, tool_calls: list[float]) -> str:
+    return f"{name:>17}: text {text:6.2f}" + "".join(
+        f" | {n:>3} tool calls {t:6.2f}"
+        for n, t in zip(NUM_TOOL_CALLS, tool_calls, strict=True)
+    )
+
+
+async def amain() -> None:
+    for name, (parser_cls, make_text, make_tool_calls) in PROVIDERS.items():
+        text = await abench(parser_cls(), make_text(), AsyncStreamedStr)
+        tool_calls = [
+            await abench(
+                parser_cls(), make_tool_calls(n), AsyncParallelFunctionCall[str]
+            )
+            for n in NUM_TOOL_CALLS
+        ]
+        print(format_results(f"{name} (async)", text, tool_calls))
+
+
+def main() -> None:
+    print(f"Time per token in microseconds, for {NUM_TOKENS:,} tokens")
+    for name, (parser_cls, make_text, make_tool_calls) in PROVIDERS.items():
+        text = bench(parser_cls(), make_text(), StreamedStr)
+        tool_calls = [
+            bench(parser_cls(), make_tool_calls(n), ParallelFunctionCall[str])
+            for n in NUM_TOOL_CALLS
+        ]
+        print(format_results(name, text, tool_calls))
+    asyncio.run(amain())
+
+
+if __name__ == "__main__":
+    main()
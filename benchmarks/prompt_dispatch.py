@@ -0,0 +1,97 @@
+"""Benchmark the overhead of calling a prompt-function that uses the global chat model.
+
+Calls a `@prompt` function with no `model` argument and no chat model context, so
+that the chat model is created from the magentic settings. `OpenaiChatModel.complete`
+is replaced with one that returns immediately, so only the time to dispatch the call
+is measured. This is compared with the previous implementation, which read the
+settings from environment variables and created a new chat model with new clients on
+every call.
+
+Run with `python benchmarks/prompt_dispatch.py`.
+"""
+
+import time
+from collections.abc import Callable
+from typing import Any
+from unittest.mock import patch
+
+import openai
+
+from magentic import AssistantMessage, OpenaiChatModel, prompt
+from magentic.backend import get_chat_model
+from magentic.chat_model.base import ChatModel
+from magentic.chat_model.client_registry import clear_clients
+from magentic.settings import Settings
+
+NUM_CALLS = 1_000
+# The previous implementation takes tens of milliseconds per call
+NUM_CALLS_PREVIOUS = 20
+
+
+def get_chat_model_previous() -> ChatModel:
+    """The previous implementation of `get_chat_model` for the OpenAI backend."""
+    settings = Settings()
+    # Each chat model created its own sync and async clients
+    clear_clients()
+    openai.AsyncOpenAI(
+        api_key=settings.openai_api_key, base_url=settings.openai_base_url
+    )
+    return OpenaiChatModel(
+        model=settings.openai_model,
+        api_key=settings.openai_api_key,
+        api_type=settings.openai_api_type,
+        base_url=settings.openai_base_url,
+        max_tokens=settings.openai_max_tokens,
+        seed=settings.openai_seed,
+        temperature=settings.openai_temperature,
+    )
+
+
+def complete(self: OpenaiChatModel, *args: Any, **kwargs: Any) -> AssistantMessage[str]:
+    return AssistantMessage("Hello")
+
+
+@prompt("Say hello")
+def say_hello() -> str: ...
+
+
+def bench(
+    func: Callable[[], Any], num_calls: int = NUM_CALLS, repeat: int = 3
+) -> float:
+    """Return the best time per call in microseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(num_calls):
+            func()
+        best = min(best, time.perf_counter() - start)
+    return best / num_calls * 1e6
+
+
+def main() -> None:
+    with patch.object(OpenaiChatModel, "complete", complete):
+        assert say_hello() == "Hello"
+        current_get = bench(get_chat_model)
+        current_call = bench(say_hello)
+        with patch("magentic.prompt_function.get_chat_model", get_chat_model_previous):
+            assert say_hello() == "Hello"
+            previous_get = bench(get_chat_model_previous, NUM_CALLS_PREVIOUS)
+            previous_call = bench(say_hello, NUM_CALLS_PREVIOUS)
+
+    print("Time per call in microseconds")
+    print(
+        f"{'get_chat_model':<16}"
+        f" | previous {previous_get:8.1f}"
+        f" | current {current_get:8.1f}"
+        f" | {previous_get / current_get:6.1f}x"
+    )
+    print(
+        f"{'@prompt call':<16}"
+        f" | previous {previous_call:8.1f}"
+        f" | current {current_call:8.1f}"
+        f" | {previous_call / current_call:6.1f}x"
+    )
+
+
+if __name__ == "__main__":
+    main()
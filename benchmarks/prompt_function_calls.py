@@ -0,0 +1,160 @@
+"""Benchmark the overhead of calling a prompt-function.
+
+Calls a prompt-function with several tools and a structured return type against a
+`ReplayChatModel`, so that no requests are made, and reports the calls per second.
+This is compared with clearing the caches of function schemas and tools arguments
+before every call, which is equivalent to rebuilding the pydantic models, JSON
+schemas and tools on each call as was done previously. The cost of building the
+OpenAI request arguments is also reported separately.
+
+Run with `python benchmarks/prompt_function_calls.py`.
+"""
+
+import json
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any, Literal
+
+from openai.types.chat import ChatCompletionChunk
+from pydantic import BaseModel
+
+from magentic import prompt
+from magentic.chat_model import function_schema, openai_chat_model
+from magentic.chat_model.function_schema import get_function_schemas
+from magentic.chat_model.openai_chat_model import OpenaiChatModel
+from magentic.chat_model.recording_chat_model import ReplayChatModel
+
+NUM_CALLS = 500
+
+
+class Address(BaseModel):
+    street: str
+    city: str
+    country: str
+
+
+class Person(BaseModel):
+    name: str
+    age: int
+    addresses: list[Address]
+    role: Literal["admin", "user", "guest"]
+
+
+def search_people(query: str, limit: int = 10) -> list[Person]:
+    """Search for people matching the query."""
+    return []
+
+
+def get_person(name: str) -> Person:
+    """Get a person by name."""
+    raise NotImplementedError
+
+
+def update_address(name: str, address: Address, *, primary: bool = False) -> None:
+    """Update the address of a person."""
+
+
+def delete_person(name: str, reason: str | None = None) -> None:
+    """Delete a person."""
+
+
+FUNCTIONS: list[Callable[..., Any]] = [
+    search_people,
+    get_person,
+    update_address,
+    delete_person,
+]
+
+PERSON_JSON = json.dumps(
+    {
+        "name": "Alice",
+        "age": 30,
+        "addresses": [{"street": "1 Main St", "city": "Dublin", "country": "IE"}],
+        "role": "admin",
+    }
+)
+
+
+def openai_chunk(delta: dict[str, Any]) -> dict[str, Any]:
+    return ChatCompletionChunk.model_validate(
+        {
+            "id": "chatcmpl-1",
+            "object": "chat.completion.chunk",
+            "created": 0,
+            "model": "gpt-4o",
+            "choices": [{"index": 0, "delta": delta}],
+        }
+    ).model_dump(mode="json", exclude_unset=True)
+
+
+def write_recording(path: Path) -> None:
+    """Write a recording of a response that returns a `Person` through a tool call."""
+    chunks = [openai_chunk({"role": "assistant"})]
+    for i in range(0, len(PERSON_JSON), 8):
+        function = {"name": "return_person" if i == 0 else None}
+        function["arguments"] = PERSON_JSON[i : i + 8]
+        tool_call = {"index": 0, "id": "call_1" if i == 0 else None}
+        chunks.append(
+            openai_chunk({"tool_calls": [{**tool_call, "function": function}]})
+        )
+    recording = {"format": "openai", "items": chunks, "delays": [0.0] * len(chunks)}
+    path.write_text(json.dumps(recording) + "\n")
+
+
+def clear_caches() -> None:
+    function_schema._cached_function_schemas.cache_clear()
+    function_schema._cached_async_function_schemas.cache_clear()
+    openai_chat_model._cached_tools_args.cache_clear()
+
+
+def bench(func: Callable[[], Any], *, cached: bool, repeat: int = 3) -> float:
+    """Return the best number of calls per second."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(NUM_CALLS):
+            if not cached:
+                clear_caches()
+            func()
+        best = min(best, time.perf_counter() - start)
+    return NUM_CALLS / best
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = Path(tmp_dir) / "recording.jsonl"
+        write_recording(path)
+
+        @prompt(
+            "Find the person called {name}",
+            functions=FUNCTIONS,
+            model=ReplayChatModel(path, speed=None),
+        )
+        def find_person(name: str) -> Person: ...
+
+        assert find_person("Alice").name == "Alice"
+        print(f"Calls per second, over {NUM_CALLS} calls")
+        print(
+            "prompt-function with ReplayChatModel"
+            f" | uncached {bench(lambda: find_person('Alice'), cached=False):8,.0f}"
+            f" | cached {bench(lambda: find_person('Alice'), cached=True):8,.0f}"
+        )
+
+    chat_model = OpenaiChatModel("gpt-4o", api_key="test")
+    output_types = [Person]
+
+    def build_openai_tools_args() -> None:
+        function_schemas = get_function_schemas(FUNCTIONS, output_types)
+        chat_model._get_tools_args(function_schemas, output_types)
+
+    print(
+        "OpenAI tools arguments               "
+        f" | uncached {bench(build_openai_tools_args, cached=False):8,.0f}"
+        f" | cached {bench(build_openai_tools_args, cached=True):8,.0f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""Benchmark executing tool calls while the response is still being streamed.
+
+Replays a recorded response in which the model emits several tool calls spread out
+over time, using `ReplayChatModel` so that no requests are made. Each tool sleeps to
+simulate I/O, with the earlier tool calls taking the longest. The time to get all
+results is compared between collecting every tool call before executing them
+concurrently, as was done previously, and starting each tool call as soon as it has
+been parsed from the stream.
+
+Run with `python benchmarks/speculative_tool_execution.py`.
+"""
+
+import asyncio
+import json
+import tempfile
+import time
+from collections.abc import Awaitable, Callable
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+
+from openai.types.chat import ChatCompletionChunk
+
+from magentic import AsyncParallelFunctionCall, ParallelFunctionCall, UserMessage
+from magentic.chat_model.recording_chat_model import ReplayChatModel
+
+# Seconds between the tool calls in the response
+TOOL_CALL_INTERVAL = 0.1
+# Seconds taken by the tool for each tool call
+TOOL_DURATIONS = [0.5, 0.4, 0.3, 0.2, 0.1]
+
+
+def fetch(index: int) -> int:
+    """Fetch the page with the given index."""
+    time.sleep(TOOL_DURATIONS[index])
+    return index
+
+
+async def afetch(index: int) -> int:
+    """Fetch the page with the given index."""
+    await asyncio.sleep(TOOL_DURATIONS[index])
+    return index
+
+
+def openai_chunk(delta: dict[str, Any]) -> dict[str, Any]:
+    return ChatCompletionChunk.model_validate(
+        {
+            "id": "chatcmpl-1",
+            "object": "chat.completion.chunk",
+            "created": 0,
+            "model": "gpt-4o",
+            "choices": [{"index": 0, "delta": delta}],
+        }
+    ).model_dump(mode="json", exclude_unset=True)
+
+
+def write_recording(path: Path, function_name: str) -> None:
+    """Write a recording of a response with tool calls spread out over time."""
+    chunks = [openai_chunk({"role": "assistant"})]
+    delays = [0.0]
+    for index in range(len(TOOL_DURATIONS)):
+        function = {"name": function_name, "arguments": json.dumps({"index": index})}
+        tool_call = {"index": index, "id": f"call_{index}", "function": function}
+        chunks.append(openai_chunk({"tool_calls": [tool_call]}))
+        delays.append(TOOL_CALL_INTERVAL)
+    # The last tool call is complete once the stream ends
+    chunks.append(openai_chunk({}))
+    delays.append(TOOL_CALL_INTERVAL)
+    recording = {"format": "openai", "items": chunks, "delays": delays}
+    path.write_text(json.dumps(recording) + "\n")
+
+
+def bench(func: Callable[[], Any], repeat: int = 3) -> float:
+    """Return the best time in seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+async def abench(func: Callable[[], Awaitable[Any]], repeat: int = 3) -> float:
+    """Async version of `bench`."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = Path(tmp_dir) / "fetch.jsonl"
+        write_recording(path, "fetch")
+        chat_model = ReplayChatModel(path)
+
+        def complete() -> ParallelFunctionCall[int]:
+            message = chat_model.complete(
+                [UserMessage("Fetch the pages")],
+                functions=[fetch],
+                output_types=[ParallelFunctionCall[int]],
+            )
+            return message.content
+
+        def execute_after_message() -> None:
+            function_calls = list(complete())
+            with ThreadPoolExecutor(len(TOOL_DURATIONS)) as executor:
+                list(executor.map(lambda call: call(), function_calls))
+
+        def execute_as_parsed() -> None:
+            complete()(max_workers=len(TOOL_DURATIONS))
+
+        print(
+            f"Time in seconds for {len(TOOL_DURATIONS)} tool calls"
+            f" {TOOL_CALL_INTERVAL}s apart, taking {TOOL_DURATIONS}s"
+        )
+        print(
+            "sync  "
+            f" | after message {bench(execute_after_message):5.2f}"
+            f" | as parsed {bench(execute_as_parsed):5.2f}"
+        )
+
+        apath = Path(tmp_dir) / "afetch.jsonl"
+        write_recording(apath, "afetch")
+        achat_model = ReplayChatModel(apath)
+
+        async def acomplete() -> AsyncParallelFunctionCall[Awaitable[int]]:
+            message = await achat_model.acomplete(
+                [UserMessage("Fetch the pages")],
+                functions=[afetch],
+                output_types=[AsyncParallelFunctionCall[Awaitable[int]]],
+            )
+            return message.content
+
+        async def aexecute_after_message() -> None:
+            function_calls = [call async for call in await acomplete()]
+            await asyncio.gather(*(call() for call in function_calls))
+
+        async def aexecute_as_parsed() -> None:
+            await (await acomplete())()
+
+        async def amain() -> None:
+            after_message = await abench(aexecute_after_message)
+            as_parsed = await abench(aexecute_as_parsed)
+            print(
+                "async "
+                f" | after message {after_message:5.2f}"
+                f" | as parsed {as_parsed:5.2f}"
+            )
+
+        asyncio.run(amain())
+
+
+if __name__ == "__main__":
+    main()
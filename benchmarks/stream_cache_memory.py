@@ -0,0 +1,96 @@
+"""Benchmark the memory retained by streamed outputs for each stream cache mode.
+
+Streams a long generation through `StreamedStr` once, then reports the memory still
+held by the `StreamedStr` along with the peak memory and time taken. Also streams many
+shorter generations concurrently through `AsyncStreamedStr`, as happens when a prompt
+function is fanned out across many requests, and reports the total retained memory.
+
+Run with `python benchmarks/stream_cache_memory.py`.
+"""
+
+import asyncio
+import time
+import tracemalloc
+from collections.abc import AsyncIterator, Iterator
+from typing import get_args
+
+from magentic.streaming import AsyncStreamedStr, StreamCache, StreamedStr
+
+STREAM_CACHES: tuple[StreamCache, ...] = get_args(StreamCache)
+
+
+def generate_chunks(num_chunks: int) -> Iterator[str]:
+    """Yield new token-sized string objects, as received from an LLM."""
+    for i in range(num_chunks):
+        yield f" token{i % 1000}"
+
+
+async def agenerate_chunks(num_chunks: int) -> AsyncIterator[str]:
+    for i in range(num_chunks):
+        yield f" token{i % 1000}"
+        if i % 100 == 0:
+            await asyncio.sleep(0)
+
+
+def format_bytes(num_bytes: int) -> str:
+    return f"{num_bytes / 1_000_000:>8.2f} MB"
+
+
+def bench_long_stream(cache: StreamCache, num_chunks: int) -> None:
+    tracemalloc.start()
+    start = time.perf_counter()
+    streamed_str = StreamedStr(generate_chunks(num_chunks), cache=cache)
+    num_chars = 0
+    for chunk in streamed_str:
+        num_chars += len(chunk)
+    elapsed = time.perf_counter() - start
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(
+        f"{cache:>7}: {num_chunks:,} chunks, {num_chars / 1_000_000:.1f}M chars"
+        f" | retained {format_bytes(retained)} | peak {format_bytes(peak)}"
+        f" | {num_chunks / elapsed:>12,.0f} chunks/s"
+    )
+    del streamed_str
+
+
+async def consume(async_streamed_str: AsyncStreamedStr) -> int:
+    num_chars = 0
+    async for chunk in async_streamed_str:
+        num_chars += len(chunk)
+    return num_chars
+
+
+async def bench_fan_out(
+    cache: StreamCache, num_streams: int, num_chunks_per_stream: int
+) -> None:
+    tracemalloc.start()
+    start = time.perf_counter()
+    async_streamed_strs = [
+        AsyncStreamedStr(agenerate_chunks(num_chunks_per_stream), cache=cache)
+        for _ in range(num_streams)
+    ]
+    await asyncio.gather(*(consume(s) for s in async_streamed_strs))
+    elapsed = time.perf_counter() - start
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    num_chunks = num_streams * num_chunks_per_stream
+    print(
+        f"{cache:>7}: {num_streams:,} streams x {num_chunks_per_stream:,} chunks"
+        f" | retained {format_bytes(retained)} | peak {format_bytes(peak)}"
+        f" | {num_chunks / elapsed:>12,.0f} chunks/s"
+    )
+    del async_streamed_strs
+
+
+def main() -> None:
+    print("Single long stream")
+    for cache in STREAM_CACHES:
+        bench_long_stream(cache, num_chunks=1_000_000)
+    print("Concurrent streams")
+    for cache in STREAM_CACHES:
+        asyncio.run(bench_fan_out(cache, num_streams=1000, num_chunks_per_stream=2000))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""Benchmark the per-item cost of tracking the state of LLM output streams.
+
+Feeds synthetic OpenAI and Anthropic responses containing long tool calls through
+`OpenaiStreamState` and `AnthropicStreamState`, then builds the message snapshot once,
+as happens when a tool call fails to parse. This is compared with accumulating the
+message snapshot on every item, which is what the stream states did previously.
+
+Run with `python benchmarks/stream_state.py`.
+"""
+
+import time
+from collections.abc import Callable
+from typing import Any
+
+import anthropic.types as anthropic_types
+import openai
+from anthropic.lib.streaming import InputJsonEvent, MessageStopEvent
+from anthropic.lib.streaming._messages import accumulate_event
+from openai.lib.streaming.chat import ChatCompletionStreamState
+from openai.types.chat import ChatCompletionChunk
+
+from magentic.chat_model.anthropic_chat_model import AnthropicStreamState
+from magentic.chat_model.openai_chat_model import OpenaiStreamState
+
+NUM_TOKENS = (1_000, 2_000, 4_000)
+NUM_TOOL_CALLS = 10
+
+
+def tool_call_args_tokens(num_tokens: int) -> list[str]:
+    """Split the arguments of a tool call into `num_tokens` chunks."""
+    return ['{"query": "', *(["word "] * (num_tokens - 2)), '"}']
+
+
+def openai_chunk(delta: dict[str, Any]) -> ChatCompletionChunk:
+    return ChatCompletionChunk.model_validate(
+        {
+            "id": "chatcmpl-1",
+            "object": "chat.completion.chunk",
+            "created": 0,
+            "model": "gpt-4o",
+            "choices": [{"index": 0, "delta": delta}],
+        }
+    )
+
+
+def openai_tool_calls(num_tokens: int) -> list[ChatCompletionChunk]:
+    chunks = [openai_chunk({"role": "assistant"})]
+    for i in range(NUM_TOOL_CALLS):
+        for j, args in enumerate(tool_call_args_tokens(num_tokens // NUM_TOOL_CALLS)):
+            tool_call = {
+                "index": i,
+                "id": f"call_{i}" if j == 0 else None,
+                "type": "function",
+                "function": {"name": "search" if j == 0 else None, "arguments": args},
+            }
+            chunks.append(openai_chunk({"tool_calls": [tool_call]}))
+    return chunks
+
+
+def anthropic_tool_calls(num_tokens: int) -> list[Any]:
+    message = anthropic_types.Message(
+        id="msg_1",
+        content=[],
+        model="claude-3-5-sonnet-latest",
+        role="assistant",
+        stop_reason=None,
+        stop_sequence=None,
+        type="message",
+        usage=anthropic_types.Usage(input_tokens=10, output_tokens=1),
+    )
+    events: list[Any] = [
+        anthropic_types.RawMessageStartEvent(type="message_start", message=message)
+    ]
+    for i in range(NUM_TOOL_CALLS):
+        events.append(
+            anthropic_types.RawContentBlockStartEvent(
+                type="content_block_start",
+                index=i,
+                content_block=anthropic_types.ToolUseBlock(
+                    type="tool_use", id=f"toolu_{i}", name="search", input={}
+                ),
+            )
+        )
+        for args in tool_call_args_tokens(num_tokens // NUM_TOOL_CALLS):
+            events.append(
+                anthropic_types.RawContentBlockDeltaEvent(
+                    type="content_block_delta",
+                    index=i,
+                    delta=anthropic_types.InputJSONDelta(
+                        type="input_json_delta", partial_json=args
+                    ),
+                )
+            )
+            events.append(
+                InputJsonEvent(type="input_json", partial_json=args, snapshot={})
+            )
+    events.append(MessageStopEvent(type="message_stop", message=message))
+    return events
+
+
+def eager_openai(items: list[ChatCompletionChunk]) -> None:
+    state = ChatCompletionStreamState(
+        input_tools=openai.NOT_GIVEN, response_format=openai.NOT_GIVEN
+    )
+    for item in items:
+        state.handle_chunk(item)
+    state.current_completion_snapshot.choices[0].message.model_dump()
+
+
+def lazy_openai(items: list[ChatCompletionChunk]) -> None:
+    state = OpenaiStreamState()
+    for item in items:
+        state.update(item)
+    state.current_message_snapshot  # noqa: B018
+
+
+def eager_anthropic(items: list[Any]) -> None:
+    snapshot = None
+    for item in items:
+        snapshot = accumulate_event(event=item, current_snapshot=snapshot)
+    assert snapshot is not None
+    snapshot.model_dump()
+
+
+def lazy_anthropic(items: list[Any]) -> None:
+    state = AnthropicStreamState()
+    for item in items:
+        state.update(item)
+    state.current_message_snapshot  # noqa: B018
+
+
+def bench(
+    func: Callable[[list[Any]], None], items: list[Any], repeat: int = 3
+) -> float:
+    """Return the best time per item in microseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(items)
+        best = min(best, time.perf_counter() - start)
+    return best / len(items) * 1e6
+
+
+def main() -> None:
+    print(f"Time per item in microseconds, for {NUM_TOOL_CALLS} tool calls")
+    for num_tokens in NUM_TOKENS:
+        openai_items = openai_tool_calls(num_tokens)
+        anthropic_items = anthropic_tool_calls(num_tokens)
+        print(
+            f"{num_tokens:>6,} tokens"
+            f" | openai eager {bench(eager_openai, openai_items):7.2f}"
+            f" lazy {bench(lazy_openai, openai_items):6.2f}"
+            f" | anthropic eager {bench(eager_anthropic, anthropic_items):7.2f}"
+            f" lazy {bench(lazy_anthropic, anthropic_items):6.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
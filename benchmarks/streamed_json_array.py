@@ -0,0 +1,189 @@
+"""Benchmark splitting a streamed JSON array into items.
+
+Compares `iter_streamed_json_array` against the previous per-character state machine
+on multi-megabyte synthetic arrays, streamed in LLM-token-sized and larger chunks.
+Also compares `aiter_streamed_json_array` against the previous async implementation,
+which yielded one character at a time from an async generator.
+
+Run with `python benchmarks/streamed_json_array.py`.
+"""
+
+import asyncio
+import json
+import time
+from collections.abc import AsyncIterable, AsyncIterator, Callable, Iterable, Iterator
+from dataclasses import dataclass
+from itertools import chain, dropwhile
+
+from magentic.streaming import (
+    aiter_streamed_json_array,
+    async_iter,
+    iter_streamed_json_array,
+)
+
+
+@dataclass
+class _PerCharParserState:
+    """The per-character parser previously used by `iter_streamed_json_array`."""
+
+    array_level: int = 0
+    object_level: int = 0
+    in_string: bool = False
+    is_escaped: bool = False
+    is_element_separator: bool = False
+
+    def update(self, char: str) -> None:
+        if self.in_string:
+            if char == '"' and not self.is_escaped:
+                self.in_string = False
+        elif char == '"':
+            self.in_string = True
+        elif char == ",":
+            if self.array_level == 1 and self.object_level == 0:
+                self.is_element_separator = True
+                return
+        elif char == "[":
+            self.array_level += 1
+        elif char == "]":
+            self.array_level -= 1
+            if self.array_level == 0:
+                self.is_element_separator = True
+                return
+        elif char == "{":
+            self.object_level += 1
+        elif char == "}":
+            self.object_level -= 1
+        elif char == "\\":
+            self.is_escaped = not self.is_escaped
+        else:
+            self.is_escaped = False
+        self.is_element_separator = False
+
+
+def per_char_iter_streamed_json_array(chunks: Iterable[str]) -> Iterator[str]:
+    iter_chars: Iterator[str] = chain.from_iterable(chunks)
+    parser_state = _PerCharParserState()
+    iter_chars = dropwhile(lambda x: x != "[", iter_chars)
+    parser_state.update(next(iter_chars))
+    item_chars: list[str] = []
+    for char in iter_chars:
+        parser_state.update(char)
+        if parser_state.is_element_separator:
+            if item_chars:
+                yield "".join(item_chars).strip()
+                item_chars = []
+        else:
+            item_chars.append(char)
+
+
+async def per_char_aiter_streamed_json_array(
+    chunks: AsyncIterable[str],
+) -> AsyncIterator[str]:
+    async def chars_generator() -> AsyncIterator[str]:
+        async for chunk in chunks:
+            for char in chunk:
+                yield char
+
+    iter_chars = chars_generator()
+    parser_state = _PerCharParserState()
+    async for char in iter_chars:
+        if char == "[":
+            break
+    parser_state.update("[")
+    item_chars: list[str] = []
+    async for char in iter_chars:
+        parser_state.update(char)
+        if parser_state.is_element_separator:
+            if item_chars:
+                yield "".join(item_chars).strip()
+                item_chars = []
+        else:
+            item_chars.append(char)
+
+
+def make_array_json(target_bytes: int) -> tuple[str, int]:
+    """Create a JSON array of objects of approximately `target_bytes` in size."""
+    item = {
+        "title": "Structured outputs from streamed tool calls",
+        "authors": ["Ada Lovelace", "Alan Turing"],
+        "year": 2024,
+        "score": 0.87,
+        "metadata": {"source": "synthetic", "tags": ["llm", "json", "streaming"]},
+    }
+    item_json = json.dumps(item)
+    num_items = max(1, target_bytes // (len(item_json) + 2))
+    return '{"value": [' + ", ".join([item_json] * num_items) + "]}", num_items
+
+
+def split_chunks(text: str, chunk_size: int) -> list[str]:
+    return [text[i : i + chunk_size] for i in range(0, len(text), chunk_size)]
+
+
+def bench(
+    func: Callable[[Iterable[str]], Iterable[str]],
+    chunks: list[str],
+    num_items: int,
+    repeat: int,
+) -> float:
+    """Return the best items/sec over `repeat` runs."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        count = sum(1 for _ in func(chunks))
+        best = min(best, time.perf_counter() - start)
+        assert count == num_items, (count, num_items)
+    return num_items / best
+
+
+async def abench(
+    func: Callable[[AsyncIterable[str]], AsyncIterable[str]],
+    chunks: list[str],
+    num_items: int,
+    repeat: int,
+) -> float:
+    """Async version of `bench`."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        count = 0
+        async for _ in func(async_iter(chunks)):
+            count += 1
+        best = min(best, time.perf_counter() - start)
+        assert count == num_items, (count, num_items)
+    return num_items / best
+
+
+async def amain() -> None:
+    text, num_items = make_array_json(1_000_000)
+    for chunk_size in (4, 64, 4096):
+        chunks = split_chunks(text, chunk_size)
+        per_char = await abench(
+            per_char_aiter_streamed_json_array, chunks, num_items, 3
+        )
+        scanner = await abench(aiter_streamed_json_array, chunks, num_items, 3)
+        print(
+            f"async 1 MB, {chunk_size:>4}-char chunks, {num_items} items:"
+            f" per-char {per_char:>10,.0f} items/s"
+            f" | chunk scanner {scanner:>10,.0f} items/s"
+            f" | {scanner / per_char:.1f}x"
+        )
+
+
+def main() -> None:
+    for size_mb in (1, 4):
+        text, num_items = make_array_json(size_mb * 1_000_000)
+        for chunk_size in (4, 64, 4096):
+            chunks = split_chunks(text, chunk_size)
+            per_char = bench(per_char_iter_streamed_json_array, chunks, num_items, 3)
+            scanner = bench(iter_streamed_json_array, chunks, num_items, 3)
+            print(
+                f"{size_mb} MB, {chunk_size:>4}-char chunks, {num_items} items:"
+                f" per-char {per_char:>10,.0f} items/s"
+                f" | chunk scanner {scanner:>10,.0f} items/s"
+                f" | {scanner / per_char:.1f}x"
+            )
+    asyncio.run(amain())
+
+
+if __name__ == "__main__":
+    main()
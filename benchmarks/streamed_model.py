@@ -0,0 +1,82 @@
+"""Benchmark parsing streamed JSON into partial models for `StreamedModel`.
+
+Streams the arguments of increasingly large objects through
+`StreamedModelFunctionSchema.parse_args` in small chunks, as received from an LLM, and
+reports the time taken and the memory retained by the `StreamedModel`. The time per
+character should stay roughly constant as the size of the object grows.
+
+Run with `python benchmarks/streamed_model.py`.
+"""
+
+import json
+import time
+import tracemalloc
+from collections.abc import Iterator
+
+from pydantic import BaseModel
+
+from magentic import StreamedModel
+from magentic.chat_model.function_schema import StreamedModelFunctionSchema
+
+CHUNK_SIZE = 4
+SIZES = (10_000, 20_000, 40_000, 80_000)
+
+
+class Finding(BaseModel):
+    title: str
+    score: int
+
+
+class JudgmentDecision(BaseModel):
+    reasoning: str
+    findings: list[Finding]
+    approved: bool
+
+
+def make_json(size: int) -> str:
+    """Return the JSON of a `JudgmentDecision` of roughly `size` characters."""
+    num_findings = size // 2 // 40
+    decision = JudgmentDecision(
+        reasoning="word " * (size // 2 // 5),
+        findings=[
+            Finding(title=f"Finding number {i}", score=i) for i in range(num_findings)
+        ],
+        approved=True,
+    )
+    return decision.model_dump_json()
+
+
+def iter_chunks(text: str) -> Iterator[str]:
+    for i in range(0, len(text), CHUNK_SIZE):
+        yield text[i : i + CHUNK_SIZE]
+
+
+def bench(size: int) -> None:
+    function_schema = StreamedModelFunctionSchema(StreamedModel[JudgmentDecision])
+    text = make_json(size)
+    tracemalloc.start()
+    start = time.perf_counter()
+    streamed_model = function_schema.parse_args(iter_chunks(text))
+    num_partials = sum(1 for _ in streamed_model)
+    elapsed = time.perf_counter() - start
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert streamed_model.to_model() == JudgmentDecision.model_validate(
+        json.loads(text)
+    )
+    print(
+        f"{len(text):>7,} chars | {num_partials:>6,} partials"
+        f" | {elapsed:6.2f} s | {elapsed / len(text) * 1e6:6.2f} us/char"
+        f" | retained {retained / 1_000_000:6.2f} MB"
+    )
+    del streamed_model
+
+
+def main() -> None:
+    print(f"Chunks of {CHUNK_SIZE} characters")
+    for size in SIZES:
+        bench(size)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,11 @@
+import importlib
+from typing import TYPE_CHECKING, Any
+
 from ._chat import Chat as Chat
 from ._pydantic import ConfigDict as ConfigDict
 from ._pydantic import with_config as with_config
+from ._streamed_model import AsyncStreamedModel as AsyncStreamedModel
+from ._streamed_model import StreamedModel as StreamedModel
 from ._streamed_response import AsyncStreamedResponse as AsyncStreamedResponse
 from ._streamed_response import StreamedResponse as StreamedResponse
 from .chat_model.message import AnyMessage as AnyMessage
@@ -13,12 +18,38 @@ from .chat_model.message import Placeholder as Placeholder
 from .chat_model.message import SystemMessage as SystemMessage
 from .chat_model.message import ToolResultMessage as ToolResultMessage
 from .chat_model.message import UserMessage as UserMessage
-from .chat_model.openai_chat_model import OpenaiChatModel as OpenaiChatModel
+from .chat_model.timing import use_metrics_callback as use_metrics_callback
 from .chatprompt import chatprompt as chatprompt
 from .function_call import AsyncParallelFunctionCall as AsyncParallelFunctionCall
 from .function_call import FunctionCall as FunctionCall
 from .function_call import ParallelFunctionCall as ParallelFunctionCall
+from .function_call import execution_policy as execution_policy
+from .function_result_cache import DiskFunctionResultCache as DiskFunctionResultCache
+from .function_result_cache import FunctionResultCache as FunctionResultCache
 from .prompt_chain import prompt_chain as prompt_chain
 from .prompt_function import prompt as prompt
 from .streaming import AsyncStreamedStr as AsyncStreamedStr
 from .streaming import StreamedStr as StreamedStr
+from .streaming import use_stream_cache as use_stream_cache
+
+if TYPE_CHECKING:
+    from .chat_model.openai_chat_model import OpenaiChatModel as OpenaiChatModel
+
+# Imported on first access so that `import magentic` does not import LLM provider
+# packages such as openai, which take most of the import time
+_lazy_imports = {
+    "OpenaiChatModel": ".chat_model.openai_chat_model",
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name in _lazy_imports:
+        value = getattr(importlib.import_module(_lazy_imports[name], __name__), name)
+        globals()[name] = value
+        return value
+    msg = f"module {__name__!r} has no attribute {name!r}"
+    raise AttributeError(msg)
+
+
+def __dir__() -> list[str]:
+    return sorted([*globals(), *_lazy_imports])
@@ -1,5 +1,6 @@
-import inspect
+import threading
 from collections.abc import Callable, Iterable, Sequence
+from concurrent.futures import Executor
 from typing import Any, ParamSpec
 
 from typing_extensions import Self, deprecated
@@ -18,13 +19,81 @@ from magentic.function_call import (
     AsyncParallelFunctionCall,
     FunctionCall,
     ParallelFunctionCall,
+    _aexecute,
 )
 from magentic.prompt_function import BasePromptFunction
-from magentic.streaming import async_iter, azip
 
 P = ParamSpec("P")
 
 
+def _exception_to_result(result: Any) -> Any:
+    """Convert an exception returned by a function call to a message for the LLM."""
+    if isinstance(result, Exception):
+        return f"{type(result).__name__}: {result}"
+    return result
+
+
+class _MessageHistory:
+    """An immutable sequence of messages that shares its prefix with its parent.
+
+    Adding messages creates a new history that points to the current one, so that
+    appending to or forking a history takes constant time and memory. The list of all
+    messages is built on request and cached. Building it takes over the cached list of
+    the nearest ancestor and extends it, so along a single chain of histories only the
+    most recently built list is kept.
+    """
+
+    __slots__ = ("_length", "_messages", "_parent", "_segment")
+
+    # Guards taking over the cached list of an ancestor
+    _lock = threading.Lock()
+
+    def __init__(
+        self,
+        segment: tuple[Message[Any], ...] = (),
+        parent: "_MessageHistory | None" = None,
+    ):
+        self._segment = segment
+        self._parent = parent
+        self._length = len(segment) + (len(parent) if parent else 0)
+        self._messages: list[Message[Any]] | None = None
+
+    def __len__(self) -> int:
+        return self._length
+
+    def add(self, *messages: Message[Any]) -> "_MessageHistory":
+        """Return a new history with the messages added."""
+        return _MessageHistory(messages, self)
+
+    @property
+    def last(self) -> Message[Any]:
+        history: _MessageHistory | None = self
+        while history is not None:
+            if history._segment:
+                return history._segment[-1]
+            history = history._parent
+        msg = "list index out of range"
+        raise IndexError(msg)
+
+    def to_list(self) -> list[Message[Any]]:
+        """Return the list of all messages. This must not be modified."""
+        with self._lock:
+            if self._messages is not None:
+                return self._messages
+            segments: list[tuple[Message[Any], ...]] = []
+            history: _MessageHistory | None = self
+            while history is not None and history._messages is None:
+                segments.append(history._segment)
+                history = history._parent
+            messages: list[Message[Any]] = []
+            if history is not None:
+                messages, history._messages = history._messages, None  # type: ignore[assignment]
+            for segment in reversed(segments):
+                messages.extend(segment)
+            self._messages = messages
+            return messages
+
+
 class Chat:
     """A chat with an LLM chat model.
 
@@ -46,7 +115,7 @@ class Chat:
         output_types: Iterable[type[Any]] | None = None,
         model: ChatModel | None = None,
     ):
-        self._messages = list(messages) if messages else []
+        self._history = _MessageHistory(tuple(messages) if messages else ())
         self._functions = list(functions) if functions else []
         self._output_types = list(output_types) if output_types else [str]
         self._model = model
@@ -72,11 +141,11 @@ class Chat:
 
     @property
     def messages(self) -> list[Message[Any]]:
-        return self._messages.copy()
+        return self._history.to_list().copy()
 
     @property
     def last_message(self) -> Message[Any]:
-        return self._messages[-1]
+        return self._history.last
 
     @property
     def model(self) -> ChatModel:
@@ -84,12 +153,12 @@ class Chat:
 
     def add_message(self, message: Message[Any]) -> Self:
         """Add a message to the chat."""
-        return type(self)(
-            messages=[*self._messages, message],
-            functions=self._functions,
-            output_types=self._output_types,
-            model=self._model,  # Keep `None` value if unset
-        )
+        # Share the messages, functions and output types with this chat. This is a
+        # faster equivalent of `copy.copy(self)`
+        chat = object.__new__(type(self))
+        chat.__dict__.update(self.__dict__)
+        chat._history = self._history.add(message)
+        return chat
 
     def add_system_message(self, content: str) -> Self:
         """Add a system message to the chat."""
@@ -109,7 +178,7 @@ class Chat:
     def submit(self) -> Self:
         """Request an LLM message to be added to the chat."""
         output_message: AssistantMessage[Any] = self.model.complete(
-            messages=self._messages,
+            messages=self.messages,
             functions=self._functions,
             output_types=self._output_types,
         )
@@ -118,56 +187,104 @@ class Chat:
     async def asubmit(self) -> Self:
         """Async version of `submit`."""
         output_message: AssistantMessage[Any] = await self.model.acomplete(
-            messages=self._messages,
+            messages=self.messages,
             functions=self._functions,
             output_types=self._output_types,
         )
         return self.add_message(output_message)
 
-    # TODO: Add optional error handling to this method, with param to toggle
-    def exec_function_call(self) -> Self:
-        """If the last message is a function call, execute it and add the result."""
+    def exec_function_call(
+        self,
+        *,
+        executor: Executor | None = None,
+        max_workers: int | None = None,
+        return_exceptions: bool = False,
+    ) -> Self:
+        """If the last message is a function call, execute it and add the result.
+
+        The calls of a `ParallelFunctionCall` are executed one after another, or
+        concurrently if an `executor` or `max_workers` is given. See
+        `ParallelFunctionCall.__call__`.
+
+        If `return_exceptions` is `True`, an exception raised by a function call is
+        added to the chat as the result of the call so that the LLM can respond to it,
+        instead of being raised.
+        """
         if isinstance(self.last_message.content, FunctionCall):
             function_call = self.last_message.content
-            result = function_call()
+            try:
+                result = function_call()
+            except Exception as e:
+                if not return_exceptions:
+                    raise
+                result = _exception_to_result(e)
             return self.add_message(
                 FunctionResultMessage(content=result, function_call=function_call)
             )
 
         if isinstance(self.last_message.content, ParallelFunctionCall):
             parallel_function_call = self.last_message.content
+            results = parallel_function_call(
+                executor=executor,
+                max_workers=max_workers,
+                return_exceptions=return_exceptions,
+            )
             chat = self
             for result, function_call in zip(
-                parallel_function_call(), parallel_function_call, strict=True
+                results, parallel_function_call, strict=True
             ):
                 chat = chat.add_message(
-                    FunctionResultMessage(content=result, function_call=function_call)
+                    FunctionResultMessage(
+                        content=_exception_to_result(result),
+                        function_call=function_call,
+                    )
                 )
             return chat
 
         msg = "Last message is not a function call."
         raise TypeError(msg)
 
-    async def aexec_function_call(self) -> Self:
-        """Async version of `exec_function_call`."""
+    async def aexec_function_call(
+        self,
+        *,
+        max_concurrency: int | None = None,
+        return_exceptions: bool = False,
+    ) -> Self:
+        """Async version of `exec_function_call`.
+
+        Sync functions are run in the default thread pool of the event loop so that
+        they do not block it, unless disabled using `execution_policy`. The calls of an
+        `AsyncParallelFunctionCall` are executed concurrently, each starting as soon as
+        it is received from the LLM. Set `max_concurrency` to limit the number
+        executing at the same time.
+        """
         if isinstance(self.last_message.content, FunctionCall):
             function_call = self.last_message.content
-            result = function_call()
-            if inspect.isawaitable(result):
-                result = await result
+            try:
+                result = await _aexecute(function_call)
+            except Exception as e:
+                if not return_exceptions:
+                    raise
+                result = _exception_to_result(e)
             return self.add_message(
                 FunctionResultMessage(content=result, function_call=function_call)
             )
 
         if isinstance(self.last_message.content, AsyncParallelFunctionCall):
             async_parallel_function_call = self.last_message.content
+            results = await async_parallel_function_call(
+                max_concurrency=max_concurrency, return_exceptions=return_exceptions
+            )
+            function_calls = [
+                function_call async for function_call in async_parallel_function_call
+            ]
             chat = self
-            async for result, function_call in azip(
-                async_iter(await async_parallel_function_call()),
-                async_parallel_function_call,
-            ):
+            for result, function_call in zip(results, function_calls, strict=True):
                 chat = chat.add_message(
-                    FunctionResultMessage(content=result, function_call=function_call)
+                    FunctionResultMessage(
+                        content=_exception_to_result(result),
+                        function_call=function_call,
+                    )
                 )
             return chat
 
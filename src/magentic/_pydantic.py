@@ -1,11 +1,13 @@
 from collections.abc import Callable
-from typing import Any, TypeVar
+from functools import cache
+from typing import Annotated, Any, Literal, TypeVar, Union, get_args, get_origin
 
-import openai
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, create_model
 from pydantic import ConfigDict as _ConfigDict
 from pydantic import with_config as _with_config
 
+from magentic.typing import is_union_type
+
 
 class ConfigDict(_ConfigDict, total=False):
     openai_strict: bool
@@ -32,9 +34,71 @@ def json_schema(model: type[BaseModel]) -> dict[str, Any]:
     OpenAI APIs strict mode is generated.
     """
     if model.model_config.get("openai_strict", False):
+        # Import here to avoid importing openai when importing magentic
+        import openai
+
         tool_param = openai.pydantic_function_tool(model)
         return tool_param["function"].get("parameters", {})
     model_schema = model.model_json_schema().copy()
     model_schema.pop("title", None)
     model_schema.pop("description", None)
     return model_schema
+
+
+BaseModelT = TypeVar("BaseModelT", bound=BaseModel)
+
+# Models whose partial version is currently being created, to handle recursive models
+_partial_models_in_progress: set[type[BaseModel]] = set()
+
+
+def _partial_type(type_: Any) -> Any:
+    """Replace any pydantic models within the type with their partial versions."""
+    origin, args = get_origin(type_), get_args(type_)
+    if origin is None and isinstance(type_, type) and issubclass(type_, BaseModel):
+        return partial_model(type_)
+    if origin is None or not args or origin is Literal:
+        return type_
+    if origin is Annotated:
+        return Annotated[(_partial_type(args[0]), *args[1:])]
+    partial_args = tuple(_partial_type(arg) for arg in args)
+    if partial_args == args:
+        return type_
+    if is_union_type(type_):
+        return Union[partial_args]  # noqa: UP007
+    try:
+        return origin[partial_args]
+    except TypeError:
+        return type_
+
+
+@cache
+def partial_model(model: type[BaseModelT]) -> type[BaseModelT]:
+    """Create a subclass of the model in which every field is optional.
+
+    Fields default to `None` and nested models are replaced with their partial
+    versions, so that incomplete LLM output can be validated into an instance of the
+    model. Field constraints are dropped but the model's validators still apply.
+    """
+    if model in _partial_models_in_progress:
+        return model
+    _partial_models_in_progress.add(model)
+    try:
+        fields: dict[str, Any] = {
+            name: (
+                _partial_type(field.annotation) | None,
+                Field(
+                    default=None,
+                    alias=field.alias,
+                    validation_alias=field.validation_alias,
+                ),
+            )
+            for name, field in model.model_fields.items()
+        }
+        return create_model(
+            f"Partial{model.__name__}",
+            __base__=model,
+            __module__=model.__module__,
+            **fields,
+        )
+    finally:
+        _partial_models_in_progress.discard(model)
@@ -0,0 +1,110 @@
+from collections.abc import AsyncIterable, AsyncIterator, Iterable, Iterator
+from types import TracebackType
+from typing import Generic, TypeVar
+
+from pydantic import BaseModel
+from typing_extensions import Self
+
+from magentic.streaming import aclose_iterable, close_iterable
+
+BaseModelT = TypeVar("BaseModelT", bound=BaseModel)
+
+
+class StreamedModel(Generic[BaseModelT]):
+    """A pydantic model that is generated in chunks.
+
+    This is an iterable of increasingly complete partial instances of the model, which
+    are yielded while the LLM output is received. Fields that have not been generated
+    yet are `None`. The last item is the complete and fully validated instance.
+
+    Only the latest partial instance is retained, so iterating again yields the most
+    recent instance followed by any that have not been received yet.
+
+    Examples
+    --------
+    >>> from magentic import prompt, StreamedModel
+    >>> from pydantic import BaseModel
+    >>>
+    >>> class Superhero(BaseModel):
+    >>>     name: str
+    >>>     power: str
+    >>>
+    >>> @prompt("Create a Superhero named {name}.")
+    >>> def create_superhero(name: str) -> StreamedModel[Superhero]: ...
+    >>>
+    >>> for hero in create_superhero("Garden Man"):
+    >>>     print(hero)
+    name='Garden' power=None
+    name='Garden Man' power='Can'
+    name='Garden Man' power='Can control plants'
+    """
+
+    def __init__(self, partials: Iterable[BaseModelT]):
+        self._partials = iter(partials)
+        self._latest: BaseModelT | None = None
+
+    def __iter__(self) -> Iterator[BaseModelT]:
+        if self._latest is not None:
+            yield self._latest
+        for partial in self._partials:
+            self._latest = partial
+            yield partial
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Stop receiving the model and close the underlying stream."""
+        close_iterable(self._partials)
+
+    def to_model(self) -> BaseModelT:
+        """Wait for the model to be fully generated and return it."""
+        for _ in self:
+            pass
+        assert self._latest is not None
+        return self._latest
+
+
+class AsyncStreamedModel(Generic[BaseModelT]):
+    """Async version of `StreamedModel`."""
+
+    def __init__(self, partials: AsyncIterable[BaseModelT]):
+        self._partials = aiter(partials)
+        self._latest: BaseModelT | None = None
+
+    async def __aiter__(self) -> AsyncIterator[BaseModelT]:
+        if self._latest is not None:
+            yield self._latest
+        async for partial in self._partials:
+            self._latest = partial
+            yield partial
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Stop receiving the model and close the underlying stream."""
+        await aclose_iterable(self._partials)
+
+    async def to_model(self) -> BaseModelT:
+        """Wait for the model to be fully generated and return it."""
+        async for _ in self:
+            pass
+        assert self._latest is not None
+        return self._latest
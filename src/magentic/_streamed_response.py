@@ -1,6 +1,9 @@
 from collections.abc import AsyncIterable, AsyncIterator, Iterable, Iterator
+from types import TracebackType
 from typing import Any
 
+from typing_extensions import Self
+
 from magentic.function_call import FunctionCall
 from magentic.streaming import (
     AsyncStreamedStr,
@@ -51,6 +54,21 @@ class StreamedResponse:
     def __iter__(self) -> Iterator[StreamedStr | FunctionCall[Any]]:
         yield from self._stream
 
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Stop receiving the response and close the underlying stream."""
+        self._stream.close()
+
 
 class AsyncStreamedResponse:
     """Async version of `StreamedResponse`."""
@@ -61,3 +79,18 @@ class AsyncStreamedResponse:
     async def __aiter__(self) -> AsyncIterator[AsyncStreamedStr | FunctionCall[Any]]:
         async for item in self._stream:
             yield item
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Stop receiving the response and close the underlying stream."""
+        await self._stream.aclose()
@@ -1,13 +1,19 @@
+from functools import lru_cache
+
 from magentic.chat_model.base import ChatModel, _chat_model_context
-from magentic.settings import Backend, get_settings
+from magentic.settings import Backend, Settings, get_settings
 
 
 def get_chat_model() -> ChatModel:
     if chat_model := _chat_model_context.get():
         return chat_model
+    return _get_chat_model_for_settings(get_settings())
 
-    settings = get_settings()
 
+# Chat models are stateless so are reused for the same settings, which also reuses
+# their HTTP connections
+@lru_cache(maxsize=16)
+def _get_chat_model_for_settings(settings: Settings) -> ChatModel:
     match settings.backend:
         case Backend.ANTHROPIC:
             from magentic.chat_model.anthropic_chat_model import AnthropicChatModel
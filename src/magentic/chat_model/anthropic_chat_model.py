@@ -1,20 +1,28 @@
 import json
 from collections.abc import AsyncIterator, Callable, Iterable, Iterator, Sequence
 from enum import Enum
-from functools import singledispatch
+from functools import lru_cache, singledispatch
 from itertools import groupby
 from typing import Any, Generic, cast
 
 from typing_extensions import TypeVar
 
 from magentic._parsing import contains_parallel_function_call_type, contains_string_type
+from magentic._streamed_model import AsyncStreamedModel, StreamedModel
 from magentic._streamed_response import AsyncStreamedResponse, StreamedResponse
 from magentic.chat_model.base import ChatModel, OutputT, aparse_stream, parse_stream
+from magentic.chat_model.client_registry import (
+    HttpClientOptions,
+    get_async_client,
+    get_client,
+    get_http_client_options,
+)
 from magentic.chat_model.function_schema import (
+    FUNCTION_SCHEMAS_CACHE_SIZE,
     BaseFunctionSchema,
-    FunctionCallFunctionSchema,
-    function_schema_for_type,
     get_async_function_schemas,
+    get_function_call_function_schema,
+    get_function_schema_for_type,
     get_function_schemas,
 )
 from magentic.chat_model.message import (
@@ -22,6 +30,7 @@ from magentic.chat_model.message import (
     DocumentBytes,
     ImageBytes,
     Message,
+    MessageConversionCache,
     SystemMessage,
     ToolResultMessage,
     Usage,
@@ -35,6 +44,7 @@ from magentic.chat_model.stream import (
     StreamParser,
     StreamState,
 )
+from magentic.chat_model.timing import TimingRecorder
 from magentic.function_call import (
     AsyncParallelFunctionCall,
     FunctionCall,
@@ -51,8 +61,11 @@ try:
     from anthropic.types import (
         DocumentBlockParam,
         ImageBlockParam,
+        InputJSONDelta,
         MessageParam,
+        RawContentBlockDeltaEvent,
         TextBlockParam,
+        TextDelta,
         ToolChoiceParam,
         ToolChoiceToolParam,
         ToolParam,
@@ -151,7 +164,7 @@ def _(message: UserImageMessage[Any]) -> MessageParam:
 def _function_call_to_tool_call_block(
     function_call: FunctionCall[Any],
 ) -> ToolUseBlockParam:
-    function_schema = FunctionCallFunctionSchema(function_call.function)
+    function_schema = get_function_call_function_schema(function_call.function)
     return {
         "type": "tool_use",
         "id": function_call._unique_id,
@@ -195,7 +208,12 @@ def _(message: AssistantMessage[Any]) -> MessageParam:
             "content": content_blocks,
         }
 
-    function_schema = function_schema_for_type(type(message.content))
+    if isinstance(message.content, StreamedModel):
+        return message_to_anthropic_message(
+            AssistantMessage(message.content.to_model())
+        )
+
+    function_schema = get_function_schema_for_type(type(message.content))
     return {
         "role": AnthropicMessageRole.ASSISTANT.value,
         "content": [
@@ -232,6 +250,11 @@ async def _(message: AssistantMessage[Any]) -> MessageParam:
             "role": AnthropicMessageRole.ASSISTANT.value,
             "content": content_blocks,
         }
+
+    if isinstance(message.content, AsyncStreamedModel):
+        return message_to_anthropic_message(
+            AssistantMessage(await message.content.to_model())
+        )
     return message_to_anthropic_message(message)
 
 
@@ -240,7 +263,7 @@ def _(message: ToolResultMessage[Any]) -> MessageParam:
     if isinstance(message.content, str):
         content = message.content
     else:
-        function_schema = function_schema_for_type(type(message.content))
+        function_schema = get_function_schema_for_type(type(message.content))
         content = json.loads(function_schema.serialize_args(message.content))
     return {
         "role": AnthropicMessageRole.USER.value,
@@ -254,6 +277,33 @@ def _(message: ToolResultMessage[Any]) -> MessageParam:
     }
 
 
+_anthropic_message_cache: MessageConversionCache[MessageParam] = (
+    MessageConversionCache()
+)
+
+
+def _messages_to_anthropic_messages(
+    messages: Iterable[Message[Any]],
+) -> list[MessageParam]:
+    """Convert messages to Anthropic messages, reusing those converted previously."""
+    return [
+        _anthropic_message_cache.convert(message, message_to_anthropic_message)
+        for message in messages
+    ]
+
+
+async def _async_messages_to_anthropic_messages(
+    messages: Iterable[Message[Any]],
+) -> list[MessageParam]:
+    """Async version of `_messages_to_anthropic_messages`."""
+    return [
+        await _anthropic_message_cache.aconvert(
+            message, async_message_to_anthropic_message
+        )
+        for message in messages
+    ]
+
+
 # TODO: Move this to the magentic level by allowing `UserMessage` have a list of content
 def _combine_messages(messages: Iterable[MessageParam]) -> list[MessageParam]:
     """Combine messages with the same role, to get alternating roles.
@@ -320,19 +370,71 @@ class AnthropicStreamParser(StreamParser[MessageStreamEvent]):
         return []
 
 
+# Event types that change the message snapshot built by `accumulate_event`
+_SNAPSHOT_EVENT_TYPES = frozenset(
+    {"message_start", "content_block_start", "content_block_delta", "message_delta"}
+)
+
+
+def _append_key(event: MessageStreamEvent) -> tuple[int, str] | None:
+    """Return the content block index and delta type if the event appends text."""
+    if event.type == "content_block_delta" and event.delta.type in (
+        "text_delta",
+        "input_json_delta",
+    ):
+        return (event.index, event.delta.type)
+    return None
+
+
+def _coalesce_events(events: Iterable[MessageStreamEvent]) -> list[MessageStreamEvent]:
+    """Merge runs of events that append to the same content block.
+
+    Accumulating the merged events gives the same message snapshot without re-parsing
+    the tool call input JSON on every delta.
+    """
+    coalesced: list[MessageStreamEvent] = []
+    for key, group in groupby(events, key=_append_key):
+        if key is None:
+            coalesced.extend(group)
+            continue
+        index, delta_type = key
+        deltas = [event.delta for event in group]  # type: ignore[union-attr]
+        delta: TextDelta | InputJSONDelta = (
+            TextDelta(
+                type="text_delta",
+                text="".join(cast(TextDelta, delta).text for delta in deltas),
+            )
+            if delta_type == "text_delta"
+            else InputJSONDelta(
+                type="input_json_delta",
+                partial_json="".join(
+                    cast(InputJSONDelta, delta).partial_json for delta in deltas
+                ),
+            )
+        )
+        coalesced.append(
+            RawContentBlockDeltaEvent(
+                type="content_block_delta", index=index, delta=delta
+            )
+        )
+    return coalesced
+
+
 class AnthropicStreamState(StreamState[MessageStreamEvent]):
+    """Tracks the state of the Anthropic model output stream.
+
+    Events are recorded as they arrive and the message snapshot is only built when it
+    is requested, as accumulating it on every event is slow for long tool calls.
+    """
+
     def __init__(self) -> None:
-        self._current_message_snapshot: anthropic.types.Message | None = (
-            None  # TODO: type
-        )
+        self._events: list[MessageStreamEvent] = []
         self.usage_ref: list[Usage] = []
 
     def update(self, item: MessageStreamEvent) -> None:
-        self._current_message_snapshot = accumulate_event(
-            # Unrecognized event types are ignored
-            event=item,  # type: ignore[arg-type]
-            current_snapshot=self._current_message_snapshot,
-        )
+        # Events which do not change the snapshot are not recorded
+        if item.type in _SNAPSHOT_EVENT_TYPES:
+            self._events.append(item)
         if item.type == "message_stop":
             assert not self.usage_ref
             self.usage_ref.append(
@@ -344,9 +446,15 @@ class AnthropicStreamState(StreamState[MessageStreamEvent]):
 
     @property
     def current_message_snapshot(self) -> Message[Any]:
-        assert self._current_message_snapshot is not None
+        snapshot: anthropic.types.Message | None = None
+        for event in _coalesce_events(self._events):
+            snapshot = accumulate_event(
+                event=event,  # type: ignore[arg-type]
+                current_snapshot=snapshot,
+            )
+        assert snapshot is not None
         # TODO: Possible to return AssistantMessage here?
-        return _RawMessage(self._current_message_snapshot.model_dump())
+        return _RawMessage(snapshot.model_dump())
 
 
 def _extract_system_message(
@@ -366,6 +474,20 @@ def _if_given(value: T | None) -> T | anthropic.NotGiven:
     return value if value is not None else anthropic.NOT_GIVEN
 
 
+ToolsArgs = tuple[
+    list[ToolParam] | anthropic.NotGiven, ToolChoiceParam | anthropic.NotGiven
+]
+
+
+@lru_cache(maxsize=FUNCTION_SCHEMAS_CACHE_SIZE)
+def _cached_tools_args(
+    chat_model_cls: type["AnthropicChatModel"],
+    function_schemas: tuple[BaseFunctionSchema[Any], ...],
+    output_types: tuple[type, ...],
+) -> ToolsArgs:
+    return chat_model_cls._create_tools_args(function_schemas, output_types)
+
+
 class AnthropicChatModel(ChatModel):
     """An LLM chat model that uses the `anthropic` python package."""
 
@@ -384,9 +506,44 @@ class AnthropicChatModel(ChatModel):
         self._max_tokens = max_tokens
         self._temperature = temperature
 
-        self._client = anthropic.Anthropic(api_key=api_key, base_url=base_url)
-        self._async_client = anthropic.AsyncAnthropic(
-            api_key=api_key, base_url=base_url
+        self._http_client_options = get_http_client_options()
+        self._client = get_client(
+            "anthropic",
+            base_url,
+            api_key,
+            self._http_client_options,
+            self._create_client,
+        )
+
+    def _create_client(self, options: HttpClientOptions) -> anthropic.Anthropic:
+        return anthropic.Anthropic(
+            api_key=self.api_key,
+            base_url=self.base_url,
+            http_client=anthropic.DefaultHttpxClient(
+                limits=options.limits, http2=options.http2
+            ),
+        )
+
+    def _create_async_client(
+        self, options: HttpClientOptions
+    ) -> anthropic.AsyncAnthropic:
+        return anthropic.AsyncAnthropic(
+            api_key=self.api_key,
+            base_url=self.base_url,
+            http_client=anthropic.DefaultAsyncHttpxClient(
+                limits=options.limits, http2=options.http2
+            ),
+        )
+
+    @property
+    def _async_client(self) -> anthropic.AsyncAnthropic:
+        # Async clients are created for each event loop
+        return get_async_client(
+            "anthropic",
+            self.base_url,
+            self.api_key,
+            self._http_client_options,
+            self._create_async_client,
         )
 
     @property
@@ -427,6 +584,33 @@ class AnthropicChatModel(ChatModel):
             )
         return {"type": "any", "disable_parallel_tool_use": disable_parallel_tool_use}
 
+    @classmethod
+    def _create_tools_args(
+        cls,
+        function_schemas: Iterable[BaseFunctionSchema[Any]],
+        output_types: Iterable[type],
+    ) -> ToolsArgs:
+        """Create the tools and tool choice arguments."""
+        tool_schemas = [BaseFunctionToolSchema(schema) for schema in function_schemas]
+        tools = [schema.to_dict() for schema in tool_schemas] or anthropic.NOT_GIVEN
+        tool_choice = cls._get_tool_choice(
+            tool_schemas=tool_schemas, output_types=output_types
+        )
+        return tools, tool_choice
+
+    def _get_tools_args(
+        self,
+        function_schemas: Iterable[BaseFunctionSchema[Any]],
+        output_types: Iterable[type],
+    ) -> ToolsArgs:
+        """Get the tools and tool choice arguments, reusing them across requests."""
+        try:
+            return _cached_tools_args(
+                type(self), tuple(function_schemas), tuple(output_types)
+            )
+        except TypeError:  # Unhashable output type
+            return self._create_tools_args(function_schemas, output_types)
+
     def complete(
         self,
         messages: Iterable[Message[Any]],
@@ -436,36 +620,40 @@ class AnthropicChatModel(ChatModel):
         stop: list[str] | None = None,
     ) -> AssistantMessage[OutputT]:
         """Request an LLM message."""
+        timing_recorder = TimingRecorder()
         if output_types is None:
             output_types = [] if functions else cast(list[type[OutputT]], [str])
 
         function_schemas = get_function_schemas(functions, output_types)
-        tool_schemas = [BaseFunctionToolSchema(schema) for schema in function_schemas]
+        tools, tool_choice = self._get_tools_args(function_schemas, output_types)
 
         system, messages = _extract_system_message(messages)
+        anthropic_messages = _combine_messages(
+            _messages_to_anthropic_messages(messages)
+        )
 
+        timing_recorder.request_sent()
         response: Iterator[MessageStreamEvent] = self._client.messages.stream(
             model=self.model,
-            messages=_combine_messages(
-                [message_to_anthropic_message(m) for m in messages]
-            ),
+            messages=anthropic_messages,
             max_tokens=self.max_tokens,
             stop_sequences=_if_given(stop),
             system=system,
             temperature=_if_given(self.temperature),
-            tools=[schema.to_dict() for schema in tool_schemas] or anthropic.NOT_GIVEN,
-            tool_choice=self._get_tool_choice(
-                tool_schemas=tool_schemas, output_types=output_types
-            ),
+            tools=tools,
+            tool_choice=tool_choice,
         ).__enter__()
         stream = OutputStream(
             response,
             function_schemas=function_schemas,
             parser=AnthropicStreamParser(),
             state=AnthropicStreamState(),
+            timing_recorder=timing_recorder,
         )
         return AssistantMessage._with_usage(
-            parse_stream(stream, output_types), usage_ref=stream.usage_ref
+            parse_stream(stream, output_types),
+            usage_ref=stream.usage_ref,
+            timing_recorder=stream.timing_recorder,
         )
 
     async def acomplete(
@@ -477,36 +665,40 @@ class AnthropicChatModel(ChatModel):
         stop: list[str] | None = None,
     ) -> AssistantMessage[OutputT]:
         """Async version of `complete`."""
+        timing_recorder = TimingRecorder()
         if output_types is None:
             output_types = [] if functions else cast(list[type[OutputT]], [str])
 
         function_schemas = get_async_function_schemas(functions, output_types)
-        tool_schemas = [BaseFunctionToolSchema(schema) for schema in function_schemas]
+        tools, tool_choice = self._get_tools_args(function_schemas, output_types)
 
         system, messages = _extract_system_message(messages)
+        anthropic_messages = _combine_messages(
+            await _async_messages_to_anthropic_messages(messages)
+        )
 
+        timing_recorder.request_sent()
         response: AsyncIterator[
             MessageStreamEvent
         ] = await self._async_client.messages.stream(
             model=self.model,
-            messages=_combine_messages(
-                [await async_message_to_anthropic_message(m) for m in messages]
-            ),
+            messages=anthropic_messages,
             max_tokens=self.max_tokens,
             stop_sequences=_if_given(stop),
             system=system,
             temperature=_if_given(self.temperature),
-            tools=[schema.to_dict() for schema in tool_schemas] or anthropic.NOT_GIVEN,
-            tool_choice=self._get_tool_choice(
-                tool_schemas=tool_schemas, output_types=output_types
-            ),
+            tools=tools,
+            tool_choice=tool_choice,
         ).__aenter__()
         stream = AsyncOutputStream(
             response,
             function_schemas=function_schemas,
             parser=AnthropicStreamParser(),
             state=AnthropicStreamState(),
+            timing_recorder=timing_recorder,
         )
         return AssistantMessage._with_usage(
-            await aparse_stream(stream, output_types), usage_ref=stream.usage_ref
+            await aparse_stream(stream, output_types),
+            usage_ref=stream.usage_ref,
+            timing_recorder=stream.timing_recorder,
         )
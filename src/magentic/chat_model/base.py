@@ -2,7 +2,6 @@ import types
 from abc import ABC, abstractmethod
 from collections.abc import AsyncIterator, Callable, Iterable, Iterator
 from contextvars import ContextVar
-from itertools import chain
 from typing import Any, cast, get_origin
 
 from pydantic import ValidationError
@@ -15,7 +14,7 @@ from magentic.function_call import (
     FunctionCall,
     ParallelFunctionCall,
 )
-from magentic.streaming import AsyncStreamedStr, StreamedStr, achain, async_iter
+from magentic.streaming import AsyncStreamedStr, StreamedStr, aprepend, prepend
 
 OutputT = TypeVar("OutputT", default=str)
 
@@ -105,7 +104,6 @@ class ToolSchemaParseError(Exception):
 
 
 # TODO: Move this into _parsing
-# TODO: Make this a stream class with a close method and context management
 def parse_stream(
     stream: Iterator[Any], output_types: Iterable[type[OutputT]]
 ) -> OutputT:
@@ -116,7 +114,7 @@ def parse_stream(
     obj = next(stream)
     if isinstance(obj, StreamedStr):
         if StreamedResponse in output_type_origins:
-            return cast(OutputT, StreamedResponse(chain([obj], stream)))
+            return cast(OutputT, StreamedResponse(prepend(obj, stream)))
         if StreamedStr in output_type_origins:
             return cast(OutputT, obj)
         if str in output_type_origins:
@@ -124,9 +122,9 @@ def parse_stream(
         raise StringNotAllowedError(obj.truncate(100))
     if isinstance(obj, FunctionCall):
         if StreamedResponse in output_type_origins:
-            return cast(OutputT, StreamedResponse(chain([obj], stream)))
+            return cast(OutputT, StreamedResponse(prepend(obj, stream)))
         if ParallelFunctionCall in output_type_origins:
-            return cast(OutputT, ParallelFunctionCall(chain([obj], stream)))
+            return cast(OutputT, ParallelFunctionCall(prepend(obj, stream)))
         if FunctionCall in output_type_origins:
             # TODO: Check that FunctionCall type matches ?
             return cast(OutputT, obj)
@@ -144,9 +142,7 @@ async def aparse_stream(
     obj = await anext(stream)
     if isinstance(obj, AsyncStreamedStr):
         if AsyncStreamedResponse in output_type_origins:
-            return cast(
-                OutputT, AsyncStreamedResponse(achain(async_iter([obj]), stream))
-            )
+            return cast(OutputT, AsyncStreamedResponse(aprepend(obj, stream)))
         if AsyncStreamedStr in output_type_origins:
             return cast(OutputT, obj)
         if str in output_type_origins:
@@ -154,13 +150,9 @@ async def aparse_stream(
         raise StringNotAllowedError(await obj.truncate(100))
     if isinstance(obj, FunctionCall):
         if AsyncStreamedResponse in output_type_origins:
-            return cast(
-                OutputT, AsyncStreamedResponse(achain(async_iter([obj]), stream))
-            )
+            return cast(OutputT, AsyncStreamedResponse(aprepend(obj, stream)))
         if AsyncParallelFunctionCall in output_type_origins:
-            return cast(
-                OutputT, AsyncParallelFunctionCall(achain(async_iter([obj]), stream))
-            )
+            return cast(OutputT, AsyncParallelFunctionCall(aprepend(obj, stream)))
         if FunctionCall in output_type_origins:
             return cast(OutputT, obj)
         raise FunctionCallNotAllowedError(obj)
@@ -0,0 +1,399 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Iterable
+from functools import partial
+from pathlib import Path
+from typing import Any, cast
+
+from magentic.chat_model.base import ChatModel, OutputT
+from magentic.chat_model.function_schema import (
+    get_async_function_schemas,
+    get_function_schemas,
+)
+from magentic.chat_model.message import AssistantMessage, Message
+from magentic.chat_model.openai_chat_model import (
+    _openai_message_cache,
+    async_message_to_openai_message,
+    message_to_openai_message,
+)
+from magentic.chat_model.recording_chat_model import (
+    _PARSER_FORMATS,
+    _STREAM_FORMATS,
+    StreamRecording,
+    _areplay,
+    _replay,
+    _StreamRecorder,
+)
+from magentic.chat_model.stream import StreamParser, StreamRecorder, use_stream_recorder
+from magentic.streaming import async_iter
+
+
+class ResponseCache:
+    """An in-memory cache of LLM responses, for use with `CachedChatModel`.
+
+    Each response is stored as the raw items of the LLM response stream.
+
+    Parameters
+    ----------
+    maxsize : int or None
+        The maximum number of responses to keep. The least recently used response is
+        evicted when this is exceeded. If `None`, the number of responses is unlimited.
+    ttl : float or None
+        The number of seconds after which a response expires. If `None`, responses do
+        not expire.
+    """
+
+    def __init__(self, *, maxsize: int | None = 1024, ttl: float | None = None):
+        if maxsize is not None and maxsize < 1:
+            msg = f"maxsize must be at least 1, got {maxsize}"
+            raise ValueError(msg)
+        if ttl is not None and ttl <= 0:
+            msg = f"ttl must be greater than 0, got {ttl}"
+            raise ValueError(msg)
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # Maps key to (time stored, response), in order of least recently used
+        self._responses: OrderedDict[str, tuple[float, StreamRecording]] = OrderedDict()
+
+    def get(self, key: str) -> StreamRecording | None:
+        """Get the cached response for the key, or `None` if there is none."""
+        response = self._load(key)
+        with self._lock:
+            if response is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return response
+
+    def set(self, key: str, response: StreamRecording) -> None:
+        """Store the response for the key."""
+        self._store(key, response)
+
+    @property
+    def hit_rate(self) -> float:
+        """The fraction of lookups that returned a cached response."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def clear(self) -> None:
+        """Remove all cached responses and reset the hit and miss counters."""
+        self._clear()
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._responses)
+
+    def _is_expired(self, stored_at: float) -> bool:
+        return self.ttl is not None and time.time() - stored_at > self.ttl
+
+    def _load(self, key: str) -> StreamRecording | None:
+        with self._lock:
+            if key not in self._responses:
+                return None
+            stored_at, response = self._responses[key]
+            if self._is_expired(stored_at):
+                del self._responses[key]
+                return None
+            self._responses.move_to_end(key)
+            return response
+
+    def _store(self, key: str, response: StreamRecording) -> None:
+        with self._lock:
+            self._responses[key] = (time.time(), response)
+            self._responses.move_to_end(key)
+            if self.maxsize is not None and len(self._responses) > self.maxsize:
+                self._responses.popitem(last=False)
+
+    def _clear(self) -> None:
+        with self._lock:
+            self._responses.clear()
+
+
+class SqliteResponseCache(ResponseCache):
+    """A `ResponseCache` that stores responses in a SQLite database file.
+
+    The database uses write-ahead logging, so it can be shared by multiple processes
+    with readers not blocked by a writer. Each process opens its own connection, and
+    waits up to `timeout` seconds for another process to finish writing. Responses are
+    stored as JSON. The hit and miss counters are for this process only.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        *,
+        maxsize: int | None = 1024,
+        ttl: float | None = None,
+        timeout: float = 30,
+    ):
+        super().__init__(maxsize=maxsize, ttl=ttl)
+        self.path = Path(path)
+        self.timeout = timeout
+        self._connection_pid: int | None = None
+        self._connection: sqlite3.Connection | None = None
+        with self._lock, self._get_connection() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS responses"
+                " (key TEXT PRIMARY KEY, stored_at REAL, used_at REAL, response TEXT)"
+            )
+
+    def _get_connection(self) -> sqlite3.Connection:
+        # Connections must not be used across a fork, so child processes reconnect
+        if self._connection is None or self._connection_pid != os.getpid():
+            self._connection = sqlite3.connect(
+                self.path, timeout=self.timeout, check_same_thread=False
+            )
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection_pid = os.getpid()
+        return self._connection
+
+    def __len__(self) -> int:
+        with self._lock:
+            (count,) = (
+                self._get_connection()
+                .execute("SELECT COUNT(*) FROM responses")
+                .fetchone()
+            )
+        return int(count)
+
+    def _load(self, key: str) -> StreamRecording | None:
+        with self._lock, self._get_connection() as connection:
+            row = connection.execute(
+                "SELECT stored_at, response FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            stored_at, response = row
+            if self._is_expired(stored_at):
+                connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+                return None
+            connection.execute(
+                "UPDATE responses SET used_at = ? WHERE key = ?", (time.time(), key)
+            )
+        return StreamRecording(**json.loads(response))
+
+    def _store(self, key: str, response: StreamRecording) -> None:
+        data = json.dumps(response._asdict(), separators=(",", ":"))
+        now = time.time()
+        with self._lock, self._get_connection() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)",
+                (key, now, now, data),
+            )
+            if self.ttl is not None:
+                connection.execute(
+                    "DELETE FROM responses WHERE stored_at < ?", (now - self.ttl,)
+                )
+            if self.maxsize is not None:
+                connection.execute(
+                    "DELETE FROM responses WHERE key NOT IN"
+                    " (SELECT key FROM responses ORDER BY used_at DESC LIMIT ?)",
+                    (self.maxsize,),
+                )
+
+    def _clear(self) -> None:
+        with self._lock, self._get_connection() as connection:
+            connection.execute("DELETE FROM responses")
+
+
+def _canonical_message(message: Message[Any]) -> Any:
+    """Convert a message to a JSON-serializable form for use in a cache key."""
+    try:
+        return _openai_message_cache.convert(message, message_to_openai_message)
+    except TypeError:
+        # Content that OpenAI does not support, such as documents
+        return repr(message)
+
+
+async def _async_canonical_message(message: Message[Any]) -> Any:
+    """Async version of `_canonical_message`."""
+    try:
+        return await _openai_message_cache.aconvert(
+            message, async_message_to_openai_message
+        )
+    except TypeError:
+        return repr(message)
+
+
+def _canonical_tool_call_ids(messages: list[Any]) -> list[Any]:
+    """Replace the random tool call ids with ids numbered in order of appearance."""
+    ids: dict[str, str] = {}
+
+    def canonical_id(tool_call_id: str) -> str:
+        return ids.setdefault(tool_call_id, f"call_{len(ids)}")
+
+    canonical_messages = []
+    for message in messages:
+        # Converted messages are cached so must be copied rather than modified
+        if isinstance(message, dict) and message.get("tool_calls"):
+            message = {
+                **message,
+                "tool_calls": [
+                    {**tool_call, "id": canonical_id(tool_call["id"])}
+                    for tool_call in message["tool_calls"]
+                ],
+            }
+        if isinstance(message, dict) and "tool_call_id" in message:
+            message = {**message, "tool_call_id": canonical_id(message["tool_call_id"])}
+        canonical_messages.append(message)
+    return canonical_messages
+
+
+class CachedChatModel(ChatModel):
+    """Wraps another ChatModel to cache its responses.
+
+    Requests are keyed on the chat model, its model name, temperature and seed, the
+    messages, the functions and output types, and `stop`. On a cache hit, the stored
+    response stream is processed by the same stream parser as the original response,
+    so streamed outputs and function calls are returned exactly as they would be from
+    the LLM. A response is only cached once its stream has been read to the end, so a
+    streamed output that is closed early is not cached.
+
+    Parameters
+    ----------
+    chat_model : ChatModel
+        The chat model to cache responses from.
+    store : ResponseCache or None
+        Where to store responses. Use `SqliteResponseCache` to share responses between
+        processes. If `None`, an in-memory `ResponseCache` is used.
+    """
+
+    def __init__(self, chat_model: ChatModel, store: ResponseCache | None = None):
+        self._chat_model = chat_model
+        self.store = store if store is not None else ResponseCache()
+
+    @property
+    def chat_model(self) -> ChatModel:
+        return self._chat_model
+
+    def _key(
+        self,
+        messages: list[Any],
+        function_schemas: Iterable[Any],
+        output_types: Iterable[type[Any]],
+        stop: list[str] | None,
+    ) -> str:
+        request = {
+            "chat_model": f"{type(self.chat_model).__module__}"
+            f".{type(self.chat_model).__qualname__}",
+            "model": getattr(self.chat_model, "model", None),
+            "temperature": getattr(self.chat_model, "temperature", None),
+            "seed": getattr(self.chat_model, "seed", None),
+            "messages": _canonical_tool_call_ids(messages),
+            "tools": [function_schema.dict() for function_schema in function_schemas],
+            "output_types": [repr(output_type) for output_type in output_types],
+            "stop": stop,
+        }
+        data = json.dumps(request, sort_keys=True, separators=(",", ":"), default=repr)
+        return hashlib.sha256(data.encode()).hexdigest()
+
+    def key(
+        self,
+        messages: Iterable[Message[Any]],
+        functions: Iterable[Callable[..., Any]] | None = None,
+        output_types: Iterable[type[OutputT]] | None = None,
+        *,
+        stop: list[str] | None = None,
+    ) -> str:
+        """Get the cache key for a request."""
+        if output_types is None:
+            output_types = cast(Iterable[type[OutputT]], [] if functions else [str])
+        output_types = list(output_types)
+        return self._key(
+            [_canonical_message(message) for message in messages],
+            get_function_schemas(functions, output_types),
+            output_types,
+            stop,
+        )
+
+    async def akey(
+        self,
+        messages: Iterable[Message[Any]],
+        functions: Iterable[Callable[..., Any]] | None = None,
+        output_types: Iterable[type[OutputT]] | None = None,
+        *,
+        stop: list[str] | None = None,
+    ) -> str:
+        """Async version of `key`."""
+        if output_types is None:
+            output_types = cast(Iterable[type[OutputT]], [] if functions else [str])
+        output_types = list(output_types)
+        return self._key(
+            [await _async_canonical_message(message) for message in messages],
+            get_async_function_schemas(functions, output_types),
+            output_types,
+            stop,
+        )
+
+    def _create_recorder(self, key: str, parser: StreamParser[Any]) -> StreamRecorder:
+        format = _PARSER_FORMATS.get(type(parser).__name__)
+        if format is None:
+            msg = f"Caching is not supported for {type(parser).__name__}"
+            raise ValueError(msg)
+        dump_item = _STREAM_FORMATS[format]().dump_item
+        return _StreamRecorder(
+            format, dump_item, partial(self.store.set, key), save_partial=False
+        )
+
+    def complete(
+        self,
+        messages: Iterable[Message[Any]],
+        functions: Iterable[Callable[..., Any]] | None = None,
+        output_types: Iterable[type[OutputT]] | None = None,
+        *,
+        stop: list[str] | None = None,
+    ) -> AssistantMessage[OutputT]:
+        """Request an LLM message."""
+        messages = list(messages)
+        output_types = list(output_types) if output_types is not None else None
+        key = self.key(messages, functions, output_types, stop=stop)
+        response = self.store.get(key)
+        if response is not None:
+            load_item = _STREAM_FORMATS[response.format]().load_item
+            items = (load_item(item) for item in response.items)
+            return _replay(response.format, items, functions, output_types)
+
+        with use_stream_recorder(partial(self._create_recorder, key)):
+            return self._chat_model.complete(
+                messages=messages,
+                functions=functions,
+                output_types=output_types,
+                stop=stop,
+            )
+
+    async def acomplete(
+        self,
+        messages: Iterable[Message[Any]],
+        functions: Iterable[Callable[..., Any]] | None = None,
+        output_types: Iterable[type[OutputT]] | None = None,
+        *,
+        stop: list[str] | None = None,
+    ) -> AssistantMessage[OutputT]:
+        """Async version of `complete`."""
+        messages = list(messages)
+        output_types = list(output_types) if output_types is not None else None
+        key = await self.akey(messages, functions, output_types, stop=stop)
+        response = self.store.get(key)
+        if response is not None:
+            load_item = _STREAM_FORMATS[response.format]().load_item
+            items = async_iter(load_item(item) for item in response.items)
+            return await _areplay(response.format, items, functions, output_types)
+
+        with use_stream_recorder(partial(self._create_recorder, key)):
+            return await self._chat_model.acomplete(
+                messages=messages,
+                functions=functions,
+                output_types=output_types,
+                stop=stop,
+            )
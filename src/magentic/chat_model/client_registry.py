@@ -0,0 +1,138 @@
+"""Process-wide registry of LLM provider clients.
+
+Each provider client holds a pool of HTTP connections. Sharing clients between chat
+models that use the same backend, base URL and API key allows requests to reuse warm
+connections rather than making new connections and TLS handshakes. Async clients are
+also keyed on the event loop, because their connections cannot be used from another
+event loop.
+"""
+
+import asyncio
+import hashlib
+import os
+import threading
+import weakref
+from collections.abc import Callable
+from typing import Any, NamedTuple, TypeVar
+
+import httpx
+
+from magentic.settings import get_settings
+
+ClientT = TypeVar("ClientT")
+
+
+class HttpClientOptions(NamedTuple):
+    """Options for the HTTP connection pool of provider clients."""
+
+    max_connections: int | None
+    max_keepalive_connections: int | None
+    keepalive_expiry: float | None
+    http2: bool
+
+    @property
+    def limits(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry,
+        )
+
+
+def get_http_client_options() -> HttpClientOptions:
+    """Get the HTTP client options from the magentic settings."""
+    settings = get_settings()
+    return HttpClientOptions(
+        max_connections=settings.http_max_connections,
+        max_keepalive_connections=settings.http_max_keepalive_connections,
+        keepalive_expiry=settings.http_keepalive_expiry,
+        http2=settings.http2,
+    )
+
+
+class _ClientKey(NamedTuple):
+    backend: str
+    base_url: str | None
+    api_key_hash: str | None
+    options: HttpClientOptions
+
+
+_lock = threading.Lock()
+_pid = os.getpid()
+_clients: dict[_ClientKey, Any] = {}
+_async_clients: weakref.WeakKeyDictionary[
+    asyncio.AbstractEventLoop, dict[_ClientKey, Any]
+] = weakref.WeakKeyDictionary()
+
+
+def _client_key(
+    backend: str,
+    base_url: str | None,
+    api_key: str | None,
+    options: HttpClientOptions,
+) -> _ClientKey:
+    # Avoid holding API keys in the registry keys
+    api_key_hash = hashlib.sha256(api_key.encode()).hexdigest() if api_key else None
+    return _ClientKey(backend, base_url, api_key_hash, options)
+
+
+def _clear_after_fork() -> None:
+    # Connections are not safe to share with a child process, so it needs new clients
+    global _pid
+    if os.getpid() != _pid:
+        _pid = os.getpid()
+        _clients.clear()
+        _async_clients.clear()
+
+
+def get_client(
+    backend: str,
+    base_url: str | None,
+    api_key: str | None,
+    options: HttpClientOptions,
+    create: Callable[[HttpClientOptions], ClientT],
+) -> ClientT:
+    """Get the shared sync client for the backend, creating it if needed.
+
+    `create` is called with `options` to create the client if there is none for this
+    backend, base URL, API key and options.
+    """
+    key = _client_key(backend, base_url, api_key, options)
+    with _lock:
+        _clear_after_fork()
+        if key not in _clients:
+            _clients[key] = create(options)
+        client: ClientT = _clients[key]
+    return client
+
+
+def get_async_client(
+    backend: str,
+    base_url: str | None,
+    api_key: str | None,
+    options: HttpClientOptions,
+    create: Callable[[HttpClientOptions], ClientT],
+) -> ClientT:
+    """Get the shared async client for the backend and the running event loop.
+
+    Async version of `get_client`. This must be called from a running event loop.
+    """
+    key = _client_key(backend, base_url, api_key, options)
+    loop = asyncio.get_running_loop()
+    with _lock:
+        _clear_after_fork()
+        loop_clients = _async_clients.setdefault(loop, {})
+        if key not in loop_clients:
+            loop_clients[key] = create(options)
+        client: ClientT = loop_clients[key]
+    return client
+
+
+def clear_clients() -> None:
+    """Remove all clients from the registry so that new clients are created.
+
+    The removed clients are not closed, as they may still be in use by chat models.
+    """
+    with _lock:
+        _clients.clear()
+        _async_clients.clear()
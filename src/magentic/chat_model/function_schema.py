@@ -1,14 +1,26 @@
 import inspect
 import typing
 from abc import ABC, abstractmethod
-from collections.abc import AsyncIterable, Callable, Iterable
-from functools import singledispatch
-from typing import Any, Generic, TypeVar, cast, get_args, get_origin
+from collections.abc import (
+    AsyncIterable,
+    AsyncIterator,
+    Callable,
+    Iterable,
+    Iterator,
+    Sequence,
+)
+from functools import lru_cache, singledispatch
+from typing import TYPE_CHECKING, Any, Generic, TypeVar, cast, get_args, get_origin
 
-from openai.types.shared_params import FunctionDefinition
-from pydantic import BaseModel, TypeAdapter, create_model
+from pydantic import BaseModel, TypeAdapter, ValidationError, create_model
 
-from magentic._pydantic import ConfigDict, get_pydantic_config, json_schema
+from magentic._pydantic import (
+    ConfigDict,
+    get_pydantic_config,
+    json_schema,
+    partial_model,
+)
+from magentic._streamed_model import AsyncStreamedModel, StreamedModel
 from magentic._streamed_response import AsyncStreamedResponse, StreamedResponse
 from magentic.function_call import (
     AsyncParallelFunctionCall,
@@ -16,13 +28,21 @@ from magentic.function_call import (
     ParallelFunctionCall,
 )
 from magentic.streaming import (
+    AsyncClosingIterator,
     AsyncStreamedStr,
+    ClosingIterator,
+    PartialJsonParser,
     StreamedStr,
+    aclose_iterable,
     aiter_streamed_json_array,
+    close_iterable,
     iter_streamed_json_array,
 )
 from magentic.typing import is_origin_abstract, is_origin_subclass, name_type
 
+if TYPE_CHECKING:
+    from openai.types.shared_params import FunctionDefinition
+
 T = TypeVar("T")
 
 
@@ -57,7 +77,7 @@ class BaseFunctionSchema(ABC, Generic[T]):
         """Whether to enable strict schema adherence when generating the function call."""
         return None
 
-    def dict(self) -> FunctionDefinition:
+    def dict(self) -> "FunctionDefinition":
         schema: FunctionDefinition = {"name": self.name, "parameters": self.parameters}
         if self.description:
             schema["description"] = self.description
@@ -345,6 +365,147 @@ class BaseModelFunctionSchema(FunctionSchema[BaseModelT], Generic[BaseModelT]):
         return value.model_dump_json()
 
 
+class _PartialModelParser(Generic[BaseModelT]):
+    """Incrementally parses streamed JSON into partial instances of a pydantic model.
+
+    Validating a partial instance takes time proportional to the number of values in
+    it, so for large objects partial instances are produced less often than once per
+    chunk to keep the total time linear in the length of the JSON.
+    """
+
+    # Number of values that can be validated per character received
+    _VALUES_PER_CHAR = 16
+
+    def __init__(self, model: type[BaseModelT]):
+        self._model = model
+        self._partial_model: type[BaseModelT] = partial_model(model)
+        self._chunks: list[str] = []
+        self._json_parser = PartialJsonParser()
+        self._last_version: int = 0
+        self._num_chars_since_partial: int = 0
+
+    def feed(self, chunk: str) -> BaseModelT | None:
+        """Add a chunk and return a new partial instance if the parsed data changed."""
+        self._chunks.append(chunk)
+        self._json_parser.feed(chunk)
+        self._num_chars_since_partial += len(chunk)
+        if self._json_parser.version == self._last_version or (
+            self._num_chars_since_partial * self._VALUES_PER_CHAR
+            < self._json_parser.num_values
+        ):
+            return None
+        self._last_version = self._json_parser.version
+        self._num_chars_since_partial = 0
+        data = self._json_parser.snapshot()
+        # Skip the empty object received before the first value
+        if not isinstance(data, dict) or not data:
+            return None
+        try:
+            return self._partial_model.model_validate(data)
+        except ValidationError:
+            # Incomplete values can fail validation e.g. a partial `Literal` string
+            return None
+
+    def finish(self) -> BaseModelT:
+        """Validate the complete JSON into an instance of the model.
+
+        Raises `ValidationError` if the JSON is malformed.
+        """
+        return self._model.model_validate_json("".join(self._chunks))
+
+
+StreamedModelT = TypeVar("StreamedModelT", bound=StreamedModel[Any])
+
+
+@register_function_schema(StreamedModel)
+class StreamedModelFunctionSchema(
+    FunctionSchema[StreamedModelT], Generic[StreamedModelT]
+):
+    """FunctionSchema for StreamedModel. Parses LLM output into partial models."""
+
+    def __init__(self, output_type: type[StreamedModelT]):
+        self._output_type = output_type
+        self._model: type[BaseModel] = (
+            args[0] if (args := get_args(output_type)) else BaseModel
+        )
+
+    @property
+    def name(self) -> str:
+        return f"return_{name_type(self._model)}"
+
+    @property
+    def parameters(self) -> dict[str, Any]:
+        return json_schema(self._model)
+
+    @property
+    def strict(self) -> bool | None:
+        return cast(ConfigDict, self._model.model_config).get("openai_strict")
+
+    def _iter_partials(self, chunks: Iterable[str]) -> Iterator[BaseModel]:
+        parser = _PartialModelParser(self._model)
+        for chunk in chunks:
+            if (partial := parser.feed(chunk)) is not None:
+                yield partial
+        yield parser.finish()
+
+    def parse_args(self, chunks: Iterable[str]) -> StreamedModelT:
+        partials = ClosingIterator(
+            self._iter_partials(chunks), lambda: close_iterable(chunks)
+        )
+        return cast(StreamedModelT, StreamedModel(partials))
+
+    def serialize_args(self, value: StreamedModelT) -> str:
+        model: BaseModel = value.to_model()
+        return model.model_dump_json()
+
+
+AsyncStreamedModelT = TypeVar("AsyncStreamedModelT", bound=AsyncStreamedModel[Any])
+
+
+@register_function_schema(AsyncStreamedModel)
+class AsyncStreamedModelFunctionSchema(
+    AsyncFunctionSchema[AsyncStreamedModelT], Generic[AsyncStreamedModelT]
+):
+    """FunctionSchema for AsyncStreamedModel. Parses LLM output into partial models."""
+
+    def __init__(self, output_type: type[AsyncStreamedModelT]):
+        self._output_type = output_type
+        self._model: type[BaseModel] = (
+            args[0] if (args := get_args(output_type)) else BaseModel
+        )
+
+    @property
+    def name(self) -> str:
+        return f"return_{name_type(self._model)}"
+
+    @property
+    def parameters(self) -> dict[str, Any]:
+        return json_schema(self._model)
+
+    @property
+    def strict(self) -> bool | None:
+        return cast(ConfigDict, self._model.model_config).get("openai_strict")
+
+    async def _aiter_partials(
+        self, chunks: AsyncIterable[str]
+    ) -> AsyncIterator[BaseModel]:
+        parser = _PartialModelParser(self._model)
+        async for chunk in chunks:
+            if (partial := parser.feed(chunk)) is not None:
+                yield partial
+        yield parser.finish()
+
+    async def aparse_args(self, chunks: AsyncIterable[str]) -> AsyncStreamedModelT:
+        partials = AsyncClosingIterator(
+            self._aiter_partials(chunks), lambda: aclose_iterable(chunks)
+        )
+        return cast(AsyncStreamedModelT, AsyncStreamedModel(partials))
+
+    async def aserialize_args(self, value: AsyncStreamedModelT) -> str:
+        model: BaseModel = await value.to_model()
+        return model.model_dump_json()
+
+
 def create_model_from_function(func: Callable[..., Any]) -> type[BaseModel]:
     """Create a Pydantic model from a function signature."""
     # https://github.com/pydantic/pydantic/issues/3585#issuecomment-1002745763
@@ -385,6 +546,11 @@ class FunctionCallFunctionSchema(FunctionSchema[FunctionCall[T]], Generic[T]):
     def __init__(self, func: Callable[..., T]):
         self._func = func
         self._model = create_model_from_function(func)
+        # The name and kind of each parameter, used to bind the parsed arguments
+        self._parameters = [
+            (param.name, param.kind)
+            for param in inspect.signature(func).parameters.values()
+        ]
 
     @property
     def name(self) -> str:
@@ -406,47 +572,23 @@ class FunctionCallFunctionSchema(FunctionSchema[FunctionCall[T]], Generic[T]):
         # Anthropic message stream returns empty string for function call with no arguments
         args_json = "".join(chunks) or "{}"
         model = self._model.model_validate_json(args_json)
-        supplied_params = [
-            param
-            for param in inspect.signature(self._func).parameters.values()
-            if param.name in model.model_fields_set
-        ]
-
-        args_positional_only = [
-            getattr(model, param.name)
-            for param in supplied_params
-            if param.kind == param.POSITIONAL_ONLY
-        ]
-        args_positional_or_keyword = [
-            getattr(model, param.name)
-            for param in supplied_params
-            if param.kind == param.POSITIONAL_OR_KEYWORD
-        ]
-        args_var_positional = [
-            arg
-            for param in supplied_params
-            if param.kind == param.VAR_POSITIONAL
-            for arg in getattr(model, param.name)
-        ]
-        args_keyword_only = {
-            param.name: getattr(model, param.name)
-            for param in supplied_params
-            if param.kind == param.KEYWORD_ONLY
-        }
-        args_var_keyword = {
-            name: value
-            for param in supplied_params
-            if param.kind == param.VAR_KEYWORD
-            for name, value in getattr(model, param.name).items()
-        }
-        return FunctionCall(
-            self._func,
-            *args_positional_only,
-            *args_positional_or_keyword,
-            *args_var_positional,
-            **args_keyword_only,
-            **args_var_keyword,
-        )
+        # Parameters are in signature order so positional arguments can be appended
+        args: list[Any] = []
+        kwargs: dict[str, Any] = {}
+        fields_set = model.model_fields_set
+        for name, kind in self._parameters:
+            if name not in fields_set:
+                continue
+            value = getattr(model, name)
+            if kind is inspect.Parameter.VAR_POSITIONAL:
+                args.extend(value)
+            elif kind is inspect.Parameter.VAR_KEYWORD:
+                kwargs.update(value)
+            elif kind is inspect.Parameter.KEYWORD_ONLY:
+                kwargs[name] = value
+            else:
+                args.append(value)
+        return FunctionCall(self._func, *args, **kwargs)
 
     def serialize_args(self, value: FunctionCall[T]) -> str:
         return self._model.model_construct(**value.arguments).model_dump_json(
@@ -468,29 +610,101 @@ _NON_FUNCTION_CALL_TYPES = (
 )
 
 
-def get_function_schemas(
+# Number of distinct (functions, output_types) combinations to keep function schemas
+# for. Prompt-functions and chats pass the same combination on every call.
+FUNCTION_SCHEMAS_CACHE_SIZE = 256
+
+
+def _create_function_schemas(
     functions: Iterable[Callable[..., R]] | None,
     output_types: Iterable[type[T]],
-) -> Iterable[FunctionSchema[FunctionCall[R] | T]]:
-    return [
-        *(FunctionCallFunctionSchema(f) for f in functions or []),  # type: ignore[list-item]
-        *(
-            function_schema_for_type(type_)
+    schema_for_type: Callable[[type[T]], AsyncFunctionSchema[T]],
+) -> tuple[AsyncFunctionSchema[FunctionCall[R] | T], ...]:
+    return (
+        *(FunctionCallFunctionSchema(f) for f in functions or []),  # type: ignore[arg-type]
+        *(  # type: ignore[arg-type]
+            schema_for_type(type_)
             for type_ in output_types
-            if not is_origin_subclass(type_, _NON_FUNCTION_CALL_TYPES)  # type: ignore[list-item]
+            if not is_origin_subclass(type_, _NON_FUNCTION_CALL_TYPES)
         ),
-    ]
+    )
+
+
+@lru_cache(maxsize=FUNCTION_SCHEMAS_CACHE_SIZE)
+def _cached_function_schemas(
+    functions: tuple[Callable[..., Any], ...],
+    output_types: tuple[type, ...],
+) -> tuple[FunctionSchema[Any], ...]:
+    return _create_function_schemas(functions, output_types, function_schema_for_type)  # type: ignore[return-value]
+
+
+@lru_cache(maxsize=FUNCTION_SCHEMAS_CACHE_SIZE)
+def _cached_async_function_schemas(
+    functions: tuple[Callable[..., Any], ...],
+    output_types: tuple[type, ...],
+) -> tuple[AsyncFunctionSchema[Any], ...]:
+    return _create_function_schemas(
+        functions, output_types, async_function_schema_for_type
+    )
+
+
+def get_function_schemas(
+    functions: Iterable[Callable[..., R]] | None,
+    output_types: Iterable[type[T]],
+) -> Sequence[FunctionSchema[FunctionCall[R] | T]]:
+    """Get the FunctionSchemas for the functions and output types.
+
+    The schemas are created once for each combination of functions and output types,
+    so that their pydantic models and JSON schemas are reused across LLM requests.
+    """
+    functions, output_types = tuple(functions or ()), tuple(output_types)
+    try:
+        return _cached_function_schemas(functions, output_types)
+    except TypeError:  # Unhashable function or type
+        return _create_function_schemas(
+            functions, output_types, function_schema_for_type
+        )  # type: ignore[return-value]
 
 
 def get_async_function_schemas(
     functions: Iterable[Callable[..., R]] | None,
     output_types: Iterable[type[T]],
-) -> Iterable[FunctionSchema[FunctionCall[R] | T]]:
-    return [
-        *(FunctionCallFunctionSchema(f) for f in functions or []),  # type: ignore[list-item]
-        *(
-            async_function_schema_for_type(type_)
-            for type_ in output_types
-            if not is_origin_subclass(type_, _NON_FUNCTION_CALL_TYPES)  # type: ignore[list-item]
-        ),
-    ]
+) -> Sequence[AsyncFunctionSchema[FunctionCall[R] | T]]:
+    """Async version of `get_function_schemas`."""
+    functions, output_types = tuple(functions or ()), tuple(output_types)
+    try:
+        return _cached_async_function_schemas(functions, output_types)
+    except TypeError:  # Unhashable function or type
+        return _create_function_schemas(
+            functions, output_types, async_function_schema_for_type
+        )
+
+
+@lru_cache(maxsize=FUNCTION_SCHEMAS_CACHE_SIZE)
+def _cached_function_call_function_schema(
+    func: Callable[..., Any],
+) -> FunctionCallFunctionSchema[Any]:
+    return FunctionCallFunctionSchema(func)
+
+
+@lru_cache(maxsize=FUNCTION_SCHEMAS_CACHE_SIZE)
+def _cached_function_schema_for_type(type_: type) -> FunctionSchema[Any]:
+    return function_schema_for_type(type_)
+
+
+def get_function_call_function_schema(
+    func: Callable[..., T],
+) -> FunctionCallFunctionSchema[T]:
+    """Get the FunctionCallFunctionSchema for a function, reusing it across calls."""
+    try:
+        return _cached_function_call_function_schema(func)
+    except TypeError:  # Unhashable function
+        return FunctionCallFunctionSchema(func)
+
+
+def get_function_schema_for_type(type_: type[T]) -> FunctionSchema[T]:
+    """Get the FunctionSchema for a type, reusing it across calls."""
+    try:
+        return _cached_function_schema_for_type(type_)  # type: ignore[arg-type]
+    except TypeError:  # Unhashable type
+        return function_schema_for_type(type_)
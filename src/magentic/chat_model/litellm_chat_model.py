@@ -1,20 +1,27 @@
+import copy
 from collections.abc import Callable, Iterable, Sequence
+from functools import lru_cache
 from typing import Any, Literal, cast
 
 import openai
 from openai.lib.streaming.chat import ChatCompletionStreamState
-from openai.types.chat import ChatCompletionNamedToolChoiceParam
+from openai.types.chat import (
+    ChatCompletionNamedToolChoiceParam,
+    ChatCompletionToolParam,
+)
 
 from magentic._parsing import contains_string_type
 from magentic.chat_model.base import ChatModel, OutputT, aparse_stream, parse_stream
 from magentic.chat_model.function_schema import (
+    FUNCTION_SCHEMAS_CACHE_SIZE,
+    BaseFunctionSchema,
     get_async_function_schemas,
     get_function_schemas,
 )
 from magentic.chat_model.message import AssistantMessage, Message, Usage, _RawMessage
 from magentic.chat_model.openai_chat_model import (
     BaseFunctionToolSchema,
-    message_to_openai_message,
+    _messages_to_openai_messages,
 )
 from magentic.chat_model.stream import (
     AsyncOutputStream,
@@ -23,6 +30,7 @@ from magentic.chat_model.stream import (
     StreamParser,
     StreamState,
 )
+from magentic.chat_model.timing import TimingRecorder
 
 try:
     import litellm
@@ -62,11 +70,14 @@ class LitellmStreamParser(StreamParser[ModelResponse]):
 
 
 class LitellmStreamState(StreamState[ModelResponse]):
+    """Tracks the state of the LiteLLM model output stream.
+
+    Chunks are recorded as they arrive and the message snapshot is only built when it
+    is requested, as accumulating it on every chunk is slow.
+    """
+
     def __init__(self) -> None:
-        self._chat_completion_stream_state = ChatCompletionStreamState(
-            input_tools=openai.NOT_GIVEN,
-            response_format=openai.NOT_GIVEN,
-        )
+        self._chunks: list[ModelResponse] = []
         self.usage_ref: list[Usage] = []
 
     def update(self, item: ModelResponse) -> None:
@@ -77,7 +88,7 @@ class LitellmStreamState(StreamState[ModelResponse]):
         if not hasattr(item, "refusal"):
             assert isinstance(item.choices[0], StreamingChoices)
             item.choices[0].delta.refusal = None  # type: ignore[attr-defined]
-        self._chat_completion_stream_state.handle_chunk(item)  # type: ignore[arg-type]
+        self._chunks.append(item)
         usage = cast(litellm.Usage, item.usage)  # type: ignore[attr-defined,name-defined]
         # Ignore usages with 0 tokens
         if usage and usage.prompt_tokens and usage.completion_tokens:
@@ -91,7 +102,13 @@ class LitellmStreamState(StreamState[ModelResponse]):
 
     @property
     def current_message_snapshot(self) -> Message[Any]:
-        snapshot = self._chat_completion_stream_state.current_completion_snapshot
+        chat_completion_stream_state = ChatCompletionStreamState(
+            input_tools=openai.NOT_GIVEN,
+            response_format=openai.NOT_GIVEN,
+        )
+        for chunk in self._chunks:
+            chat_completion_stream_state.handle_chunk(chunk)  # type: ignore[arg-type]
+        snapshot = chat_completion_stream_state.current_completion_snapshot
         message = snapshot.choices[0].message
         # Fix incorrectly concatenated role
         message.role = "assistant"
@@ -99,6 +116,21 @@ class LitellmStreamState(StreamState[ModelResponse]):
         return _RawMessage(message.model_dump())
 
 
+ToolsArgs = tuple[
+    list[ChatCompletionToolParam] | None,
+    ChatCompletionNamedToolChoiceParam | Literal["required"] | None,
+]
+
+
+@lru_cache(maxsize=FUNCTION_SCHEMAS_CACHE_SIZE)
+def _cached_tools_args(
+    chat_model_cls: type["LitellmChatModel"],
+    function_schemas: tuple[BaseFunctionSchema[Any], ...],
+    output_types: tuple[type, ...],
+) -> ToolsArgs:
+    return chat_model_cls._create_tools_args(function_schemas, output_types)
+
+
 class LitellmChatModel(ChatModel):
     """An LLM chat model that uses the `litellm` python package."""
 
@@ -162,6 +194,38 @@ class LitellmChatModel(ChatModel):
             return tool_schemas[0].as_tool_choice()
         return "required"
 
+    @classmethod
+    def _create_tools_args(
+        cls,
+        function_schemas: Iterable[BaseFunctionSchema[Any]],
+        output_types: Iterable[type],
+    ) -> ToolsArgs:
+        """Create the tools and tool choice arguments."""
+        tool_schemas = [BaseFunctionToolSchema(schema) for schema in function_schemas]
+        tools = [schema.to_dict() for schema in tool_schemas] or None
+        tool_choice = cls._get_tool_choice(
+            tool_schemas=tool_schemas, output_types=output_types
+        )
+        return tools, tool_choice
+
+    def _get_tools_args(
+        self,
+        function_schemas: Iterable[BaseFunctionSchema[Any]],
+        output_types: Iterable[type],
+    ) -> ToolsArgs:
+        """Get the tools and tool choice arguments, reusing them across requests.
+
+        The tools are copied as LiteLLM may modify them when adapting them to the
+        provider.
+        """
+        try:
+            tools, tool_choice = _cached_tools_args(
+                type(self), tuple(function_schemas), tuple(output_types)
+            )
+        except TypeError:  # Unhashable output type
+            return self._create_tools_args(function_schemas, output_types)
+        return copy.deepcopy(tools), tool_choice
+
     def complete(
         self,
         messages: Iterable[Message[Any]],
@@ -171,15 +235,18 @@ class LitellmChatModel(ChatModel):
         stop: list[str] | None = None,
     ) -> AssistantMessage[OutputT]:
         """Request an LLM message."""
+        timing_recorder = TimingRecorder()
         if output_types is None:
             output_types = cast(Iterable[type[OutputT]], [] if functions else [str])
 
         function_schemas = get_function_schemas(functions, output_types)
-        tool_schemas = [BaseFunctionToolSchema(schema) for schema in function_schemas]
+        tools, tool_choice = self._get_tools_args(function_schemas, output_types)
+        openai_messages = _messages_to_openai_messages(messages)
 
+        timing_recorder.request_sent()
         response = litellm.completion(
             model=self.model,
-            messages=[message_to_openai_message(m) for m in messages],
+            messages=openai_messages,
             api_base=self.api_base,
             custom_llm_provider=self.custom_llm_provider,
             extra_headers=self.extra_headers,
@@ -189,10 +256,8 @@ class LitellmChatModel(ChatModel):
             stream=True,
             # TODO: Add usage for LitellmChatModel
             temperature=self.temperature,
-            tools=[schema.to_dict() for schema in tool_schemas] or None,
-            tool_choice=self._get_tool_choice(
-                tool_schemas=tool_schemas, output_types=output_types
-            ),  # type: ignore[arg-type,unused-ignore]
+            tools=tools,
+            tool_choice=tool_choice,  # type: ignore[arg-type,unused-ignore]
         )
         assert not isinstance(response, ModelResponse)
         stream = OutputStream(
@@ -200,8 +265,13 @@ class LitellmChatModel(ChatModel):
             function_schemas=function_schemas,
             parser=LitellmStreamParser(),
             state=LitellmStreamState(),
+            timing_recorder=timing_recorder,
+        )
+        return AssistantMessage._with_usage(
+            parse_stream(stream, output_types),
+            usage_ref=None,
+            timing_recorder=stream.timing_recorder,
         )
-        return AssistantMessage(parse_stream(stream, output_types))
 
     async def acomplete(
         self,
@@ -212,15 +282,18 @@ class LitellmChatModel(ChatModel):
         stop: list[str] | None = None,
     ) -> AssistantMessage[OutputT]:
         """Async version of `complete`."""
+        timing_recorder = TimingRecorder()
         if output_types is None:
             output_types = cast(Iterable[type[OutputT]], [] if functions else [str])
 
         function_schemas = get_async_function_schemas(functions, output_types)
-        tool_schemas = [BaseFunctionToolSchema(schema) for schema in function_schemas]
+        tools, tool_choice = self._get_tools_args(function_schemas, output_types)
+        openai_messages = _messages_to_openai_messages(messages)
 
+        timing_recorder.request_sent()
         response = await litellm.acompletion(
             model=self.model,
-            messages=[message_to_openai_message(m) for m in messages],
+            messages=openai_messages,
             api_base=self.api_base,
             custom_llm_provider=self.custom_llm_provider,
             extra_headers=self.extra_headers,
@@ -230,10 +303,8 @@ class LitellmChatModel(ChatModel):
             stream=True,
             # TODO: Add usage for LitellmChatModel
             temperature=self.temperature,
-            tools=[schema.to_dict() for schema in tool_schemas] or None,
-            tool_choice=self._get_tool_choice(
-                tool_schemas=tool_schemas, output_types=output_types
-            ),  # type: ignore[arg-type,unused-ignore]
+            tools=tools,
+            tool_choice=tool_choice,  # type: ignore[arg-type,unused-ignore]
         )
         assert not isinstance(response, ModelResponse)
         stream = AsyncOutputStream(
@@ -241,5 +312,10 @@ class LitellmChatModel(ChatModel):
             function_schemas=function_schemas,
             parser=LitellmStreamParser(),
             state=LitellmStreamState(),
+            timing_recorder=timing_recorder,
+        )
+        return AssistantMessage._with_usage(
+            await aparse_stream(stream, output_types),
+            usage_ref=None,
+            timing_recorder=stream.timing_recorder,
         )
-        return AssistantMessage(await aparse_stream(stream, output_types))
@@ -1,11 +1,16 @@
 import base64
+import mmap
+import os
+import weakref
 from abc import ABC, abstractmethod
-from collections.abc import Awaitable, Iterable, Sequence
+from collections.abc import Awaitable, Callable, Iterable, Iterator, Sequence
 from functools import cached_property
+from pathlib import Path
 from typing import (
     TYPE_CHECKING,
     Annotated,
     Any,
+    ClassVar,
     Generic,
     Literal,
     NamedTuple,
@@ -25,10 +30,12 @@ from pydantic import (
     RootModel,
     TypeAdapter,
     ValidationError,
+    field_serializer,
     model_validator,
 )
 from typing_extensions import Self
 
+from magentic.chat_model.timing import Timing, TimingRecorder
 from magentic.function_call import FunctionCall
 
 if TYPE_CHECKING:
@@ -129,69 +136,124 @@ class SystemMessage(Message[str]):
         return SystemMessage(self.content.format(**kwargs))
 
 
-# Anthropic supports PDF: https://docs.anthropic.com/en/docs/build-with-claude/pdf-support
-DocumentMimeType = Literal["application/pdf"]
-_DOCUMENT_MIME_TYPES: tuple[DocumentMimeType, ...] = get_args(DocumentMimeType)
+# Number of bytes at the start of a file used to guess its MIME type
+_MIME_TYPE_HEADER_SIZE = 8192
+# Number of bytes to encode at a time when streaming base64. This is a multiple of 3
+# so that the encoded chunks do not contain padding and can be concatenated.
+_BASE64_CHUNK_SIZE = 3 * 2**20
 
 
-class DocumentBytes(RootModel[bytes]):
-    """Bytes representing a document file."""
+class _Base64Bytes(RootModel[bytes]):
+    """Bytes of a file that are sent to the LLM encoded as base64.
 
-    @cached_property
-    def mime_type(self) -> DocumentMimeType:
-        mimetype: str | None = filetype.guess_mime(self.root)
-        assert mimetype in _DOCUMENT_MIME_TYPES
-        return cast(DocumentMimeType, mimetype)
+    The base64 encoding is cached on the instance, so a block that is reused across
+    messages is only encoded once. Messages created using `format` and copies made
+    using `model_copy` share the same block, and so share the encoding.
+    """
+
+    _mime_type_description: ClassVar[str]
+    _mime_types: ClassVar[tuple[str, ...]]
 
     def __init__(self, root: bytes, **data: Any):
         super().__init__(root=root, **data)
 
-    def as_base64(self) -> str:
+    @classmethod
+    def from_file(cls, path: str | os.PathLike[str]) -> Self:
+        """Create from a file without reading it into memory.
+
+        The file is memory-mapped, so its contents are paged in by the operating
+        system as they are encoded rather than held in memory as `bytes`. The file
+        must not be modified while this object is in use.
+        """
+        with Path(path).open("rb") as file:
+            mapped_file = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        # A memoryview supports the same operations as bytes without copying
+        file_bytes = cls.model_construct(memoryview(mapped_file))
+        file_bytes._check_mime_type()
+        return file_bytes
+
+    def _guess_mime_type(self) -> str | None:
+        mimetype: str | None = filetype.guess_mime(
+            bytes(self.root[:_MIME_TYPE_HEADER_SIZE])
+        )
+        return mimetype
+
+    @cached_property
+    def _base64(self) -> str:
         return base64.b64encode(self.root).decode("utf-8")
 
+    def as_base64(self) -> str:
+        return self._base64
+
+    def iter_base64(self, chunk_size: int = _BASE64_CHUNK_SIZE) -> Iterator[str]:
+        """Encode as base64 in chunks, without creating the full encoding.
+
+        `chunk_size` is the number of bytes encoded at a time, rounded down to a
+        multiple of 3.
+        """
+        chunk_size = max(chunk_size - chunk_size % 3, 3)
+        data = memoryview(self.root)
+        for start in range(0, len(data), chunk_size):
+            chunk = data[start : start + chunk_size]
+            yield base64.b64encode(chunk).decode("utf-8")
+
     def format(self, **kwargs: Any) -> Self:
         del kwargs
         return self
 
-    @model_validator(mode="after")
-    def _is_document_bytes(self) -> Self:
-        mimetype: str | None = filetype.guess_mime(self.root)
-        if mimetype not in _DOCUMENT_MIME_TYPES:
-            msg = f"Unsupported document MIME type: {mimetype!r}"
+    @field_serializer("root")
+    def _serialize_root(self, root: bytes) -> bytes:
+        # Memory-mapped files are stored as a memoryview
+        return root if isinstance(root, bytes) else bytes(root)
+
+    def _check_mime_type(self) -> None:
+        mimetype = self._guess_mime_type()
+        if mimetype not in self._mime_types:
+            msg = f"Unsupported {self._mime_type_description} MIME type: {mimetype!r}"
             raise ValueError(msg)
+
+    @model_validator(mode="after")
+    def _is_supported_bytes(self) -> Self:
+        self._check_mime_type()
         return self
 
 
+# Anthropic supports PDF: https://docs.anthropic.com/en/docs/build-with-claude/pdf-support
+DocumentMimeType = Literal["application/pdf"]
+_DOCUMENT_MIME_TYPES: tuple[DocumentMimeType, ...] = get_args(DocumentMimeType)
+
+
+class DocumentBytes(_Base64Bytes):
+    """Bytes representing a document file."""
+
+    _mime_type_description = "document"
+    _mime_types = _DOCUMENT_MIME_TYPES
+
+    @cached_property
+    def mime_type(self) -> DocumentMimeType:
+        mimetype = self._guess_mime_type()
+        assert mimetype in _DOCUMENT_MIME_TYPES
+        return cast(DocumentMimeType, mimetype)
+
+
 # OpenAI supports PNG, JPEG, WEBP, and non-animated GIF
 # Anthropic supports JPEG, PNG, GIF, or WebP
 ImageMimeType = Literal["image/jpeg", "image/png", "image/gif", "image/webp"]
 _IMAGE_MIME_TYPES: tuple[ImageMimeType, ...] = get_args(ImageMimeType)
 
 
-class ImageBytes(RootModel[bytes]):
+class ImageBytes(_Base64Bytes):
     """Bytes representing an image file."""
 
+    _mime_type_description = "image"
+    _mime_types = _IMAGE_MIME_TYPES
+
     @cached_property
     def mime_type(self) -> ImageMimeType:
-        mimetype: str | None = filetype.guess_mime(self.root)
+        mimetype = self._guess_mime_type()
         assert mimetype in _IMAGE_MIME_TYPES
         return cast(ImageMimeType, mimetype)
 
-    def as_base64(self) -> str:
-        return base64.b64encode(self.root).decode("utf-8")
-
-    def format(self, **kwargs: Any) -> Self:
-        del kwargs
-        return self
-
-    @model_validator(mode="after")
-    def _is_image_bytes(self) -> Self:
-        mimetype: str | None = filetype.guess_mime(self.root)
-        if mimetype not in _IMAGE_MIME_TYPES:
-            msg = f"Unsupported image MIME type: {mimetype!r}"
-            raise ValueError(msg)
-        return self
-
 
 class ImageUrl(RootModel[str]):
     """String representing a URL to an image."""
@@ -264,14 +326,22 @@ class AssistantMessage(Message[ContentT], Generic[ContentT]):
 
     role: Literal["assistant"] = "assistant"
     _usage_ref: list[Usage] | None = PrivateAttr(None)
+    _timing_recorder: TimingRecorder | None = PrivateAttr(None)
+    _num_retries: int = PrivateAttr(0)
 
     def __init__(self, content: ContentT, **data: Any):
         super().__init__(content=content, **data)
 
     @classmethod
-    def _with_usage(cls, content: ContentT, usage_ref: list[Usage]) -> Self:  # type: ignore[misc]
+    def _with_usage(
+        cls,
+        content: ContentT,  # type: ignore[misc]
+        usage_ref: list[Usage] | None,
+        timing_recorder: TimingRecorder | None = None,
+    ) -> Self:
         message = cls(content)
         message._usage_ref = usage_ref
+        message._timing_recorder = timing_recorder
         return message
 
     @property
@@ -280,6 +350,17 @@ class AssistantMessage(Message[ContentT], Generic[ContentT]):
             return self._usage_ref[0]
         return None
 
+    @property
+    def timing(self) -> Timing | None:
+        if self._timing_recorder is not None:
+            return self._timing_recorder.timing
+        return None
+
+    @property
+    def num_retries(self) -> int:
+        """The number of times the request was retried by `RetryChatModel`."""
+        return self._num_retries
+
     @overload
     def format(
         self: "AssistantMessage[str]", **kwargs: Any
@@ -376,3 +457,62 @@ AnyMessage = Annotated[
     Field(discriminator="role"),
 ]
 """Union of all message types."""
+
+
+ConvertedT = TypeVar("ConvertedT")
+
+
+class MessageConversionCache(Generic[ConvertedT]):
+    """Cache of messages converted to the format of an LLM provider.
+
+    Messages are treated as immutable, so each message instance only needs to be
+    converted once even though the full chat history is sent with every request. The
+    converted message is kept until the message instance is garbage collected, and
+    must not be modified.
+    """
+
+    def __init__(self) -> None:
+        # Messages are unhashable so are keyed on their id. The weak reference ensures
+        # a cached value is not returned for a new message that reuses the id.
+        self._entries: dict[int, tuple[weakref.ref[Message[Any]], ConvertedT]] = {}
+
+    def _get(self, message: Message[Any]) -> ConvertedT | None:
+        entry = self._entries.get(id(message))
+        if entry is not None and entry[0]() is message:
+            return entry[1]
+        return None
+
+    def _set(self, message: Message[Any], converted: ConvertedT) -> None:
+        key = id(message)
+
+        def remove(ref: weakref.ref[Message[Any]]) -> None:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] is ref:
+                del self._entries[key]
+
+        self._entries[key] = (weakref.ref(message, remove), converted)
+
+    def convert(
+        self, message: Message[Any], converter: Callable[[Message[Any]], ConvertedT]
+    ) -> ConvertedT:
+        """Return the converted message, calling `converter` if it is not cached."""
+        converted = self._get(message)
+        if converted is None:
+            converted = converter(message)
+            self._set(message, converted)
+        return converted
+
+    async def aconvert(
+        self,
+        message: Message[Any],
+        converter: Callable[[Message[Any]], Awaitable[ConvertedT]],
+    ) -> ConvertedT:
+        """Async version of `convert`."""
+        converted = self._get(message)
+        if converted is None:
+            converted = await converter(message)
+            self._set(message, converted)
+        return converted
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -1,6 +1,7 @@
 from collections.abc import AsyncIterator, Callable, Iterable, Iterator, Sequence
 from enum import Enum
-from functools import singledispatch
+from functools import lru_cache, singledispatch
+from itertools import groupby
 from typing import Any, Generic, Literal, TypeVar, cast
 
 import openai
@@ -18,13 +19,21 @@ from openai.types.chat import (
 )
 
 from magentic._parsing import contains_parallel_function_call_type, contains_string_type
+from magentic._streamed_model import AsyncStreamedModel, StreamedModel
 from magentic._streamed_response import AsyncStreamedResponse, StreamedResponse
 from magentic.chat_model.base import ChatModel, OutputT, aparse_stream, parse_stream
+from magentic.chat_model.client_registry import (
+    HttpClientOptions,
+    get_async_client,
+    get_client,
+    get_http_client_options,
+)
 from magentic.chat_model.function_schema import (
+    FUNCTION_SCHEMAS_CACHE_SIZE,
     BaseFunctionSchema,
-    FunctionCallFunctionSchema,
-    function_schema_for_type,
     get_async_function_schemas,
+    get_function_call_function_schema,
+    get_function_schema_for_type,
     get_function_schemas,
 )
 from magentic.chat_model.message import (
@@ -32,6 +41,7 @@ from magentic.chat_model.message import (
     ImageBytes,
     ImageUrl,
     Message,
+    MessageConversionCache,
     SystemMessage,
     ToolResultMessage,
     Usage,
@@ -45,6 +55,7 @@ from magentic.chat_model.stream import (
     StreamParser,
     StreamState,
 )
+from magentic.chat_model.timing import TimingRecorder
 from magentic.function_call import (
     AsyncParallelFunctionCall,
     FunctionCall,
@@ -138,7 +149,7 @@ def _(message: UserImageMessage[Any]) -> ChatCompletionUserMessageParam:
 def _function_call_to_tool_call_block(
     function_call: FunctionCall[Any],
 ) -> ChatCompletionMessageToolCallParam:
-    function_schema = FunctionCallFunctionSchema(function_call.function)
+    function_schema = get_function_call_function_schema(function_call.function)
     return {
         "id": function_call._unique_id,
         "type": "function",
@@ -186,7 +197,10 @@ def _(message: AssistantMessage[Any]) -> ChatCompletionMessageParam:
             ],
         }
 
-    function_schema = function_schema_for_type(type(message.content))
+    if isinstance(message.content, StreamedModel):
+        return message_to_openai_message(AssistantMessage(message.content.to_model()))
+
+    function_schema = get_function_schema_for_type(type(message.content))
     return {
         "role": OpenaiMessageRole.ASSISTANT.value,
         "tool_calls": [
@@ -230,6 +244,11 @@ async def _(message: AssistantMessage[Any]) -> ChatCompletionMessageParam:
                 for function_call in function_calls
             ],
         }
+
+    if isinstance(message.content, AsyncStreamedModel):
+        return message_to_openai_message(
+            AssistantMessage(await message.content.to_model())
+        )
     return message_to_openai_message(message)
 
 
@@ -238,7 +257,7 @@ def _(message: ToolResultMessage[Any]) -> ChatCompletionMessageParam:
     if isinstance(message.content, str):
         content = message.content
     else:
-        function_schema = function_schema_for_type(type(message.content))
+        function_schema = get_function_schema_for_type(type(message.content))
         content = function_schema.serialize_args(message.content)
     return {
         "role": OpenaiMessageRole.TOOL.value,
@@ -247,6 +266,31 @@ def _(message: ToolResultMessage[Any]) -> ChatCompletionMessageParam:
     }
 
 
+_openai_message_cache: MessageConversionCache[ChatCompletionMessageParam] = (
+    MessageConversionCache()
+)
+
+
+def _messages_to_openai_messages(
+    messages: Iterable[Message[Any]],
+) -> list[ChatCompletionMessageParam]:
+    """Convert messages to OpenAI messages, reusing those converted previously."""
+    return [
+        _openai_message_cache.convert(message, message_to_openai_message)
+        for message in messages
+    ]
+
+
+async def _async_messages_to_openai_messages(
+    messages: Iterable[Message[Any]],
+) -> list[ChatCompletionMessageParam]:
+    """Async version of `_messages_to_openai_messages`."""
+    return [
+        await _openai_message_cache.aconvert(message, async_message_to_openai_message)
+        for message in messages
+    ]
+
+
 # TODO: Use ToolResultMessage to solve this at magentic level
 def _add_missing_tool_calls_responses(
     messages: list[ChatCompletionMessageParam],
@@ -317,19 +361,82 @@ class OpenaiStreamParser(StreamParser[ChatCompletionChunk]):
                     )
 
 
+def _append_key(chunk: ChatCompletionChunk) -> tuple[int, int | None] | None:
+    """Return the (choice, tool call) index if the chunk only appends text to it.
+
+    The tool call index is `None` for chunks that only append content.
+    """
+    if chunk.usage or len(chunk.choices) != 1:
+        return None
+    choice = chunk.choices[0]
+    delta = choice.delta
+    if (
+        choice.finish_reason
+        or choice.logprobs
+        or delta.role
+        or delta.refusal
+        or delta.function_call
+    ):
+        return None
+    if delta.content is not None and not delta.tool_calls:
+        return (choice.index, None)
+    if delta.content is None and delta.tool_calls and len(delta.tool_calls) == 1:
+        tool_call = delta.tool_calls[0]
+        if (
+            tool_call.id is None
+            and tool_call.function is not None
+            and tool_call.function.name is None
+            and tool_call.function.arguments is not None
+        ):
+            return (choice.index, tool_call.index)
+    return None
+
+
+def _appended_text(chunk: ChatCompletionChunk) -> str:
+    delta = chunk.choices[0].delta
+    if delta.tool_calls:
+        return delta.tool_calls[0].function.arguments or ""  # type: ignore[union-attr]
+    return delta.content or ""
+
+
+def _coalesce_chunks(
+    chunks: Iterable[ChatCompletionChunk],
+) -> list[ChatCompletionChunk]:
+    """Merge runs of chunks that append to the same content or tool call arguments.
+
+    Accumulating the merged chunks gives the same completion snapshot in far fewer
+    calls to `ChatCompletionStreamState.handle_chunk`, which is slow.
+    """
+    coalesced: list[ChatCompletionChunk] = []
+    for key, group in groupby(chunks, key=_append_key):
+        group_chunks = list(group)
+        if key is None or len(group_chunks) == 1:
+            coalesced.extend(group_chunks)
+            continue
+        text = "".join(_appended_text(chunk) for chunk in group_chunks)
+        merged = group_chunks[0].model_copy(deep=True)
+        delta = merged.choices[0].delta
+        if delta.tool_calls:
+            delta.tool_calls[0].function.arguments = text  # type: ignore[union-attr]
+        else:
+            delta.content = text
+        coalesced.append(merged)
+    return coalesced
+
+
 class OpenaiStreamState(StreamState[ChatCompletionChunk]):
     """Tracks the state of the OpenAI model output stream.
 
     - message snapshot
     - usage
     - stop reason
+
+    Chunks are recorded as they arrive and the message snapshot is only built when it
+    is requested, as accumulating it on every chunk is slow.
     """
 
     def __init__(self) -> None:
-        self._chat_completion_stream_state = ChatCompletionStreamState(
-            input_tools=openai.NOT_GIVEN,
-            response_format=openai.NOT_GIVEN,
-        )
+        self._chunks: list[ChatCompletionChunk] = []
         self.usage_ref: list[Usage] = []
 
         # Keep track of tool call index to add this to Mistral tool calls
@@ -348,7 +455,7 @@ class OpenaiStreamState(StreamState[ChatCompletionChunk]):
                     self._current_tool_call_index += 1
                     self._seen_tool_call_ids.add(tool_call_chunk.id)
                 tool_call_chunk.index = self._current_tool_call_index
-        self._chat_completion_stream_state.handle_chunk(item)
+        self._chunks.append(item)
         if item.usage:
             # Only keep the last usage
             # xAI Grok and Gemini openai-compatible API includes usage in all streamed chunks
@@ -363,7 +470,13 @@ class OpenaiStreamState(StreamState[ChatCompletionChunk]):
 
     @property
     def current_message_snapshot(self) -> Message[Any]:
-        snapshot = self._chat_completion_stream_state.current_completion_snapshot
+        chat_completion_stream_state = ChatCompletionStreamState(
+            input_tools=openai.NOT_GIVEN,
+            response_format=openai.NOT_GIVEN,
+        )
+        for chunk in _coalesce_chunks(self._chunks):
+            chat_completion_stream_state.handle_chunk(chunk)
+        snapshot = chat_completion_stream_state.current_completion_snapshot
         message = snapshot.choices[0].message
         # TODO: Possible to return AssistantMessage here?
         return _RawMessage(message.model_dump())
@@ -373,6 +486,21 @@ def _if_given(value: T | None) -> T | openai.NotGiven:
     return value if value is not None else openai.NOT_GIVEN
 
 
+ToolsArgs = tuple[
+    list[ChatCompletionToolParam] | openai.NotGiven,
+    ChatCompletionToolChoiceOptionParam | openai.NotGiven,
+]
+
+
+@lru_cache(maxsize=FUNCTION_SCHEMAS_CACHE_SIZE)
+def _cached_tools_args(
+    chat_model_cls: type["OpenaiChatModel"],
+    function_schemas: tuple[BaseFunctionSchema[Any], ...],
+    output_types: tuple[type, ...],
+) -> ToolsArgs:
+    return chat_model_cls._create_tools_args(function_schemas, output_types)
+
+
 class OpenaiChatModel(ChatModel):
     """An LLM chat model that uses the `openai` python package."""
 
@@ -395,22 +523,62 @@ class OpenaiChatModel(ChatModel):
         self._seed = seed
         self._temperature = temperature
 
-        match api_type:
+        self._http_client_options = get_http_client_options()
+        self._client = get_client(
+            api_type,
+            base_url,
+            api_key,
+            self._http_client_options,
+            self._create_client,
+        )
+
+    def _create_client(self, options: HttpClientOptions) -> openai.OpenAI:
+        http_client = openai.DefaultHttpxClient(
+            limits=options.limits, http2=options.http2
+        )
+        match self.api_type:
             case "openai":
-                self._client = openai.OpenAI(api_key=api_key, base_url=base_url)
-                self._async_client = openai.AsyncOpenAI(
-                    api_key=api_key, base_url=base_url
+                return openai.OpenAI(
+                    api_key=self.api_key,
+                    base_url=self.base_url,
+                    http_client=http_client,
                 )
             case "azure":
-                self._client = openai.AzureOpenAI(
-                    api_key=api_key,
-                    base_url=base_url,  # type: ignore[arg-type]
+                return openai.AzureOpenAI(
+                    api_key=self.api_key,
+                    base_url=self.base_url,  # type: ignore[arg-type]
+                    http_client=http_client,
                 )
-                self._async_client = openai.AsyncAzureOpenAI(
-                    api_key=api_key,
-                    base_url=base_url,  # type: ignore[arg-type]
+
+    def _create_async_client(self, options: HttpClientOptions) -> openai.AsyncOpenAI:
+        http_client = openai.DefaultAsyncHttpxClient(
+            limits=options.limits, http2=options.http2
+        )
+        match self.api_type:
+            case "openai":
+                return openai.AsyncOpenAI(
+                    api_key=self.api_key,
+                    base_url=self.base_url,
+                    http_client=http_client,
+                )
+            case "azure":
+                return openai.AsyncAzureOpenAI(
+                    api_key=self.api_key,
+                    base_url=self.base_url,  # type: ignore[arg-type]
+                    http_client=http_client,
                 )
 
+    @property
+    def _async_client(self) -> openai.AsyncOpenAI:
+        # Async clients are created for each event loop
+        return get_async_client(
+            self.api_type,
+            self.base_url,
+            self.api_key,
+            self._http_client_options,
+            self._create_async_client,
+        )
+
     @property
     def model(self) -> str:
         return self._model
@@ -457,6 +625,37 @@ class OpenaiChatModel(ChatModel):
             return tool_schemas[0].as_tool_choice()
         return "required"
 
+    @classmethod
+    def _create_tools_args(
+        cls,
+        function_schemas: Iterable[BaseFunctionSchema[Any]],
+        output_types: Iterable[type],
+    ) -> ToolsArgs:
+        """Create the tools and tool choice arguments."""
+        tool_schemas = [BaseFunctionToolSchema(schema) for schema in function_schemas]
+        tools = [schema.to_dict() for schema in tool_schemas] or openai.NOT_GIVEN
+        tool_choice = cls._get_tool_choice(
+            tool_schemas=tool_schemas, output_types=output_types
+        )
+        return tools, tool_choice
+
+    def _get_tools_args(
+        self,
+        function_schemas: Iterable[BaseFunctionSchema[Any]],
+        output_types: Iterable[type],
+    ) -> ToolsArgs:
+        """Get the tools and tool choice arguments, reusing them across requests.
+
+        The arguments are serialized once for each combination of function schemas
+        and output types, which are themselves reused by `get_function_schemas`.
+        """
+        try:
+            return _cached_tools_args(
+                type(self), tuple(function_schemas), tuple(output_types)
+            )
+        except TypeError:  # Unhashable output type
+            return self._create_tools_args(function_schemas, output_types)
+
     def _get_parallel_tool_calls(
         self, *, tools_specified: bool, output_types: Iterable[type]
     ) -> bool | openai.NotGiven:
@@ -478,29 +677,30 @@ class OpenaiChatModel(ChatModel):
         # TODO: Add type hint for function call ?
     ) -> AssistantMessage[OutputT]:
         """Request an LLM message."""
+        timing_recorder = TimingRecorder()
         if output_types is None:
             output_types = cast(Iterable[type[OutputT]], [] if functions else [str])
 
         function_schemas = get_function_schemas(functions, output_types)
-        tool_schemas = [BaseFunctionToolSchema(schema) for schema in function_schemas]
+        tools, tool_choice = self._get_tools_args(function_schemas, output_types)
+        openai_messages = _add_missing_tool_calls_responses(
+            _messages_to_openai_messages(messages)
+        )
 
+        timing_recorder.request_sent()
         response: Iterator[ChatCompletionChunk] = self._client.chat.completions.create(
             model=self.model,
-            messages=_add_missing_tool_calls_responses(
-                [message_to_openai_message(m) for m in messages]
-            ),
+            messages=openai_messages,
             max_tokens=_if_given(self.max_tokens),
             seed=_if_given(self.seed),
             stop=_if_given(stop),
             stream=True,
             stream_options=self._get_stream_options(),
             temperature=_if_given(self.temperature),
-            tools=[schema.to_dict() for schema in tool_schemas] or openai.NOT_GIVEN,
-            tool_choice=self._get_tool_choice(
-                tool_schemas=tool_schemas, output_types=output_types
-            ),
+            tools=tools,
+            tool_choice=tool_choice,
             parallel_tool_calls=self._get_parallel_tool_calls(
-                tools_specified=bool(tool_schemas), output_types=output_types
+                tools_specified=bool(function_schemas), output_types=output_types
             ),
         )
         stream = OutputStream(
@@ -508,9 +708,12 @@ class OpenaiChatModel(ChatModel):
             function_schemas=function_schemas,
             parser=OpenaiStreamParser(),
             state=OpenaiStreamState(),
+            timing_recorder=timing_recorder,
         )
         return AssistantMessage._with_usage(
-            parse_stream(stream, output_types), usage_ref=stream.usage_ref
+            parse_stream(stream, output_types),
+            usage_ref=stream.usage_ref,
+            timing_recorder=stream.timing_recorder,
         )
 
     async def acomplete(
@@ -522,31 +725,32 @@ class OpenaiChatModel(ChatModel):
         stop: list[str] | None = None,
     ) -> AssistantMessage[OutputT]:
         """Async version of `complete`."""
+        timing_recorder = TimingRecorder()
         if output_types is None:
             output_types = [] if functions else cast(list[type[OutputT]], [str])
 
         function_schemas = get_async_function_schemas(functions, output_types)
-        tool_schemas = [BaseFunctionToolSchema(schema) for schema in function_schemas]
+        tools, tool_choice = self._get_tools_args(function_schemas, output_types)
+        openai_messages = _add_missing_tool_calls_responses(
+            await _async_messages_to_openai_messages(messages)
+        )
 
+        timing_recorder.request_sent()
         response: AsyncIterator[
             ChatCompletionChunk
         ] = await self._async_client.chat.completions.create(
             model=self.model,
-            messages=_add_missing_tool_calls_responses(
-                [await async_message_to_openai_message(m) for m in messages]
-            ),
+            messages=openai_messages,
             max_tokens=_if_given(self.max_tokens),
             seed=_if_given(self.seed),
             stop=_if_given(stop),
             stream=True,
             stream_options=self._get_stream_options(),
             temperature=_if_given(self.temperature),
-            tools=[schema.to_dict() for schema in tool_schemas] or openai.NOT_GIVEN,
-            tool_choice=self._get_tool_choice(
-                tool_schemas=tool_schemas, output_types=output_types
-            ),
+            tools=tools,
+            tool_choice=tool_choice,
             parallel_tool_calls=self._get_parallel_tool_calls(
-                tools_specified=bool(tool_schemas), output_types=output_types
+                tools_specified=bool(function_schemas), output_types=output_types
             ),
         )
         stream = AsyncOutputStream(
@@ -554,7 +758,10 @@ class OpenaiChatModel(ChatModel):
             function_schemas=function_schemas,
             parser=OpenaiStreamParser(),
             state=OpenaiStreamState(),
+            timing_recorder=timing_recorder,
         )
         return AssistantMessage._with_usage(
-            await aparse_stream(stream, output_types), usage_ref=stream.usage_ref
+            await aparse_stream(stream, output_types),
+            usage_ref=stream.usage_ref,
+            timing_recorder=stream.timing_recorder,
         )
@@ -0,0 +1,350 @@
+import asyncio
+import gzip
+import json
+import threading
+import time
+from collections.abc import AsyncIterator, Callable, Iterable, Iterator
+from functools import cache
+from itertools import count
+from pathlib import Path
+from typing import IO, Any, NamedTuple, cast, get_args
+
+from magentic.chat_model.base import ChatModel, OutputT, aparse_stream, parse_stream
+from magentic.chat_model.function_schema import (
+    get_async_function_schemas,
+    get_function_schemas,
+)
+from magentic.chat_model.message import AssistantMessage, Message
+from magentic.chat_model.stream import (
+    AsyncOutputStream,
+    OutputStream,
+    StreamParser,
+    StreamRecorder,
+    StreamState,
+    use_stream_recorder,
+)
+
+
+class StreamRecording(NamedTuple):
+    """The raw items of an LLM response stream and the delay in seconds before each.
+
+    `format` names the provider the items are from, which determines how they are
+    serialized and parsed.
+    """
+
+    format: str
+    items: list[Any]
+    delays: list[float]
+
+
+class _StreamFormat(NamedTuple):
+    parser: Callable[[], StreamParser[Any]]
+    state: Callable[[], StreamState[Any]]
+    dump_item: Callable[[Any], Any]
+    load_item: Callable[[Any], Any]
+
+
+@cache
+def _openai_format() -> _StreamFormat:
+    from openai.types.chat import ChatCompletionChunk
+
+    from magentic.chat_model.openai_chat_model import (
+        OpenaiStreamParser,
+        OpenaiStreamState,
+    )
+
+    return _StreamFormat(
+        parser=OpenaiStreamParser,
+        state=OpenaiStreamState,
+        dump_item=lambda item: item.model_dump(mode="json", exclude_unset=True),
+        load_item=ChatCompletionChunk.model_validate,
+    )
+
+
+@cache
+def _anthropic_format() -> _StreamFormat:
+    from anthropic.lib.streaming import MessageStreamEvent
+
+    from magentic.chat_model.anthropic_chat_model import (
+        AnthropicStreamParser,
+        AnthropicStreamState,
+    )
+
+    event_types = {
+        get_args(event_type.model_fields["type"].annotation)[0]: event_type
+        for event_type in get_args(MessageStreamEvent)
+    }
+
+    def load_item(data: dict[str, Any]) -> Any:
+        event_type = event_types[data["type"]]
+        if "snapshot" in event_type.model_fields:
+            # Snapshots are not recorded as they grow with the response
+            snapshot_type = event_type.model_fields["snapshot"].annotation
+            data = {**data, "snapshot": "" if snapshot_type is str else None}
+        return event_type.model_validate(data)
+
+    return _StreamFormat(
+        parser=AnthropicStreamParser,
+        state=AnthropicStreamState,
+        dump_item=lambda item: item.model_dump(mode="json", exclude={"snapshot"}),
+        load_item=load_item,
+    )
+
+
+@cache
+def _litellm_format() -> _StreamFormat:
+    from litellm.types.utils import ModelResponse
+
+    from magentic.chat_model.litellm_chat_model import (
+        LitellmStreamParser,
+        LitellmStreamState,
+    )
+
+    return _StreamFormat(
+        parser=LitellmStreamParser,
+        state=LitellmStreamState,
+        dump_item=lambda item: item.model_dump(mode="json"),
+        load_item=lambda data: ModelResponse(stream=True, **data),
+    )
+
+
+_STREAM_FORMATS: dict[str, Callable[[], _StreamFormat]] = {
+    "openai": _openai_format,
+    "anthropic": _anthropic_format,
+    "litellm": _litellm_format,
+}
+
+_PARSER_FORMATS = {
+    "OpenaiStreamParser": "openai",
+    "AnthropicStreamParser": "anthropic",
+    "LitellmStreamParser": "litellm",
+}
+
+
+def _open(path: Path, mode: str) -> IO[str]:
+    if path.suffix == ".gz":
+        return cast(IO[str], gzip.open(path, mode))
+    return path.open(mode)
+
+
+def load_stream_recordings(path: str | Path) -> list[StreamRecording]:
+    """Load the stream recordings saved by `RecordingChatModel`.
+
+    The items are returned as the provider objects they were recorded from.
+    """
+    recordings = []
+    with _open(Path(path), "rt") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            recording = StreamRecording(**json.loads(line))
+            load_item = _STREAM_FORMATS[recording.format]().load_item
+            recordings.append(
+                recording._replace(items=[load_item(i) for i in recording.items])
+            )
+    return recordings
+
+
+def _replay(
+    format: str,
+    items: Iterator[Any],
+    functions: Iterable[Callable[..., Any]] | None,
+    output_types: Iterable[type[OutputT]] | None,
+) -> AssistantMessage[OutputT]:
+    """Process recorded stream items as the chat model that recorded them would."""
+    if output_types is None:
+        output_types = cast(Iterable[type[OutputT]], [] if functions else [str])
+
+    stream_format = _STREAM_FORMATS[format]()
+    stream = OutputStream(
+        items,
+        function_schemas=get_function_schemas(functions, output_types),
+        parser=stream_format.parser(),
+        state=stream_format.state(),
+    )
+    return AssistantMessage._with_usage(
+        parse_stream(stream, output_types),
+        usage_ref=stream.usage_ref,
+        timing_recorder=stream.timing_recorder,
+    )
+
+
+async def _areplay(
+    format: str,
+    items: AsyncIterator[Any],
+    functions: Iterable[Callable[..., Any]] | None,
+    output_types: Iterable[type[OutputT]] | None,
+) -> AssistantMessage[OutputT]:
+    """Async version of `_replay`."""
+    if output_types is None:
+        output_types = cast(Iterable[type[OutputT]], [] if functions else [str])
+
+    stream_format = _STREAM_FORMATS[format]()
+    stream = AsyncOutputStream(
+        items,
+        function_schemas=get_async_function_schemas(functions, output_types),
+        parser=stream_format.parser(),
+        state=stream_format.state(),
+    )
+    return AssistantMessage._with_usage(
+        await aparse_stream(stream, output_types),
+        usage_ref=stream.usage_ref,
+        timing_recorder=stream.timing_recorder,
+    )
+
+
+class _StreamRecorder(StreamRecorder):
+    def __init__(
+        self,
+        format: str,
+        dump_item: Callable[[Any], Any],
+        save: Callable[[StreamRecording], None],
+        *,
+        save_partial: bool = True,
+    ):
+        self._format = format
+        self._dump_item = dump_item
+        self._save = save
+        self._save_partial = save_partial
+        self._items: list[Any] = []
+        self._delays: list[float] = []
+        self._last_item_time = time.perf_counter()
+
+    def record(self, item: Any) -> None:
+        now = time.perf_counter()
+        self._items.append(self._dump_item(item))
+        self._delays.append(round(now - self._last_item_time, 6))
+        self._last_item_time = now
+
+    def finish(self, *, ended: bool) -> None:
+        if ended or self._save_partial:
+            self._save(StreamRecording(self._format, self._items, self._delays))
+
+
+class RecordingChatModel(ChatModel):
+    """Wraps another ChatModel to record its raw LLM response streams to a file.
+
+    Each response stream is appended to the file as a line of JSON once it has ended,
+    which for streamed outputs is when they have been fully iterated or closed. The
+    delay before each chunk is recorded too. Files with a `.gz` suffix are compressed.
+    Use `ReplayChatModel` to replay the recorded responses.
+    """
+
+    def __init__(self, chat_model: ChatModel, path: str | Path):
+        self._chat_model = chat_model
+        self._path = Path(path)
+        self._lock = threading.Lock()
+
+    def _create_recorder(self, parser: StreamParser[Any]) -> StreamRecorder:
+        format = _PARSER_FORMATS.get(type(parser).__name__)
+        if format is None:
+            msg = f"Recording is not supported for {type(parser).__name__}"
+            raise ValueError(msg)
+        dump_item = _STREAM_FORMATS[format]().dump_item
+        return _StreamRecorder(format, dump_item, self._save)
+
+    def _save(self, recording: StreamRecording) -> None:
+        line = json.dumps(recording._asdict(), separators=(",", ":"))
+        with self._lock, _open(self._path, "at") as f:
+            f.write(line + "\n")
+
+    def complete(
+        self,
+        messages: Iterable[Message[Any]],
+        functions: Iterable[Callable[..., Any]] | None = None,
+        output_types: Iterable[type[OutputT]] | None = None,
+        *,
+        stop: list[str] | None = None,
+    ) -> AssistantMessage[OutputT]:
+        """Request an LLM message."""
+        with use_stream_recorder(self._create_recorder):
+            return self._chat_model.complete(
+                messages=messages,
+                functions=functions,
+                output_types=output_types,
+                stop=stop,
+            )
+
+    async def acomplete(
+        self,
+        messages: Iterable[Message[Any]],
+        functions: Iterable[Callable[..., Any]] | None = None,
+        output_types: Iterable[type[OutputT]] | None = None,
+        *,
+        stop: list[str] | None = None,
+    ) -> AssistantMessage[OutputT]:
+        """Async version of `complete`."""
+        with use_stream_recorder(self._create_recorder):
+            return await self._chat_model.acomplete(
+                messages=messages,
+                functions=functions,
+                output_types=output_types,
+                stop=stop,
+            )
+
+
+class ReplayChatModel(ChatModel):
+    """A ChatModel that replays the LLM responses recorded by `RecordingChatModel`.
+
+    The recorded responses are returned in order regardless of the messages, starting
+    again from the first once all have been used. Each is processed by the same stream
+    parser and state as the chat model that recorded it, so this exercises the real
+    response handling without making any requests.
+
+    `speed` scales the recorded delays between chunks. Use `1` to replay at the
+    recorded speed, `10` to replay ten times faster, or `None` for no delays.
+    """
+
+    def __init__(self, path: str | Path, *, speed: float | None = 1):
+        if speed is not None and speed <= 0:
+            msg = f"speed must be positive or None, got {speed}"
+            raise ValueError(msg)
+        self._recordings = load_stream_recordings(path)
+        if not self._recordings:
+            msg = f"No stream recordings found in {path}"
+            raise ValueError(msg)
+        self._speed = speed
+        self._counter = count()
+
+    def _next_recording(self) -> StreamRecording:
+        return self._recordings[next(self._counter) % len(self._recordings)]
+
+    def _iter_items(self, recording: StreamRecording) -> Iterator[Any]:
+        for item, delay in zip(recording.items, recording.delays, strict=True):
+            if self._speed is not None:
+                time.sleep(delay / self._speed)
+            yield item
+
+    async def _aiter_items(self, recording: StreamRecording) -> AsyncIterator[Any]:
+        for item, delay in zip(recording.items, recording.delays, strict=True):
+            if self._speed is not None:
+                await asyncio.sleep(delay / self._speed)
+            yield item
+
+    def complete(
+        self,
+        messages: Iterable[Message[Any]],
+        functions: Iterable[Callable[..., Any]] | None = None,
+        output_types: Iterable[type[OutputT]] | None = None,
+        *,
+        stop: list[str] | None = None,
+    ) -> AssistantMessage[OutputT]:
+        """Request an LLM message."""
+        recording = self._next_recording()
+        return _replay(
+            recording.format, self._iter_items(recording), functions, output_types
+        )
+
+    async def acomplete(
+        self,
+        messages: Iterable[Message[Any]],
+        functions: Iterable[Callable[..., Any]] | None = None,
+        output_types: Iterable[type[OutputT]] | None = None,
+        *,
+        stop: list[str] | None = None,
+    ) -> AssistantMessage[OutputT]:
+        """Async version of `complete`."""
+        recording = self._next_recording()
+        return await _areplay(
+            recording.format, self._aiter_items(recording), functions, output_types
+        )
@@ -1,23 +1,223 @@
-from collections.abc import Callable, Iterable
+import asyncio
+import random
+import sys
+import time
+from collections.abc import Callable, Collection, Iterable, Mapping, Sequence
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 from functools import singledispatchmethod
 from typing import Any
 
-from magentic.chat_model.base import ChatModel, OutputT, ToolSchemaParseError
+from magentic.chat_model.base import (
+    ChatModel,
+    OutputT,
+    ToolSchemaParseError,
+    UnknownToolError,
+)
 from magentic.chat_model.message import AssistantMessage, Message, ToolResultMessage
 from magentic.logger import logfire
 
+# Request timeout, lock timeout, rate limit, server errors, and Anthropic overloaded
+RETRY_STATUS_CODES = (408, 409, 429, 500, 502, 503, 504, 529)
+
+# Errors raised when a request fails before a response is received
+_CONNECTION_ERRORS = [
+    ("httpx", "TimeoutException"),
+    ("httpx", "NetworkError"),
+    ("httpx", "RemoteProtocolError"),
+    ("openai", "APIConnectionError"),
+    ("anthropic", "APIConnectionError"),
+]
+
+
+def _get_connection_error_types() -> tuple[type[Exception], ...]:
+    # Only packages that have been imported can have raised an error, so avoid
+    # importing the others
+    return tuple(
+        getattr(module, name)
+        for module_name, name in _CONNECTION_ERRORS
+        if (module := sys.modules.get(module_name)) is not None
+    )
+
+
+def _get_retry_after(error: Exception) -> float | None:
+    """Get the seconds to wait from the `Retry-After` header of the error response."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if headers is None:
+        return None
+    # Non-standard header used by OpenAI
+    if (retry_after_ms := headers.get("retry-after-ms")) is not None:
+        try:
+            return float(retry_after_ms) / 1000
+        except ValueError:
+            pass
+    if (retry_after := headers.get("retry-after")) is None:
+        return None
+    try:
+        return float(retry_after)
+    except ValueError:
+        pass
+    try:
+        retry_at: datetime = parsedate_to_datetime(retry_after)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return (retry_at - datetime.now(timezone.utc)).total_seconds()
+
+
+class RetryPolicy:
+    """Policy for retrying requests that fail due to rate limits or transient errors.
+
+    Requests that fail due to a connection error, a timeout, or a response with one of
+    `retry_status_codes` are retried after a delay. If the response has a `Retry-After`
+    header then the delay is the time it specifies, otherwise the delay increases
+    exponentially with each retry and full jitter is applied.
+
+    Parameters
+    ----------
+    max_retries : int
+        The maximum number of retries of each request.
+    max_retries_by_error : Mapping[type[Exception], int] | None
+        The maximum number of retries for errors of each type. The entry for the most
+        specific base class of the error applies. Errors with no entry are only limited
+        by `max_retries`.
+    initial_delay : float
+        The maximum delay in seconds before the first retry.
+    max_delay : float
+        The maximum delay in seconds before any retry. If a `Retry-After` header
+        requests a longer delay then the request is not retried.
+    multiplier : float
+        The factor by which the maximum delay increases with each retry.
+    jitter : bool
+        Whether to wait a random time up to the maximum delay, which prevents many
+        clients from retrying at the same time.
+    deadline : float | None
+        The time in seconds since the first attempt after which no retries are made.
+    retry_status_codes : Collection[int]
+        The HTTP status codes of responses for which the request is retried.
+    retry_on : tuple[type[Exception], ...]
+        Additional error types for which the request is retried.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_retries: int = 5,
+        max_retries_by_error: Mapping[type[Exception], int] | None = None,
+        initial_delay: float = 0.5,
+        max_delay: float = 60,
+        multiplier: float = 2,
+        jitter: bool = True,
+        deadline: float | None = None,
+        retry_status_codes: Collection[int] = RETRY_STATUS_CODES,
+        retry_on: tuple[type[Exception], ...] = (),
+    ):
+        if max_retries < 0:
+            msg = "max_retries must not be negative"
+            raise ValueError(msg)
+        if initial_delay < 0 or max_delay < 0:
+            msg = "initial_delay and max_delay must not be negative"
+            raise ValueError(msg)
+        if deadline is not None and deadline <= 0:
+            msg = "deadline must be greater than 0"
+            raise ValueError(msg)
+        self.max_retries = max_retries
+        self.max_retries_by_error = dict(max_retries_by_error or {})
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.multiplier = multiplier
+        self.jitter = jitter
+        self.deadline = deadline
+        self.retry_status_codes = frozenset(retry_status_codes)
+        self.retry_on = retry_on
+
+    def is_retryable(self, error: Exception) -> bool:
+        """Whether the request that raised `error` can be retried."""
+        if isinstance(error, self.retry_on):
+            return True
+        # Provider API errors for responses have the status code
+        status_code = getattr(error, "status_code", None)
+        if isinstance(status_code, int):
+            return status_code in self.retry_status_codes
+        return isinstance(error, _get_connection_error_types())
+
+    def _get_error_type(self, error: Exception) -> type[Exception] | None:
+        for error_type in type(error).__mro__:
+            if error_type in self.max_retries_by_error:
+                return error_type
+        return None
+
+    def get_delay(
+        self,
+        error: Exception,
+        previous_errors: Sequence[Exception],
+        elapsed: float,
+    ) -> float | None:
+        """Get the seconds to wait before retrying a request that raised `error`.
+
+        Parameters
+        ----------
+        error : Exception
+            The error raised by the latest attempt.
+        previous_errors : Sequence[Exception]
+            The errors of the previous attempts that were retried.
+        elapsed : float
+            The time in seconds since the first attempt.
+
+        Returns
+        -------
+        float | None
+            The delay in seconds, or None if the request should not be retried.
+        """
+        if not self.is_retryable(error) or len(previous_errors) >= self.max_retries:
+            return None
+        if (error_type := self._get_error_type(error)) is not None:
+            num_retries = sum(isinstance(e, error_type) for e in previous_errors)
+            if num_retries >= self.max_retries_by_error[error_type]:
+                return None
+
+        retry_after = _get_retry_after(error)
+        if retry_after is not None:
+            delay = max(retry_after, 0)
+            if delay > self.max_delay:
+                return None
+        else:
+            delay = min(
+                self.max_delay,
+                self.initial_delay * self.multiplier ** len(previous_errors),
+            )
+            if self.jitter:
+                delay = random.uniform(0, delay)  # noqa: S311
+
+        if self.deadline is not None and elapsed + delay > self.deadline:
+            return None
+        return delay
+
 
 class RetryChatModel(ChatModel):
-    """Wraps another ChatModel to add LLM-assisted retries."""
+    """Wraps another ChatModel to add LLM-assisted retries.
+
+    If `retry_policy` is provided, requests that fail due to rate limits or transient
+    errors are also retried following the policy. This includes errors that occur
+    after the request was made but before the response content is received, so
+    streamed outputs are only returned once the first content has arrived. Errors
+    raised while iterating over streamed outputs are not retried.
+
+    The number of retries is available as `num_retries` on the returned message.
+    """
 
     def __init__(
         self,
         chat_model: ChatModel,
         *,
-        max_retries: int,
+        max_retries: int = 0,
+        retry_policy: RetryPolicy | None = None,
     ):
         self._chat_model = chat_model
         self._max_retries = max_retries
+        self._retry_policy = retry_policy
 
     # TODO: Make this public to allow modifying error handling behavior
     # User should be able to add handlers to instance using decorator
@@ -27,7 +227,6 @@ class RetryChatModel(ChatModel):
     def _make_retry_messages(self, error: Exception) -> list[Message[Any]]:
         raise NotImplementedError
 
-    # TODO: Catch UnknownToolError here
     @_make_retry_messages.register
     def _(self, error: ToolSchemaParseError) -> list[Message[Any]]:
         return [
@@ -37,6 +236,31 @@ class RetryChatModel(ChatModel):
             ),
         ]
 
+    @_make_retry_messages.register
+    def _(self, error: UnknownToolError) -> list[Message[Any]]:
+        return [
+            error.output_message,
+            ToolResultMessage(content=str(error), tool_call_id=error.tool_call_id),
+        ]
+
+    def _get_retry_delay(
+        self, error: Exception, previous_errors: Sequence[Exception], start: float
+    ) -> float | None:
+        if self._retry_policy is None:
+            return None
+        delay = self._retry_policy.get_delay(
+            error, previous_errors, elapsed=time.monotonic() - start
+        )
+        if delay is not None:
+            logfire.warn(
+                "Retrying Chat Completion after {error_type} in {delay:.2f}s."
+                " Attempt {num_retry}",
+                error_type=type(error).__name__,
+                delay=delay,
+                num_retry=len(previous_errors) + 1,
+            )
+        return delay
+
     def complete(
         self,
         messages: Iterable[Message[Any]],
@@ -52,6 +276,8 @@ class RetryChatModel(ChatModel):
         ):
             messages = list(messages)
             num_retry = 0
+            errors: list[Exception] = []
+            start = time.monotonic()
             while True:
                 try:
                     message = self._chat_model.complete(
@@ -61,11 +287,19 @@ class RetryChatModel(ChatModel):
                         stop=stop,
                     )
                 # TODO: Get list of caught exceptions from _make_retry_messages registered types
-                except ToolSchemaParseError as e:
+                except (ToolSchemaParseError, UnknownToolError) as e:
                     if num_retry >= self._max_retries:
                         raise
                     messages += self._make_retry_messages(e)
+                except Exception as e:
+                    delay = self._get_retry_delay(e, errors, start)
+                    if delay is None:
+                        raise
+                    errors.append(e)
+                    time.sleep(delay)
+                    continue
                 else:
+                    message._num_retries = num_retry + len(errors)
                     return message
 
                 num_retry += 1
@@ -90,6 +324,8 @@ class RetryChatModel(ChatModel):
         ):
             messages = list(messages)
             num_retry = 0
+            errors: list[Exception] = []
+            start = time.monotonic()
             while True:
                 try:
                     message = await self._chat_model.acomplete(
@@ -98,11 +334,19 @@ class RetryChatModel(ChatModel):
                         output_types=output_types,
                         stop=stop,
                     )
-                except ToolSchemaParseError as e:
+                except (ToolSchemaParseError, UnknownToolError) as e:
                     if num_retry >= self._max_retries:
                         raise
                     messages += self._make_retry_messages(e)
+                except Exception as e:
+                    delay = self._get_retry_delay(e, errors, start)
+                    if delay is None:
+                        raise
+                    errors.append(e)
+                    await asyncio.sleep(delay)
+                    continue
                 else:
+                    message._num_retries = num_retry + len(errors)
                     return message
 
                 num_retry += 1
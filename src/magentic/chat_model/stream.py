@@ -1,6 +1,10 @@
+import asyncio
 from abc import ABC, abstractmethod
-from collections.abc import AsyncIterable, AsyncIterator, Iterable, Iterator
-from itertools import chain
+from collections import deque
+from collections.abc import AsyncIterable, AsyncIterator, Callable, Iterable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from time import perf_counter
 from typing import Any, Generic, NamedTuple, TypeVar
 
 from pydantic import ValidationError
@@ -12,15 +16,17 @@ from magentic.chat_model.function_schema import (
     select_function_schema,
 )
 from magentic.chat_model.message import Message, Usage
+from magentic.chat_model.timing import TimingRecorder
 from magentic.streaming import (
+    AsyncClosingIterator,
     AsyncStreamedStr,
+    ClosingIterator,
     StreamedStr,
-    aapply,
-    achain,
+    aclose_iterable,
     aconsume,
-    apply,
-    async_iter,
+    close_iterable,
     consume,
+    get_stream_cache,
 )
 
 ItemT = TypeVar("ItemT")
@@ -65,8 +71,48 @@ class StreamState(ABC, Generic[ItemT]):
     def current_message_snapshot(self) -> Message[Any]: ...
 
 
+class StreamRecorder(ABC):
+    """Receives the raw items of an LLM response stream as they are read."""
+
+    @abstractmethod
+    def record(self, item: Any) -> None: ...
+
+    @abstractmethod
+    def finish(self, *, ended: bool) -> None:
+        """Called once when the stream has ended or been closed.
+
+        `ended` is `False` if the stream was closed before all items were read.
+        """
+
+
+StreamRecorderFactory = Callable[[StreamParser[Any]], StreamRecorder]
+
+_stream_recorder_factory_context: ContextVar[StreamRecorderFactory | None] = ContextVar(
+    "stream_recorder_factory", default=None
+)
+
+
+@contextmanager
+def use_stream_recorder(factory: StreamRecorderFactory | None) -> Iterator[None]:
+    """Record the LLM response streams of output streams created within this context.
+
+    `factory` is called with the parser of each output stream to create its recorder.
+    """
+    token = _stream_recorder_factory_context.set(factory)
+    try:
+        yield
+    finally:
+        _stream_recorder_factory_context.reset(token)
+
+
 class OutputStream(Generic[ItemT, OutputT]):
-    """Converts streamed LLM output into a stream of magentic objects."""
+    """Converts streamed LLM output into a stream of magentic objects.
+
+    The LLM response stream is read one item at a time by whichever output is currently
+    being iterated. Tool call chunks that have been parsed from an item but not yet
+    consumed are held in a queue, so that each item passes through a fixed number of
+    steps regardless of how many outputs precede it in the response.
+    """
 
     def __init__(
         self,
@@ -74,14 +120,24 @@ class OutputStream(Generic[ItemT, OutputT]):
         function_schemas: Iterable[FunctionSchema[OutputT]],
         parser: StreamParser[ItemT],
         state: StreamState[ItemT],
+        timing_recorder: TimingRecorder | None = None,
     ):
         self._stream = stream
         self._function_schemas = function_schemas
         self._parser = parser
         self._state = state
-
+        self._timing_recorder = timing_recorder or TimingRecorder()
+        recorder_factory = _stream_recorder_factory_context.get()
+        self._recorder = recorder_factory(parser) if recorder_factory else None
+        # Capture the cache mode now as outputs are created lazily outside the context
+        self._cache = get_stream_cache()
+
+        self._stream_iterator = iter(stream)
+        self._tool_call_chunks: deque[FunctionCallChunk] = deque()
+        # Set when the output currently being streamed has received all its chunks
+        self._output_complete: bool = False
+        self._closed: bool = False
         self._iterator = self.__stream__()
-        self._exhausted: bool = False
 
     def __next__(self) -> StreamedStr | OutputT:
         return self._iterator.__next__()
@@ -89,104 +145,144 @@ class OutputStream(Generic[ItemT, OutputT]):
     def __iter__(self) -> Iterator[StreamedStr | OutputT]:
         yield from self._iterator
 
-    def _streamed_str(
-        self, stream: Iterator[ItemT], current_item_ref: list[ItemT]
-    ) -> Iterator[str]:
-        for item in stream:
+    def close(self) -> None:
+        """Stop the output stream and close the LLM response stream.
+
+        This releases the connection and stops the LLM generating further output.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        # Drop pending tool calls so that no further outputs are produced
+        self._tool_call_chunks.clear()
+        close_iterable(self._stream)
+        self._finish(ended=False)
+
+    def _finish(self, *, ended: bool) -> None:
+        self._timing_recorder.finish()
+        if self._recorder is not None:
+            self._recorder.finish(ended=ended)
+            self._recorder = None
+
+    def _next_item(self) -> ItemT | None:
+        """Read the next item from the LLM response stream, or `None` if it has ended."""
+        if self._closed:
+            return None
+        wait_start = perf_counter()
+        item = next(self._stream_iterator, None)
+        if item is None:
+            self._finish(ended=True)
+            return None
+        self._timing_recorder.item_received(wait_start)
+        if self._recorder is not None:
+            self._recorder.record(item)
+        update_start = perf_counter()
+        self._state.update(item)
+        self._timing_recorder.add_parse(perf_counter() - update_start)
+        return item
+
+    def _next_tool_call_chunk(self) -> FunctionCallChunk | None:
+        while not self._tool_call_chunks:
+            item = self._next_item()
+            if item is None:
+                return None
+            self._tool_call_chunks.extend(self._parser.iter_tool_calls(item))
+            if self._tool_call_chunks:
+                self._timing_recorder.tool_call_received()
+        return self._tool_call_chunks.popleft()
+
+    def _streamed_str(self, item: ItemT | None) -> Iterator[str]:
+        while item is not None:
             if content := self._parser.get_content(item):
                 yield content
             if self._parser.is_tool_call(item):
                 # TODO: Check if output types allow for early return and raise if not
-                assert not current_item_ref
-                current_item_ref.append(item)
-                return
-        self._exhausted = True
-
-    def _tool_call(
-        self,
-        stream: Iterator[FunctionCallChunk],
-        current_tool_call_ref: list[FunctionCallChunk],
-        current_tool_call_id: str,
-    ) -> Iterator[str]:
-        for item in stream:
+                self._tool_call_chunks.extend(self._parser.iter_tool_calls(item))
+                self._timing_recorder.tool_call_received()
+                break
+            item = self._next_item()
+        self._output_complete = True
+
+    def _tool_call(self, tool_call_id: str) -> Iterator[str]:
+        while (chunk := self._next_tool_call_chunk()) is not None:
             # Only end the stream if we encounter a new tool call
             # so that the whole stream is consumed including stop_reason/usage chunks
-            if item.id and item.id != current_tool_call_id:
+            if chunk.id and chunk.id != tool_call_id:
                 # TODO: Check if output types allow for early return and raise if not
-                assert not current_tool_call_ref
-                current_tool_call_ref.append(item)
-                return
-            if item.args:
-                yield item.args
-        self._exhausted = True
+                self._tool_call_chunks.appendleft(chunk)
+                break
+            if chunk.args:
+                yield chunk.args
+        self._output_complete = True
 
     def __stream__(self) -> Iterator[StreamedStr | OutputT]:
-        # This works similarly to `itertools.groupby`
-        stream = apply(self._state.update, self._stream)
-        current_item_ref = [next(stream)]
-        while current_item_ref:
-            current_item = current_item_ref.pop()
-            if self._parser.is_content(current_item):
-                stream = chain([current_item], stream)
-                streamed_str = StreamedStr(self._streamed_str(stream, current_item_ref))
-                yield streamed_str
-                if not current_item_ref and not self._exhausted:
-                    # Finish the group to allow advancing to the next one
-                    # Consume stream via StreamedStr so it can cache
-                    consume(streamed_str)
-            elif self._parser.is_tool_call(current_item):
-                tool_calls_stream: Iterator[FunctionCallChunk] = (
-                    tool_call_chunk
-                    for item in chain([current_item], stream)
-                    for tool_call_chunk in self._parser.iter_tool_calls(item)
+        item = self._next_item()
+        while item is not None and not (
+            self._parser.is_content(item) or self._parser.is_tool_call(item)
+        ):
+            item = self._next_item()
+        if item is None:
+            return
+
+        if self._parser.is_content(item):
+            self._timing_recorder.content_received()
+            self._output_complete = False
+            # Closing the output closes the stream, even if it was never iterated
+            streamed_str = StreamedStr(
+                ClosingIterator(self._streamed_str(item), self.close), cache=self._cache
+            )
+            yield streamed_str
+            if not self._output_complete:
+                # Finish the output to allow advancing to the next one
+                # Consume stream via StreamedStr so it can cache
+                consume(streamed_str)
+        else:
+            self._timing_recorder.tool_call_received()
+            self._tool_call_chunks.extend(self._parser.iter_tool_calls(item))
+
+        while (tool_call_chunk := self._next_tool_call_chunk()) is not None:
+            tool_call_id = tool_call_chunk.id
+            assert tool_call_id is not None
+            assert tool_call_chunk.name is not None
+            function_schema = select_function_schema(
+                self._function_schemas, tool_call_chunk.name
+            )
+            if function_schema is None:
+                raise UnknownToolError(
+                    output_message=self._state.current_message_snapshot,
+                    tool_call_id=tool_call_id,
+                    tool_name=tool_call_chunk.name,
                 )
-                tool_call_ref = [next(tool_calls_stream)]
-                while tool_call_ref:
-                    current_tool_call_chunk = tool_call_ref.pop()
-                    current_tool_call_id = current_tool_call_chunk.id
-                    assert current_tool_call_id is not None
-                    assert current_tool_call_chunk.name is not None
-                    function_schema = select_function_schema(
-                        self._function_schemas, current_tool_call_chunk.name
+            # Return the chunk so that its args are included in the tool call
+            self._tool_call_chunks.appendleft(tool_call_chunk)
+            self._output_complete = False
+            try:
+                with self._timing_recorder.parsing():
+                    output = function_schema.parse_args(
+                        ClosingIterator(self._tool_call(tool_call_id), self.close)
                     )
-                    if function_schema is None:
-                        assert current_tool_call_id is not None
-                        raise UnknownToolError(
-                            output_message=self._state.current_message_snapshot,
-                            tool_call_id=current_tool_call_id,
-                            tool_name=current_tool_call_chunk.name,
-                        )
-                    try:
-                        tool_calls_stream = chain(
-                            [current_tool_call_chunk], tool_calls_stream
-                        )
-                        output = function_schema.parse_args(
-                            self._tool_call(
-                                tool_calls_stream, tool_call_ref, current_tool_call_id
-                            )
-                        )
-                        yield output
-                        if not tool_call_ref and not self._exhausted:
-                            # Finish the group to allow advancing to the next one
-                            # Output must be Iterable if parse_args above did not consume
-                            assert isinstance(output, Iterable), output
-                            # Consume stream via the output type so it can cache
-                            consume(output)
-
-                    except ValidationError as e:
-                        assert current_tool_call_id is not None
-                        raise ToolSchemaParseError(
-                            output_message=self._state.current_message_snapshot,
-                            tool_call_id=current_tool_call_id,
-                            validation_error=e,
-                        ) from e
-            elif new_current_item := next(stream, None):
-                current_item_ref.append(new_current_item)
+                yield output
+                if not self._output_complete:
+                    # Finish the output to allow advancing to the next one
+                    # Output must be Iterable if parse_args above did not consume
+                    assert isinstance(output, Iterable), output
+                    # Consume stream via the output type so it can cache
+                    consume(output)
+            except ValidationError as e:
+                raise ToolSchemaParseError(
+                    output_message=self._state.current_message_snapshot,
+                    tool_call_id=tool_call_id,
+                    validation_error=e,
+                ) from e
 
     @property
     def usage_ref(self) -> list[Usage]:
         return self._state.usage_ref
 
+    @property
+    def timing_recorder(self) -> TimingRecorder:
+        return self._timing_recorder
+
 
 class AsyncOutputStream(Generic[ItemT, OutputT]):
     """Async version of `OutputStream`."""
@@ -197,14 +293,23 @@ class AsyncOutputStream(Generic[ItemT, OutputT]):
         function_schemas: Iterable[AsyncFunctionSchema[OutputT]],
         parser: StreamParser[ItemT],
         state: StreamState[ItemT],
+        timing_recorder: TimingRecorder | None = None,
     ):
         self._stream = stream
         self._function_schemas = function_schemas
         self._parser = parser
         self._state = state
-
+        self._timing_recorder = timing_recorder or TimingRecorder()
+        recorder_factory = _stream_recorder_factory_context.get()
+        self._recorder = recorder_factory(parser) if recorder_factory else None
+        # Capture the cache mode now as outputs are created lazily outside the context
+        self._cache = get_stream_cache()
+
+        self._stream_iterator = aiter(stream)
+        self._tool_call_chunks: deque[FunctionCallChunk] = deque()
+        self._output_complete: bool = False
+        self._closed: bool = False
         self._iterator = self.__stream__()
-        self._exhausted: bool = False
 
     async def __anext__(self) -> AsyncStreamedStr | OutputT:
         return await self._iterator.__anext__()
@@ -213,98 +318,140 @@ class AsyncOutputStream(Generic[ItemT, OutputT]):
         async for item in self._iterator:
             yield item
 
-    async def _streamed_str(
-        self, stream: AsyncIterator[ItemT], current_item_ref: list[ItemT]
-    ) -> AsyncIterator[str]:
-        async for item in stream:
+    async def aclose(self) -> None:
+        """Async version of `OutputStream.close`."""
+        if self._closed:
+            return
+        self._closed = True
+        # Drop pending tool calls so that no further outputs are produced
+        self._tool_call_chunks.clear()
+        await aclose_iterable(self._stream)
+        self._finish(ended=False)
+
+    def _finish(self, *, ended: bool) -> None:
+        self._timing_recorder.finish()
+        if self._recorder is not None:
+            self._recorder.finish(ended=ended)
+            self._recorder = None
+
+    async def _next_item(self) -> ItemT | None:
+        if self._closed:
+            return None
+        wait_start = perf_counter()
+        try:
+            item = await anext(self._stream_iterator, None)
+        except asyncio.CancelledError:
+            # Release the connection now rather than when garbage collected
+            await self.aclose()
+            raise
+        if item is None:
+            self._finish(ended=True)
+            return None
+        self._timing_recorder.item_received(wait_start)
+        if self._recorder is not None:
+            self._recorder.record(item)
+        update_start = perf_counter()
+        self._state.update(item)
+        self._timing_recorder.add_parse(perf_counter() - update_start)
+        return item
+
+    async def _next_tool_call_chunk(self) -> FunctionCallChunk | None:
+        while not self._tool_call_chunks:
+            item = await self._next_item()
+            if item is None:
+                return None
+            self._tool_call_chunks.extend(self._parser.iter_tool_calls(item))
+            if self._tool_call_chunks:
+                self._timing_recorder.tool_call_received()
+        return self._tool_call_chunks.popleft()
+
+    async def _streamed_str(self, item: ItemT | None) -> AsyncIterator[str]:
+        while item is not None:
             if content := self._parser.get_content(item):
                 yield content
             if self._parser.is_tool_call(item):
                 # TODO: Check if output types allow for early return
-                assert not current_item_ref
-                current_item_ref.append(item)
-                return
-        self._exhausted = True
-
-    async def _tool_call(
-        self,
-        stream: AsyncIterator[FunctionCallChunk],
-        current_tool_call_ref: list[FunctionCallChunk],
-        current_tool_call_id: str,
-    ) -> AsyncIterator[str]:
-        async for item in stream:
-            if item.id and item.id != current_tool_call_id:
+                self._tool_call_chunks.extend(self._parser.iter_tool_calls(item))
+                self._timing_recorder.tool_call_received()
+                break
+            item = await self._next_item()
+        self._output_complete = True
+
+    async def _tool_call(self, tool_call_id: str) -> AsyncIterator[str]:
+        while (chunk := await self._next_tool_call_chunk()) is not None:
+            if chunk.id and chunk.id != tool_call_id:
                 # TODO: Check if output types allow for early return
-                assert not current_tool_call_ref
-                current_tool_call_ref.append(item)
-                return
-            if item.args:
-                yield item.args
-        self._exhausted = True
+                self._tool_call_chunks.appendleft(chunk)
+                break
+            if chunk.args:
+                yield chunk.args
+        self._output_complete = True
 
     async def __stream__(self) -> AsyncIterator[AsyncStreamedStr | OutputT]:
-        stream = aapply(self._state.update, self._stream)
-        current_item_ref = [await anext(stream)]
-        while current_item_ref:
-            current_item = current_item_ref.pop()
-            if self._parser.is_content(current_item):
-                stream = achain(async_iter([current_item]), stream)
-                streamed_str = AsyncStreamedStr(
-                    self._streamed_str(stream, current_item_ref)
+        item = await self._next_item()
+        while item is not None and not (
+            self._parser.is_content(item) or self._parser.is_tool_call(item)
+        ):
+            item = await self._next_item()
+        if item is None:
+            return
+
+        if self._parser.is_content(item):
+            self._timing_recorder.content_received()
+            self._output_complete = False
+            # Closing the output closes the stream, even if it was never iterated
+            streamed_str = AsyncStreamedStr(
+                AsyncClosingIterator(self._streamed_str(item), self.aclose),
+                cache=self._cache,
+            )
+            yield streamed_str
+            if not self._output_complete:
+                # Finish the output to allow advancing to the next one
+                # Consume stream via AsyncStreamedStr so it can cache
+                await aconsume(streamed_str)
+        else:
+            self._timing_recorder.tool_call_received()
+            self._tool_call_chunks.extend(self._parser.iter_tool_calls(item))
+
+        while (tool_call_chunk := await self._next_tool_call_chunk()) is not None:
+            tool_call_id = tool_call_chunk.id
+            assert tool_call_id is not None
+            assert tool_call_chunk.name is not None
+            function_schema = select_function_schema(
+                self._function_schemas, tool_call_chunk.name
+            )
+            if function_schema is None:
+                raise UnknownToolError(
+                    output_message=self._state.current_message_snapshot,
+                    tool_call_id=tool_call_id,
+                    tool_name=tool_call_chunk.name,
                 )
-                yield streamed_str
-                if not current_item_ref and not self._exhausted:
-                    # Finish the group to allow advancing to the next one
-                    # Consume stream via AsyncStreamedStr so it can cache
-                    await aconsume(streamed_str)
-            elif self._parser.is_tool_call(current_item):
-                tool_calls_stream: AsyncIterator[FunctionCallChunk] = (
-                    tool_call_chunk
-                    async for item in achain(async_iter([current_item]), stream)
-                    for tool_call_chunk in self._parser.iter_tool_calls(item)
-                )
-                tool_call_ref = [await anext(tool_calls_stream)]
-                while tool_call_ref:
-                    current_tool_call_chunk = tool_call_ref.pop()
-                    current_tool_call_id = current_tool_call_chunk.id
-                    assert current_tool_call_id is not None
-                    assert current_tool_call_chunk.name is not None
-                    function_schema = select_function_schema(
-                        self._function_schemas, current_tool_call_chunk.name
+            # Return the chunk so that its args are included in the tool call
+            self._tool_call_chunks.appendleft(tool_call_chunk)
+            self._output_complete = False
+            try:
+                with self._timing_recorder.parsing():
+                    output = await function_schema.aparse_args(
+                        AsyncClosingIterator(self._tool_call(tool_call_id), self.aclose)
                     )
-                    if function_schema is None:
-                        assert current_tool_call_id is not None
-                        raise UnknownToolError(
-                            output_message=self._state.current_message_snapshot,
-                            tool_call_id=current_tool_call_id,
-                            tool_name=current_tool_call_chunk.name,
-                        )
-                    try:
-                        tool_calls_stream = achain(
-                            async_iter([current_tool_call_chunk]), tool_calls_stream
-                        )
-                        output = await function_schema.aparse_args(
-                            self._tool_call(
-                                tool_calls_stream, tool_call_ref, current_tool_call_id
-                            )
-                        )
-                        yield output
-                        if not tool_call_ref and not self._exhausted:
-                            # Finish the group to allow advancing to the next one
-                            # Output must be AsyncIterable if aparse_args above did not consume
-                            assert isinstance(output, AsyncIterable), output
-                            # Consume stream via the output type so it can cache
-                            await aconsume(output)
-                    except ValidationError as e:
-                        assert current_tool_call_id is not None
-                        raise ToolSchemaParseError(
-                            output_message=self._state.current_message_snapshot,
-                            tool_call_id=current_tool_call_id,
-                            validation_error=e,
-                        ) from e
-            elif new_current_item := await anext(stream, None):
-                current_item_ref.append(new_current_item)
+                yield output
+                if not self._output_complete:
+                    # Finish the output to allow advancing to the next one
+                    # Output must be AsyncIterable if aparse_args above did not consume
+                    assert isinstance(output, AsyncIterable), output
+                    # Consume stream via the output type so it can cache
+                    await aconsume(output)
+            except ValidationError as e:
+                raise ToolSchemaParseError(
+                    output_message=self._state.current_message_snapshot,
+                    tool_call_id=tool_call_id,
+                    validation_error=e,
+                ) from e
 
     @property
     def usage_ref(self) -> list[Usage]:
         return self._state.usage_ref
+
+    @property
+    def timing_recorder(self) -> TimingRecorder:
+        return self._timing_recorder
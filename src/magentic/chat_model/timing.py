@@ -0,0 +1,165 @@
+from bisect import bisect_left
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from time import perf_counter
+from typing import NamedTuple
+
+# Upper bounds in seconds of the buckets of the inter-chunk gap histogram
+INTER_CHUNK_GAP_BUCKETS: tuple[float, ...] = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0)
+
+
+class Timing(NamedTuple):
+    """Timing statistics for the LLM request, in seconds.
+
+    The `time_to_*` durations are measured from when the request was sent. A duration
+    is `None` if the event has not happened (yet). The timing is updated as the
+    response is streamed, so `total` is `None` until the response has ended.
+
+    Attributes
+    ----------
+    request_build
+        Time taken to build the request before sending it.
+    time_to_first_byte
+        Time until the first chunk of the response was received.
+    time_to_first_content
+        Time until the first chunk of text content was received.
+    time_to_first_tool_call
+        Time until the first chunk of a tool call was received.
+    inter_chunk_gaps
+        Histogram of the time between consecutive chunks. Each count is the number of
+        gaps up to the corresponding bound in `INTER_CHUNK_GAP_BUCKETS`, and the last
+        count is the number of gaps longer than all of these.
+    parse
+        Time spent updating the stream state and parsing and validating tool calls,
+        excluding time waiting for the LLM. Outputs that are parsed while being
+        iterated, such as `StreamedModel`, are not included.
+    total
+        Time from the start of the request until the response ended.
+    """
+
+    request_build: float
+    time_to_first_byte: float | None
+    time_to_first_content: float | None
+    time_to_first_tool_call: float | None
+    inter_chunk_gaps: tuple[int, ...]
+    parse: float
+    total: float | None
+
+
+MetricsCallback = Callable[[Timing], None]
+
+_metrics_callback_context: ContextVar[MetricsCallback | None] = ContextVar(
+    "metrics_callback", default=None
+)
+
+
+@contextmanager
+def use_metrics_callback(callback: MetricsCallback | None) -> Iterator[None]:
+    """Call `callback` with the `Timing` of each LLM response requested in this context.
+
+    The callback is called once the response has ended, which for streamed outputs
+    is when they have been fully iterated or closed.
+
+    Examples
+    --------
+    >>> with use_metrics_callback(lambda timing: print(timing.time_to_first_byte)):
+    >>>     tell_joke("cats")
+    0.4213
+    """
+    token = _metrics_callback_context.set(callback)
+    try:
+        yield
+    finally:
+        _metrics_callback_context.reset(token)
+
+
+class TimingRecorder:
+    """Records the timing of an LLM request as it is built, sent and streamed."""
+
+    def __init__(self) -> None:
+        self._start = perf_counter()
+        self._request_sent: float | None = None
+        self._first_item: float | None = None
+        self._last_item: float | None = None
+        self._first_content: float | None = None
+        self._first_tool_call: float | None = None
+        self._end: float | None = None
+        self._gap_counts = [0] * (len(INTER_CHUNK_GAP_BUCKETS) + 1)
+        self._parse = 0.0
+        self._wait = 0.0
+        # Capture the callback now as the response may end outside the context
+        self._callback = _metrics_callback_context.get()
+
+    def request_sent(self) -> None:
+        """Mark that the request has been built and is being sent."""
+        self._request_sent = perf_counter()
+
+    def item_received(self, wait_start: float) -> None:
+        """Record a chunk of the response, which was waited for since `wait_start`."""
+        now = perf_counter()
+        self._wait += now - wait_start
+        if self._last_item is None:
+            self._first_item = now
+        else:
+            self._gap_counts[
+                bisect_left(INTER_CHUNK_GAP_BUCKETS, now - self._last_item)
+            ] += 1
+        self._last_item = now
+
+    def content_received(self) -> None:
+        """Mark that the latest chunk contains text content."""
+        if self._first_content is None:
+            self._first_content = self._last_item
+
+    def tool_call_received(self) -> None:
+        """Mark that the latest chunk contains a tool call."""
+        if self._first_tool_call is None:
+            self._first_tool_call = self._last_item
+
+    def add_parse(self, duration: float) -> None:
+        """Add time spent processing the response."""
+        self._parse += duration
+
+    @contextmanager
+    def parsing(self) -> Iterator[None]:
+        """Add the time spent in this block, excluding time already accounted for.
+
+        Time waiting for chunks and processing them is recorded as they are received,
+        so this is excluded to avoid counting it twice.
+        """
+        start = perf_counter()
+        wait_start = self._wait
+        parse_start = self._parse
+        try:
+            yield
+        finally:
+            elapsed = perf_counter() - start
+            self._parse += (
+                elapsed - (self._wait - wait_start) - (self._parse - parse_start)
+            )
+
+    def finish(self) -> None:
+        """Mark the end of the response and report the timing to the callback."""
+        if self._end is not None:
+            return
+        self._end = perf_counter()
+        if self._callback is not None:
+            self._callback(self.timing)
+
+    @property
+    def timing(self) -> Timing:
+        request_sent = self._start if self._request_sent is None else self._request_sent
+
+        def since_request_sent(time: float | None) -> float | None:
+            return None if time is None else time - request_sent
+
+        return Timing(
+            request_build=request_sent - self._start,
+            time_to_first_byte=since_request_sent(self._first_item),
+            time_to_first_content=since_request_sent(self._first_content),
+            time_to_first_tool_call=since_request_sent(self._first_tool_call),
+            inter_chunk_gaps=tuple(self._gap_counts),
+            parse=self._parse,
+            total=None if self._end is None else self._end - self._start,
+        )
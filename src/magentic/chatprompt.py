@@ -8,6 +8,7 @@ from magentic.chat_model.base import ChatModel
 from magentic.chat_model.message import Message
 from magentic.chat_model.retry_chat_model import RetryChatModel
 from magentic.logger import logfire
+from magentic.streaming import StreamCache, use_stream_cache
 from magentic.typing import split_union_type
 
 P = ParamSpec("P")
@@ -40,6 +41,7 @@ class BaseChatPromptFunction(Generic[P, R]):
         stop: list[str] | None = None,
         max_retries: int = 0,
         model: ChatModel | None = None,
+        stream_cache: StreamCache | None = None,
     ):
         self._name = name
         self._signature = inspect.Signature(
@@ -51,6 +53,7 @@ class BaseChatPromptFunction(Generic[P, R]):
         self._stop = stop
         self._max_retries = max_retries
         self._model = model
+        self._stream_cache = stream_cache
 
         self._return_types = list(split_union_type(return_type))
 
@@ -86,9 +89,12 @@ class ChatPromptFunction(BaseChatPromptFunction[P, R], Generic[P, R]):
 
     def __call__(self, *args: P.args, **kwargs: P.kwargs) -> R:
         """Query the LLM with the formatted chat prompt template."""
-        with logfire.span(
-            f"Calling chatprompt-function {self._name}",
-            **self._signature.bind(*args, **kwargs).arguments,
+        with (
+            logfire.span(
+                f"Calling chatprompt-function {self._name}",
+                **self._signature.bind(*args, **kwargs).arguments,
+            ),
+            use_stream_cache(self._stream_cache),
         ):
             message = self.model.complete(
                 messages=self.format(*args, **kwargs),
@@ -104,9 +110,12 @@ class AsyncChatPromptFunction(BaseChatPromptFunction[P, R], Generic[P, R]):
 
     async def __call__(self, *args: P.args, **kwargs: P.kwargs) -> R:
         """Asynchronously query the LLM with the formatted chat prompt template."""
-        with logfire.span(
-            f"Calling async chatprompt-function {self._name}",
-            **self._signature.bind(*args, **kwargs).arguments,
+        with (
+            logfire.span(
+                f"Calling async chatprompt-function {self._name}",
+                **self._signature.bind(*args, **kwargs).arguments,
+            ),
+            use_stream_cache(self._stream_cache),
         ):
             message = await self.model.acomplete(
                 messages=self.format(*args, **kwargs),
@@ -139,6 +148,7 @@ def chatprompt(
     stop: list[str] | None = None,
     max_retries: int = 0,
     model: ChatModel | None = None,
+    stream_cache: StreamCache | None = None,
 ) -> ChatPromptDecorator:
     """Convert a function into an LLM chat prompt template.
 
@@ -189,6 +199,7 @@ def chatprompt(
                 stop=stop,
                 max_retries=max_retries,
                 model=model,
+                stream_cache=stream_cache,
             )
             return cast(
                 AsyncChatPromptFunction[P, R],
@@ -204,6 +215,7 @@ def chatprompt(
             stop=stop,
             max_retries=max_retries,
             model=model,
+            stream_cache=stream_cache,
         )
         return cast(ChatPromptFunction[P, R], update_wrapper(prompt_function, func))
 
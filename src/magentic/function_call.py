@@ -1,5 +1,7 @@
 import asyncio
+import contextvars
 import inspect
+import threading
 from collections.abc import (
     AsyncIterable,
     AsyncIterator,
@@ -8,14 +10,327 @@ from collections.abc import (
     Iterable,
     Iterator,
 )
-from typing import Any, Generic, ParamSpec, TypeVar, cast
+from concurrent.futures import (
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from contextlib import AbstractContextManager, nullcontext
+from functools import partial
+from types import TracebackType
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Generic,
+    Literal,
+    ParamSpec,
+    TypeVar,
+    cast,
+    overload,
+)
 from uuid import uuid4
+from weakref import WeakKeyDictionary
+
+from typing_extensions import Self
 
 from magentic.logger import logfire
 from magentic.streaming import CachedAsyncIterable, CachedIterable
 
+if TYPE_CHECKING:
+    from magentic.function_result_cache import FunctionResultCache
+
 T = TypeVar("T")
 P = ParamSpec("P")
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+class FunctionCallTimeoutError(TimeoutError):
+    """Raised when a function call exceeds the timeout set by `execution_policy`."""
+
+
+_executors: dict[str, Executor] = {}
+_executors_lock = threading.Lock()
+
+
+def _get_shared_executor(executor: Literal["thread", "process"]) -> Executor:
+    """Get the thread or process pool shared by all functions, creating it if needed."""
+    with _executors_lock:
+        if executor not in _executors:
+            _executors[executor] = (
+                ThreadPoolExecutor(thread_name_prefix="magentic")
+                if executor == "thread"
+                else ProcessPoolExecutor()
+            )
+        return _executors[executor]
+
+
+def _is_async_callable(function: Callable[..., Any]) -> bool:
+    # Also check __call__ to detect instances with an async __call__ method
+    return inspect.iscoroutinefunction(function) or inspect.iscoroutinefunction(
+        getattr(function, "__call__", None)  # noqa: B004
+    )
+
+
+async def _acall(function: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    result = function(*args, **kwargs)
+    if inspect.isawaitable(result):
+        return await result
+    return result
+
+
+class ExecutionPolicy:
+    """How a function is executed when it is called by the LLM.
+
+    Set this on a function using the `execution_policy` decorator.
+    """
+
+    def __init__(
+        self,
+        *,
+        run_in_thread: bool = True,
+        executor: Literal["thread", "process"] | Executor | None = None,
+        max_concurrency: int | None = None,
+        timeout: float | None = None,
+        cache: "FunctionResultCache | None" = None,
+    ):
+        if isinstance(executor, str) and executor not in ("thread", "process"):
+            msg = (
+                f"executor must be 'thread', 'process' or an Executor, got {executor!r}"
+            )
+            raise ValueError(msg)
+        if max_concurrency is not None and max_concurrency < 1:
+            msg = f"max_concurrency must be at least 1, got {max_concurrency}"
+            raise ValueError(msg)
+        if timeout is not None and timeout <= 0:
+            msg = f"timeout must be greater than 0, got {timeout}"
+            raise ValueError(msg)
+
+        self.run_in_thread = run_in_thread
+        self.executor = executor
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.cache = cache
+
+        # Calls from the sync API share a semaphore, calls from the async API share one
+        # per event loop because asyncio semaphores cannot be used across event loops
+        self._semaphore = (
+            threading.BoundedSemaphore(max_concurrency) if max_concurrency else None
+        )
+        self._async_semaphores: WeakKeyDictionary[
+            asyncio.AbstractEventLoop, asyncio.Semaphore
+        ] = WeakKeyDictionary()
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, ExecutionPolicy):
+            return NotImplemented
+        return (
+            self.run_in_thread == other.run_in_thread
+            and self.executor == other.executor
+            and self.max_concurrency == other.max_concurrency
+            and self.timeout == other.timeout
+            and self.cache is other.cache
+        )
+
+    def __repr__(self) -> str:
+        return (
+            f"{type(self).__name__}(run_in_thread={self.run_in_thread!r},"
+            f" executor={self.executor!r}, max_concurrency={self.max_concurrency!r},"
+            f" timeout={self.timeout!r}, cache={self.cache!r})"
+        )
+
+    def _get_executor(self) -> Executor:
+        if isinstance(self.executor, Executor):
+            return self.executor
+        return _get_shared_executor(self.executor or "thread")
+
+    def _prepare_call(
+        self, function: Callable[..., T], args: tuple[Any, ...], kwargs: dict[str, Any]
+    ) -> Callable[[], T]:
+        """Bind the arguments to the function so it can be submitted to the executor."""
+        if self.executor == "process" or isinstance(self.executor, ProcessPoolExecutor):
+            # Context variables cannot be sent to another process
+            return partial(function, *args, **kwargs)
+        # Copy the context so that context variables are available in the thread
+        return partial(contextvars.copy_context().run, function, *args, **kwargs)
+
+    def _timeout_error(self, function: Callable[..., Any]) -> FunctionCallTimeoutError:
+        name = getattr(function, "__name__", repr(function))
+        msg = f"Function {name} timed out after {self.timeout} seconds"
+        return FunctionCallTimeoutError(msg)
+
+    def execute(self, function: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Call the function with the arguments according to this policy.
+
+        The function is called directly unless an executor or timeout is set. A
+        function that exceeds the timeout raises `FunctionCallTimeoutError`, but cannot
+        be stopped so continues running in its thread or process.
+        """
+        if self.executor is None and self.timeout is None:
+            with self._semaphore or nullcontext():
+                return function(*args, **kwargs)
+
+        semaphore = self._semaphore
+        if semaphore is not None:
+            semaphore.acquire()
+        try:
+            future = self._get_executor().submit(
+                self._prepare_call(function, args, kwargs)
+            )
+        except BaseException:
+            if semaphore is not None:
+                semaphore.release()
+            raise
+        if semaphore is not None:
+            # Hold the semaphore until the function returns, even after a timeout
+            future.add_done_callback(lambda _: semaphore.release())
+        done, _ = wait([future], timeout=self.timeout)
+        if not done:
+            future.cancel()
+            raise self._timeout_error(function)
+        return future.result()
+
+    async def aexecute(
+        self, function: Callable[..., Awaitable[T] | T], *args: Any, **kwargs: Any
+    ) -> T:
+        """Async version of `execute`.
+
+        Sync functions are run in the default thread pool of the event loop, or in the
+        executor if set, unless `run_in_thread` is `False`. Async functions are awaited
+        directly, and cancelled if they exceed the timeout.
+        """
+        loop = asyncio.get_running_loop()
+        semaphore = None
+        if self.max_concurrency is not None:
+            semaphore = self._async_semaphores.setdefault(
+                loop, asyncio.Semaphore(self.max_concurrency)
+            )
+            await semaphore.acquire()
+
+        future: asyncio.Future[Any]
+        run_on_loop = self.executor is None and (
+            not self.run_in_thread or _is_async_callable(function)
+        )
+        try:
+            if run_on_loop:
+                future = asyncio.ensure_future(_acall(function, *args, **kwargs))
+            else:
+                future = loop.run_in_executor(
+                    self.executor and self._get_executor(),
+                    self._prepare_call(function, args, kwargs),
+                )
+        except BaseException:
+            if semaphore is not None:
+                semaphore.release()
+            raise
+
+        def on_done(future: asyncio.Future[Any]) -> None:
+            if semaphore is not None:
+                semaphore.release()
+            if not future.cancelled():
+                # Retrieve the exception to avoid a warning if it is never awaited
+                future.exception()
+
+        # Hold the semaphore until the function returns, even after a timeout
+        future.add_done_callback(on_done)
+        try:
+            done, _ = await asyncio.wait({future}, timeout=self.timeout)
+        except asyncio.CancelledError:
+            if run_on_loop:
+                future.cancel()
+            raise
+        if not done:
+            # Functions running in a thread or process cannot be stopped
+            if run_on_loop:
+                future.cancel()
+            raise self._timeout_error(function)
+        result: Awaitable[T] | T = future.result()
+        if inspect.isawaitable(result):
+            return await result
+        return result
+
+
+_EXECUTION_POLICY_ATTR = "__magentic_execution_policy__"
+_DEFAULT_EXECUTION_POLICY = ExecutionPolicy()
+
+
+def execution_policy(
+    *,
+    run_in_thread: bool = True,
+    executor: Literal["thread", "process"] | Executor | None = None,
+    max_concurrency: int | None = None,
+    timeout: float | None = None,
+    cache: "FunctionResultCache | None" = None,
+) -> Callable[[F], F]:
+    """Set how a function is executed when it is called by the LLM.
+
+    Parameters
+    ----------
+    run_in_thread : bool
+        When using the async API, sync functions are run in the default thread pool
+        of the event loop so that they do not block it. Set to `False` to instead call
+        the function directly on the event loop, for example if it returns quickly or
+        is not thread-safe.
+    executor : "thread", "process", Executor or None
+        Run the sync function in a thread pool or process pool shared by all
+        functions, or in the given `concurrent.futures.Executor`. Use "process" for
+        CPU-bound functions; the function, its arguments and result must be picklable.
+    max_concurrency : int or None
+        The maximum number of calls to the function executing at the same time.
+        Further calls wait until one finishes.
+    timeout : float or None
+        The number of seconds after which a call raises `FunctionCallTimeoutError`.
+        With `prompt_chain` this error is sent to the LLM as the result of the
+        function call. Sync functions run in a thread if no executor is set, and
+        continue running in the background after timing out.
+    cache : FunctionResultCache or None
+        Return the cached result for a function call with the same arguments instead
+        of calling the function again. Only use this for functions without side
+        effects. The cache can be shared by several functions.
+    """
+    policy = ExecutionPolicy(
+        run_in_thread=run_in_thread,
+        executor=executor,
+        max_concurrency=max_concurrency,
+        timeout=timeout,
+        cache=cache,
+    )
+
+    def decorator(function: F) -> F:
+        if executor is not None and _is_async_callable(function):
+            msg = "executor can only be set for sync functions"
+            raise ValueError(msg)
+        setattr(function, _EXECUTION_POLICY_ATTR, policy)
+        return function
+
+    return decorator
+
+
+def get_execution_policy(function: Callable[..., Any]) -> ExecutionPolicy:
+    """Get the `ExecutionPolicy` set on a function by `execution_policy`."""
+    return getattr(function, _EXECUTION_POLICY_ATTR, _DEFAULT_EXECUTION_POLICY)
+
+
+async def _aexecute(function_call: "FunctionCall[Awaitable[T] | T]") -> T:
+    """Execute the function call without blocking the event loop.
+
+    Sync functions are run in the default thread pool of the event loop unless this
+    is disabled using `execution_policy`.
+    """
+    function = function_call.function
+    policy = get_execution_policy(function)
+    with function_call._span():
+        if policy.cache is None:
+            return await policy.aexecute(
+                function, *function_call._args, **function_call._kwargs
+            )
+        return await policy.cache.aget_or_execute(
+            function_call,
+            partial(
+                policy.aexecute, function, *function_call._args, **function_call._kwargs
+            ),
+        )
 
 
 def _create_unique_id() -> str:
@@ -40,10 +355,19 @@ class FunctionCall(Generic[T]):
         self._unique_id = _create_unique_id()
 
     def __call__(self) -> T:
-        with logfire.span(
+        policy = get_execution_policy(self._function)
+        with self._span():
+            if policy.cache is None:
+                return policy.execute(self._function, *self._args, **self._kwargs)
+            return policy.cache.get_or_execute(
+                self,
+                partial(policy.execute, self._function, *self._args, **self._kwargs),
+            )
+
+    def _span(self) -> AbstractContextManager[Any]:
+        return logfire.span(
             f"Executing function call {self._function.__name__}", **self.arguments
-        ):
-            return self._function(*self._args, **self._kwargs)
+        )
 
     def __eq__(self, other: object) -> bool:
         if not isinstance(other, type(self)):
@@ -81,13 +405,98 @@ class ParallelFunctionCall(Generic[T]):
     def __init__(self, function_calls: Iterable[FunctionCall[T]]):
         self._function_calls = CachedIterable(function_calls)
 
-    def __call__(self) -> tuple[T, ...]:
+    @overload
+    def __call__(
+        self,
+        *,
+        executor: Executor | None = None,
+        max_workers: int | None = None,
+        return_exceptions: Literal[False] = False,
+    ) -> tuple[T, ...]: ...
+
+    @overload
+    def __call__(
+        self,
+        *,
+        executor: Executor | None = None,
+        max_workers: int | None = None,
+        return_exceptions: bool,
+    ) -> tuple[T | Exception, ...]: ...
+
+    def __call__(
+        self,
+        *,
+        executor: Executor | None = None,
+        max_workers: int | None = None,
+        return_exceptions: bool = False,
+    ) -> tuple[T | Exception, ...]:
+        """Execute the function calls, returning the results in order.
+
+        By default the function calls are executed one after another. To execute them
+        concurrently, provide an `executor` or set `max_workers` to use a thread pool
+        with that many threads. Each function call is submitted as soon as it has been
+        received from the LLM.
+
+        If `return_exceptions` is `True`, an exception raised by a function call is
+        returned in place of its result. Otherwise the first exception is raised, once
+        all function calls submitted to the executor have finished.
+        """
+        if executor is not None and max_workers is not None:
+            msg = "Only one of executor and max_workers can be set"
+            raise ValueError(msg)
+
         with logfire.span("Executing parallel function call"):
-            return tuple(function_call() for function_call in self._function_calls)
+            if executor is None and max_workers is None:
+                results: list[T | Exception] = []
+                for function_call in self._function_calls:
+                    try:
+                        results.append(function_call())
+                    except Exception as e:  # noqa: PERF203
+                        if not return_exceptions:
+                            raise
+                        results.append(e)
+                return tuple(results)
+
+            with (
+                nullcontext(executor)
+                if executor is not None
+                else ThreadPoolExecutor(max_workers=max_workers)
+            ) as executor_:
+                # Copy the context for each call so that context variables are available
+                futures: list[Future[T]] = [
+                    executor_.submit(contextvars.copy_context().run, function_call)
+                    for function_call in self._function_calls
+                ]
+                # Wait for all calls before raising so that none are left running
+                exceptions = [future.exception() for future in futures]
+            for exception in exceptions:
+                if exception is not None and (
+                    not return_exceptions or not isinstance(exception, Exception)
+                ):
+                    raise exception
+            return tuple(
+                cast(Exception, exception) if exception is not None else future.result()
+                for future, exception in zip(futures, exceptions, strict=True)
+            )
 
     def __iter__(self) -> Iterator[FunctionCall[T]]:
         yield from self._function_calls
 
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Stop receiving function calls and close the underlying stream."""
+        self._function_calls.close()
+
 
 # TODO: Separate type vars for awaitable and non-awaitable results to fix typing?
 class AsyncParallelFunctionCall(Generic[T]):
@@ -96,29 +505,87 @@ class AsyncParallelFunctionCall(Generic[T]):
     def __init__(self, function_calls: AsyncIterable[FunctionCall[Awaitable[T] | T]]):
         self._function_calls = CachedAsyncIterable(function_calls)
 
-    async def __call__(self) -> tuple[T, ...]:
+    @overload
+    async def __call__(
+        self,
+        *,
+        max_concurrency: int | None = None,
+        return_exceptions: Literal[False] = False,
+    ) -> tuple[T, ...]: ...
+
+    @overload
+    async def __call__(
+        self,
+        *,
+        max_concurrency: int | None = None,
+        return_exceptions: bool,
+    ) -> tuple[T | Exception, ...]: ...
+
+    async def __call__(
+        self,
+        *,
+        max_concurrency: int | None = None,
+        return_exceptions: bool = False,
+    ) -> tuple[T | Exception, ...]:
+        """Execute the function calls concurrently, returning the results in order.
+
+        Each function call is started as a task as soon as it has been received from
+        the LLM, so that executing it overlaps with the LLM generating the remaining
+        function calls. Sync functions are run in the default thread pool of the event
+        loop so that they do not block it, unless disabled using `execution_policy`.
+        Set `max_concurrency` to limit the number of function calls executing at the
+        same time.
+
+        If `return_exceptions` is `True`, an exception raised by a function call is
+        returned in place of its result. Otherwise the first exception is raised, once
+        all function calls have finished. If receiving the function calls fails, the
+        function calls that have already started are cancelled.
+        """
+        semaphore = asyncio.Semaphore(max_concurrency) if max_concurrency else None
+
+        async def exec_function_call(
+            function_call: FunctionCall[Awaitable[T] | T],
+        ) -> T:
+            async with semaphore or nullcontext():
+                return await _aexecute(function_call)
+
         with logfire.span("Executing async parallel function call"):
-            tasks_and_results: list[asyncio.Task[T] | T] = []
-            async for function_call in self._function_calls:
-                result = function_call()
-                if inspect.iscoroutine(result):
-                    tasks_and_results.append(asyncio.create_task(result))
-                else:
-                    result = cast(T, result)
-                    tasks_and_results.append(result)
-
-            tasks = [
-                task for task in tasks_and_results if isinstance(task, asyncio.Task)
-            ]
-            await asyncio.gather(*tasks)
-            results = [
-                task_or_result.result()
-                if isinstance(task_or_result, asyncio.Task)
-                else task_or_result
-                for task_or_result in tasks_and_results
-            ]
-            return tuple(results)
+            tasks: list[asyncio.Task[T]] = []
+            try:
+                # Append to the list as received so started tasks can be cancelled
+                async for function_call in self._function_calls:
+                    tasks.append(  # noqa: PERF401
+                        asyncio.create_task(exec_function_call(function_call))
+                    )
+                # Wait for all calls before raising so that none are left running
+                results = await asyncio.gather(*tasks, return_exceptions=True)
+            except BaseException:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                raise
+            for result in results:
+                if isinstance(result, BaseException) and (
+                    not return_exceptions or not isinstance(result, Exception)
+                ):
+                    raise result
+            return tuple(cast(list[T | Exception], results))
 
     async def __aiter__(self) -> AsyncIterator[FunctionCall[Awaitable[T] | T]]:
         async for function_call in self._function_calls:
             yield function_call
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Stop receiving function calls and close the underlying stream."""
+        await self._function_calls.aclose()
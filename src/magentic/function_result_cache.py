@@ -0,0 +1,206 @@
+import inspect
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+from typing import Any, TypeVar
+
+from magentic.chat_model.function_schema import get_function_call_function_schema
+from magentic.function_call import FunctionCall
+
+T = TypeVar("T")
+
+# Returned by `FunctionResultCache.get` when there is no result for the key
+MISSING: Any = object()
+
+
+class FunctionResultCache:
+    """An in-memory cache of the results of function calls.
+
+    Results are keyed on the function and the JSON arguments of the function call, as
+    serialized for the LLM, so calls with the same arguments share a result. Set this
+    on a function using `execution_policy(cache=...)` to return the cached result
+    instead of calling the function again. Exceptions are not cached.
+
+    Parameters
+    ----------
+    maxsize : int or None
+        The maximum number of results to keep. The least recently used result is
+        evicted when this is exceeded. If `None`, the number of results is unlimited.
+    ttl : float or None
+        The number of seconds after which a result expires. If `None`, results do not
+        expire.
+    """
+
+    def __init__(self, *, maxsize: int | None = 1024, ttl: float | None = None):
+        if maxsize is not None and maxsize < 1:
+            msg = f"maxsize must be at least 1, got {maxsize}"
+            raise ValueError(msg)
+        if ttl is not None and ttl <= 0:
+            msg = f"ttl must be greater than 0, got {ttl}"
+            raise ValueError(msg)
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # Maps key to (time stored, result), in order of least recently used
+        self._results: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+
+    def key(self, function_call: FunctionCall[Any]) -> str:
+        """Get the cache key for a function call."""
+        function = function_call.function
+        function_schema = get_function_call_function_schema(function)
+        return (
+            f"{function.__module__}.{function.__qualname__}"
+            f":{function_schema.serialize_args(function_call)}"
+        )
+
+    def get(self, key: str) -> Any:
+        """Get the cached result for the key, or `MISSING` if there is none."""
+        result = self._load(key)
+        with self._lock:
+            if result is MISSING:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return result
+
+    def set(self, key: str, result: Any) -> None:
+        """Store the result of the function call with the given key."""
+        self._store(key, result)
+
+    def get_or_execute(
+        self, function_call: FunctionCall[Any], execute: Callable[[], T]
+    ) -> T:
+        """Return the cached result of the function call, or execute and cache it."""
+        key = self.key(function_call)
+        result = self.get(key)
+        if result is MISSING:
+            result = execute()
+            # Awaitables returned by async functions can only be awaited once
+            if not inspect.isawaitable(result):
+                self.set(key, result)
+        return result  # type: ignore[no-any-return]
+
+    async def aget_or_execute(
+        self, function_call: FunctionCall[Any], aexecute: Callable[[], Awaitable[T]]
+    ) -> T:
+        """Async version of `get_or_execute`."""
+        key = self.key(function_call)
+        result = self.get(key)
+        if result is MISSING:
+            result = await aexecute()
+            self.set(key, result)
+        return result  # type: ignore[no-any-return]
+
+    @property
+    def hit_rate(self) -> float:
+        """The fraction of lookups that returned a cached result."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def clear(self) -> None:
+        """Remove all cached results and reset the hit and miss counters."""
+        self._clear()
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._results)
+
+    def _is_expired(self, stored_at: float) -> bool:
+        return self.ttl is not None and time.time() - stored_at > self.ttl
+
+    def _load(self, key: str) -> Any:
+        with self._lock:
+            if key not in self._results:
+                return MISSING
+            stored_at, result = self._results[key]
+            if self._is_expired(stored_at):
+                del self._results[key]
+                return MISSING
+            self._results.move_to_end(key)
+            return result
+
+    def _store(self, key: str, result: Any) -> None:
+        with self._lock:
+            self._results[key] = (time.time(), result)
+            self._results.move_to_end(key)
+            if self.maxsize is not None and len(self._results) > self.maxsize:
+                self._results.popitem(last=False)
+
+    def _clear(self) -> None:
+        with self._lock:
+            self._results.clear()
+
+
+class DiskFunctionResultCache(FunctionResultCache):
+    """A `FunctionResultCache` that stores results in a SQLite database file.
+
+    Results persist across processes, so must be picklable. Only use a database file
+    from a trusted source, because loading a result can execute arbitrary code.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        *,
+        maxsize: int | None = 1024,
+        ttl: float | None = None,
+    ):
+        super().__init__(maxsize=maxsize, ttl=ttl)
+        self.path = Path(path)
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS results"
+                " (key TEXT PRIMARY KEY, stored_at REAL, used_at REAL, result BLOB)"
+            )
+
+    def __len__(self) -> int:
+        with self._lock:
+            (count,) = self._connection.execute(
+                "SELECT COUNT(*) FROM results"
+            ).fetchone()
+        return int(count)
+
+    def _load(self, key: str) -> Any:
+        with self._lock, self._connection:
+            row = self._connection.execute(
+                "SELECT stored_at, result FROM results WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return MISSING
+            stored_at, result = row
+            if self._is_expired(stored_at):
+                self._connection.execute("DELETE FROM results WHERE key = ?", (key,))
+                return MISSING
+            self._connection.execute(
+                "UPDATE results SET used_at = ? WHERE key = ?", (time.time(), key)
+            )
+        return pickle.loads(result)  # noqa: S301
+
+    def _store(self, key: str, result: Any) -> None:
+        data = pickle.dumps(result)
+        now = time.time()
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)",
+                (key, now, now, data),
+            )
+            if self.maxsize is not None:
+                self._connection.execute(
+                    "DELETE FROM results WHERE key NOT IN"
+                    " (SELECT key FROM results ORDER BY used_at DESC LIMIT ?)",
+                    (self.maxsize,),
+                )
+
+    def _clear(self) -> None:
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM results")
@@ -1,14 +1,28 @@
 import inspect
-from collections.abc import Callable, Sequence
+from collections.abc import (
+    AsyncIterable,
+    AsyncIterator,
+    Callable,
+    Iterable,
+    Iterator,
+    Sequence,
+)
+from concurrent.futures import ThreadPoolExecutor
 from functools import wraps
 from typing import Any, ParamSpec, TypeVar, cast
 
-from magentic._chat import Chat
+from magentic._chat import Chat, _exception_to_result
 from magentic.chat_model.base import ChatModel
-from magentic.chat_model.message import Message, UserMessage
+from magentic.chat_model.message import FunctionResultMessage, Message, UserMessage
 from magentic.chatprompt import AsyncChatPromptFunction, ChatPromptFunction
-from magentic.function_call import FunctionCall
+from magentic.function_call import (
+    AsyncParallelFunctionCall,
+    FunctionCall,
+    FunctionCallTimeoutError,
+    ParallelFunctionCall,
+)
 from magentic.logger import logfire
+from magentic.streaming import StreamCache, async_iter, use_stream_cache
 
 P = ParamSpec("P")
 R = TypeVar("R")
@@ -18,11 +32,65 @@ class MaxFunctionCallsError(Exception):
     """Raised when prompt chain reaches the max number of function calls."""
 
 
+def _limit_calls(
+    function_calls: Iterable[FunctionCall[Any]],
+    name: str,
+    num_calls: int,
+    max_calls: int | None,
+) -> Iterator[FunctionCall[Any]]:
+    """Raise `MaxFunctionCallsError` instead of yielding a call beyond `max_calls`."""
+    for function_call in function_calls:
+        num_calls += 1
+        if max_calls is not None and num_calls > max_calls:
+            msg = f"Function {name} reached limit of {max_calls} function calls"
+            raise MaxFunctionCallsError(msg)
+        yield function_call
+
+
+async def _alimit_calls(
+    function_calls: AsyncIterable[FunctionCall[Any]],
+    name: str,
+    num_calls: int,
+    max_calls: int | None,
+) -> AsyncIterator[FunctionCall[Any]]:
+    """Async version of `_limit_calls`."""
+    async for function_call in function_calls:
+        num_calls += 1
+        if max_calls is not None and num_calls > max_calls:
+            msg = f"Function {name} reached limit of {max_calls} function calls"
+            raise MaxFunctionCallsError(msg)
+        yield function_call
+
+
+def _add_function_results(
+    chat: Chat, function_calls: Sequence[FunctionCall[Any]], results: Sequence[Any]
+) -> Chat:
+    """Add the function results to the chat, raising any error other than a timeout.
+
+    A `FunctionCallTimeoutError` is sent to the LLM as the result of the function call
+    so that it can respond to it.
+    """
+    for result in results:
+        if isinstance(result, Exception) and not isinstance(
+            result, FunctionCallTimeoutError
+        ):
+            raise result
+    for function_call, result in zip(function_calls, results, strict=True):
+        chat = chat.add_message(
+            FunctionResultMessage(
+                content=_exception_to_result(result), function_call=function_call
+            )
+        )
+    return chat
+
+
 def prompt_chain(
     template: str | Sequence[Message[Any]],
     functions: list[Callable[..., Any]] | None = None,
     model: ChatModel | None = None,
     max_calls: int | None = None,
+    max_parallel: int | None = None,
+    stream_cache: StreamCache | None = None,
 ) -> Callable[[Callable[P, R]], Callable[P, R]]:
     """Convert a Python function to an LLM query, auto-resolving function calls.
 
@@ -32,10 +100,29 @@ def prompt_chain(
     appended to the list of messages. Then the LLM is queried again and this repeats
     until a final answer is reached.
 
-    Set `max_calls` to limit the number of function calls. If the limit is reached, a
+    When the LLM makes multiple function calls at once, these are executed concurrently
+    and all of the results are returned to the LLM in the next query. Each function
+    call starts executing as soon as it has been received, while the LLM is still
+    generating the rest. Sync functions are run in a thread pool. Set `max_parallel`
+    to limit the number of functions executing at the same time, or to `1` to execute
+    them one after another.
+
+    Use the `execution_policy` decorator on a function to set a timeout, concurrency
+    limit or executor for it. A function call that times out is sent to the LLM as an
+    error result.
+
+    Set `max_calls` to limit the number of function calls. Each of multiple function
+    calls made at once counts towards this. If the limit is reached, a
     `MaxFunctionCallsError` will be raised.
+
+    Set `stream_cache` to select how streamed outputs retain the items received from
+    the LLM. See `StreamCache`.
     """
 
+    if max_parallel is not None and max_parallel < 1:
+        msg = f"max_parallel must be at least 1, got {max_parallel}"
+        raise ValueError(msg)
+
     messages = (
         [UserMessage(content=template)] if isinstance(template, str) else template
     )
@@ -47,18 +134,22 @@ def prompt_chain(
             async_prompt_function = AsyncChatPromptFunction[P, Any](
                 name=func.__name__,
                 parameters=list(func_signature.parameters.values()),
-                # TODO: Also allow ParallelFunctionCall. Support this more neatly
-                return_type=func_signature.return_annotation | FunctionCall,  # type: ignore[arg-type,unused-ignore]
+                return_type=func_signature.return_annotation  # type: ignore[arg-type,unused-ignore]
+                | AsyncParallelFunctionCall,
                 messages=messages,
                 functions=functions,
                 model=model,
+                stream_cache=stream_cache,
             )
 
             @wraps(func)
             async def awrapper(*args: P.args, **kwargs: P.kwargs) -> Any:
-                with logfire.span(
-                    f"Calling async prompt-chain {func.__name__}",
-                    **func_signature.bind(*args, **kwargs).arguments,
+                with (
+                    logfire.span(
+                        f"Calling async prompt-chain {func.__name__}",
+                        **func_signature.bind(*args, **kwargs).arguments,
+                    ),
+                    use_stream_cache(stream_cache),
                 ):
                     chat = await Chat(
                         messages=async_prompt_function.format(*args, **kwargs),
@@ -67,16 +158,24 @@ def prompt_chain(
                         model=async_prompt_function._model,  # Keep `None` value if unset
                     ).asubmit()
                     num_calls = 0
-                    while isinstance(chat.last_message.content, FunctionCall):
-                        if max_calls is not None and num_calls >= max_calls:
-                            msg = (
-                                f"Function {func.__name__} reached limit of"
-                                f" {max_calls} function calls"
-                            )
-                            raise MaxFunctionCallsError(msg)
-                        chat = await chat.aexec_function_call()
+                    while isinstance(
+                        content := chat.last_message.content,
+                        FunctionCall | AsyncParallelFunctionCall,
+                    ):
+                        if isinstance(content, FunctionCall):
+                            content = AsyncParallelFunctionCall(async_iter([content]))
+                        # Each call starts executing as soon as it is received
+                        function_calls = AsyncParallelFunctionCall(
+                            _alimit_calls(content, func.__name__, num_calls, max_calls)
+                        )
+                        results = await function_calls(
+                            max_concurrency=max_parallel, return_exceptions=True
+                        )
+                        chat = _add_function_results(
+                            chat, [fc async for fc in function_calls], results
+                        )
                         chat = await chat.asubmit()
-                        num_calls += 1
+                        num_calls += len(results)
                     return chat.last_message.content
 
             return cast(Callable[P, R], awrapper)
@@ -84,18 +183,22 @@ def prompt_chain(
         prompt_function = ChatPromptFunction[P, R](
             name=func.__name__,
             parameters=list(func_signature.parameters.values()),
-            # TODO: Also allow ParallelFunctionCall. Support this more neatly
-            return_type=func_signature.return_annotation | FunctionCall,  # type: ignore[arg-type,unused-ignore]
+            return_type=func_signature.return_annotation  # type: ignore[arg-type,unused-ignore]
+            | ParallelFunctionCall,
             messages=messages,
             functions=functions,
             model=model,
+            stream_cache=stream_cache,
         )
 
         @wraps(func)
         def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
-            with logfire.span(
-                f"Calling prompt-chain {func.__name__}",
-                **func_signature.bind(*args, **kwargs).arguments,
+            with (
+                logfire.span(
+                    f"Calling prompt-chain {func.__name__}",
+                    **func_signature.bind(*args, **kwargs).arguments,
+                ),
+                use_stream_cache(stream_cache),
             ):
                 chat = Chat(
                     messages=prompt_function.format(*args, **kwargs),
@@ -104,15 +207,23 @@ def prompt_chain(
                     model=prompt_function._model,  # Keep `None` value if unset
                 ).submit()
                 num_calls = 0
-                while isinstance(chat.last_message.content, FunctionCall):
-                    if max_calls is not None and num_calls >= max_calls:
-                        msg = (
-                            f"Function {func.__name__} reached limit of"
-                            f" {max_calls} function calls"
+                while isinstance(
+                    content := chat.last_message.content,
+                    FunctionCall | ParallelFunctionCall,
+                ):
+                    if isinstance(content, FunctionCall):
+                        content = ParallelFunctionCall([content])
+                    # Each call starts executing as soon as it is received
+                    function_calls = ParallelFunctionCall(
+                        _limit_calls(content, func.__name__, num_calls, max_calls)
+                    )
+                    with ThreadPoolExecutor(max_workers=max_parallel) as executor:
+                        results = function_calls(
+                            executor=executor, return_exceptions=True
                         )
-                        raise MaxFunctionCallsError(msg)
-                    chat = chat.exec_function_call().submit()
-                    num_calls += 1
+                    chat = _add_function_results(chat, list(function_calls), results)
+                    chat = chat.submit()
+                    num_calls += len(results)
                 return cast(R, chat.last_message.content)
 
         return wrapper
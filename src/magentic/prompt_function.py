@@ -9,6 +9,7 @@ from magentic.chat_model.base import ChatModel
 from magentic.chat_model.message import UserMessage
 from magentic.chat_model.retry_chat_model import RetryChatModel
 from magentic.logger import logfire
+from magentic.streaming import StreamCache, use_stream_cache
 from magentic.typing import split_union_type
 
 P = ParamSpec("P")
@@ -32,6 +33,7 @@ class BasePromptFunction(Generic[P, R]):
         stop: list[str] | None = None,
         max_retries: int = 0,
         model: ChatModel | None = None,
+        stream_cache: StreamCache | None = None,
     ):
         self._name = name
         self._signature = inspect.Signature(
@@ -43,6 +45,7 @@ class BasePromptFunction(Generic[P, R]):
         self._stop = stop
         self._max_retries = max_retries
         self._model = model
+        self._stream_cache = stream_cache
 
         self._return_types = list(split_union_type(return_type))
 
@@ -79,9 +82,12 @@ class PromptFunction(BasePromptFunction[P, R], Generic[P, R]):
 
     def __call__(self, *args: P.args, **kwargs: P.kwargs) -> R:
         """Query the LLM with the formatted prompt template."""
-        with logfire.span(
-            f"Calling prompt-function {self._name}",
-            **self._signature.bind(*args, **kwargs).arguments,
+        with (
+            logfire.span(
+                f"Calling prompt-function {self._name}",
+                **self._signature.bind(*args, **kwargs).arguments,
+            ),
+            use_stream_cache(self._stream_cache),
         ):
             message = self.model.complete(
                 messages=[UserMessage(content=self.format(*args, **kwargs))],
@@ -97,9 +103,12 @@ class AsyncPromptFunction(BasePromptFunction[P, R], Generic[P, R]):
 
     async def __call__(self, *args: P.args, **kwargs: P.kwargs) -> R:
         """Asynchronously query the LLM with the formatted prompt template."""
-        with logfire.span(
-            f"Calling async prompt-function {self._name}",
-            **self._signature.bind(*args, **kwargs).arguments,
+        with (
+            logfire.span(
+                f"Calling async prompt-function {self._name}",
+                **self._signature.bind(*args, **kwargs).arguments,
+            ),
+            use_stream_cache(self._stream_cache),
         ):
             message = await self.model.acomplete(
                 messages=[UserMessage(content=self.format(*args, **kwargs))],
@@ -131,6 +140,7 @@ def prompt(
     stop: list[str] | None = None,
     max_retries: int = 0,
     model: ChatModel | None = None,
+    stream_cache: StreamCache | None = None,
 ) -> PromptDecorator:
     """Convert a function into an LLM prompt template.
 
@@ -163,6 +173,7 @@ def prompt(
                 stop=stop,
                 max_retries=max_retries,
                 model=model,
+                stream_cache=stream_cache,
             )
             return cast(
                 AsyncPromptFunction[P, R],
@@ -178,6 +189,7 @@ def prompt(
             stop=stop,
             max_retries=max_retries,
             model=model,
+            stream_cache=stream_cache,
         )
         return cast(PromptFunction[P, R], update_wrapper(prompt_function, func))
 
@@ -1,5 +1,8 @@
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
 from enum import Enum
-from typing import Literal
+from typing import Any, Literal
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -12,10 +15,16 @@ class Backend(Enum):
 
 
 class Settings(BaseSettings):
-    model_config = SettingsConfigDict(env_prefix="MAGENTIC_")
+    model_config = SettingsConfigDict(env_prefix="MAGENTIC_", frozen=True)
 
     backend: Backend = Backend.OPENAI
 
+    # Connection pool of the HTTP clients shared by chat models
+    http_max_connections: int | None = 1000
+    http_max_keepalive_connections: int | None = 100
+    http_keepalive_expiry: float | None = 5.0
+    http2: bool = False
+
     anthropic_model: str = "claude-3-opus-20240229"
     anthropic_api_key: str | None = None
     anthropic_base_url: str | None = None
@@ -43,5 +52,43 @@ class Settings(BaseSettings):
     openai_temperature: float | None = None
 
 
+_settings: Settings | None = None
+_settings_context: ContextVar[Settings | None] = ContextVar("settings", default=None)
+
+
 def get_settings() -> Settings:
-    return Settings()
+    """Get the magentic settings.
+
+    The settings are read from environment variables the first time this is called,
+    then cached. Call `reload_settings` to read them again after the environment
+    variables change, or use `use_settings` to override them within a context.
+    """
+    if (settings := _settings_context.get()) is not None:
+        return settings
+    if _settings is None:
+        return reload_settings()
+    return _settings
+
+
+def reload_settings() -> Settings:
+    """Read the magentic settings from environment variables again."""
+    global _settings
+    _settings = Settings()
+    return _settings
+
+
+@contextmanager
+def use_settings(**overrides: Any) -> Iterator[Settings]:
+    """Override magentic settings within this context.
+
+    Examples
+    --------
+    >>> with use_settings(openai_model="gpt-4o-mini", openai_temperature=0):
+    >>>     say_hello()  # Uses gpt-4o-mini with temperature 0
+    """
+    settings = Settings.model_validate({**get_settings().model_dump(), **overrides})
+    token = _settings_context.set(settings)
+    try:
+        yield settings
+    finally:
+        _settings_context.reset(token)
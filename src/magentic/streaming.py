@@ -1,13 +1,68 @@
 import asyncio
 import collections
+import inspect
+import json
+import re
 import textwrap
-from collections.abc import AsyncIterable, AsyncIterator, Callable, Iterable, Iterator
-from dataclasses import dataclass
-from itertools import chain, dropwhile
-from typing import Any, TypeVar
+from collections.abc import (
+    AsyncIterable,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Iterable,
+    Iterator,
+)
+from contextlib import contextmanager
+from contextvars import ContextVar
+from itertools import chain
+from types import TracebackType
+from typing import Any, Literal, TypeVar
+
+from typing_extensions import Self
 
 T = TypeVar("T")
 
+StreamCache = Literal["full", "compact", "none"]
+"""How streamed outputs retain the items received from the LLM.
+
+- `"full"`: cache every item so the output can be iterated any number of times.
+- `"compact"`: cache the chunks of streamed strings coalesced into a single buffer.
+- `"none"`: do not cache. The output can only be iterated once, and any further
+  iteration resumes from where the previous one stopped.
+"""
+
+_stream_cache_context: ContextVar[StreamCache] = ContextVar(
+    "stream_cache", default="full"
+)
+
+
+def get_stream_cache() -> StreamCache:
+    """Get the stream cache mode for streamed outputs created in this context."""
+    return _stream_cache_context.get()
+
+
+@contextmanager
+def use_stream_cache(cache: StreamCache | None) -> Iterator[None]:
+    """Set the stream cache mode for streamed outputs created within this context.
+
+    If `cache` is `None` the current mode is left unchanged.
+
+    Examples
+    --------
+    >>> with use_stream_cache("none"):
+    >>>     story = tell_story("a dragon")  # returns StreamedStr
+    >>> for chunk in story:
+    >>>     print(chunk, end="")
+    """
+    if cache is None:
+        yield
+        return
+    token = _stream_cache_context.set(cache)
+    try:
+        yield
+    finally:
+        _stream_cache_context.reset(token)
+
 
 async def async_iter(iterable: Iterable[T]) -> AsyncIterator[T]:
     """Get an AsyncIterator for an Iterable."""
@@ -50,6 +105,76 @@ async def achain(*aiterables: AsyncIterable[T]) -> AsyncIterator[T]:
             yield item
 
 
+def close_iterable(iterable: Iterable[Any]) -> None:
+    """Close the iterable if it supports closing, e.g. a generator or response stream."""
+    if (close := getattr(iterable, "close", None)) is not None:
+        close()
+
+
+async def aclose_iterable(aiterable: AsyncIterable[Any]) -> None:
+    """Async version of `close_iterable`."""
+    if (aclose := getattr(aiterable, "aclose", None)) is not None:
+        await aclose()
+    elif (close := getattr(aiterable, "close", None)) is not None:
+        result = close()
+        if inspect.isawaitable(result):
+            await result
+
+
+class ClosingIterator(Iterator[T]):
+    """Wraps an iterator so that closing it calls `on_close`.
+
+    Unlike the `GeneratorExit` handler of a generator, `on_close` is called even if
+    iteration has not started yet.
+    """
+
+    def __init__(self, iterator: Iterator[T], on_close: Callable[[], None]):
+        self._iterator = iterator
+        self._on_close = on_close
+
+    def __iter__(self) -> Self:
+        return self
+
+    def __next__(self) -> T:
+        return next(self._iterator)
+
+    def close(self) -> None:
+        close_iterable(self._iterator)
+        self._on_close()
+
+
+class AsyncClosingIterator(AsyncIterator[T]):
+    """Async version of `ClosingIterator`."""
+
+    def __init__(
+        self, aiterator: AsyncIterator[T], on_aclose: Callable[[], Awaitable[None]]
+    ):
+        self._aiterator = aiterator
+        self._on_aclose = on_aclose
+
+    def __aiter__(self) -> Self:
+        return self
+
+    async def __anext__(self) -> T:
+        return await anext(self._aiterator)
+
+    async def aclose(self) -> None:
+        await aclose_iterable(self._aiterator)
+        await self._on_aclose()
+
+
+def prepend(item: T, iterator: Iterator[T]) -> ClosingIterator[T]:
+    """Yield the item then the rest of the iterator, which is closed with this."""
+    return ClosingIterator(chain([item], iterator), lambda: close_iterable(iterator))
+
+
+def aprepend(item: T, aiterator: AsyncIterator[T]) -> AsyncClosingIterator[T]:
+    """Async version of `prepend`."""
+    return AsyncClosingIterator(
+        achain(async_iter([item]), aiterator), lambda: aclose_iterable(aiterator)
+    )
+
+
 def peek(iterator: Iterator[T]) -> tuple[T, Iterator[T]]:
     """Returns the first item in the Iterator and a copy of the Iterator."""
     first_item = next(iterator)
@@ -122,42 +247,326 @@ async def agroupby(
             await aconsume(agroup(aiterator, group_key))
 
 
-@dataclass
-class JsonArrayParserState:
-    """State of the parser for a streamed JSON array."""
-
-    array_level: int = 0
-    object_level: int = 0
-    in_string: bool = False
-    is_escaped: bool = False
-    is_element_separator: bool = False
-
-    def update(self, char: str) -> None:
-        if self.in_string:
-            if char == '"' and not self.is_escaped:
-                self.in_string = False
-        elif char == '"':
-            self.in_string = True
-        elif char == ",":
-            if self.array_level == 1 and self.object_level == 0:
-                self.is_element_separator = True
-                return
-        elif char == "[":
-            self.array_level += 1
-        elif char == "]":
-            self.array_level -= 1
-            if self.array_level == 0:
-                self.is_element_separator = True
-                return
-        elif char == "{":
-            self.object_level += 1
-        elif char == "}":
-            self.object_level -= 1
-        elif char == "\\":
-            self.is_escaped = not self.is_escaped
+# A complete string, a structural character, or the start of an unterminated string
+_JSON_ARRAY_TOKEN = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"|[\[\]{},"]')
+# The remainder of a string that was started in a previous chunk
+_JSON_STRING_REST = re.compile(r'[^"\\]*(?:\\.[^"\\]*)*"')
+
+
+def _ends_with_escape(text: str) -> bool:
+    """Return True if the string content ends with an unpaired backslash."""
+    return (len(text) - len(text.rstrip("\\"))) % 2 == 1
+
+
+class JsonArrayScanner:
+    """Splits a streamed JSON array into the JSON strings of its items.
+
+    Chunks are scanned by jumping between complete strings and structural characters
+    using a compiled regex, and items are sliced out of the text rather than being built
+    up character by character. Chunks that cannot bring the scanner closer to the end
+    of an item (e.g. no closing quote while inside a string) are buffered and scanned
+    together with the next chunk that can. All characters before the start of the first
+    array i.e. the first "[" are ignored, as are all characters after it is closed.
+    """
+
+    def __init__(self) -> None:
+        self._started: bool = False
+        self._finished: bool = False
+        self._array_level: int = 0
+        self._object_level: int = 0
+        self._in_string: bool = False
+        self._is_escaped: bool = False
+        self._item_parts: list[str] = []
+        self._unscanned: list[str] = []
+        # Characters that must be present for a chunk to be worth scanning
+        self._triggers: tuple[str, str] = (",", "]")
+
+    @property
+    def finished(self) -> bool:
+        """Whether the end of the array has been reached."""
+        return self._finished
+
+    def feed(self, chunk: str) -> list[str]:
+        """Add the next chunk and return the items completed by it."""
+        if self._finished:
+            return []
+        if not self._started:
+            start = chunk.find("[")
+            if start == -1:
+                return []
+            self._started = True
+            self._array_level = 1
+            chunk = chunk[start + 1 :]
+
+        self._unscanned.append(chunk)
+        trigger_1, trigger_2 = self._triggers
+        if trigger_1 not in chunk and trigger_2 not in chunk:
+            return []
+        text = "".join(self._unscanned)
+        self._unscanned = []
+        items = self._scan(text)
+        if self._in_string:
+            self._triggers = ('"', '"')
+        elif self._array_level > 1 or self._object_level > 0:
+            self._triggers = ("}", "]")
         else:
-            self.is_escaped = False
-        self.is_element_separator = False
+            self._triggers = (",", "]")
+        return items
+
+    def _end_item(self, items: list[str], last_part: str) -> None:
+        self._item_parts.append(last_part)
+        if item := "".join(self._item_parts).strip():
+            items.append(item)
+        self._item_parts = []
+
+    def _scan(self, text: str) -> list[str]:
+        items: list[str] = []
+        pos = item_start = 0
+        if self._in_string:
+            if self._is_escaped and text:
+                self._is_escaped = False
+                pos += 1
+            match = _JSON_STRING_REST.match(text, pos)
+            if match is None:
+                self._is_escaped = self._is_escaped or _ends_with_escape(text[pos:])
+                self._item_parts.append(text)
+                return items
+            self._in_string = False
+            pos = match.end()
+
+        for match in _JSON_ARRAY_TOKEN.finditer(text, pos):
+            symbol = match.group()
+            if symbol == ",":
+                if self._array_level == 1 and self._object_level == 0:
+                    self._end_item(items, text[item_start : match.start()])
+                    item_start = match.end()
+            elif symbol == "[":
+                self._array_level += 1
+            elif symbol == "]":
+                self._array_level -= 1
+                if self._array_level == 0:
+                    self._end_item(items, text[item_start : match.start()])
+                    self._finished = True
+                    return items
+            elif symbol == "{":
+                self._object_level += 1
+            elif symbol == "}":
+                self._object_level -= 1
+            elif symbol == '"':
+                # String is not terminated within the text scanned so far
+                self._in_string = True
+                self._is_escaped = _ends_with_escape(text[match.end() :])
+                break
+
+        self._item_parts.append(text[item_start:])
+        return items
+
+
+# The content of a string up to its closing quote, or a trailing unpaired backslash
+_JSON_STRING_CONTENT = re.compile(r'[^"\\]*(?:\\.[^"\\]*)*', re.DOTALL)
+_JSON_PARTIAL_UNICODE_ESCAPE = re.compile(r"(\\+)u[0-9a-fA-F]{0,3}$")
+_JSON_WHITESPACE = re.compile(r"[ \t\n\r]*")
+# A number or literal, which ends at whitespace or a structural character
+_JSON_SCALAR = re.compile(r'[^ \t\n\r,:\[\]{}"]*')
+
+
+class PartialJsonParser:
+    """Incrementally parses a streamed JSON value into partial Python objects.
+
+    Each chunk is scanned once. Containers are built up in place as their items are
+    completed, and the string or number currently being received is held separately
+    and added to a snapshot of the value on request, so the cost of a chunk does not
+    depend on how much of the value has already been received. Partial strings are
+    included in the snapshot whereas partial keys and `true`/`false`/`null` are not,
+    similar to `pydantic_core.from_json` with `allow_partial="trailing-strings"`.
+
+    Malformed JSON sets `failed` and the rest of the input is ignored, so that the
+    error can be reported by validating the complete text.
+    """
+
+    def __init__(self) -> None:
+        self._root: Any = None
+        self._has_root: bool = False
+        self._stack: list[dict[str, Any] | list[Any]] = []
+        self._key: str | None = None
+        self._in_string: bool = False
+        self._string_is_key: bool = False
+        self._string_parts: list[str] = []
+        self._scalar: str = ""
+        self._leftover: str = ""
+        self._failed: bool = False
+        self._version: int = 0
+        self._num_values: int = 0
+
+    @property
+    def failed(self) -> bool:
+        """Whether the JSON received so far is malformed."""
+        return self._failed
+
+    @property
+    def version(self) -> int:
+        """A counter that increases whenever the snapshot changes."""
+        return self._version
+
+    @property
+    def num_values(self) -> int:
+        """The number of complete values and containers parsed so far."""
+        return self._num_values
+
+    def feed(self, chunk: str) -> None:
+        """Add the next chunk of the JSON text."""
+        if self._failed:
+            return
+        text = self._leftover + chunk
+        self._leftover = ""
+        try:
+            self._scan(text)
+        except ValueError:
+            self._failed = True
+
+    def snapshot(self) -> Any:
+        """Return the value parsed so far, including any incomplete string or number.
+
+        The returned containers are updated in place as more chunks are received.
+        """
+        if self._failed or not self._has_root:
+            return None
+        pending = self._pending_value()
+        if pending is _NO_VALUE or not self._stack:
+            return self._root if pending is _NO_VALUE else pending
+        top = self._stack[-1]
+        # Copy the innermost container so the pending value is not added to the result
+        if isinstance(top, dict):
+            if self._key is None:
+                return self._root
+            return self._replace_top({**top, self._key: pending})
+        return self._replace_top([*top, pending])
+
+    def _replace_top(self, new_top: dict[str, Any] | list[Any]) -> Any:
+        """Return a copy of the path from the root to the innermost container."""
+        value: Any = new_top
+        for parent in reversed(self._stack[:-1]):
+            # The open child container is always the most recently added value
+            if isinstance(parent, dict):
+                value = {**parent, next(reversed(parent)): value}
+            else:
+                value = [*parent[:-1], value]
+        return value
+
+    def _pending_value(self) -> Any:
+        if self._in_string and not self._string_is_key:
+            raw = "".join(self._string_parts)
+            self._string_parts = [raw]
+            if "\\" not in raw:
+                return raw
+            # Drop any incomplete unicode escape at the end e.g. a partial \u00e9
+            if (match := _JSON_PARTIAL_UNICODE_ESCAPE.search(raw)) and len(
+                match.group(1)
+            ) % 2:
+                raw = raw[: match.end(1) - 1]
+            try:
+                return json.loads(f'"{raw}"')
+            except ValueError:
+                return _NO_VALUE
+        if self._scalar:
+            try:
+                return json.loads(self._scalar)
+            except ValueError:
+                return _NO_VALUE
+        return _NO_VALUE
+
+    def _add_value(self, value: Any) -> None:
+        self._version += 1
+        self._num_values += 1
+        if not self._stack:
+            if self._has_root:
+                msg = "Extra data after JSON value"
+                raise ValueError(msg)
+            self._root, self._has_root = value, True
+            return
+        top = self._stack[-1]
+        if isinstance(top, list):
+            top.append(value)
+            return
+        if self._key is None:
+            msg = "Expected an object key"
+            raise ValueError(msg)
+        top[self._key] = value
+        self._key = None
+
+    def _end_scalar(self) -> None:
+        if self._scalar:
+            scalar, self._scalar = self._scalar, ""
+            self._add_value(json.loads(scalar))
+
+    def _scan(self, text: str) -> None:
+        pos, end = 0, len(text)
+        while pos < end:
+            if self._in_string:
+                match = _JSON_STRING_CONTENT.match(text, pos)
+                assert match is not None  # Always matches, possibly empty
+                if content := match.group():
+                    self._string_parts.append(content)
+                    self._version += not self._string_is_key
+                pos = match.end()
+                if pos == end:
+                    return
+                if text[pos] == "\\":
+                    # Unpaired backslash at the end of the chunk
+                    self._leftover = text[pos:]
+                    return
+                raw = "".join(self._string_parts)
+                value = json.loads(f'"{raw}"') if "\\" in raw else raw
+                self._in_string = False
+                self._string_parts = []
+                if self._string_is_key:
+                    self._key = value
+                else:
+                    self._add_value(value)
+                pos += 1
+                continue
+
+            match = _JSON_WHITESPACE.match(text, pos)
+            assert match is not None  # Always matches, possibly empty
+            if match.end() > pos:
+                self._end_scalar()
+                pos = match.end()
+                continue
+            char = text[pos]
+            if char in "{[":
+                self._end_scalar()
+                container: dict[str, Any] | list[Any] = {} if char == "{" else []
+                self._add_value(container)
+                self._stack.append(container)
+            elif char in "}]":
+                self._end_scalar()
+                if not self._stack or isinstance(self._stack[-1], dict) != (
+                    char == "}"
+                ):
+                    msg = f"Unexpected {char!r}"
+                    raise ValueError(msg)
+                self._stack.pop()
+            elif char in ",:":
+                self._end_scalar()
+            elif char == '"':
+                self._end_scalar()
+                self._in_string = True
+                self._string_is_key = (
+                    bool(self._stack)
+                    and isinstance(self._stack[-1], dict)
+                    and self._key is None
+                )
+            else:
+                match = _JSON_SCALAR.match(text, pos)
+                assert match is not None  # Always matches, at least one char
+                self._scalar += match.group()
+                self._version += 1
+                pos = match.end()
+                continue
+            pos += 1
+
+
+_NO_VALUE = object()
 
 
 def iter_streamed_json_array(chunks: Iterable[str]) -> Iterable[str]:
@@ -165,48 +574,19 @@ def iter_streamed_json_array(chunks: Iterable[str]) -> Iterable[str]:
 
     This ignores all characters before the start of the first array i.e. the first "["
     """
-    iter_chars: Iterator[str] = chain.from_iterable(chunks)
-    parser_state = JsonArrayParserState()
-
-    iter_chars = dropwhile(lambda x: x != "[", iter_chars)
-    parser_state.update(next(iter_chars))
-
-    item_chars: list[str] = []
-    for char in iter_chars:
-        parser_state.update(char)
-        if parser_state.is_element_separator:
-            if item_chars:
-                yield "".join(item_chars).strip()
-                item_chars = []
-        else:
-            item_chars.append(char)
+    scanner = JsonArrayScanner()
+    # Continue after the array is finished so the whole stream is consumed
+    for chunk in chunks:
+        yield from scanner.feed(chunk)
 
 
 async def aiter_streamed_json_array(chunks: AsyncIterable[str]) -> AsyncIterable[str]:
     """Async version of `iter_streamed_json_array`."""
-
-    async def chars_generator() -> AsyncIterable[str]:
-        async for chunk in chunks:
-            for char in chunk:
-                yield char
-
-    iter_chars = chars_generator()
-    parser_state = JsonArrayParserState()
-
-    async for char in iter_chars:
-        if char == "[":
-            break
-    parser_state.update("[")
-
-    item_chars: list[str] = []
-    async for char in iter_chars:
-        parser_state.update(char)
-        if parser_state.is_element_separator:
-            if item_chars:
-                yield "".join(item_chars).strip()
-                item_chars = []
-        else:
-            item_chars.append(char)
+    scanner = JsonArrayScanner()
+    # Chunks are split synchronously so only awaiting once per chunk
+    async for chunk in chunks:
+        for item in scanner.feed(chunk):
+            yield item
 
 
 class CachedIterable(Iterable[T]):
@@ -222,6 +602,10 @@ class CachedIterable(Iterable[T]):
             self._cached_items.append(item)
             yield item
 
+    def close(self) -> None:
+        """Close the underlying iterable."""
+        close_iterable(self._iterator)
+
 
 class CachedAsyncIterable(AsyncIterable[T]):
     """Async version of `CachedIterable`."""
@@ -237,18 +621,180 @@ class CachedAsyncIterable(AsyncIterable[T]):
             self._cached_items.append(item)
             yield item
 
+    async def aclose(self) -> None:
+        """Close the underlying async iterable."""
+        await aclose_iterable(self._aiterator)
+
+
+class CompactCachedIterable(Iterable[str]):
+    """Wraps an Iterable of strings and caches them coalesced into a single buffer.
+
+    The cached chunks are replayed as a single string, which avoids retaining an object
+    per chunk for long streams.
+    """
+
+    def __init__(self, iterable: Iterable[str]):
+        self._iterator = iter(iterable)
+        self._buffer = bytearray()
+
+    def __iter__(self) -> Iterator[str]:
+        position = 0
+        while True:
+            if position < len(self._buffer):
+                chunk = self._buffer[position:].decode()
+                position = len(self._buffer)
+                yield chunk
+                continue
+            try:
+                chunk = next(self._iterator)
+            except StopIteration:
+                return
+            self._buffer += chunk.encode()
+            position = len(self._buffer)
+            yield chunk
+
+    def close(self) -> None:
+        """Close the underlying iterable."""
+        close_iterable(self._iterator)
+
+
+class CompactCachedAsyncIterable(AsyncIterable[str]):
+    """Async version of `CompactCachedIterable`."""
+
+    def __init__(self, aiterable: AsyncIterable[str]):
+        self._aiterator = aiter(aiterable)
+        self._buffer = bytearray()
+
+    async def __aiter__(self) -> AsyncIterator[str]:
+        position = 0
+        while True:
+            if position < len(self._buffer):
+                chunk = self._buffer[position:].decode()
+                position = len(self._buffer)
+                yield chunk
+                continue
+            try:
+                chunk = await anext(self._aiterator)
+            except StopAsyncIteration:
+                return
+            self._buffer += chunk.encode()
+            position = len(self._buffer)
+            yield chunk
+
+    async def aclose(self) -> None:
+        """Close the underlying async iterable."""
+        await aclose_iterable(self._aiterator)
+
+
+class StreamConsumedError(Exception):
+    """Raised when a streamed output that is not cached is iterated again."""
+
+    _MESSAGE = (
+        "This streamed output has already been consumed and was not cached, so it"
+        " cannot be iterated again. Use stream_cache='full' or stream_cache='compact'"
+        " to iterate it more than once, e.g. to add it to the chat history."
+    )
+
+    def __init__(self) -> None:
+        super().__init__(self._MESSAGE)
+
+
+class SinglePassIterable(Iterable[T]):
+    """Wraps an Iterable without caching, so each item is only yielded once.
+
+    Iteration resumes from where the previous iteration stopped. Once all items have
+    been yielded, iterating again raises `StreamConsumedError`.
+    """
+
+    def __init__(self, iterable: Iterable[T]):
+        self._iterator = iter(iterable)
+        self._consumed: bool = False
+
+    def __iter__(self) -> Iterator[T]:
+        if self._consumed:
+            raise StreamConsumedError
+        # Not `yield from` which would close the iterator when breaking out of a loop
+        for item in self._iterator:  # noqa: UP028
+            yield item
+        self._consumed = True
+
+    def close(self) -> None:
+        """Close the underlying iterable."""
+        close_iterable(self._iterator)
+
+
+class SinglePassAsyncIterable(AsyncIterable[T]):
+    """Async version of `SinglePassIterable`."""
+
+    def __init__(self, aiterable: AsyncIterable[T]):
+        self._aiterator = aiter(aiterable)
+        self._consumed: bool = False
+
+    async def __aiter__(self) -> AsyncIterator[T]:
+        if self._consumed:
+            raise StreamConsumedError
+        async for item in self._aiterator:
+            yield item
+        self._consumed = True
+
+    async def aclose(self) -> None:
+        """Close the underlying async iterable."""
+        await aclose_iterable(self._aiterator)
+
+
+def _cached_chunks(
+    chunks: Iterable[str], cache: StreamCache
+) -> CachedIterable[str] | CompactCachedIterable | SinglePassIterable[str]:
+    if cache == "compact":
+        return CompactCachedIterable(chunks)
+    if cache == "none":
+        return SinglePassIterable(chunks)
+    return CachedIterable(chunks)
+
+
+def _cached_achunks(
+    chunks: AsyncIterable[str], cache: StreamCache
+) -> (
+    CachedAsyncIterable[str] | CompactCachedAsyncIterable | SinglePassAsyncIterable[str]
+):
+    if cache == "compact":
+        return CompactCachedAsyncIterable(chunks)
+    if cache == "none":
+        return SinglePassAsyncIterable(chunks)
+    return CachedAsyncIterable(chunks)
+
 
-# TODO: Add close method to close the underlying stream if chunks is a stream
-# TODO: Make it a context manager to automatically close
 class StreamedStr(Iterable[str]):
-    """A string that is generated in chunks."""
+    """A string that is generated in chunks.
 
-    def __init__(self, chunks: Iterable[str]):
-        self._chunks = CachedIterable(chunks)
+    The chunks are retained according to `cache`, which defaults to the stream cache
+    mode of the current context. See `StreamCache`.
+
+    Use `close` or a `with` block to stop receiving the string early. This also closes
+    the LLM response stream, which releases the connection.
+    """
+
+    def __init__(self, chunks: Iterable[str], cache: StreamCache | None = None):
+        self._chunks = _cached_chunks(chunks, cache or get_stream_cache())
 
     def __iter__(self) -> Iterator[str]:
         yield from self._chunks
 
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Stop receiving the string and close the underlying stream."""
+        self._chunks.close()
+
     def __str__(self) -> str:
         return "".join(self)
 
@@ -271,13 +817,28 @@ class StreamedStr(Iterable[str]):
 class AsyncStreamedStr(AsyncIterable[str]):
     """Async version of `StreamedStr`."""
 
-    def __init__(self, chunks: AsyncIterable[str]):
-        self._chunks = CachedAsyncIterable(chunks)
+    def __init__(self, chunks: AsyncIterable[str], cache: StreamCache | None = None):
+        self._chunks = _cached_achunks(chunks, cache or get_stream_cache())
 
     async def __aiter__(self) -> AsyncIterator[str]:
         async for chunk in self._chunks:
             yield chunk
 
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Stop receiving the string and close the underlying stream."""
+        await self._chunks.aclose()
+
     async def to_string(self) -> str:
         """Convert the streamed string to a string."""
         return "".join([item async for item in self])
@@ -1,13 +1,18 @@
-from typing import Annotated
+from typing import Annotated, Any
 from unittest.mock import ANY
 
+import anthropic.types as anthropic_types
 import pytest
+from anthropic.lib.streaming import MessageStopEvent
 from inline_snapshot import snapshot
 from pydantic import AfterValidator, BaseModel
 
+from magentic._streamed_model import AsyncStreamedModel, StreamedModel
 from magentic._streamed_response import AsyncStreamedResponse, StreamedResponse
 from magentic.chat_model.anthropic_chat_model import (
     AnthropicChatModel,
+    AnthropicStreamState,
+    _messages_to_anthropic_messages,
     async_message_to_anthropic_message,
     message_to_anthropic_message,
 )
@@ -20,6 +25,7 @@ from magentic.chat_model.message import (
     Message,
     Usage,
     UserMessage,
+    _RawMessage,
 )
 from magentic.function_call import (
     AsyncParallelFunctionCall,
@@ -33,6 +39,10 @@ def plus(a: int, b: int) -> int:
     return a + b
 
 
+class Country(BaseModel):
+    name: str
+
+
 message_to_anthropic_message_test_cases = [
     (UserMessage("Hello"), {"role": "user", "content": "Hello"}),
     (AssistantMessage("Hello"), {"role": "assistant", "content": "Hello"}),
@@ -116,6 +126,20 @@ message_to_anthropic_message_test_cases = [
             ],
         },
     ),
+    (
+        AssistantMessage(StreamedModel([Country(name="Fr"), Country(name="France")])),
+        {
+            "role": "assistant",
+            "content": [
+                {
+                    "type": "tool_use",
+                    "id": ANY,
+                    "name": "return_country",
+                    "input": {"name": "France"},
+                }
+            ],
+        },
+    ),
 ]
 
 
@@ -176,6 +200,22 @@ async_message_to_anthropic_message_test_cases = [
             ],
         },
     ),
+    (
+        AssistantMessage(
+            AsyncStreamedModel(async_iter([Country(name="Fr"), Country(name="France")]))
+        ),
+        {
+            "role": "assistant",
+            "content": [
+                {
+                    "type": "tool_use",
+                    "id": ANY,
+                    "name": "return_country",
+                    "input": {"name": "France"},
+                }
+            ],
+        },
+    ),
 ]
 
 
@@ -189,6 +229,18 @@ async def test_async_message_to_anthropic_message(message, expected_anthropic_me
     )
 
 
+def test_messages_to_anthropic_messages_reuses_converted_messages():
+    messages: list[Message[Any]] = [
+        UserMessage("Hello"),
+        AssistantMessage(FunctionCall(plus, 1, 2)),
+    ]
+    anthropic_messages = _messages_to_anthropic_messages(messages)
+    assert anthropic_messages == [message_to_anthropic_message(m) for m in messages]
+    next_anthropic_messages = _messages_to_anthropic_messages(messages)
+    assert next_anthropic_messages[0] is anthropic_messages[0]
+    assert next_anthropic_messages[1] is anthropic_messages[1]
+
+
 def test_message_to_anthropic_message_user_image_document_bytes_pdf(document_bytes_pdf):
     image_message = UserMessage([DocumentBytes(document_bytes_pdf)])
     assert message_to_anthropic_message(image_message) == snapshot(
@@ -519,3 +571,63 @@ async def test_anthropic_chat_model_acomplete_async_streamed_response():
     assert len(await streamed_str.to_string()) > 1  # Check AsyncStreamedStr was cached
     assert isinstance(function_call, FunctionCall)
     assert function_call() is None  # Check FunctionCall is successfully called
+
+
+def test_anthropic_stream_state_current_message_snapshot():
+    message = anthropic_types.Message(
+        id="msg_1",
+        content=[],
+        model="claude-3-haiku-20240307",
+        role="assistant",
+        stop_reason=None,
+        stop_sequence=None,
+        type="message",
+        usage=anthropic_types.Usage(input_tokens=10, output_tokens=1),
+    )
+
+    def delta(index: int, delta: Any) -> anthropic_types.RawContentBlockDeltaEvent:
+        return anthropic_types.RawContentBlockDeltaEvent(
+            type="content_block_delta", index=index, delta=delta
+        )
+
+    state = AnthropicStreamState()
+    for event in [
+        anthropic_types.RawMessageStartEvent(type="message_start", message=message),
+        anthropic_types.RawContentBlockStartEvent(
+            type="content_block_start",
+            index=0,
+            content_block=anthropic_types.TextBlock(type="text", text=""),
+        ),
+        delta(0, anthropic_types.TextDelta(type="text_delta", text="Hello")),
+        delta(0, anthropic_types.TextDelta(type="text_delta", text=" World")),
+        anthropic_types.RawContentBlockStartEvent(
+            type="content_block_start",
+            index=1,
+            content_block=anthropic_types.ToolUseBlock(
+                type="tool_use", id="toolu_1", name="plus", input={}
+            ),
+        ),
+        delta(
+            1,
+            anthropic_types.InputJSONDelta(
+                type="input_json_delta", partial_json='{"a": 1,'
+            ),
+        ),
+        delta(
+            1,
+            anthropic_types.InputJSONDelta(
+                type="input_json_delta", partial_json=' "b": 2}'
+            ),
+        ),
+        MessageStopEvent(type="message_stop", message=message),
+    ]:
+        state.update(event)  # type: ignore[arg-type]
+    assert state.usage_ref == [Usage(input_tokens=10, output_tokens=1)]
+    # Snapshot is rebuilt from the recorded events each time
+    for _ in range(2):
+        snapshot = state.current_message_snapshot
+        assert isinstance(snapshot, _RawMessage)
+        assert [
+            (block["type"], block.get("text"), block.get("input"))
+            for block in snapshot.content["content"]
+        ] == [("text", "Hello World", None), ("tool_use", None, {"a": 1, "b": 2})]
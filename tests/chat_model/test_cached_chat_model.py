@@ -0,0 +1,314 @@
+import multiprocessing
+import sqlite3
+import time
+from collections.abc import Callable, Iterable
+from typing import Any, cast
+
+import pytest
+from openai.types.chat import ChatCompletionChunk
+
+from magentic.chat_model.base import ChatModel, OutputT, aparse_stream, parse_stream
+from magentic.chat_model.cached_chat_model import (
+    CachedChatModel,
+    ResponseCache,
+    SqliteResponseCache,
+)
+from magentic.chat_model.function_schema import (
+    get_async_function_schemas,
+    get_function_schemas,
+)
+from magentic.chat_model.message import (
+    AssistantMessage,
+    FunctionResultMessage,
+    Message,
+    Usage,
+    UserMessage,
+)
+from magentic.chat_model.openai_chat_model import OpenaiStreamParser, OpenaiStreamState
+from magentic.chat_model.recording_chat_model import StreamRecording
+from magentic.chat_model.stream import AsyncOutputStream, OutputStream
+from magentic.function_call import FunctionCall, ParallelFunctionCall
+from magentic.streaming import AsyncStreamedStr, StreamedStr, async_iter
+
+
+def plus(a: int, b: int) -> int:
+    return a + b
+
+
+def openai_chunk(delta: dict[str, Any], **kwargs: Any) -> ChatCompletionChunk:
+    return ChatCompletionChunk.model_validate(
+        {
+            "id": "chatcmpl-1",
+            "object": "chat.completion.chunk",
+            "created": 0,
+            "model": "gpt-4o",
+            "choices": [{"index": 0, "delta": delta}],
+            **kwargs,
+        }
+    )
+
+
+OPENAI_TEXT = [
+    openai_chunk({"role": "assistant", "content": ""}),
+    openai_chunk({"content": "Hello"}),
+    openai_chunk({"content": " World"}),
+    openai_chunk(
+        {},
+        usage={"prompt_tokens": 5, "completion_tokens": 2, "total_tokens": 7},
+    ),
+]
+
+OPENAI_TOOL_CALLS = [
+    openai_chunk({"role": "assistant"}),
+    openai_chunk(
+        {
+            "tool_calls": [
+                {
+                    "index": 0,
+                    "id": "1",
+                    "function": {"name": "plus", "arguments": '{"a": 1, "b": 2}'},
+                }
+            ]
+        }
+    ),
+    openai_chunk(
+        {
+            "tool_calls": [
+                {
+                    "index": 1,
+                    "id": "2",
+                    "function": {"name": "plus", "arguments": '{"a": 3, "b": 4}'},
+                }
+            ]
+        }
+    ),
+]
+
+
+class FakeChatModel(ChatModel):
+    """Returns the given response to every request, parsed as by OpenaiChatModel."""
+
+    def __init__(self, response: list[Any], model: str = "gpt-4o"):
+        self.response = response
+        self.model = model
+        self.temperature: float | None = None
+        self.seed: int | None = None
+        self.num_requests = 0
+
+    def complete(
+        self,
+        messages: Iterable[Message[Any]],
+        functions: Iterable[Callable[..., Any]] | None = None,
+        output_types: Iterable[type[OutputT]] | None = None,
+        *,
+        stop: list[str] | None = None,
+    ) -> AssistantMessage[OutputT]:
+        self.num_requests += 1
+        output_types = output_types or cast(list[type[OutputT]], [str])
+        stream = OutputStream(
+            iter(self.response),
+            function_schemas=get_function_schemas(functions, output_types),
+            parser=OpenaiStreamParser(),
+            state=OpenaiStreamState(),
+        )
+        return AssistantMessage._with_usage(
+            parse_stream(stream, output_types), usage_ref=stream.usage_ref
+        )
+
+    async def acomplete(
+        self,
+        messages: Iterable[Message[Any]],
+        functions: Iterable[Callable[..., Any]] | None = None,
+        output_types: Iterable[type[OutputT]] | None = None,
+        *,
+        stop: list[str] | None = None,
+    ) -> AssistantMessage[OutputT]:
+        self.num_requests += 1
+        output_types = output_types or cast(list[type[OutputT]], [str])
+        stream = AsyncOutputStream(
+            async_iter(self.response),
+            function_schemas=get_async_function_schemas(functions, output_types),
+            parser=OpenaiStreamParser(),
+            state=OpenaiStreamState(),
+        )
+        return AssistantMessage._with_usage(
+            await aparse_stream(stream, output_types), usage_ref=stream.usage_ref
+        )
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store_factory(request, tmp_path):
+    if request.param == "memory":
+        return ResponseCache
+    return lambda **kwargs: SqliteResponseCache(tmp_path / "cache.db", **kwargs)
+
+
+def test_cached_chat_model_complete(store_factory):
+    chat_model = FakeChatModel(OPENAI_TEXT)
+    cached_chat_model = CachedChatModel(chat_model, store=store_factory())
+    message = cached_chat_model.complete([UserMessage("Hello")])
+    assert message.content == "Hello World"
+    message = cached_chat_model.complete([UserMessage("Hello")])
+    assert message.content == "Hello World"
+    assert message.usage == Usage(input_tokens=5, output_tokens=2)
+    assert chat_model.num_requests == 1
+    assert cached_chat_model.store.hit_rate == 0.5
+
+    cached_chat_model.complete([UserMessage("Hello again")])
+    assert chat_model.num_requests == 2
+
+
+def test_cached_chat_model_complete_function_calls(store_factory):
+    chat_model = FakeChatModel(OPENAI_TOOL_CALLS)
+    cached_chat_model = CachedChatModel(chat_model, store=store_factory())
+    for _ in range(2):
+        parallel_function_call = cached_chat_model.complete(
+            [UserMessage("Add")],
+            functions=[plus],
+            output_types=[ParallelFunctionCall[int]],
+        ).content
+        assert list(parallel_function_call) == [
+            FunctionCall(plus, 1, 2),
+            FunctionCall(plus, 3, 4),
+        ]
+    assert chat_model.num_requests == 1
+
+
+def test_cached_chat_model_streamed_str_closed_not_cached():
+    chat_model = FakeChatModel(OPENAI_TEXT)
+    cached_chat_model = CachedChatModel(chat_model)
+    streamed_str = cached_chat_model.complete(
+        [UserMessage("Hello")], output_types=[StreamedStr]
+    ).content
+    assert next(iter(streamed_str)) == "Hello"
+    streamed_str.close()
+    assert len(cached_chat_model.store) == 0
+
+    streamed_str = cached_chat_model.complete(
+        [UserMessage("Hello")], output_types=[StreamedStr]
+    ).content
+    assert str(streamed_str) == "Hello World"
+    streamed_str = cached_chat_model.complete(
+        [UserMessage("Hello")], output_types=[StreamedStr]
+    ).content
+    assert str(streamed_str) == "Hello World"
+    assert chat_model.num_requests == 2
+
+
+def test_cached_chat_model_key():
+    chat_model = FakeChatModel(OPENAI_TEXT)
+    cached_chat_model = CachedChatModel(chat_model)
+    key = cached_chat_model.key([UserMessage("Hello")])
+    assert key == cached_chat_model.key([UserMessage("Hello")])
+    assert key == cached_chat_model.key([UserMessage("Hello")], output_types=[str])
+    assert key != cached_chat_model.key([UserMessage("Hi")])
+    assert key != cached_chat_model.key([UserMessage("Hello")], stop=["\n"])
+    assert key != cached_chat_model.key(
+        [UserMessage("Hello")], output_types=[StreamedStr]
+    )
+    assert key != cached_chat_model.key([UserMessage("Hello")], functions=[plus])
+    chat_model.temperature = 0.5
+    assert key != cached_chat_model.key([UserMessage("Hello")])
+    chat_model.temperature = None
+    chat_model.seed = 42
+    assert key != cached_chat_model.key([UserMessage("Hello")])
+    assert key != CachedChatModel(FakeChatModel(OPENAI_TEXT, model="gpt-4o-mini")).key(
+        [UserMessage("Hello")]
+    )
+
+
+def test_cached_chat_model_key_ignores_tool_call_ids():
+    def make_messages() -> list[Message[Any]]:
+        function_call = FunctionCall(plus, 1, 2)
+        return [
+            UserMessage("Add"),
+            AssistantMessage(function_call),
+            FunctionResultMessage(3, function_call),
+        ]
+
+    cached_chat_model = CachedChatModel(FakeChatModel(OPENAI_TEXT))
+    messages = make_messages()
+    assert cached_chat_model.key(messages) == cached_chat_model.key(make_messages())
+    assert cached_chat_model.key(messages) != cached_chat_model.key(
+        [messages[0], messages[1], FunctionResultMessage(4, messages[1].content)]
+    )
+
+
+async def test_cached_chat_model_acomplete(store_factory):
+    chat_model = FakeChatModel(OPENAI_TEXT)
+    cached_chat_model = CachedChatModel(chat_model, store=store_factory())
+    for _ in range(2):
+        message = await cached_chat_model.acomplete(
+            [UserMessage("Hello")], output_types=[AsyncStreamedStr]
+        )
+        assert await message.content.to_string() == "Hello World"
+    assert chat_model.num_requests == 1
+    assert await cached_chat_model.akey([UserMessage("Hello")]) == (
+        cached_chat_model.key([UserMessage("Hello")])
+    )
+
+
+@pytest.mark.parametrize(
+    ("kwargs", "match"),
+    [
+        ({"maxsize": 0}, "maxsize must be at least 1"),
+        ({"ttl": 0}, "ttl must be greater than 0"),
+    ],
+)
+def test_response_cache_invalid(kwargs, match):
+    with pytest.raises(ValueError, match=match):
+        ResponseCache(**kwargs)
+
+
+def test_response_cache_maxsize(store_factory):
+    store = store_factory(maxsize=2)
+    recording = StreamRecording("openai", [], [])
+    store.set("a", recording)
+    time.sleep(0.001)  # Order by time of use on disk
+    store.set("b", recording)
+    time.sleep(0.001)
+    assert store.get("a") == recording  # Now "b" is the least recently used
+    time.sleep(0.001)
+    store.set("c", recording)
+    assert len(store) == 2
+    assert store.get("b") is None
+    assert (store.hits, store.misses) == (1, 1)
+
+
+def test_response_cache_ttl(store_factory, monkeypatch):
+    store = store_factory(ttl=10)
+    store.set("key", StreamRecording("openai", [], []))
+    assert store.get("key") is not None
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 11)
+    assert store.get("key") is None
+    assert len(store) == 0
+
+
+def test_sqlite_response_cache_shared(tmp_path):
+    path = tmp_path / "cache.db"
+    recording = StreamRecording("openai", [{"id": "1"}], [0.0])
+    SqliteResponseCache(path).set("key", recording)
+    assert SqliteResponseCache(path).get("key") == recording
+    with sqlite3.connect(path) as connection:
+        assert connection.execute("PRAGMA journal_mode").fetchone() == ("wal",)
+
+
+def set_response(store: SqliteResponseCache, key: str) -> None:
+    store.set(key, StreamRecording("openai", [], []))
+
+
+def test_sqlite_response_cache_multiple_processes(tmp_path):
+    store = SqliteResponseCache(tmp_path / "cache.db")
+    assert store.get("key") is None
+    context = multiprocessing.get_context("fork")
+    processes = [
+        context.Process(target=set_response, args=(store, f"key{i}")) for i in range(4)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+        assert process.exitcode == 0
+    assert len(store) == 4
+    assert store.get("key0") == StreamRecording("openai", [], [])
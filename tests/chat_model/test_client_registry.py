@@ -0,0 +1,90 @@
+import asyncio
+
+from magentic.chat_model.anthropic_chat_model import AnthropicChatModel
+from magentic.chat_model.client_registry import (
+    HttpClientOptions,
+    clear_clients,
+    get_async_client,
+    get_client,
+    get_http_client_options,
+)
+from magentic.chat_model.openai_chat_model import OpenaiChatModel
+from magentic.settings import reload_settings
+
+OPTIONS = HttpClientOptions(
+    max_connections=10, max_keepalive_connections=5, keepalive_expiry=5.0, http2=False
+)
+
+
+def get_test_client(
+    backend: str = "openai",
+    base_url: str | None = None,
+    api_key: str = "sk-1",
+    options: HttpClientOptions = OPTIONS,
+) -> object:
+    return get_client(backend, base_url, api_key, options, lambda options: object())
+
+
+def test_get_client_shared():
+    clear_clients()
+    client = get_test_client()
+    assert get_test_client() is client
+    assert get_test_client(api_key="sk-2") is not client
+    assert get_test_client(base_url="http://localhost:8080") is not client
+    assert get_test_client(backend="azure") is not client
+    assert get_test_client(options=OPTIONS._replace(http2=True)) is not client
+    clear_clients()
+    assert get_test_client() is not client
+
+
+def test_get_async_client_per_event_loop():
+    clear_clients()
+
+    async def get() -> tuple[object, object]:
+        return (
+            get_async_client("openai", None, "sk-1", OPTIONS, lambda options: object()),
+            get_async_client("openai", None, "sk-1", OPTIONS, lambda options: object()),
+        )
+
+    client, same_client = asyncio.run(get())
+    assert client is same_client
+    other_loop_client, _ = asyncio.run(get())
+    assert other_loop_client is not client
+
+
+def test_get_http_client_options(monkeypatch):
+    monkeypatch.setenv("MAGENTIC_HTTP_MAX_CONNECTIONS", "20")
+    monkeypatch.setenv("MAGENTIC_HTTP2", "true")
+    reload_settings()
+    options = get_http_client_options()
+    assert options.max_connections == 20
+    assert options.max_keepalive_connections == 100
+    assert options.http2 is True
+    assert options.limits.max_connections == 20
+
+
+def test_openai_chat_model_shares_clients():
+    chat_model = OpenaiChatModel("gpt-4o", api_key="sk-1")
+    assert OpenaiChatModel("gpt-4o-mini", api_key="sk-1")._client is chat_model._client
+    assert OpenaiChatModel("gpt-4o", api_key="sk-2")._client is not chat_model._client
+
+    async def get_async_clients() -> list[object]:
+        return [
+            chat_model._async_client,
+            OpenaiChatModel("gpt-4o-mini", api_key="sk-1")._async_client,
+        ]
+
+    async_client, other_async_client = asyncio.run(get_async_clients())
+    assert async_client is other_async_client
+
+
+def test_anthropic_chat_model_shares_clients():
+    chat_model = AnthropicChatModel("claude-3-haiku-20240307", api_key="sk-1")
+    assert (
+        AnthropicChatModel("claude-3-opus-20240229", api_key="sk-1")._client
+        is chat_model._client
+    )
+    assert (
+        AnthropicChatModel("claude-3-haiku-20240307", api_key="sk-2")._client
+        is not chat_model._client
+    )
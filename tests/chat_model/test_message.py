@@ -1,3 +1,5 @@
+import gc
+from pathlib import Path
 from typing import TYPE_CHECKING, Literal, cast
 from unittest.mock import ANY, MagicMock
 
@@ -9,9 +11,11 @@ from typing_extensions import assert_type
 from magentic.chat_model.message import (
     AnyMessage,
     AssistantMessage,
+    DocumentBytes,
     FunctionResultMessage,
     ImageBytes,
     ImageUrl,
+    MessageConversionCache,
     Placeholder,
     SystemMessage,
     ToolResultMessage,
@@ -106,6 +110,44 @@ def test_image_bytes_invalid():
         ImageBytes(b"invalid")
 
 
+def test_image_bytes_as_base64_cached(image_bytes_jpg):
+    image_bytes = ImageBytes(image_bytes_jpg)
+    assert image_bytes.as_base64() is image_bytes.as_base64()
+    # Messages that reuse the block share its encoding
+    message = UserMessage([Placeholder(ImageBytes, "image")])
+    assert message.format(image=image_bytes).content[0] is image_bytes
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 100, 2**20])
+def test_document_bytes_iter_base64(document_bytes_pdf, chunk_size):
+    document_bytes = DocumentBytes(document_bytes_pdf)
+    chunks = list(document_bytes.iter_base64(chunk_size))
+    assert "".join(chunks) == document_bytes.as_base64()
+    assert all("=" not in chunk for chunk in chunks[:-1])
+
+
+@pytest.mark.parametrize(
+    ("block_type", "path", "mime_type"),
+    [
+        (DocumentBytes, "tests/data/test.pdf", "application/pdf"),
+        (ImageBytes, "tests/data/python-powered.jpg", "image/jpeg"),
+        (ImageBytes, "tests/data/python-powered.png", "image/png"),
+    ],
+)
+def test_bytes_from_file(block_type, path, mime_type):
+    block = block_type.from_file(path)
+    assert not isinstance(block.root, bytes)
+    assert block == block_type(Path(path).read_bytes())
+    assert block.mime_type == mime_type
+    assert block.as_base64() == block_type(Path(path).read_bytes()).as_base64()
+    assert block.model_dump() == Path(path).read_bytes()
+
+
+def test_bytes_from_file_invalid():
+    with pytest.raises(ValueError, match="Unsupported image MIME type"):
+        ImageBytes.from_file("tests/data/test.pdf")
+
+
 def test_user_message_format():
     user_message = UserMessage("Hello {x}")
     user_message_formatted = user_message.format(x="world")
@@ -283,3 +325,38 @@ def test_any_message():
         AssistantMessage("Hello"),
         ToolResultMessage(3, "unique_id"),
     ]
+
+
+def test_message_conversion_cache_convert():
+    cache: MessageConversionCache[str] = MessageConversionCache()
+    converter = MagicMock(side_effect=lambda message: message.content.upper())
+    message = UserMessage("Hello")
+    assert cache.convert(message, converter) == "HELLO"
+    assert cache.convert(message, converter) == "HELLO"
+    assert cache.convert(UserMessage("Hello"), converter) == "HELLO"
+    assert converter.call_count == 2
+    assert len(cache) == 2
+
+
+def test_message_conversion_cache_removes_collected_messages():
+    cache: MessageConversionCache[str] = MessageConversionCache()
+    message = UserMessage("Hello")
+    cache.convert(message, lambda message: "converted")
+    assert len(cache) == 1
+    del message
+    gc.collect()
+    assert len(cache) == 0
+
+
+async def test_message_conversion_cache_aconvert():
+    cache: MessageConversionCache[str] = MessageConversionCache()
+    converter = MagicMock(side_effect=lambda message: message.content.upper())
+
+    async def aconverter(message):
+        return converter(message)
+
+    message = UserMessage("Hello")
+    assert await cache.aconvert(message, aconverter) == "HELLO"
+    assert await cache.aconvert(message, aconverter) == "HELLO"
+    assert cache.convert(message, converter) == "HELLO"
+    assert converter.call_count == 1
@@ -5,12 +5,14 @@ from unittest.mock import ANY
 import openai
 import pytest
 from inline_snapshot import snapshot
-from openai.types.chat import ChatCompletionMessageParam
+from openai.types.chat import ChatCompletionChunk, ChatCompletionMessageParam
 from pydantic import AfterValidator, BaseModel
 
 from magentic._pydantic import ConfigDict, with_config
+from magentic._streamed_model import AsyncStreamedModel, StreamedModel
 from magentic._streamed_response import AsyncStreamedResponse, StreamedResponse
 from magentic.chat_model.base import ToolSchemaParseError
+from magentic.chat_model.function_schema import get_function_schemas
 from magentic.chat_model.message import (
     AssistantMessage,
     FunctionResultMessage,
@@ -24,6 +26,9 @@ from magentic.chat_model.message import (
 )
 from magentic.chat_model.openai_chat_model import (
     OpenaiChatModel,
+    OpenaiStreamState,
+    _async_messages_to_openai_messages,
+    _messages_to_openai_messages,
     async_message_to_openai_message,
     message_to_openai_message,
 )
@@ -32,13 +37,22 @@ from magentic.function_call import (
     FunctionCall,
     ParallelFunctionCall,
 )
-from magentic.streaming import AsyncStreamedStr, StreamedStr, async_iter
+from magentic.streaming import (
+    AsyncStreamedStr,
+    StreamConsumedError,
+    StreamedStr,
+    async_iter,
+)
 
 
 def plus(a: int, b: int) -> int:
     return a + b
 
 
+class Country(BaseModel):
+    name: str
+
+
 message_to_openai_message_test_cases = [
     (
         _RawMessage({"role": "user", "content": "Hello"}),
@@ -129,6 +143,22 @@ message_to_openai_message_test_cases = [
             "content": '{"value":3}',
         },
     ),
+    (
+        AssistantMessage(StreamedModel([Country(name="Fr"), Country(name="France")])),
+        {
+            "role": "assistant",
+            "tool_calls": [
+                {
+                    "id": ANY,
+                    "type": "function",
+                    "function": {
+                        "name": "return_country",
+                        "arguments": '{"name":"France"}',
+                    },
+                }
+            ],
+        },
+    ),
 ]
 
 
@@ -186,6 +216,24 @@ async_message_to_openai_message_test_cases = [
             ],
         },
     ),
+    (
+        AssistantMessage(
+            AsyncStreamedModel(async_iter([Country(name="Fr"), Country(name="France")]))
+        ),
+        {
+            "role": "assistant",
+            "tool_calls": [
+                {
+                    "id": ANY,
+                    "type": "function",
+                    "function": {
+                        "name": "return_country",
+                        "arguments": '{"name":"France"}',
+                    },
+                }
+            ],
+        },
+    ),
 ]
 
 
@@ -196,6 +244,30 @@ async def test_async_message_to_openai_message(message, expected_openai_message)
     assert await async_message_to_openai_message(message) == expected_openai_message
 
 
+def test_messages_to_openai_messages_reuses_converted_messages():
+    messages: list[Message[Any]] = [
+        UserMessage("Hello"),
+        AssistantMessage(FunctionCall(plus, 1, 2)),
+    ]
+    openai_messages = _messages_to_openai_messages(messages)
+    assert openai_messages == [message_to_openai_message(m) for m in messages]
+    next_openai_messages = _messages_to_openai_messages(
+        [*messages, UserMessage("Again")]
+    )
+    assert next_openai_messages[0] is openai_messages[0]
+    assert next_openai_messages[1] is openai_messages[1]
+    assert next_openai_messages[2] == {"role": "user", "content": "Again"}
+
+
+async def test_async_messages_to_openai_messages_reuses_converted_messages():
+    messages: list[Message[Any]] = [UserMessage("Hello"), AssistantMessage("Hi")]
+    openai_messages = await _async_messages_to_openai_messages(messages)
+    assert openai_messages == [message_to_openai_message(m) for m in messages]
+    next_openai_messages = await _async_messages_to_openai_messages(messages)
+    assert next_openai_messages[0] is openai_messages[0]
+    assert next_openai_messages[1] is openai_messages[1]
+
+
 def test_message_to_openai_message_user_image_message_bytes_jpg(image_bytes_jpg):
     image_message = UserMessage([ImageBytes(image_bytes_jpg)])
     assert message_to_openai_message(image_message) == snapshot(
@@ -230,6 +302,13 @@ def test_message_to_openai_message_user_image_message_bytes_png(image_bytes_png)
     )
 
 
+def test_message_to_openai_message_consumed_streamed_str_raises():
+    streamed_str = StreamedStr(iter(["Hello", " World"]), cache="none")
+    assert str(streamed_str) == "Hello World"
+    with pytest.raises(StreamConsumedError):
+        message_to_openai_message(AssistantMessage(StreamedResponse([streamed_str])))
+
+
 def test_message_to_openai_message_raises():
     class CustomMessage(Message[str]):
         def __init__(self, content: str, **data: Any):
@@ -457,9 +536,74 @@ async def test_openai_chat_model_acomplete_raises_tool_schema_parse_error():
         )
 
 
+def test_openai_chat_model_get_tools_args_reused():
+    chat_model = OpenaiChatModel("gpt-4o")
+    function_schemas = get_function_schemas([plus], [int])
+    tools, tool_choice = chat_model._get_tools_args(function_schemas, [int])
+    assert [tool["function"]["name"] for tool in tools] == ["plus", "return_int"]  # type: ignore[union-attr]
+    assert tool_choice == "required"
+    assert chat_model._get_tools_args(function_schemas, [int])[0] is tools
+    # Returning a string changes the tool choice
+    assert (
+        chat_model._get_tools_args(function_schemas, [str, int])[1] is openai.NOT_GIVEN
+    )
+
+
+def test_openai_chat_model_get_tools_args_per_model_class():
+    class CustomToolChoiceChatModel(OpenaiChatModel):
+        @staticmethod
+        def _get_tool_choice(*, tool_schemas, output_types):
+            return "auto"
+
+    function_schemas = get_function_schemas([plus], [int])
+    assert OpenaiChatModel("gpt-4o")._get_tools_args(function_schemas, [int])[1] == (
+        "required"
+    )
+    chat_model = CustomToolChoiceChatModel("gpt-4o")
+    assert chat_model._get_tools_args(function_schemas, [int])[1] == "auto"
+
+
 def test_openai_chat_model_azure_omits_stream_options(monkeypatch):
     monkeypatch.setenv("AZURE_OPENAI_API_KEY", "test")
     monkeypatch.setenv("AZURE_OPENAI_ENDPOINT", "test")
     monkeypatch.setenv("OPENAI_API_VERSION", "test")
     chat_model = OpenaiChatModel("gpt-4o", api_type="azure")
     assert chat_model._get_stream_options() == openai.NOT_GIVEN
+
+
+def test_openai_stream_state_current_message_snapshot():
+    def chunk(delta: dict[str, Any]) -> ChatCompletionChunk:
+        return ChatCompletionChunk.model_validate(
+            {
+                "id": "chatcmpl-1",
+                "object": "chat.completion.chunk",
+                "created": 0,
+                "model": "gpt-4o",
+                "choices": [{"index": 0, "delta": delta}],
+            }
+        )
+
+    def tool_call(id: str | None, name: str | None, args: str) -> dict[str, Any]:
+        function = {"name": name, "arguments": args}
+        return {"tool_calls": [{"index": 0, "id": id, "function": function}]}
+
+    state = OpenaiStreamState()
+    for item in [
+        chunk({"role": "assistant", "content": ""}),
+        chunk({"content": "Hello"}),
+        chunk({"content": " World"}),
+        chunk(tool_call("1", "plus", '{"a": 1,')),
+        chunk(tool_call(None, None, ' "b": 2}')),
+        chunk(tool_call("2", "plus", '{"a": 3,')),
+        chunk(tool_call(None, None, ' "b": 4}')),
+    ]:
+        state.update(item)
+    # Snapshot is rebuilt from the recorded chunks each time
+    for _ in range(2):
+        message = state.current_message_snapshot
+        assert isinstance(message, _RawMessage)
+        assert message.content["content"] == "Hello World"
+        assert [
+            (tool_call["id"], tool_call["function"]["arguments"])
+            for tool_call in message.content["tool_calls"]
+        ] == [("1", '{"a": 1, "b": 2}'), ("2", '{"a": 3, "b": 4}')]
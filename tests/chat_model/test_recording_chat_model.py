@@ -0,0 +1,300 @@
+from collections.abc import Callable, Iterable
+from typing import Any, cast
+
+import anthropic.types as anthropic_types
+import pytest
+from anthropic.lib.streaming import InputJsonEvent, MessageStopEvent, TextEvent
+from litellm.types.utils import Delta, ModelResponse, StreamingChoices
+from openai.types.chat import ChatCompletionChunk
+
+from magentic._streamed_response import StreamedResponse
+from magentic.chat_model.anthropic_chat_model import (
+    AnthropicStreamParser,
+    AnthropicStreamState,
+)
+from magentic.chat_model.base import ChatModel, OutputT, aparse_stream, parse_stream
+from magentic.chat_model.function_schema import (
+    get_async_function_schemas,
+    get_function_schemas,
+)
+from magentic.chat_model.litellm_chat_model import (
+    LitellmStreamParser,
+    LitellmStreamState,
+)
+from magentic.chat_model.message import AssistantMessage, Message, Usage, UserMessage
+from magentic.chat_model.openai_chat_model import OpenaiStreamParser, OpenaiStreamState
+from magentic.chat_model.recording_chat_model import (
+    RecordingChatModel,
+    ReplayChatModel,
+    load_stream_recordings,
+)
+from magentic.chat_model.stream import (
+    AsyncOutputStream,
+    OutputStream,
+    StreamParser,
+    StreamState,
+)
+from magentic.function_call import FunctionCall, ParallelFunctionCall
+from magentic.streaming import StreamedStr, async_iter
+
+
+def plus(a: int, b: int) -> int:
+    return a + b
+
+
+def openai_chunk(delta: dict[str, Any], **kwargs: Any) -> ChatCompletionChunk:
+    return ChatCompletionChunk.model_validate(
+        {
+            "id": "chatcmpl-1",
+            "object": "chat.completion.chunk",
+            "created": 0,
+            "model": "gpt-4o",
+            "choices": [{"index": 0, "delta": delta}],
+            **kwargs,
+        }
+    )
+
+
+def openai_tool_call(id: str | None, name: str | None, args: str) -> dict[str, Any]:
+    function = {"name": name, "arguments": args}
+    return {"tool_calls": [{"index": 0, "id": id, "function": function}]}
+
+
+OPENAI_TEXT = [
+    openai_chunk({"role": "assistant", "content": ""}),
+    openai_chunk({"content": "Hello"}),
+    openai_chunk({"content": " World"}),
+    openai_chunk(
+        {},
+        usage={"prompt_tokens": 5, "completion_tokens": 2, "total_tokens": 7},
+    ),
+]
+
+OPENAI_TOOL_CALLS = [
+    openai_chunk({"role": "assistant"}),
+    openai_chunk(openai_tool_call("1", "plus", '{"a": 1,')),
+    openai_chunk(openai_tool_call(None, None, ' "b": 2}')),
+    openai_chunk(openai_tool_call("2", "plus", '{"a": 3, "b": 4}')),
+]
+
+
+class FakeChatModel(ChatModel):
+    """Returns the given responses in order, parsed as by a provider chat model."""
+
+    def __init__(
+        self,
+        responses: list[list[Any]],
+        parser: Callable[[], StreamParser[Any]] = OpenaiStreamParser,
+        state: Callable[[], StreamState[Any]] = OpenaiStreamState,
+    ):
+        self._responses = iter(responses)
+        self._parser = parser
+        self._state = state
+
+    def complete(
+        self,
+        messages: Iterable[Message[Any]],
+        functions: Iterable[Callable[..., Any]] | None = None,
+        output_types: Iterable[type[OutputT]] | None = None,
+        *,
+        stop: list[str] | None = None,
+    ) -> AssistantMessage[OutputT]:
+        output_types = output_types or cast(list[type[OutputT]], [str])
+        stream = OutputStream(
+            iter(next(self._responses)),
+            function_schemas=get_function_schemas(functions, output_types),
+            parser=self._parser(),
+            state=self._state(),
+        )
+        return AssistantMessage._with_usage(
+            parse_stream(stream, output_types), usage_ref=stream.usage_ref
+        )
+
+    async def acomplete(
+        self,
+        messages: Iterable[Message[Any]],
+        functions: Iterable[Callable[..., Any]] | None = None,
+        output_types: Iterable[type[OutputT]] | None = None,
+        *,
+        stop: list[str] | None = None,
+    ) -> AssistantMessage[OutputT]:
+        output_types = output_types or cast(list[type[OutputT]], [str])
+        stream = AsyncOutputStream(
+            async_iter(next(self._responses)),
+            function_schemas=get_async_function_schemas(functions, output_types),
+            parser=self._parser(),
+            state=self._state(),
+        )
+        return AssistantMessage._with_usage(
+            await aparse_stream(stream, output_types), usage_ref=stream.usage_ref
+        )
+
+
+@pytest.mark.parametrize("filename", ["recording.jsonl", "recording.jsonl.gz"])
+def test_recording_chat_model_replay(tmp_path, filename):
+    path = tmp_path / filename
+    recording_chat_model = RecordingChatModel(
+        FakeChatModel([OPENAI_TEXT, OPENAI_TOOL_CALLS]), path
+    )
+    message = recording_chat_model.complete([UserMessage("Hello")])
+    assert message.content == "Hello World"
+    parallel_function_call = recording_chat_model.complete(
+        [UserMessage("Add")],
+        functions=[plus],
+        output_types=[ParallelFunctionCall[int]],
+    ).content
+    assert list(parallel_function_call) == [
+        FunctionCall(plus, 1, 2),
+        FunctionCall(plus, 3, 4),
+    ]
+
+    replay_chat_model = ReplayChatModel(path, speed=None)
+    message = replay_chat_model.complete([UserMessage("Hello")])
+    assert message.content == "Hello World"
+    assert message.usage == Usage(input_tokens=5, output_tokens=2)
+    parallel_function_call = replay_chat_model.complete(
+        [UserMessage("Add")],
+        functions=[plus],
+        output_types=[ParallelFunctionCall[int]],
+    ).content
+    assert list(parallel_function_call) == [
+        FunctionCall(plus, 1, 2),
+        FunctionCall(plus, 3, 4),
+    ]
+    # Starts again from the first recording
+    assert replay_chat_model.complete([UserMessage("Hello")]).content == "Hello World"
+
+
+def test_recording_chat_model_records_when_stream_ends(tmp_path):
+    path = tmp_path / "recording.jsonl"
+    recording_chat_model = RecordingChatModel(FakeChatModel([OPENAI_TEXT]), path)
+    streamed_str = recording_chat_model.complete(
+        [UserMessage("Hello")], output_types=[StreamedStr]
+    ).content
+    assert not path.exists()
+    assert str(streamed_str) == "Hello World"
+    [recording] = load_stream_recordings(path)
+    assert recording.format == "openai"
+    assert recording.items == OPENAI_TEXT
+    assert len(recording.delays) == len(OPENAI_TEXT)
+
+
+async def test_recording_chat_model_replay_async(tmp_path):
+    path = tmp_path / "recording.jsonl"
+    recording_chat_model = RecordingChatModel(FakeChatModel([OPENAI_TEXT]), path)
+    message = await recording_chat_model.acomplete([UserMessage("Hello")])
+    assert message.content == "Hello World"
+
+    replay_chat_model = ReplayChatModel(path, speed=100)
+    message = await replay_chat_model.acomplete([UserMessage("Hello")])
+    assert message.content == "Hello World"
+
+
+def test_replay_chat_model_recorded_speed(tmp_path):
+    path = tmp_path / "recording.jsonl"
+    path.write_text(
+        '{"format":"openai","items":['
+        + ",".join(chunk.model_dump_json(exclude_unset=True) for chunk in OPENAI_TEXT)
+        + '],"delays":[0.0,0.1,0.1,0.0]}\n'
+    )
+    message = ReplayChatModel(path, speed=2).complete([UserMessage("Hello")])
+    assert message.content == "Hello World"
+    timing = message.timing
+    assert timing is not None
+    assert timing.total is not None
+    assert 0.1 <= timing.total < 1
+
+
+def test_replay_chat_model_no_recordings(tmp_path):
+    path = tmp_path / "recording.jsonl"
+    path.write_text("")
+    with pytest.raises(ValueError, match="No stream recordings"):
+        ReplayChatModel(path)
+
+
+def test_load_stream_recordings_anthropic(tmp_path):
+    message = anthropic_types.Message(
+        id="msg_1",
+        content=[],
+        model="claude-3-haiku-20240307",
+        role="assistant",
+        stop_reason=None,
+        stop_sequence=None,
+        type="message",
+        usage=anthropic_types.Usage(input_tokens=10, output_tokens=1),
+    )
+    events = [
+        anthropic_types.RawMessageStartEvent(type="message_start", message=message),
+        anthropic_types.RawContentBlockStartEvent(
+            type="content_block_start",
+            index=0,
+            content_block=anthropic_types.TextBlock(type="text", text=""),
+        ),
+        anthropic_types.RawContentBlockDeltaEvent(
+            type="content_block_delta",
+            index=0,
+            delta=anthropic_types.TextDelta(type="text_delta", text="Hello"),
+        ),
+        TextEvent(type="text", text="Hello", snapshot="Hello"),
+        anthropic_types.RawContentBlockStartEvent(
+            type="content_block_start",
+            index=1,
+            content_block=anthropic_types.ToolUseBlock(
+                type="tool_use", id="toolu_1", name="plus", input={}
+            ),
+        ),
+        anthropic_types.RawContentBlockDeltaEvent(
+            type="content_block_delta",
+            index=1,
+            delta=anthropic_types.InputJSONDelta(
+                type="input_json_delta", partial_json='{"a": 1, "b": 2}'
+            ),
+        ),
+        InputJsonEvent(
+            type="input_json", partial_json='{"a": 1, "b": 2}', snapshot={"a": 1}
+        ),
+        MessageStopEvent(type="message_stop", message=message),
+    ]
+    path = tmp_path / "recording.jsonl"
+    recording_chat_model = RecordingChatModel(
+        FakeChatModel([events], AnthropicStreamParser, AnthropicStreamState), path
+    )
+    streamed_response = recording_chat_model.complete(
+        [UserMessage("Add")], functions=[plus], output_types=[StreamedResponse]
+    ).content
+    assert len(list(streamed_response)) == 2
+    [recording] = load_stream_recordings(path)
+    assert recording.format == "anthropic"
+    assert [type(event) for event in recording.items] == [
+        type(event) for event in events
+    ]
+    assert [event.model_dump(exclude={"snapshot"}) for event in recording.items] == [
+        event.model_dump(exclude={"snapshot"}) for event in events
+    ]
+
+    replayed_message = ReplayChatModel(path, speed=None).complete(
+        [UserMessage("Add")], functions=[plus], output_types=[StreamedResponse]
+    )
+    streamed_str, function_call = replayed_message.content
+    assert str(streamed_str) == "Hello"
+    assert function_call == FunctionCall(plus, 1, 2)
+    assert replayed_message.usage == Usage(input_tokens=10, output_tokens=1)
+
+
+def test_load_stream_recordings_litellm(tmp_path):
+    chunks = [
+        ModelResponse(
+            stream=True,
+            choices=[StreamingChoices(delta=Delta(role="assistant", content=text))],
+        )
+        for text in ["Hello", " World"]
+    ]
+    path = tmp_path / "recording.jsonl"
+    recording_chat_model = RecordingChatModel(
+        FakeChatModel([chunks], LitellmStreamParser, LitellmStreamState), path
+    )
+    assert recording_chat_model.complete([UserMessage("Hello")]).content == (
+        "Hello World"
+    )
+    message = ReplayChatModel(path, speed=None).complete([UserMessage("Hello")])
+    assert message.content == "Hello World"
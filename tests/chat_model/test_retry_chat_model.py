@@ -1,13 +1,36 @@
-from typing import Annotated
+import time
+from collections.abc import Callable, Iterable, Iterator
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from typing import Annotated, Any, cast
 
+import httpx
+import openai
 import pytest
+from openai.types.chat import ChatCompletionChunk
 from pydantic import AfterValidator, BaseModel
 
 from magentic.chat_model.anthropic_chat_model import AnthropicChatModel
+from magentic.chat_model.base import ChatModel, OutputT, aparse_stream, parse_stream
+from magentic.chat_model.function_schema import (
+    get_async_function_schemas,
+    get_function_schemas,
+)
 from magentic.chat_model.litellm_chat_model import LitellmChatModel
-from magentic.chat_model.message import UserMessage
-from magentic.chat_model.openai_chat_model import OpenaiChatModel
-from magentic.chat_model.retry_chat_model import RetryChatModel
+from magentic.chat_model.message import (
+    AssistantMessage,
+    Message,
+    ToolResultMessage,
+    UserMessage,
+)
+from magentic.chat_model.openai_chat_model import (
+    OpenaiChatModel,
+    OpenaiStreamParser,
+    OpenaiStreamState,
+)
+from magentic.chat_model.retry_chat_model import RetryChatModel, RetryPolicy
+from magentic.chat_model.stream import AsyncOutputStream, OutputStream
+from magentic.streaming import AsyncStreamedStr, StreamedStr, async_iter
 
 
 @pytest.mark.openai
@@ -132,3 +155,294 @@ async def test_retry_chat_model_acomplete_litellm_openai():
     )
     assert isinstance(message.content, Country)
     assert message.content.name == "Ireland"
+
+
+def openai_chunk(delta: dict[str, Any]) -> ChatCompletionChunk:
+    return ChatCompletionChunk.model_validate(
+        {
+            "id": "chatcmpl-1",
+            "object": "chat.completion.chunk",
+            "created": 0,
+            "model": "gpt-4o",
+            "choices": [{"index": 0, "delta": delta}],
+        }
+    )
+
+
+OPENAI_TEXT = [
+    openai_chunk({"role": "assistant", "content": ""}),
+    openai_chunk({"content": "Hello"}),
+    openai_chunk({"content": " World"}),
+]
+
+
+def status_error(
+    error_type: type[openai.APIStatusError],
+    status_code: int,
+    headers: dict[str, str] | None = None,
+) -> openai.APIStatusError:
+    request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+    response = httpx.Response(status_code, headers=headers, request=request)
+    return error_type("Error", response=response, body=None)
+
+
+def connection_error() -> openai.APIConnectionError:
+    return openai.APIConnectionError(request=httpx.Request("POST", "https://test"))
+
+
+class FlakyChatModel(ChatModel):
+    """Raises or returns the given responses in turn, parsed as by OpenaiChatModel.
+
+    Each response is an exception to raise when making the request, or the chunks to
+    stream. Exceptions within the chunks are raised while streaming the response.
+    """
+
+    def __init__(self, responses: list[Exception | list[Any]]):
+        self.responses = responses
+        self.requests: list[list[Message[Any]]] = []
+
+    def _next_response(self, messages: Iterable[Message[Any]]) -> list[Any]:
+        self.requests.append(list(messages))
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    @staticmethod
+    def _iter_chunks(chunks: list[Any]) -> Iterator[Any]:
+        for chunk in chunks:
+            if isinstance(chunk, Exception):
+                raise chunk
+            yield chunk
+
+    def complete(
+        self,
+        messages: Iterable[Message[Any]],
+        functions: Iterable[Callable[..., Any]] | None = None,
+        output_types: Iterable[type[OutputT]] | None = None,
+        *,
+        stop: list[str] | None = None,
+    ) -> AssistantMessage[OutputT]:
+        chunks = self._next_response(messages)
+        output_types = output_types or cast(list[type[OutputT]], [str])
+        stream = OutputStream(
+            self._iter_chunks(chunks),
+            function_schemas=get_function_schemas(functions, output_types),
+            parser=OpenaiStreamParser(),
+            state=OpenaiStreamState(),
+        )
+        return AssistantMessage(parse_stream(stream, output_types))
+
+    async def acomplete(
+        self,
+        messages: Iterable[Message[Any]],
+        functions: Iterable[Callable[..., Any]] | None = None,
+        output_types: Iterable[type[OutputT]] | None = None,
+        *,
+        stop: list[str] | None = None,
+    ) -> AssistantMessage[OutputT]:
+        chunks = self._next_response(messages)
+        output_types = output_types or cast(list[type[OutputT]], [str])
+        stream = AsyncOutputStream(
+            async_iter(self._iter_chunks(chunks)),
+            function_schemas=get_async_function_schemas(functions, output_types),
+            parser=OpenaiStreamParser(),
+            state=OpenaiStreamState(),
+        )
+        return AssistantMessage(await aparse_stream(stream, output_types))
+
+
+def test_retry_policy_get_delay_backoff():
+    policy = RetryPolicy(initial_delay=1, max_delay=5, multiplier=2, jitter=False)
+    error = status_error(openai.RateLimitError, 429)
+    delays = [policy.get_delay(error, [error] * n, elapsed=0) for n in range(4)]
+    assert delays == [1, 2, 4, 5]
+
+
+def test_retry_policy_get_delay_jitter():
+    policy = RetryPolicy(initial_delay=1)
+    error = status_error(openai.RateLimitError, 429)
+    delays = [policy.get_delay(error, [], elapsed=0) for _ in range(100)]
+    assert all(delay is not None and 0 <= delay <= 1 for delay in delays)
+    assert len(set(delays)) > 1
+
+
+@pytest.mark.parametrize(
+    ("headers", "expected_delay"),
+    [
+        ({"retry-after": "3"}, 3),
+        ({"retry-after-ms": "1500", "retry-after": "3"}, 1.5),
+        ({"retry-after": "-1"}, 0),
+        ({"retry-after": "120"}, None),
+        ({"retry-after": "invalid"}, 1),
+    ],
+)
+def test_retry_policy_get_delay_retry_after(headers, expected_delay):
+    policy = RetryPolicy(initial_delay=1, jitter=False)
+    error = status_error(openai.RateLimitError, 429, headers)
+    assert policy.get_delay(error, [], elapsed=0) == expected_delay
+
+
+def test_retry_policy_get_delay_retry_after_date():
+    policy = RetryPolicy()
+    retry_at = datetime.now(timezone.utc) + timedelta(seconds=10)
+    error = status_error(
+        openai.InternalServerError,
+        503,
+        {"retry-after": format_datetime(retry_at, usegmt=True)},
+    )
+    delay = policy.get_delay(error, [], elapsed=0)
+    assert delay is not None
+    assert 8 < delay <= 10
+
+
+@pytest.mark.parametrize(
+    ("error", "expected_retryable"),
+    [
+        (status_error(openai.RateLimitError, 429), True),
+        (status_error(openai.InternalServerError, 529), True),
+        (status_error(openai.InternalServerError, 503), True),
+        (status_error(openai.BadRequestError, 400), False),
+        (status_error(openai.AuthenticationError, 401), False),
+        (connection_error(), True),
+        (openai.APITimeoutError(request=httpx.Request("POST", "https://test")), True),
+        (httpx.ConnectError("Connection refused"), True),
+        (ValueError("Invalid"), False),
+    ],
+)
+def test_retry_policy_is_retryable(error, expected_retryable):
+    assert RetryPolicy().is_retryable(error) is expected_retryable
+
+
+def test_retry_policy_retry_on():
+    policy = RetryPolicy(retry_on=(ValueError,))
+    assert policy.is_retryable(ValueError("Invalid"))
+
+
+def test_retry_policy_max_retries():
+    policy = RetryPolicy(
+        max_retries=3, max_retries_by_error={openai.RateLimitError: 1}, jitter=False
+    )
+    rate_limit_error = status_error(openai.RateLimitError, 429)
+    assert policy.get_delay(rate_limit_error, [connection_error()], elapsed=0)
+    assert policy.get_delay(rate_limit_error, [rate_limit_error], elapsed=0) is None
+    assert policy.get_delay(connection_error(), [rate_limit_error], elapsed=0)
+    assert policy.get_delay(connection_error(), [connection_error()] * 3, 0) is None
+
+
+def test_retry_policy_deadline():
+    policy = RetryPolicy(initial_delay=1, jitter=False, deadline=10)
+    error = connection_error()
+    assert policy.get_delay(error, [], elapsed=8.5) == 1
+    assert policy.get_delay(error, [], elapsed=9.5) is None
+
+
+@pytest.mark.parametrize(
+    ("kwargs", "match"),
+    [
+        ({"max_retries": -1}, "max_retries must not be negative"),
+        ({"initial_delay": -1}, "initial_delay and max_delay must not be negative"),
+        ({"deadline": 0}, "deadline must be greater than 0"),
+    ],
+)
+def test_retry_policy_invalid(kwargs, match):
+    with pytest.raises(ValueError, match=match):
+        RetryPolicy(**kwargs)
+
+
+def test_retry_chat_model_complete_retry_policy(monkeypatch):
+    sleeps: list[float] = []
+    monkeypatch.setattr(time, "sleep", sleeps.append)
+    chat_model = FlakyChatModel(
+        [
+            status_error(openai.RateLimitError, 429, {"retry-after": "2"}),
+            connection_error(),
+            OPENAI_TEXT,
+        ]
+    )
+    retry_chat_model = RetryChatModel(
+        chat_model, retry_policy=RetryPolicy(initial_delay=1, jitter=False)
+    )
+    message = retry_chat_model.complete([UserMessage("Hello")])
+    assert message.content == "Hello World"
+    assert message.num_retries == 2
+    assert sleeps == [2, 2]
+
+
+def test_retry_chat_model_complete_retry_policy_streamed_str(monkeypatch):
+    monkeypatch.setattr(time, "sleep", lambda _: None)
+    chat_model = FlakyChatModel(
+        [
+            [openai_chunk({"role": "assistant"}), connection_error()],
+            OPENAI_TEXT,
+        ]
+    )
+    retry_chat_model = RetryChatModel(chat_model, retry_policy=RetryPolicy())
+    message = retry_chat_model.complete(
+        [UserMessage("Hello")], output_types=[StreamedStr]
+    )
+    assert str(message.content) == "Hello World"
+    assert message.num_retries == 1
+
+
+def test_retry_chat_model_complete_retry_policy_not_retryable():
+    chat_model = FlakyChatModel([status_error(openai.BadRequestError, 400)])
+    retry_chat_model = RetryChatModel(chat_model, retry_policy=RetryPolicy())
+    with pytest.raises(openai.BadRequestError):
+        retry_chat_model.complete([UserMessage("Hello")])
+    assert len(chat_model.requests) == 1
+
+
+def test_retry_chat_model_complete_no_retry_policy():
+    chat_model = FlakyChatModel([connection_error(), OPENAI_TEXT])
+    retry_chat_model = RetryChatModel(chat_model, max_retries=3)
+    with pytest.raises(openai.APIConnectionError):
+        retry_chat_model.complete([UserMessage("Hello")])
+
+
+def test_retry_chat_model_complete_unknown_tool():
+    def plus(a: int, b: int) -> int:
+        return a + b
+
+    unknown_tool_call = openai_chunk(
+        {
+            "tool_calls": [
+                {
+                    "index": 0,
+                    "id": "1",
+                    "function": {"name": "minus", "arguments": '{"a": 1, "b": 2}'},
+                }
+            ]
+        }
+    )
+    chat_model = FlakyChatModel(
+        [[openai_chunk({"role": "assistant"}), unknown_tool_call], OPENAI_TEXT]
+    )
+    retry_chat_model = RetryChatModel(chat_model, max_retries=1)
+    message = retry_chat_model.complete(
+        [UserMessage("Hello")], functions=[plus], output_types=[str]
+    )
+    assert message.content == "Hello World"
+    assert message.num_retries == 1
+    tool_result_message = chat_model.requests[1][-1]
+    assert isinstance(tool_result_message, ToolResultMessage)
+    assert tool_result_message.tool_call_id == "1"
+    assert "'minus'" in tool_result_message.content
+
+
+async def test_retry_chat_model_acomplete_retry_policy():
+    chat_model = FlakyChatModel(
+        [
+            status_error(openai.InternalServerError, 529),
+            [openai_chunk({"role": "assistant"}), connection_error()],
+            OPENAI_TEXT,
+        ]
+    )
+    retry_chat_model = RetryChatModel(
+        chat_model, retry_policy=RetryPolicy(initial_delay=0.001)
+    )
+    message = await retry_chat_model.acomplete(
+        [UserMessage("Hello")], output_types=[AsyncStreamedStr]
+    )
+    assert await message.content.to_string() == "Hello World"
+    assert message.num_retries == 2
@@ -0,0 +1,427 @@
+import asyncio
+from collections.abc import AsyncIterator, Iterator
+from typing import Any
+
+from openai.types.chat import ChatCompletionChunk
+from pydantic import BaseModel
+
+from magentic._streamed_model import AsyncStreamedModel, StreamedModel
+from magentic._streamed_response import AsyncStreamedResponse, StreamedResponse
+from magentic.chat_model.base import aparse_stream, parse_stream
+from magentic.chat_model.function_schema import (
+    get_async_function_schemas,
+    get_function_schemas,
+)
+from magentic.chat_model.openai_chat_model import OpenaiStreamParser, OpenaiStreamState
+from magentic.chat_model.stream import AsyncOutputStream, OutputStream
+from magentic.chat_model.timing import Timing, TimingRecorder, use_metrics_callback
+from magentic.function_call import (
+    AsyncParallelFunctionCall,
+    FunctionCall,
+    ParallelFunctionCall,
+)
+from magentic.streaming import AsyncStreamedStr, StreamedStr
+
+
+def plus(a: int, b: int) -> int:
+    return a + b
+
+
+class Sum(BaseModel):
+    a: int
+    b: int
+
+
+def content_chunk(content: str) -> ChatCompletionChunk:
+    return ChatCompletionChunk.model_validate(
+        {
+            "id": "chatcmpl-1",
+            "object": "chat.completion.chunk",
+            "created": 0,
+            "model": "gpt-4o",
+            "choices": [{"index": 0, "delta": {"content": content}}],
+        }
+    )
+
+
+def tool_call_chunk(id: str | None, name: str | None, args: str) -> ChatCompletionChunk:
+    return ChatCompletionChunk.model_validate(
+        {
+            "id": "chatcmpl-1",
+            "object": "chat.completion.chunk",
+            "created": 0,
+            "model": "gpt-4o",
+            "choices": [
+                {
+                    "index": 0,
+                    "delta": {
+                        "tool_calls": [
+                            {
+                                "index": 0,
+                                "id": id,
+                                "type": "function",
+                                "function": {"name": name, "arguments": args},
+                            }
+                        ]
+                    },
+                }
+            ],
+        }
+    )
+
+
+class ResponseStream:
+    """Fake provider response stream that records whether it was closed."""
+
+    def __init__(self, chunks: list[ChatCompletionChunk]):
+        self._chunks = iter(chunks)
+        self.closed = False
+
+    def __iter__(self) -> Iterator[ChatCompletionChunk]:
+        return self
+
+    def __next__(self) -> ChatCompletionChunk:
+        assert not self.closed, "Read from closed stream"
+        return next(self._chunks)
+
+    def close(self) -> None:
+        self.closed = True
+
+
+class AsyncResponseStream:
+    """Async version of `ResponseStream`.
+
+    If `wait_at_end` is set, this waits forever once the chunks run out, like a
+    response stream that is still waiting for the LLM to generate more output.
+    """
+
+    def __init__(self, chunks: list[ChatCompletionChunk], *, wait_at_end: bool = False):
+        self._chunks = iter(chunks)
+        self._wait_at_end = wait_at_end
+        self.closed = False
+
+    def __aiter__(self) -> AsyncIterator[ChatCompletionChunk]:
+        return self
+
+    async def __anext__(self) -> ChatCompletionChunk:
+        assert not self.closed, "Read from closed stream"
+        for chunk in self._chunks:
+            return chunk
+        if self._wait_at_end:
+            await asyncio.Event().wait()
+        raise StopAsyncIteration
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+def complete(response: ResponseStream, output_types: list[type]) -> Any:
+    stream = OutputStream(
+        response,
+        function_schemas=get_function_schemas([plus], output_types),
+        parser=OpenaiStreamParser(),
+        state=OpenaiStreamState(),
+    )
+    return parse_stream(stream, output_types)
+
+
+async def acomplete(response: AsyncResponseStream, output_types: list[type]) -> Any:
+    stream = AsyncOutputStream(
+        response,
+        function_schemas=get_async_function_schemas([plus], output_types),
+        parser=OpenaiStreamParser(),
+        state=OpenaiStreamState(),
+    )
+    return await aparse_stream(stream, output_types)
+
+
+def test_streamed_response_content_then_tool_calls():
+    response = ResponseStream(
+        [
+            content_chunk("Hello"),
+            content_chunk(" World"),
+            tool_call_chunk("1", "plus", '{"a": 1,'),
+            tool_call_chunk(None, None, ' "b": 2}'),
+            tool_call_chunk("2", "plus", '{"a": 3, "b": 4}'),
+        ]
+    )
+    streamed_response = complete(response, [StreamedResponse])
+    streamed_str, function_call_1, function_call_2 = list(streamed_response)
+    assert str(streamed_str) == "Hello World"
+    assert function_call_1 == FunctionCall(plus, 1, 2)
+    assert function_call_2 == FunctionCall(plus, 3, 4)
+
+
+def test_streamed_response_chunk_with_content_and_tool_call():
+    chunk = tool_call_chunk("1", "plus", '{"a": 1, "b": 2}')
+    chunk.choices[0].delta.content = "Hello"
+    response = ResponseStream([chunk])
+    streamed_response = complete(response, [StreamedResponse])
+    streamed_str, function_call = list(streamed_response)
+    assert str(streamed_str) == "Hello"
+    assert function_call == FunctionCall(plus, 1, 2)
+
+
+async def test_async_streamed_response_content_then_tool_calls():
+    response = AsyncResponseStream(
+        [
+            content_chunk("Hello"),
+            tool_call_chunk("1", "plus", '{"a": 1, "b": 2}'),
+            tool_call_chunk("2", "plus", '{"a": 3, "b": 4}'),
+        ]
+    )
+    async_streamed_response = await acomplete(response, [AsyncStreamedResponse])
+    items = aiter(async_streamed_response)
+    assert await (await anext(items)).to_string() == "Hello"
+    assert await anext(items) == FunctionCall(plus, 1, 2)
+    assert await anext(items) == FunctionCall(plus, 3, 4)
+
+
+def test_streamed_str_close_closes_response():
+    response = ResponseStream([content_chunk("Hello"), content_chunk(" World")])
+    streamed_str = complete(response, [StreamedStr])
+    with streamed_str:
+        assert next(iter(streamed_str)) == "Hello"
+    assert response.closed
+    assert list(streamed_str) == ["Hello"]
+
+
+def test_streamed_str_close_before_iterating_closes_response():
+    response = ResponseStream([content_chunk("Hello"), content_chunk(" World")])
+    with complete(response, [StreamedStr]):
+        pass
+    assert response.closed
+
+
+def test_streamed_str_break_does_not_close_response():
+    response = ResponseStream([content_chunk("Hello"), content_chunk(" World")])
+    streamed_str = complete(response, [StreamedStr])
+    for _ in streamed_str:
+        break
+    assert not response.closed
+    assert str(streamed_str) == "Hello World"
+
+
+def test_streamed_response_close_closes_response():
+    response = ResponseStream(
+        [
+            content_chunk("Hello"),
+            tool_call_chunk("1", "plus", '{"a": 1, "b": 2}'),
+            tool_call_chunk("2", "plus", '{"a": 3, "b": 4}'),
+        ]
+    )
+    streamed_response = complete(response, [StreamedResponse])
+    with streamed_response:
+        assert isinstance(next(iter(streamed_response)), StreamedStr)
+    assert response.closed
+
+
+def test_parallel_function_call_close_closes_response():
+    response = ResponseStream(
+        [
+            tool_call_chunk("1", "plus", '{"a": 1, "b": 2}'),
+            tool_call_chunk("2", "plus", '{"a": 3, "b": 4}'),
+        ]
+    )
+    parallel_function_call = complete(response, [ParallelFunctionCall[int]])
+    with parallel_function_call:
+        assert next(iter(parallel_function_call)) == FunctionCall(plus, 1, 2)
+    assert response.closed
+    assert list(parallel_function_call) == [FunctionCall(plus, 1, 2)]
+
+
+def test_streamed_response_close_before_iterating_closes_response():
+    response = ResponseStream(
+        [content_chunk("Hello"), tool_call_chunk("1", "plus", '{"a": 1, "b": 2}')]
+    )
+    complete(response, [StreamedResponse]).close()
+    assert response.closed
+
+
+def test_parallel_function_call_close_before_iterating_closes_response():
+    response = ResponseStream(
+        [
+            tool_call_chunk("1", "plus", '{"a": 1, "b": 2}'),
+            tool_call_chunk("2", "plus", '{"a": 3, "b": 4}'),
+        ]
+    )
+    complete(response, [ParallelFunctionCall[int]]).close()
+    assert response.closed
+
+
+def test_streamed_model_close_before_iterating_closes_response():
+    response = ResponseStream(
+        [
+            tool_call_chunk("1", "return_sum", '{"a": 1,'),
+            tool_call_chunk(None, None, ' "b": 2}'),
+        ]
+    )
+    streamed_model = complete(response, [StreamedModel[Sum]])
+    assert isinstance(streamed_model, StreamedModel)
+    streamed_model.close()
+    assert response.closed
+
+
+async def test_async_streamed_str_aclose_closes_response():
+    response = AsyncResponseStream([content_chunk("Hello"), content_chunk(" World")])
+    async_streamed_str = await acomplete(response, [AsyncStreamedStr])
+    async with async_streamed_str:
+        assert await anext(aiter(async_streamed_str)) == "Hello"
+    assert response.closed
+    assert [chunk async for chunk in async_streamed_str] == ["Hello"]
+
+
+async def test_async_streamed_str_aclose_before_iterating_closes_response():
+    response = AsyncResponseStream([content_chunk("Hello"), content_chunk(" World")])
+    async with await acomplete(response, [AsyncStreamedStr]):
+        pass
+    assert response.closed
+
+
+async def test_async_streamed_response_aclose_closes_response():
+    response = AsyncResponseStream(
+        [content_chunk("Hello"), tool_call_chunk("1", "plus", '{"a": 1, "b": 2}')]
+    )
+    async_streamed_response = await acomplete(response, [AsyncStreamedResponse])
+    async with async_streamed_response:
+        item = await anext(aiter(async_streamed_response))
+        assert isinstance(item, AsyncStreamedStr)
+    assert response.closed
+
+
+async def test_async_parallel_function_call_aclose_closes_response():
+    response = AsyncResponseStream(
+        [
+            tool_call_chunk("1", "plus", '{"a": 1, "b": 2}'),
+            tool_call_chunk("2", "plus", '{"a": 3, "b": 4}'),
+        ]
+    )
+    async_parallel_function_call = await acomplete(
+        response, [AsyncParallelFunctionCall[int]]
+    )
+    async with async_parallel_function_call:
+        function_call = await anext(aiter(async_parallel_function_call))
+        assert function_call == FunctionCall(plus, 1, 2)
+    assert response.closed
+
+
+async def test_async_parallel_function_call_aclose_before_iterating_closes_response():
+    response = AsyncResponseStream(
+        [
+            tool_call_chunk("1", "plus", '{"a": 1, "b": 2}'),
+            tool_call_chunk("2", "plus", '{"a": 3, "b": 4}'),
+        ]
+    )
+    await (await acomplete(response, [AsyncParallelFunctionCall[int]])).aclose()
+    assert response.closed
+
+
+async def test_async_streamed_model_aclose_before_iterating_closes_response():
+    response = AsyncResponseStream(
+        [tool_call_chunk("1", "return_sum", '{"a": 1, "b": 2}')]
+    )
+    async_streamed_model = await acomplete(response, [AsyncStreamedModel[Sum]])
+    assert isinstance(async_streamed_model, AsyncStreamedModel)
+    await async_streamed_model.aclose()
+    assert response.closed
+
+
+async def test_async_streamed_str_cancel_closes_response():
+    response = AsyncResponseStream([content_chunk("Hello")], wait_at_end=True)
+    async_streamed_str = await acomplete(response, [AsyncStreamedStr])
+    first_chunk_received = asyncio.Event()
+
+    async def consume() -> None:
+        async for _ in async_streamed_str:
+            first_chunk_received.set()
+
+    task = asyncio.create_task(consume())
+    await first_chunk_received.wait()
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+    assert task.cancelled()
+    assert response.closed
+
+
+def test_output_stream_timing_streamed_str():
+    response = ResponseStream([content_chunk("Hello"), content_chunk(" World")])
+    timing_recorder = TimingRecorder()
+    timing_recorder.request_sent()
+    stream: OutputStream[ChatCompletionChunk, Any] = OutputStream(
+        response,
+        function_schemas=get_function_schemas([], [StreamedStr]),
+        parser=OpenaiStreamParser(),
+        state=OpenaiStreamState(),
+        timing_recorder=timing_recorder,
+    )
+    streamed_str = parse_stream(stream, [StreamedStr])
+    timing = timing_recorder.timing
+    assert timing.time_to_first_byte is not None
+    assert timing.time_to_first_content == timing.time_to_first_byte
+    assert timing.total is None
+    assert str(streamed_str) == "Hello World"
+    timing = timing_recorder.timing
+    assert timing.time_to_first_tool_call is None
+    assert sum(timing.inter_chunk_gaps) == 1
+    assert timing.time_to_first_byte is not None
+    assert timing.total is not None
+    assert timing.total >= timing.request_build + timing.time_to_first_byte
+
+
+def test_output_stream_timing_parallel_function_call():
+    response = ResponseStream(
+        [
+            tool_call_chunk("1", "plus", '{"a": 1,'),
+            tool_call_chunk(None, None, ' "b": 2}'),
+            tool_call_chunk("2", "plus", '{"a": 3, "b": 4}'),
+        ]
+    )
+    stream: OutputStream[ChatCompletionChunk, Any] = OutputStream(
+        response,
+        function_schemas=get_function_schemas([plus], [ParallelFunctionCall[int]]),
+        parser=OpenaiStreamParser(),
+        state=OpenaiStreamState(),
+    )
+    assert len(list(parse_stream(stream, [ParallelFunctionCall[int]]))) == 2
+    timing = stream.timing_recorder.timing
+    assert timing.time_to_first_content is None
+    assert timing.time_to_first_tool_call == timing.time_to_first_byte
+    assert sum(timing.inter_chunk_gaps) == 2
+    assert timing.parse > 0
+    assert timing.total is not None
+
+
+def test_use_metrics_callback():
+    timings: list[Timing] = []
+    response = ResponseStream([content_chunk("Hello"), content_chunk(" World")])
+    with use_metrics_callback(timings.append):
+        streamed_str = complete(response, [StreamedStr])
+    assert timings == []
+    str(streamed_str)
+    str(streamed_str)
+    assert len(timings) == 1
+    assert timings[0].total is not None
+
+
+def test_use_metrics_callback_close():
+    timings: list[Timing] = []
+    response = ResponseStream([content_chunk("Hello"), content_chunk(" World")])
+    with use_metrics_callback(timings.append):
+        streamed_str = complete(response, [StreamedStr])
+    streamed_str.close()
+    assert len(timings) == 1
+
+
+async def test_async_output_stream_timing():
+    timings: list[Timing] = []
+    response = AsyncResponseStream(
+        [content_chunk("Hello"), tool_call_chunk("1", "plus", '{"a": 1, "b": 2}')]
+    )
+    with use_metrics_callback(timings.append):
+        async_streamed_response = await acomplete(response, [AsyncStreamedResponse])
+    async for _ in async_streamed_response:
+        pass
+    [timing] = timings
+    assert timing.time_to_first_content is not None
+    assert timing.time_to_first_tool_call is not None
+    assert timing.total is not None
@@ -0,0 +1,56 @@
+from unittest.mock import patch
+
+import pytest
+
+from magentic.chat_model.timing import (
+    INTER_CHUNK_GAP_BUCKETS,
+    Timing,
+    TimingRecorder,
+    use_metrics_callback,
+)
+
+
+def test_timing_recorder():
+    times = iter([0.0, 0.5, 2.0, 2.002, 4.5, 5.0])
+    with patch("magentic.chat_model.timing.perf_counter", lambda: next(times)):
+        timing_recorder = TimingRecorder()
+        timing_recorder.request_sent()
+        timing_recorder.item_received(wait_start=1.0)
+        timing_recorder.content_received()
+        timing_recorder.item_received(wait_start=2.0)
+        timing_recorder.tool_call_received()
+        timing_recorder.add_parse(0.25)
+        timing_recorder.item_received(wait_start=3.0)
+        assert timing_recorder.timing.total is None
+        timing_recorder.finish()
+    timing = timing_recorder.timing
+    assert timing.request_build == 0.5
+    assert timing.time_to_first_byte == 1.5
+    assert timing.time_to_first_content == 1.5
+    assert timing.time_to_first_tool_call == pytest.approx(1.502)
+    assert len(timing.inter_chunk_gaps) == len(INTER_CHUNK_GAP_BUCKETS) + 1
+    assert timing.inter_chunk_gaps == (0, 1, 0, 0, 0, 0, 0, 1)
+    assert timing.parse == 0.25
+    assert timing.total == 5.0
+
+
+def test_timing_recorder_parsing_excludes_recorded_time():
+    times = iter([0.0, 1.0, 3.0, 3.5, 4.0])
+    with patch("magentic.chat_model.timing.perf_counter", lambda: next(times)):
+        timing_recorder = TimingRecorder()
+        with timing_recorder.parsing():  # Starts at 1.0
+            timing_recorder.item_received(wait_start=2.0)  # Waits 1.0
+            timing_recorder.add_parse(0.5)
+        # Ends at 3.5, of which 1.5 was already recorded
+    assert timing_recorder.timing.parse == 0.5 + 1.0
+
+
+def test_use_metrics_callback():
+    timings: list[Timing] = []
+    with use_metrics_callback(timings.append):
+        timing_recorder = TimingRecorder()
+    timing_recorder.finish()
+    timing_recorder.finish()
+    assert timings == [timing_recorder.timing]
+    TimingRecorder().finish()
+    assert len(timings) == 1
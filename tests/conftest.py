@@ -12,6 +12,8 @@ from pytest_mock import MockerFixture
 from vcr import VCR
 from vcr.request import Request
 
+from magentic.settings import reload_settings
+
 
 @pytest.fixture(autouse=True, scope="session")
 def _load_dotenv():
@@ -24,6 +26,13 @@ def _load_dotenv():
     os.environ["PYDANTIC_ERRORS_INCLUDE_URL"] = "false"
 
 
+@pytest.fixture(autouse=True)
+def _reload_settings():
+    """Reload settings after each test so environment variables set by it are undone"""
+    yield
+    reload_settings()
+
+
 def pytest_recording_configure(config: pytest.Config, vcr: VCR) -> None:
     """Register VCR matcher for JSON request bodies"""
 
@@ -6,6 +6,7 @@ from magentic.chat_model.litellm_chat_model import LitellmChatModel
 from magentic.chat_model.message import AssistantMessage, UserMessage
 from magentic.chat_model.mistral_chat_model import MistralChatModel
 from magentic.chat_model.openai_chat_model import OpenaiChatModel
+from magentic.settings import reload_settings
 
 
 def test_backend_anthropic_chat_model(monkeypatch):
@@ -15,6 +16,7 @@ def test_backend_anthropic_chat_model(monkeypatch):
     monkeypatch.setenv("MAGENTIC_ANTHROPIC_BASE_URL", "http://localhost:8080")
     monkeypatch.setenv("MAGENTIC_ANTHROPIC_MAX_TOKENS", "10")
     monkeypatch.setenv("MAGENTIC_ANTHROPIC_TEMPERATURE", "2")
+    reload_settings()
     chat_model = get_chat_model()
     assert isinstance(chat_model, AnthropicChatModel)
     assert chat_model.model == "claude-3-haiku-20240307"
@@ -32,6 +34,7 @@ def test_backend_mistral_chat_model(monkeypatch):
     monkeypatch.setenv("MAGENTIC_MISTRAL_MAX_TOKENS", "1024")
     monkeypatch.setenv("MAGENTIC_MISTRAL_SEED", "42")
     monkeypatch.setenv("MAGENTIC_MISTRAL_TEMPERATURE", "2")
+    reload_settings()
     chat_model = get_chat_model()
     assert isinstance(chat_model, MistralChatModel)
     assert chat_model.model == "mistral-large-latest"
@@ -51,6 +54,7 @@ def test_backend_openai_chat_model(monkeypatch):
     monkeypatch.setenv("MAGENTIC_OPENAI_MAX_TOKENS", "1024")
     monkeypatch.setenv("MAGENTIC_OPENAI_SEED", "42")
     monkeypatch.setenv("MAGENTIC_OPENAI_TEMPERATURE", "2")
+    reload_settings()
     chat_model = get_chat_model()
     assert isinstance(chat_model, OpenaiChatModel)
     assert chat_model.model == "gpt-4"
@@ -68,6 +72,7 @@ def test_backend_litellm_chat_model(monkeypatch):
     monkeypatch.setenv("MAGENTIC_LITELLM_MODEL", "claude-2")
     monkeypatch.setenv("MAGENTIC_LITELLM_MAX_TOKENS", "1024")
     monkeypatch.setenv("MAGENTIC_LITELLM_TEMPERATURE", "2")
+    reload_settings()
     chat_model = get_chat_model()
     assert isinstance(chat_model, LitellmChatModel)
     assert chat_model.api_base == "http://localhost:11434"
@@ -105,3 +110,15 @@ def test_chat_model_context_within_context(monkeypatch):
             assert get_chat_model().model == "gpt-5"  # type: ignore[attr-defined]
 
         assert get_chat_model().model == "gpt-4"  # type: ignore[attr-defined]
+
+
+def test_get_chat_model_reused_for_same_settings(monkeypatch):
+    monkeypatch.setenv("MAGENTIC_BACKEND", "openai")
+    monkeypatch.setenv("MAGENTIC_OPENAI_MODEL", "gpt-4")
+    reload_settings()
+    chat_model = get_chat_model()
+    assert get_chat_model() is chat_model
+    monkeypatch.setenv("MAGENTIC_OPENAI_MODEL", "gpt-4o")
+    assert get_chat_model() is chat_model
+    reload_settings()
+    assert get_chat_model() is not chat_model
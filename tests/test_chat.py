@@ -1,3 +1,4 @@
+import threading
 from typing import TYPE_CHECKING
 
 import pytest
@@ -13,7 +14,7 @@ from magentic.function_call import (
     FunctionCall,
     ParallelFunctionCall,
 )
-from magentic.streaming import async_iter
+from magentic.streaming import async_iter, use_stream_cache
 
 if TYPE_CHECKING:
     from collections.abc import Awaitable
@@ -31,6 +32,44 @@ def test_chat_last_message():
     assert chat.last_message == UserMessage(content="two")
 
 
+def test_chat_add_message_fork():
+    chat = Chat([UserMessage("Hello")])
+    chat_a = chat.add_assistant_message("A")
+    chat_b = chat.add_assistant_message("B")
+    assert chat.messages == [UserMessage("Hello")]
+    assert chat_a.messages == [UserMessage("Hello"), AssistantMessage("A")]
+    assert chat_b.messages == [UserMessage("Hello"), AssistantMessage("B")]
+    # Building the messages of a chat must not change those of its ancestors
+    chat_a_1 = chat_a.add_user_message("1")
+    assert len(chat_a_1.messages) == 3
+    assert chat_a.messages == [UserMessage("Hello"), AssistantMessage("A")]
+    assert chat_a_1.add_user_message("2").messages[2:] == [
+        UserMessage("1"),
+        UserMessage("2"),
+    ]
+
+
+def test_chat_messages_copy():
+    chat = Chat([UserMessage("Hello")])
+    chat.messages.append(UserMessage("Not added"))
+    assert chat.messages == [UserMessage("Hello")]
+
+
+def test_chat_many_messages():
+    chat = Chat()
+    for i in range(2000):
+        chat = chat.add_user_message(str(i))
+        assert chat.last_message == UserMessage(str(i))
+    assert [message.content for message in chat.messages] == [
+        str(i) for i in range(2000)
+    ]
+
+
+def test_chat_last_message_empty():
+    with pytest.raises(IndexError):
+        _ = Chat().last_message
+
+
 @pytest.mark.openai
 def test_chat_submit():
     chat1 = Chat(
@@ -89,6 +128,64 @@ def test_exec_function_call_parallel_function_call():
     assert chat.messages[3] == FunctionResultMessage(7, plus_3_4)
 
 
+def test_exec_function_call_parallel_function_call_stream_cache_none():
+    def plus(a: int, b: int) -> int:
+        return a + b
+
+    plus_1_2 = FunctionCall(plus, 1, 2)
+    plus_3_4 = FunctionCall(plus, 3, 4)
+    with use_stream_cache("none"):
+        parallel_function_call = ParallelFunctionCall(iter([plus_1_2, plus_3_4]))
+    chat = Chat(
+        messages=[AssistantMessage(content=parallel_function_call)],
+        functions=[plus],
+    )
+    chat = chat.exec_function_call()
+    assert chat.messages[1] == FunctionResultMessage(3, plus_1_2)
+    assert chat.messages[2] == FunctionResultMessage(7, plus_3_4)
+
+
+def test_exec_function_call_max_workers():
+    barrier = threading.Barrier(2, timeout=5)
+
+    def plus(a: int, b: int) -> int:
+        barrier.wait()  # Raises if the calls are not executed concurrently
+        return a + b
+
+    plus_1_2 = FunctionCall(plus, 1, 2)
+    plus_3_4 = FunctionCall(plus, 3, 4)
+    chat = Chat(
+        messages=[AssistantMessage(content=ParallelFunctionCall([plus_1_2, plus_3_4]))],
+        functions=[plus],
+    )
+    chat = chat.exec_function_call(max_workers=2)
+    assert chat.messages[1] == FunctionResultMessage(3, plus_1_2)
+    assert chat.messages[2] == FunctionResultMessage(7, plus_3_4)
+
+
+def test_exec_function_call_return_exceptions():
+    def divide(a: int, b: int) -> float:
+        return a / b
+
+    divide_1_0 = FunctionCall(divide, 1, 0)
+    divide_4_2 = FunctionCall(divide, 4, 2)
+    chat = Chat(
+        messages=[
+            AssistantMessage(content=ParallelFunctionCall([divide_1_0, divide_4_2]))
+        ],
+        functions=[divide],
+    )
+    with pytest.raises(ZeroDivisionError):
+        chat.exec_function_call()
+    chat = chat.exec_function_call(max_workers=2, return_exceptions=True)
+    assert chat.messages[1].content == "ZeroDivisionError: division by zero"
+    assert chat.messages[2] == FunctionResultMessage(2.0, divide_4_2)
+
+    chat = Chat(messages=[AssistantMessage(content=divide_1_0)], functions=[divide])
+    chat = chat.exec_function_call(return_exceptions=True)
+    assert chat.messages[1].content == "ZeroDivisionError: division by zero"
+
+
 def test_exec_function_call_raises():
     def plus(a: int, b: int) -> int:
         return a + b
@@ -135,6 +232,18 @@ async def test_aexec_function_call_not_async_function():
     assert chat.messages[2] == FunctionResultMessage(3, plus_1_2)
 
 
+async def test_aexec_function_call_runs_sync_function_in_thread():
+    def get_thread_id() -> int:
+        return threading.get_ident()
+
+    chat = Chat(
+        messages=[AssistantMessage(content=FunctionCall(get_thread_id))],
+        functions=[get_thread_id],
+    )
+    chat = await chat.aexec_function_call()
+    assert chat.messages[1].content != threading.get_ident()
+
+
 async def test_aexec_function_call_async_parallel_function_call():
     def plus(a: int, b: int) -> int:
         return a + b
@@ -158,6 +267,33 @@ async def test_aexec_function_call_async_parallel_function_call():
     assert chat.messages[3] == FunctionResultMessage(7, plus_3_4)
 
 
+async def test_aexec_function_call_return_exceptions():
+    async def adivide(a: int, b: int) -> float:
+        return a / b
+
+    adivide_1_0: FunctionCall[Awaitable[float]] = FunctionCall(adivide, 1, 0)
+    adivide_4_2: FunctionCall[Awaitable[float]] = FunctionCall(adivide, 4, 2)
+    chat = Chat(
+        messages=[
+            AssistantMessage(
+                content=AsyncParallelFunctionCall(
+                    async_iter([adivide_1_0, adivide_4_2])
+                )
+            )
+        ],
+        functions=[adivide],
+    )
+    with pytest.raises(ZeroDivisionError):
+        await chat.aexec_function_call()
+    chat = await chat.aexec_function_call(max_concurrency=1, return_exceptions=True)
+    assert chat.messages[1].content == "ZeroDivisionError: division by zero"
+    assert chat.messages[2] == FunctionResultMessage(2.0, adivide_4_2)
+
+    chat = Chat(messages=[AssistantMessage(content=adivide_1_0)], functions=[adivide])
+    chat = await chat.aexec_function_call(return_exceptions=True)
+    assert chat.messages[1].content == "ZeroDivisionError: division by zero"
+
+
 async def test_aexec_function_call_raises():
     async def aplus(a: int, b: int) -> int:
         return a + b
@@ -22,6 +22,7 @@ from magentic.chatprompt import (
     escape_braces,
 )
 from magentic.function_call import FunctionCall
+from magentic.streaming import get_stream_cache
 
 
 @pytest.mark.parametrize(
@@ -113,6 +114,17 @@ def test_chatpromptfunction_call():
     assert mock_model.complete.call_args.kwargs["stop"] == ["stop"]
 
 
+def test_chatpromptfunction_call_stream_cache():
+    mock_model = Mock()
+    mock_model.complete.side_effect = lambda **_: AssistantMessage(get_stream_cache())
+
+    @chatprompt(UserMessage("Hello."), stream_cache="compact", model=mock_model)
+    def say_hello() -> str: ...
+
+    assert say_hello() == "compact"
+    assert get_stream_cache() == "full"
+
+
 def test_chatprompt_decorator_docstring():
     @chatprompt(UserMessage("This is a user message."))
     def func(one: int) -> str:
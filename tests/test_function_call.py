@@ -1,13 +1,24 @@
+import asyncio
 import inspect
-from typing import TYPE_CHECKING
+import os
+import threading
+import time
+from collections.abc import AsyncIterator, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, Any
 
 import pytest
 from typing_extensions import assert_type
 
 from magentic.function_call import (
     AsyncParallelFunctionCall,
+    ExecutionPolicy,
     FunctionCall,
+    FunctionCallTimeoutError,
     ParallelFunctionCall,
+    execution_policy,
+    get_execution_policy,
 )
 from magentic.streaming import async_iter
 
@@ -23,6 +34,11 @@ async def async_plus(a: int, b: int) -> int:
     return a + b
 
 
+@execution_policy(executor="process")
+def get_pid() -> int:
+    return os.getpid()
+
+
 def plus_default_value(a: int, b: int = 3) -> int:
     return a + b
 
@@ -89,6 +105,105 @@ def test_parallel_function_call_call():
     assert result == (3, "hello")
 
 
+def test_parallel_function_call_call_max_workers():
+    barrier = threading.Barrier(3, timeout=5)
+
+    def wait_and_plus(a: int, b: int) -> int:
+        barrier.wait()  # Raises if the calls are not executed concurrently
+        return a + b
+
+    parallel_function_call = ParallelFunctionCall(
+        [FunctionCall(wait_and_plus, i, i) for i in range(3)]
+    )
+    assert parallel_function_call(max_workers=3) == (0, 2, 4)
+
+
+def test_parallel_function_call_call_executor_ordered_results():
+    def sleep_and_return(value: int) -> int:
+        time.sleep(0.01 * (3 - value))
+        return value
+
+    parallel_function_call = ParallelFunctionCall(
+        [FunctionCall(sleep_and_return, i) for i in range(3)]
+    )
+    with ThreadPoolExecutor() as executor:
+        assert parallel_function_call(executor=executor) == (0, 1, 2)
+
+
+def test_parallel_function_call_call_executor_starts_calls_as_received():
+    first_call_started = threading.Event()
+
+    def start() -> str:
+        first_call_started.set()
+        return "started"
+
+    def generate_function_calls() -> Iterator[FunctionCall[str]]:
+        yield FunctionCall(start)
+        # Waits forever if the first call is not executed before the stream ends
+        assert first_call_started.wait(timeout=5)
+        yield FunctionCall(return_hello)
+
+    parallel_function_call = ParallelFunctionCall(generate_function_calls())
+    assert parallel_function_call(max_workers=2) == ("started", "hello")
+
+
+def test_parallel_function_call_call_executor_context():
+    context_var = ContextVar("context_var", default="default")
+
+    def get_context_var() -> str:
+        return context_var.get()
+
+    parallel_function_call = ParallelFunctionCall([FunctionCall(get_context_var)])
+    token = context_var.set("value")
+    try:
+        assert parallel_function_call(max_workers=1) == ("value",)
+    finally:
+        context_var.reset(token)
+
+
+def raise_error(message: str) -> int:
+    raise ValueError(message)
+
+
+@pytest.mark.parametrize("max_workers", [None, 2])
+def test_parallel_function_call_call_return_exceptions(max_workers):
+    parallel_function_call = ParallelFunctionCall(
+        [
+            FunctionCall(raise_error, "first"),
+            FunctionCall(plus, a=1, b=2),
+            FunctionCall(raise_error, "second"),
+        ]
+    )
+    result = parallel_function_call(max_workers=max_workers, return_exceptions=True)
+    assert_type(result, tuple[int | Exception, ...])
+    assert [str(x) for x in result] == ["first", "3", "second"]
+    assert isinstance(result[0], ValueError)
+
+
+def test_parallel_function_call_call_raises_after_all_calls():
+    calls = []
+
+    def record_call(value: int) -> int:
+        calls.append(value)
+        return value
+
+    parallel_function_call = ParallelFunctionCall(
+        [FunctionCall(raise_error, "first"), FunctionCall(record_call, 1)]
+    )
+    with pytest.raises(ValueError, match="first"):
+        parallel_function_call(max_workers=1)
+    assert calls == [1]
+
+
+def test_parallel_function_call_call_executor_and_max_workers():
+    parallel_function_call = ParallelFunctionCall([FunctionCall(return_hello)])
+    with (
+        ThreadPoolExecutor() as executor,
+        pytest.raises(ValueError, match="executor and max_workers"),
+    ):
+        parallel_function_call(executor=executor, max_workers=1)
+
+
 def test_parallel_function_call_iter():
     function_calls: list[FunctionCall[int | str]] = [
         FunctionCall(plus, a=1, b=2),
@@ -119,3 +234,292 @@ async def test_async_parallel_function_call_aiter():
     async_parallel_function_call = AsyncParallelFunctionCall(async_iter(function_calls))
     assert [x async for x in async_parallel_function_call] == function_calls
     assert [x async for x in async_parallel_function_call] == function_calls
+
+
+async def test_async_parallel_function_call_call_starts_calls_as_received():
+    first_call_started = asyncio.Event()
+
+    async def start() -> str:
+        first_call_started.set()
+        await asyncio.sleep(0)
+        return "started"
+
+    async def generate_function_calls() -> AsyncIterator[FunctionCall[Any]]:
+        yield FunctionCall(start)
+        # Times out if the first call is not started before the stream ends
+        await asyncio.wait_for(first_call_started.wait(), timeout=5)
+        yield FunctionCall(plus, a=1, b=2)
+
+    async_parallel_function_call = AsyncParallelFunctionCall(generate_function_calls())
+    assert await async_parallel_function_call() == ("started", 3)
+
+
+async def test_async_parallel_function_call_call_cancels_on_stream_error():
+    cancelled = asyncio.Event()
+
+    async def wait_forever() -> None:
+        try:
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    async def generate_function_calls() -> AsyncIterator[FunctionCall[Any]]:
+        yield FunctionCall(wait_forever)
+        await asyncio.sleep(0)
+        msg = "Stream failed"
+        raise RuntimeError(msg)
+
+    async_parallel_function_call = AsyncParallelFunctionCall(generate_function_calls())
+    with pytest.raises(RuntimeError, match="Stream failed"):
+        await async_parallel_function_call()
+    assert cancelled.is_set()
+
+
+async def test_async_parallel_function_call_call_max_concurrency():
+    num_running = 0
+    max_num_running = 0
+
+    async def record_running() -> None:
+        nonlocal num_running, max_num_running
+        num_running += 1
+        max_num_running = max(max_num_running, num_running)
+        await asyncio.sleep(0.01)
+        num_running -= 1
+
+    async_parallel_function_call = AsyncParallelFunctionCall(
+        async_iter([FunctionCall(record_running) for _ in range(5)])
+    )
+    await async_parallel_function_call(max_concurrency=2)
+    assert max_num_running == 2
+
+
+async def test_async_parallel_function_call_call_return_exceptions():
+    async def async_raise_error(message: str) -> int:
+        raise ValueError(message)
+
+    function_calls: list[FunctionCall[int | Awaitable[int]]] = [
+        FunctionCall(async_raise_error, "first"),
+        FunctionCall(plus, a=1, b=2),
+        FunctionCall(raise_error, "second"),
+    ]
+    async_parallel_function_call = AsyncParallelFunctionCall(async_iter(function_calls))
+    result = await async_parallel_function_call(return_exceptions=True)
+    assert_type(result, tuple[int | Exception, ...])
+    assert [str(x) for x in result] == ["first", "3", "second"]
+    with pytest.raises(ValueError, match="first"):
+        await async_parallel_function_call()
+
+
+def test_execution_policy():
+    @execution_policy(run_in_thread=False)
+    def return_one() -> int:
+        return 1
+
+    assert return_one() == 1
+    assert get_execution_policy(return_one) == ExecutionPolicy(run_in_thread=False)
+    assert get_execution_policy(return_hello) == ExecutionPolicy(run_in_thread=True)
+
+
+async def test_async_parallel_function_call_call_sync_function_does_not_block():
+    stream_consumed = threading.Event()
+
+    def wait_for_stream() -> bool:
+        # Blocks the event loop forever if not run in a thread
+        return stream_consumed.wait(timeout=5)
+
+    async def consume_stream() -> list[int]:
+        async def generate() -> AsyncIterator[int]:
+            for i in range(3):
+                await asyncio.sleep(0.01)
+                yield i
+
+        chunks = [chunk async for chunk in generate()]
+        stream_consumed.set()
+        return chunks
+
+    async_parallel_function_call = AsyncParallelFunctionCall(
+        async_iter([FunctionCall(wait_for_stream)])
+    )
+    results, chunks = await asyncio.gather(
+        async_parallel_function_call(), consume_stream()
+    )
+    assert results == (True,)
+    assert chunks == [0, 1, 2]
+
+
+async def test_async_parallel_function_call_call_run_in_thread_false():
+    @execution_policy(run_in_thread=False)
+    def get_thread_id() -> int:
+        return threading.get_ident()
+
+    def get_thread_id_in_thread() -> int:
+        return threading.get_ident()
+
+    async_parallel_function_call = AsyncParallelFunctionCall(
+        async_iter([FunctionCall(get_thread_id), FunctionCall(get_thread_id_in_thread)])
+    )
+    thread_id, thread_id_in_thread = await async_parallel_function_call()
+    assert thread_id == threading.get_ident()
+    assert thread_id_in_thread != threading.get_ident()
+
+
+async def test_async_parallel_function_call_call_copies_context_to_thread():
+    var: ContextVar[str] = ContextVar("var")
+    var.set("value")
+
+    def get_var() -> str:
+        return var.get()
+
+    async_parallel_function_call = AsyncParallelFunctionCall(
+        async_iter([FunctionCall(get_var)])
+    )
+    assert await async_parallel_function_call() == ("value",)
+
+
+@pytest.mark.parametrize(
+    ("kwargs", "match"),
+    [
+        ({"executor": "fiber"}, "executor must be"),
+        ({"max_concurrency": 0}, "max_concurrency must be at least 1"),
+        ({"timeout": 0}, "timeout must be greater than 0"),
+    ],
+)
+def test_execution_policy_invalid(kwargs, match):
+    with pytest.raises(ValueError, match=match):
+        execution_policy(**kwargs)
+
+
+def test_execution_policy_executor_async_function():
+    with pytest.raises(ValueError, match="only be set for sync functions"):
+        execution_policy(executor="thread")(async_plus)
+
+
+def test_function_call_call_timeout():
+    release = threading.Event()
+
+    @execution_policy(timeout=0.01)
+    def wait_for_release() -> bool:
+        return release.wait(timeout=5)
+
+    with pytest.raises(FunctionCallTimeoutError, match="wait_for_release timed out"):
+        FunctionCall(wait_for_release)()
+    release.set()
+
+    @execution_policy(timeout=5)
+    def return_one() -> int:
+        return 1
+
+    assert FunctionCall(return_one)() == 1
+
+
+def test_function_call_call_timeout_function_raises_timeout_error():
+    @execution_policy(timeout=5)
+    def raise_timeout_error() -> None:
+        raise TimeoutError
+
+    with pytest.raises(TimeoutError) as exc_info:
+        FunctionCall(raise_timeout_error)()
+    assert not isinstance(exc_info.value, FunctionCallTimeoutError)
+
+
+def test_function_call_call_executor_process():
+    assert FunctionCall(get_pid)() != os.getpid()
+
+
+def test_function_call_call_executor_instance():
+    with ThreadPoolExecutor(thread_name_prefix="custom") as executor:
+
+        @execution_policy(executor=executor)
+        def get_thread_name() -> str:
+            return threading.current_thread().name
+
+        assert FunctionCall(get_thread_name)().startswith("custom")
+
+
+def test_parallel_function_call_call_max_concurrency_policy():
+    lock = threading.Lock()
+    num_running = 0
+    max_num_running = 0
+
+    @execution_policy(max_concurrency=2)
+    def record_running() -> None:
+        nonlocal num_running, max_num_running
+        with lock:
+            num_running += 1
+            max_num_running = max(max_num_running, num_running)
+        time.sleep(0.02)
+        with lock:
+            num_running -= 1
+
+    parallel_function_call = ParallelFunctionCall(
+        [FunctionCall(record_running) for _ in range(6)]
+    )
+    parallel_function_call(max_workers=6)
+    assert max_num_running == 2
+
+
+async def test_async_parallel_function_call_call_max_concurrency_policy():
+    num_running = 0
+    max_num_running = 0
+
+    @execution_policy(max_concurrency=2)
+    async def record_running() -> None:
+        nonlocal num_running, max_num_running
+        num_running += 1
+        max_num_running = max(max_num_running, num_running)
+        await asyncio.sleep(0.01)
+        num_running -= 1
+
+    async_parallel_function_call = AsyncParallelFunctionCall(
+        async_iter([FunctionCall(record_running) for _ in range(6)])
+    )
+    await async_parallel_function_call()
+    assert max_num_running == 2
+
+
+async def test_async_parallel_function_call_call_timeout():
+    cancelled = asyncio.Event()
+
+    @execution_policy(timeout=0.01)
+    async def wait_forever() -> None:
+        try:
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    function_calls: list[FunctionCall[int | None | Awaitable[int | None]]] = [
+        FunctionCall(wait_forever),
+        FunctionCall(async_plus, 1, 2),
+    ]
+    async_parallel_function_call: AsyncParallelFunctionCall[int | None] = (
+        AsyncParallelFunctionCall(async_iter(function_calls))
+    )
+    timeout_error, result = await async_parallel_function_call(return_exceptions=True)
+    assert isinstance(timeout_error, FunctionCallTimeoutError)
+    assert result == 3
+    assert cancelled.is_set()
+
+
+async def test_async_parallel_function_call_call_timeout_sync_function():
+    release = threading.Event()
+
+    @execution_policy(timeout=0.01)
+    def wait_for_release() -> bool:
+        return release.wait(timeout=5)
+
+    async_parallel_function_call = AsyncParallelFunctionCall(
+        async_iter([FunctionCall(wait_for_release)])
+    )
+    with pytest.raises(FunctionCallTimeoutError):
+        await async_parallel_function_call()
+    release.set()
+
+
+async def test_async_parallel_function_call_call_executor_process():
+    async_parallel_function_call = AsyncParallelFunctionCall(
+        async_iter([FunctionCall(get_pid)])
+    )
+    (pid,) = await async_parallel_function_call()
+    assert pid != os.getpid()
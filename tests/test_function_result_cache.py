@@ -0,0 +1,170 @@
+import time
+from typing import TYPE_CHECKING
+from unittest.mock import Mock
+
+import pytest
+
+from magentic.function_call import (
+    AsyncParallelFunctionCall,
+    FunctionCall,
+    ParallelFunctionCall,
+    execution_policy,
+)
+from magentic.function_result_cache import (
+    MISSING,
+    DiskFunctionResultCache,
+    FunctionResultCache,
+)
+from magentic.streaming import async_iter
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable
+
+
+def plus(a: int, b: int = 0) -> int:
+    return a + b
+
+
+def minus(a: int, b: int) -> int:
+    return a - b
+
+
+def test_function_result_cache_key():
+    cache = FunctionResultCache()
+    assert cache.key(FunctionCall(plus, 1, 2)) == cache.key(
+        FunctionCall(plus, a=1, b=2)
+    )
+    assert cache.key(FunctionCall(plus, 1, 2)) == f'{__name__}.plus:{{"a":1,"b":2}}'
+    assert cache.key(FunctionCall(plus, 1, 2)) != cache.key(FunctionCall(plus, 2, 1))
+    assert cache.key(FunctionCall(plus, 1, 2)) != cache.key(FunctionCall(minus, 1, 2))
+
+
+@pytest.mark.parametrize(
+    ("kwargs", "match"),
+    [
+        ({"maxsize": 0}, "maxsize must be at least 1"),
+        ({"ttl": 0}, "ttl must be greater than 0"),
+    ],
+)
+def test_function_result_cache_invalid(kwargs, match):
+    with pytest.raises(ValueError, match=match):
+        FunctionResultCache(**kwargs)
+
+
+@pytest.fixture(params=["memory", "disk"])
+def cache_factory(request, tmp_path):
+    if request.param == "memory":
+        return FunctionResultCache
+    return lambda **kwargs: DiskFunctionResultCache(tmp_path / "cache.db", **kwargs)
+
+
+def test_function_result_cache_get_set(cache_factory):
+    cache = cache_factory()
+    assert cache.get("key") is MISSING
+    cache.set("key", {"value": [1, 2]})
+    assert cache.get("key") == {"value": [1, 2]}
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert cache.hit_rate == 0.5
+    assert len(cache) == 1
+
+    cache.clear()
+    assert cache.get("key") is MISSING
+    assert (cache.hits, cache.misses) == (0, 1)
+    assert len(cache) == 0
+
+
+def test_function_result_cache_maxsize(cache_factory):
+    cache = cache_factory(maxsize=2)
+    cache.set("a", 1)
+    time.sleep(0.001)  # Order by time of use on disk
+    cache.set("b", 2)
+    time.sleep(0.001)
+    assert cache.get("a") == 1  # Now "b" is the least recently used
+    time.sleep(0.001)
+    cache.set("c", 3)
+    assert len(cache) == 2
+    assert cache.get("a") == 1
+    assert cache.get("b") is MISSING
+    assert cache.get("c") == 3
+
+
+def test_function_result_cache_ttl(cache_factory, monkeypatch):
+    cache = cache_factory(ttl=10)
+    cache.set("key", 1)
+    assert cache.get("key") == 1
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 11)
+    assert cache.get("key") is MISSING
+    assert len(cache) == 0
+
+
+def test_disk_function_result_cache_persists(tmp_path):
+    DiskFunctionResultCache(tmp_path / "cache.db").set("key", [1, 2])
+    assert DiskFunctionResultCache(tmp_path / "cache.db").get("key") == [1, 2]
+
+
+def test_function_call_call_cache():
+    cache = FunctionResultCache()
+    mock_plus = Mock(side_effect=plus)
+
+    @execution_policy(cache=cache)
+    def cached_plus(a: int, b: int) -> int:
+        return mock_plus(a, b)  # type: ignore[no-any-return]
+
+    assert FunctionCall(cached_plus, 1, 2)() == 3
+    assert FunctionCall(cached_plus, a=1, b=2)() == 3
+    assert FunctionCall(cached_plus, 2, 2)() == 4
+    assert mock_plus.call_count == 2
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_function_call_call_cache_exception_not_cached():
+    cache = FunctionResultCache()
+    mock_function = Mock(side_effect=[ValueError("Error"), 1])
+
+    @execution_policy(cache=cache)
+    def flaky() -> int:
+        return mock_function()  # type: ignore[no-any-return]
+
+    with pytest.raises(ValueError, match="Error"):
+        FunctionCall(flaky)()
+    assert FunctionCall(flaky)() == 1
+    assert FunctionCall(flaky)() == 1
+    assert mock_function.call_count == 2
+
+
+def test_parallel_function_call_call_cache():
+    cache = FunctionResultCache()
+    mock_plus = Mock(side_effect=plus)
+
+    @execution_policy(cache=cache)
+    def cached_plus(a: int, b: int) -> int:
+        return mock_plus(a, b)  # type: ignore[no-any-return]
+
+    parallel_function_call = ParallelFunctionCall(
+        [FunctionCall(cached_plus, 1, 2), FunctionCall(cached_plus, 3, 4)]
+    )
+    assert parallel_function_call(max_workers=2) == (3, 7)
+    assert parallel_function_call() == (3, 7)
+    assert mock_plus.call_count == 2
+    assert (cache.hits, cache.misses) == (2, 2)
+
+
+async def test_async_parallel_function_call_call_cache():
+    cache = FunctionResultCache()
+    mock_plus = Mock(side_effect=plus)
+
+    @execution_policy(cache=cache)
+    async def cached_aplus(a: int, b: int) -> int:
+        return mock_plus(a, b)  # type: ignore[no-any-return]
+
+    function_calls: list[FunctionCall[int | Awaitable[int]]] = [
+        FunctionCall(cached_aplus, 1, 2),
+        FunctionCall(cached_aplus, 1, 2),
+    ]
+    async_parallel_function_call: AsyncParallelFunctionCall[int] = (
+        AsyncParallelFunctionCall(async_iter(function_calls))
+    )
+    assert await async_parallel_function_call(max_concurrency=1) == (3, 3)
+    assert mock_plus.call_count == 1
+    assert (cache.hits, cache.misses) == (1, 1)
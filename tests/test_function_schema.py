@@ -5,16 +5,22 @@ from collections import OrderedDict
 from typing import Annotated, Any, Generic, TypeVar, get_origin
 
 import pytest
-from pydantic import BaseModel, Field, create_model
+from pydantic import BaseModel, Field, ValidationError, create_model
 
 from magentic._pydantic import ConfigDict, with_config
+from magentic._streamed_model import AsyncStreamedModel, StreamedModel
 from magentic.chat_model.function_schema import (
     AnyFunctionSchema,
     AsyncIterableFunctionSchema,
+    AsyncStreamedModelFunctionSchema,
     BaseModelFunctionSchema,
     DictFunctionSchema,
     FunctionCallFunctionSchema,
+    FunctionSchema,
     IterableFunctionSchema,
+    StreamedModelFunctionSchema,
+    get_async_function_schemas,
+    get_function_schemas,
 )
 from magentic.function_call import FunctionCall
 from magentic.streaming import async_iter
@@ -565,6 +571,116 @@ def test_base_model_function_schema_generic_model():
     )
 
 
+def test_streamed_model_function_schema():
+    function_schema = StreamedModelFunctionSchema(StreamedModel[User])
+    assert function_schema.dict() == BaseModelFunctionSchema(User).dict()
+
+
+def test_streamed_model_function_schema_parse_args():
+    function_schema = StreamedModelFunctionSchema(StreamedModel[User])
+    streamed_model = function_schema.parse_args(
+        ['{"na', 'me": "Al', 'ice", "a', 'ge": 9', "9}"]
+    )
+    partials = list(streamed_model)
+    assert [(partial.name, partial.age) for partial in partials] == [
+        ("Al", None),
+        ("Alice", None),
+        ("Alice", 9),
+        ("Alice", 99),
+        ("Alice", 99),
+    ]
+    assert all(isinstance(partial, User) for partial in partials)
+    assert type(partials[-1]) is User
+    assert streamed_model.to_model() == User(name="Alice", age=99)
+
+
+def test_streamed_model_function_schema_parse_args_nested_model():
+    class Team(BaseModel):
+        members: list[User]
+
+    function_schema = StreamedModelFunctionSchema(StreamedModel[Team])
+    partials = list(
+        function_schema.parse_args(
+            [
+                '{"members": [{"name": "Alice", "age": 99}, {"name": "Bo',
+                'b", "age": 3}]}',
+            ]
+        )
+    )
+    assert [(member.name, member.age) for member in partials[0].members] == [
+        ("Alice", 99),
+        ("Bo", None),
+    ]
+    assert type(partials[-1]) is Team
+    assert partials[-1] == Team(
+        members=[User(name="Alice", age=99), User(name="Bob", age=3)]
+    )
+
+
+def test_streamed_model_function_schema_parse_args_leading_whitespace():
+    function_schema = StreamedModelFunctionSchema(StreamedModel[User])
+    streamed_model = function_schema.parse_args([" ", '{"name": "Alice", "age": 99}'])
+    assert streamed_model.to_model() == User(name="Alice", age=99)
+
+
+@pytest.mark.parametrize("chunks", [[" "], ['{"name": "Alice",', " 99}"]])
+def test_streamed_model_function_schema_parse_args_invalid_json(chunks):
+    function_schema = StreamedModelFunctionSchema(StreamedModel[User])
+    streamed_model = function_schema.parse_args(chunks)
+    with pytest.raises(ValidationError):
+        streamed_model.to_model()
+
+
+def test_streamed_model_retains_latest_partial():
+    function_schema = StreamedModelFunctionSchema(StreamedModel[User])
+    streamed_model = function_schema.parse_args(
+        iter(['{"name": "Al', 'ice", "age": 9', "9}"])
+    )
+    partial = next(iter(streamed_model))
+    assert partial.model_dump() == {"name": "Al", "age": None}
+    assert [(partial.name, partial.age) for partial in streamed_model] == [
+        ("Al", None),
+        ("Alice", 9),
+        ("Alice", 99),
+        ("Alice", 99),
+    ]
+    assert [(partial.name, partial.age) for partial in streamed_model] == [
+        ("Alice", 99)
+    ]
+
+
+def test_streamed_model_function_schema_serialize_args():
+    function_schema = StreamedModelFunctionSchema(StreamedModel[User])
+    streamed_model = StreamedModel([User(name="Alice", age=99)])
+    assert json.loads(function_schema.serialize_args(streamed_model)) == {
+        "name": "Alice",
+        "age": 99,
+    }
+
+
+async def test_async_streamed_model_function_schema_aparse_args():
+    function_schema = AsyncStreamedModelFunctionSchema(AsyncStreamedModel[User])
+    streamed_model = await function_schema.aparse_args(
+        async_iter(['{"name": "Al', 'ice", "age": 99}'])
+    )
+    partials = [partial async for partial in streamed_model]
+    assert [(partial.name, partial.age) for partial in partials] == [
+        ("Al", None),
+        ("Alice", 99),
+        ("Alice", 99),
+    ]
+    assert await streamed_model.to_model() == User(name="Alice", age=99)
+
+
+async def test_async_streamed_model_function_schema_aserialize_args():
+    function_schema = AsyncStreamedModelFunctionSchema(AsyncStreamedModel[User])
+    streamed_model = AsyncStreamedModel(async_iter([User(name="Alice", age=99)]))
+    assert json.loads(await function_schema.aserialize_args(streamed_model)) == {
+        "name": "Alice",
+        "age": 99,
+    }
+
+
 def plus(a: int, b: int) -> int:
     return a + b
 
@@ -593,6 +709,12 @@ def plus_with_kwargs_no_type_hints(a, **kwargs):
     return a + sum(kwargs.values())
 
 
+def plus_with_all_parameter_kinds(
+    a: int, /, b: int, *args: int, c: int, **kwargs: int
+) -> int:
+    return a + b + sum(args) + c + sum(kwargs.values())
+
+
 def plus_with_annotated(
     a: Annotated[int, Field(description="First number")],
     b: Annotated[int, Field(description="Second number")],
@@ -856,6 +978,11 @@ function_call_function_schema_args_test_cases = [
         '{"a": 1, "kwargs": {"b": 2, "c": 3}}',
         FunctionCall(plus_with_kwargs_no_type_hints, 1, b=2, c=3),
     ),
+    (
+        plus_with_all_parameter_kinds,
+        '{"a": 1, "b": 2, "args": [3, 4], "c": 5, "kwargs": {"d": 6}}',
+        FunctionCall(plus_with_all_parameter_kinds, 1, 2, 3, 4, c=5, d=6),
+    ),
     (
         plus_with_annotated,
         '{"a": 1, "b": 2}',
@@ -914,3 +1041,26 @@ def test_function_call_function_schema_serialize_invalid_args(
     """Invalid function arguments should serialize so LLM errors can be resubmitted."""
     serialized_args = FunctionCallFunctionSchema(function).serialize_args(args)
     assert json.loads(serialized_args) == json.loads(expected_args_str)
+
+
+def test_get_function_schemas_reuses_schemas():
+    function_schemas = get_function_schemas([plus], [int, list[str]])
+    assert [schema.name for schema in function_schemas] == [
+        "plus",
+        "return_int",
+        "return_list_of_str",
+    ]
+    assert get_function_schemas([plus], [int, list[str]]) is function_schemas
+    assert get_function_schemas([plus], [int]) != function_schemas
+    async_function_schemas = get_async_function_schemas([plus], [int, list[str]])
+    assert async_function_schemas is not function_schemas
+    assert (
+        get_async_function_schemas([plus], [int, list[str]]) is async_function_schemas
+    )
+
+
+def test_get_function_schemas_unhashable_output_type():
+    output_type: Any = Annotated[int, {"unhashable": True}]
+    function_schema: FunctionSchema[Any] = get_function_schemas(None, [output_type])[0]
+    assert function_schema.parse_args(['{"value": 1}']) == 1
+    assert get_function_schemas(None, [output_type])[0] is not function_schema
@@ -0,0 +1,47 @@
+import subprocess
+import sys
+
+import pytest
+
+
+def get_import_times(code: str) -> dict[str, int]:
+    """Run `code` in a new interpreter and return the import time of each module.
+
+    The times are the cumulative times in microseconds reported by `-X importtime`.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    import_times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, module_name = line.split("|")
+        if cumulative.strip().isdigit():  # Skip the header
+            import_times[module_name.strip()] = int(cumulative)
+    return import_times
+
+
+@pytest.mark.parametrize("package", ["anthropic", "litellm", "mistralai", "openai"])
+def test_import_magentic_does_not_import_provider_package(package):
+    import_times = get_import_times("import magentic")
+    assert "magentic" in import_times
+    assert not any(
+        module_name == package or module_name.startswith(f"{package}.")
+        for module_name in import_times
+    )
+
+
+def test_import_magentic_openai_chat_model_lazily():
+    import_times = get_import_times("import magentic; magentic.OpenaiChatModel")
+    assert "openai" in import_times
+
+
+def test_import_magentic_unknown_attribute():
+    import magentic
+
+    with pytest.raises(AttributeError, match="has no attribute 'NotAnAttribute'"):
+        magentic.NotAnAttribute  # noqa: B018
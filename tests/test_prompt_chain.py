@@ -1,10 +1,23 @@
+import asyncio
+import threading
+from typing import Any
 from unittest.mock import AsyncMock, Mock
 
 import pytest
 
-from magentic.chat_model.message import AssistantMessage, UserMessage
-from magentic.function_call import FunctionCall
+from magentic.chat_model.message import (
+    AssistantMessage,
+    FunctionResultMessage,
+    UserMessage,
+)
+from magentic.function_call import (
+    AsyncParallelFunctionCall,
+    FunctionCall,
+    ParallelFunctionCall,
+    execution_policy,
+)
 from magentic.prompt_chain import MaxFunctionCallsError, prompt_chain
+from magentic.streaming import async_iter, get_stream_cache
 
 
 @pytest.mark.openai
@@ -61,6 +74,146 @@ def test_prompt_chain_max_calls():
     assert mock_function.call_count == 1
 
 
+def test_prompt_chain_parallel_function_call():
+    barrier = threading.Barrier(3, timeout=5)
+
+    def plus(a: int, b: int) -> int:
+        barrier.wait()  # Raises if the calls are not executed concurrently
+        return a + b
+
+    mock_model = Mock()
+    mock_model.complete.side_effect = [
+        AssistantMessage(
+            ParallelFunctionCall(
+                [
+                    FunctionCall(plus, 1, 2),
+                    FunctionCall(plus, 3, 4),
+                    FunctionCall(plus, 5, 6),
+                ]
+            )
+        ),
+        AssistantMessage("Done"),
+    ]
+
+    @prompt_chain(template="...", functions=[plus], model=mock_model, max_calls=3)
+    def add_numbers() -> str: ...
+
+    assert add_numbers() == "Done"
+    assert mock_model.complete.call_count == 2
+    messages = mock_model.complete.call_args.kwargs["messages"]
+    assert [m.content for m in messages if isinstance(m, FunctionResultMessage)] == [
+        3,
+        7,
+        11,
+    ]
+
+
+def test_prompt_chain_max_parallel():
+    lock = threading.Lock()
+    num_running = 0
+    max_num_running = 0
+
+    def record_running() -> None:
+        nonlocal num_running, max_num_running
+        with lock:
+            num_running += 1
+            max_num_running = max(max_num_running, num_running)
+        threading.Event().wait(0.05)
+        with lock:
+            num_running -= 1
+
+    mock_model = Mock()
+    mock_model.complete.side_effect = [
+        AssistantMessage(
+            ParallelFunctionCall([FunctionCall(record_running) for _ in range(6)])
+        ),
+        AssistantMessage("Done"),
+    ]
+
+    @prompt_chain(
+        template="...", functions=[record_running], model=mock_model, max_parallel=2
+    )
+    def run() -> str: ...
+
+    assert run() == "Done"
+    assert max_num_running == 2
+
+
+def test_prompt_chain_max_calls_counts_parallel_function_calls():
+    mock_function = Mock()
+    mock_function.__name__ = "mock_function_name"
+    mock_model = Mock()
+    mock_model.complete.return_value = AssistantMessage(
+        ParallelFunctionCall([FunctionCall(mock_function) for _ in range(3)])
+    )
+
+    @prompt_chain(
+        template="...", functions=[mock_function], model=mock_model, max_calls=2
+    )
+    def make_function_calls() -> str: ...
+
+    with pytest.raises(MaxFunctionCallsError):
+        make_function_calls()
+    # Calls within the limit are executed as they are received
+    assert mock_function.call_count == 2
+
+
+def test_prompt_chain_function_timeout():
+    release = threading.Event()
+
+    @execution_policy(timeout=0.01)
+    def wait_for_release() -> bool:
+        return release.wait(timeout=5)
+
+    mock_model = Mock()
+    mock_model.complete.side_effect = [
+        AssistantMessage(FunctionCall(wait_for_release)),
+        AssistantMessage("Done"),
+    ]
+
+    @prompt_chain(template="...", functions=[wait_for_release], model=mock_model)
+    def run() -> str: ...
+
+    assert run() == "Done"
+    release.set()
+    messages = mock_model.complete.call_args.kwargs["messages"]
+    assert messages[-1].content == (
+        "FunctionCallTimeoutError: Function wait_for_release timed out after 0.01"
+        " seconds"
+    )
+
+
+def test_prompt_chain_function_raises():
+    def raise_error() -> None:
+        msg = "Error"
+        raise ValueError(msg)
+
+    mock_model = Mock()
+    mock_model.complete.return_value = AssistantMessage(FunctionCall(raise_error))
+
+    @prompt_chain(template="...", functions=[raise_error], model=mock_model)
+    def run() -> str: ...
+
+    with pytest.raises(ValueError, match="Error"):
+        run()
+
+
+def test_prompt_chain_max_parallel_invalid():
+    with pytest.raises(ValueError, match="max_parallel"):
+        prompt_chain(template="...", max_parallel=0)
+
+
+def test_prompt_chain_stream_cache():
+    mock_model = Mock()
+    mock_model.complete.side_effect = lambda **_: AssistantMessage(get_stream_cache())
+
+    @prompt_chain(template="...", model=mock_model, stream_cache="none")
+    def get_stream_cache_mode() -> str: ...
+
+    assert get_stream_cache_mode() == "none"
+    assert get_stream_cache() == "full"
+
+
 @pytest.mark.openai
 async def test_async_prompt_chain():
     async def get_current_weather(location, unit="fahrenheit"):
@@ -113,3 +266,67 @@ async def test_async_prompt_chain_max_calls():
         await make_function_call()
     assert mock_model.acomplete.call_count == 2
     assert mock_function.call_count == 1
+
+
+async def test_async_prompt_chain_parallel_function_call():
+    num_running = 0
+    max_num_running = 0
+
+    async def plus(a: int, b: int) -> int:
+        nonlocal num_running, max_num_running
+        num_running += 1
+        max_num_running = max(max_num_running, num_running)
+        await asyncio.sleep(0.01)
+        num_running -= 1
+        return a + b
+
+    def minus(a: int, b: int) -> int:
+        return a - b
+
+    function_calls: list[FunctionCall[Any]] = [
+        FunctionCall(plus, 1, 2),
+        FunctionCall(minus, 3, 4),
+        FunctionCall(plus, 5, 6),
+        FunctionCall(plus, 7, 8),
+    ]
+    mock_model = AsyncMock()
+    mock_model.acomplete.side_effect = [
+        AssistantMessage(AsyncParallelFunctionCall(async_iter(function_calls))),
+        AssistantMessage("Done"),
+    ]
+
+    @prompt_chain(
+        template="...", functions=[plus, minus], model=mock_model, max_parallel=2
+    )
+    async def add_numbers() -> str: ...
+
+    assert await add_numbers() == "Done"
+    assert max_num_running == 2
+    messages = mock_model.acomplete.call_args.kwargs["messages"]
+    assert [m.content for m in messages if isinstance(m, FunctionResultMessage)] == [
+        3,
+        -1,
+        11,
+        15,
+    ]
+
+
+async def test_async_prompt_chain_function_timeout():
+    @execution_policy(timeout=0.01)
+    async def wait_forever() -> None:
+        await asyncio.Event().wait()
+
+    mock_model = AsyncMock()
+    mock_model.acomplete.side_effect = [
+        AssistantMessage(FunctionCall(wait_forever)),
+        AssistantMessage("Done"),
+    ]
+
+    @prompt_chain(template="...", functions=[wait_forever], model=mock_model)
+    async def run() -> str: ...
+
+    assert await run() == "Done"
+    messages = mock_model.acomplete.call_args.kwargs["messages"]
+    assert messages[-1].content == (
+        "FunctionCallTimeoutError: Function wait_forever timed out after 0.01 seconds"
+    )
@@ -17,7 +17,7 @@ from magentic.function_call import (
 )
 from magentic.prompt_function import AsyncPromptFunction, PromptFunction, prompt
 from magentic.settings import get_settings
-from magentic.streaming import AsyncStreamedStr, StreamedStr
+from magentic.streaming import AsyncStreamedStr, StreamedStr, get_stream_cache
 
 
 def test_promptfunction_format():
@@ -58,6 +58,17 @@ def test_promptfunction_call():
     assert mock_model.complete.call_args.kwargs["stop"] == ["stop"]
 
 
+def test_promptfunction_call_stream_cache():
+    mock_model = Mock()
+    mock_model.complete.side_effect = lambda **_: AssistantMessage(get_stream_cache())
+
+    @prompt("Hello.", stream_cache="none", model=mock_model)
+    def say_hello() -> str: ...
+
+    assert say_hello() == "none"
+    assert get_stream_cache() == "full"
+
+
 @pytest.mark.openai
 def test_decorator_return_str():
     @prompt("What is the capital of {country}? Name only. No punctuation.")
@@ -223,6 +234,17 @@ async def test_async_promptfunction_call():
     assert mock_model.acomplete.call_args.kwargs["stop"] == ["stop"]
 
 
+async def test_async_promptfunction_call_stream_cache():
+    mock_model = AsyncMock()
+    mock_model.acomplete.side_effect = lambda **_: AssistantMessage(get_stream_cache())
+
+    @prompt("Hello.", stream_cache="compact", model=mock_model)
+    async def say_hello() -> str: ...
+
+    assert await say_hello() == "compact"
+    assert get_stream_cache() == "full"
+
+
 @pytest.mark.openai
 async def test_async_decorator_return_str():
     @prompt("What is the capital of {country}? Name only. No punctuation.")
@@ -0,0 +1,33 @@
+import pytest
+from pydantic import ValidationError
+
+from magentic.backend import get_chat_model
+from magentic.settings import get_settings, reload_settings, use_settings
+
+
+def test_get_settings_cached(monkeypatch):
+    settings = get_settings()
+    assert get_settings() is settings
+    monkeypatch.setenv("MAGENTIC_OPENAI_MODEL", "gpt-4o-mini")
+    assert get_settings() is settings
+    assert reload_settings().openai_model == "gpt-4o-mini"
+    assert get_settings().openai_model == "gpt-4o-mini"
+
+
+def test_use_settings(monkeypatch):
+    monkeypatch.setenv("MAGENTIC_OPENAI_MODEL", "gpt-4o-mini")
+    reload_settings()
+    with use_settings(openai_temperature=0.5) as settings:
+        assert get_settings() is settings
+        assert settings.openai_model == "gpt-4o-mini"
+        assert settings.openai_temperature == 0.5
+        assert get_chat_model().temperature == 0.5  # type: ignore[attr-defined]
+        with use_settings(openai_model="gpt-4o"):
+            assert get_settings().openai_model == "gpt-4o"
+            assert get_settings().openai_temperature == 0.5
+    assert get_settings().openai_temperature is None
+
+
+def test_use_settings_invalid():
+    with pytest.raises(ValidationError), use_settings(not_a_setting=1):
+        pass
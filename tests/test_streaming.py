@@ -1,4 +1,7 @@
-from collections.abc import AsyncIterator
+import copy
+import json
+from collections.abc import AsyncIterator, Iterator
+from typing import Any
 
 import pytest
 
@@ -6,17 +9,28 @@ from magentic import AsyncStreamedStr, StreamedStr
 from magentic.streaming import (
     CachedAsyncIterable,
     CachedIterable,
+    CompactCachedAsyncIterable,
+    CompactCachedIterable,
+    JsonArrayScanner,
+    PartialJsonParser,
+    SinglePassAsyncIterable,
+    SinglePassIterable,
+    StreamConsumedError,
     aapply,
     adropwhile,
     agroupby,
     aiter_streamed_json_array,
     apeek,
     apply,
+    aprepend,
     async_iter,
     atakewhile,
     azip,
+    get_stream_cache,
     iter_streamed_json_array,
     peek,
+    prepend,
+    use_stream_cache,
 )
 
 
@@ -128,6 +142,13 @@ iter_streamed_json_array_test_cases = [
     (["[1, ", "2, 3]"], ["1", "2", "3"]),
     (['[{"a": 1}, {2: "b"}]'], ['{"a": 1}', '{2: "b"}']),
     (["{\n", '"value', '":', " [", "1, ", "2, 3", "]"], ["1", "2", "3"]),
+    (["[ ]"], []),
+    (['["a\\"b", "c"]'], ['"a\\"b"', '"c"']),
+    (['["a\\', '"b", "c"]'], ['"a\\"b"', '"c"']),
+    (['["[{,}]", "x"]'], ['"[{,}]"', '"x"']),
+    (["[[1, 2], ", "[3]]"], ["[1, 2]", "[3]"]),
+    (["[1, 2]", "]}, [3]"], ["1", "2"]),
+    (["no array"], []),
 ]
 
 
@@ -136,11 +157,85 @@ def test_iter_streamed_json_array(input, expected):
     assert list(iter_streamed_json_array(iter(input))) == expected
 
 
+def test_json_array_scanner_feed():
+    scanner = JsonArrayScanner()
+    assert scanner.feed('{"value": [1') == []
+    assert scanner.feed(", 2, 3") == ["1", "2"]
+    assert not scanner.finished
+    assert scanner.feed("]") == ["3"]
+    assert scanner.finished
+    assert scanner.feed(", 4]") == []
+
+
+def test_iter_streamed_json_array_consumes_stream():
+    chunks = iter(["[1, 2]", "}", "trailing"])
+    assert list(iter_streamed_json_array(chunks)) == ["1", "2"]
+    assert list(chunks) == []
+
+
+async def test_aiter_streamed_json_array_consumes_stream():
+    chunks = async_iter(["[1, 2]", "}", "trailing"])
+    assert [x async for x in aiter_streamed_json_array(chunks)] == ["1", "2"]
+    assert [x async for x in chunks] == []
+
+
 @pytest.mark.parametrize(("input", "expected"), iter_streamed_json_array_test_cases)
 async def test_aiter_streamed_json_array(input, expected):
     assert [x async for x in aiter_streamed_json_array(async_iter(input))] == expected
 
 
+@pytest.mark.parametrize(
+    ("chunks", "expected_snapshots"),
+    [
+        (
+            ['{"a": "He', 'llo", "b', '": 1', "2}"],
+            [
+                {"a": "He"},
+                {"a": "Hello"},
+                {"a": "Hello", "b": 1},
+                {"a": "Hello", "b": 12},
+            ],
+        ),
+        (['{"a": [1, {"b": tr', "ue}]}"], [{"a": [1, {}]}, {"a": [1, {"b": True}]}]),
+        (['{"a": "\\u00', 'e9"}'], [{"a": ""}, {"a": "\u00e9"}]),
+        (['{"a": "x\\', '"y"}'], [{"a": "x"}, {"a": 'x"y'}]),
+        ([" ", "\n", '{"a": null}'], [None, None, {"a": None}]),
+    ],
+)
+def test_partial_json_parser_snapshot(chunks, expected_snapshots):
+    parser = PartialJsonParser()
+    snapshots = []
+    for chunk in chunks:
+        parser.feed(chunk)
+        # Copy as containers in the snapshot are updated in place
+        snapshots.append(copy.deepcopy(parser.snapshot()))
+    assert snapshots == expected_snapshots
+    assert not parser.failed
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7])
+def test_partial_json_parser_matches_json_loads(chunk_size):
+    value: dict[str, Any] = {
+        "text": 'He said "hi" \\ \n \u00e9 \U0001f600',
+        "items": [1, -2.5, 3e2, True, False, None, {"nested": []}],
+        "empty": {},
+    }
+    text = json.dumps(value)
+    parser = PartialJsonParser()
+    for i in range(0, len(text), chunk_size):
+        parser.feed(text[i : i + chunk_size])
+        parser.snapshot()
+    assert parser.snapshot() == value
+
+
+@pytest.mark.parametrize("text", ['{"a": 1}}', '{"a" 1, 2}', '{"a": tru}', "[1, 2}"])
+def test_partial_json_parser_failed(text):
+    parser = PartialJsonParser()
+    parser.feed(text)
+    parser.feed(" ")
+    assert parser.failed
+
+
 @pytest.mark.parametrize(
     ("input", "expected"),
     [
@@ -169,6 +264,139 @@ async def test_aiter_cached_async_iterable(input, expected):
     assert [x async for x in cached_aiterable] == list(expected)
 
 
+def test_prepend_close():
+    def generate() -> Iterator[int]:
+        yield from [2, 3]
+
+    iterator = generate()
+    prepended = prepend(1, iterator)
+    assert next(prepended) == 1
+    prepended.close()
+    assert list(iterator) == []
+
+
+async def test_aprepend_aclose():
+    aiterator = async_iter([2, 3])
+    prepended = aprepend(1, aiterator)
+    assert await anext(prepended) == 1
+    await prepended.aclose()
+    assert [x async for x in aiterator] == []
+
+
+def test_cached_iterable_close():
+    def generate() -> Iterator[int]:
+        yield from [1, 2, 3]
+
+    cached_iterable = CachedIterable(generate())
+    assert next(iter(cached_iterable)) == 1
+    cached_iterable.close()
+    assert list(cached_iterable) == [1]
+
+
+def test_iter_compact_cached_iterable():
+    compact_cached_iterable = CompactCachedIterable(iter(["Hello", " Wörld", "!"]))
+    assert list(compact_cached_iterable) == ["Hello", " Wörld", "!"]
+    assert list(compact_cached_iterable) == ["Hello Wörld!"]
+
+
+def test_iter_compact_cached_iterable_interleaved():
+    compact_cached_iterable = CompactCachedIterable(iter(["a", "b", "c"]))
+    first = iter(compact_cached_iterable)
+    second = iter(compact_cached_iterable)
+    assert next(first) == "a"
+    assert next(second) == "a"
+    assert next(second) == "b"
+    assert list(first) == ["b", "c"]
+    assert list(second) == ["c"]
+
+
+async def test_aiter_compact_cached_async_iterable():
+    compact_cached_aiterable = CompactCachedAsyncIterable(
+        async_iter(["Hello", " Wörld", "!"])
+    )
+    assert [x async for x in compact_cached_aiterable] == ["Hello", " Wörld", "!"]
+    assert [x async for x in compact_cached_aiterable] == ["Hello Wörld!"]
+
+
+def test_iter_single_pass_iterable():
+    single_pass_iterable = SinglePassIterable([1, 2, 3])
+    iterator = iter(single_pass_iterable)
+    assert next(iterator) == 1
+    assert list(single_pass_iterable) == [2, 3]
+    with pytest.raises(StreamConsumedError):
+        list(single_pass_iterable)
+
+
+async def test_aiter_single_pass_async_iterable():
+    single_pass_aiterable = SinglePassAsyncIterable(async_iter([1, 2, 3]))
+    assert [x async for x in single_pass_aiterable] == [1, 2, 3]
+    with pytest.raises(StreamConsumedError):
+        [x async for x in single_pass_aiterable]
+
+
+def test_use_stream_cache():
+    assert get_stream_cache() == "full"
+    with use_stream_cache("none"):
+        assert get_stream_cache() == "none"
+        with use_stream_cache(None):
+            assert get_stream_cache() == "none"
+        with use_stream_cache("compact"):
+            assert get_stream_cache() == "compact"
+        assert get_stream_cache() == "none"
+    assert get_stream_cache() == "full"
+
+
+@pytest.mark.parametrize(
+    ("cache", "expected_second_iteration"),
+    [
+        ("full", ["Hello", " World"]),
+        ("compact", ["Hello World"]),
+    ],
+)
+def test_streamed_str_cache(cache, expected_second_iteration):
+    streamed_str = StreamedStr(iter(["Hello", " World"]), cache=cache)
+    assert list(streamed_str) == ["Hello", " World"]
+    assert list(streamed_str) == expected_second_iteration
+
+
+def test_streamed_str_cache_none():
+    streamed_str = StreamedStr(iter(["Hello", " World"]), cache="none")
+    for chunk in streamed_str:
+        assert chunk == "Hello"
+        break
+    assert str(streamed_str) == " World"
+    with pytest.raises(StreamConsumedError):
+        str(streamed_str)
+
+
+def test_streamed_str_cache_from_context():
+    with use_stream_cache("none"):
+        streamed_str = StreamedStr(iter(["Hello", " World"]))
+    assert str(streamed_str) == "Hello World"
+    with pytest.raises(StreamConsumedError):
+        str(streamed_str)
+
+
+@pytest.mark.parametrize(
+    ("cache", "expected_second_iteration"),
+    [
+        ("full", ["Hello", " World"]),
+        ("compact", ["Hello World"]),
+    ],
+)
+async def test_async_streamed_str_cache(cache, expected_second_iteration):
+    async_streamed_str = AsyncStreamedStr(async_iter(["Hello", " World"]), cache=cache)
+    assert [chunk async for chunk in async_streamed_str] == ["Hello", " World"]
+    assert [chunk async for chunk in async_streamed_str] == expected_second_iteration
+
+
+async def test_async_streamed_str_cache_none():
+    async_streamed_str = AsyncStreamedStr(async_iter(["Hello", " World"]), cache="none")
+    assert await async_streamed_str.to_string() == "Hello World"
+    with pytest.raises(StreamConsumedError):
+        await async_streamed_str.to_string()
+
+
 def test_streamed_str_iter():
     iter_chunks = iter(["Hello", " World"])
     streamed_str = StreamedStr(iter_chunks)